@@ -1,9 +1,17 @@
+from datetime import datetime, timezone
+import os
+
 from dotenv import load_dotenv
 from flask import Flask, jsonify, make_response, Response, request
+from werkzeug.http import is_resource_modified
 # from flask_cors import CORS
 
-from meal_max.models import kitchen_model
+from meal_max.models import arena_model, kitchen_model
 from meal_max.models.battle_model import BattleModel
+from meal_max.models.matchmaking_model import MatchmakingQueue
+from meal_max.models.simulation_model import simulate_battle
+from meal_max.models.tournament_model import TOURNAMENT_FORMATS, run_tournament
+from meal_max.utils.random_utils import entropy_pool
 from meal_max.utils.sql_utils import check_database_connection, check_table_exists
 
 
@@ -19,6 +27,21 @@ app = Flask(__name__)
 # Initialize the BattleModel
 battle_model = BattleModel()
 
+# Pairs queued meals for battles, independently of the combatants of battle_model. Tickets are
+# kept in the database, so any worker process can serve any ticket
+matchmaking_queue = MatchmakingQueue(
+    tolerance=float(os.getenv("MATCHMAKING_TOLERANCE", "50")),
+    max_workers=int(os.getenv("MATCHMAKING_WORKERS", "4")),
+    max_wait=float(os.getenv("MATCHMAKING_MAX_WAIT_SECONDS", "300"))
+)
+
+# Longest time a ticket poll waits for the battle to finish
+MATCHMAKING_MAX_POLL_SECONDS = 30.0
+
+# Largest leaderboard page, and most neighbors returned on each side of a ranked meal
+LEADERBOARD_MAX_LIMIT = 1000
+MEAL_RANK_MAX_NEIGHBORS = 50
+
 ####################################################
 #
 # Healthchecks
@@ -58,6 +81,18 @@ def db_check() -> Response:
     except Exception as e:
         return make_response(jsonify({'error': str(e)}), 404)
 
+@app.route('/api/random-pool-stats', methods=['GET'])
+def random_pool_stats() -> Response:
+    """
+    Route to check the pool of random numbers used for battles.
+
+    Returns:
+        JSON response with the pool depth, refill counts and latency, and how many
+        numbers came from the local fallback generator.
+    """
+    app.logger.info('Retrieving random pool stats')
+    return make_response(jsonify({'status': 'success', 'random_pool': entropy_pool.stats()}), 200)
+
 
 ##########################################################
 #
@@ -292,6 +327,354 @@ def prep_combatant() -> Response:
         return make_response(jsonify({'error': str(e)}), 500)
 
 
+@app.route('/api/arenas', methods=['POST'])
+def create_arena() -> Response:
+    """
+    Route to open a battle arena of one's own. Unlike the routes above, which share one set of
+    combatants per process, an arena is stored in the database, so every worker process sees it.
+
+    Returns:
+        JSON response with the ID of the new arena.
+    Raises:
+        500 error if there is an issue creating the arena.
+    """
+    try:
+        arena_id = arena_model.create_arena()
+        return make_response(jsonify({'status': 'success', 'arena_id': arena_id}), 201)
+    except Exception as e:
+        app.logger.error("Failed to create arena: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/arenas/<string:arena_id>', methods=['GET'])
+def get_arena_combatants(arena_id: str) -> Response:
+    """
+    Route to get the combatants of an arena.
+
+    Path Parameter:
+        - arena_id (str): The ID of the arena.
+
+    Returns:
+        JSON response with the list of combatants.
+    Raises:
+        404 error if the arena is not found or has expired.
+    """
+    try:
+        combatants = arena_model.get_combatants(arena_id)
+        return make_response(jsonify({'status': 'success', 'combatants': combatants}), 200)
+    except ValueError as e:
+        return make_response(jsonify({'error': str(e)}), 404)
+    except Exception as e:
+        app.logger.error("Failed to get arena combatants: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/arenas/<string:arena_id>/prep-combatant', methods=['POST'])
+def prep_arena_combatant(arena_id: str) -> Response:
+    """
+    Route to prep a meal as a combatant in an arena.
+
+    Path Parameter:
+        - arena_id (str): The ID of the arena.
+
+    Parameters:
+        - meal (str): The name of the meal
+
+    Returns:
+        JSON response with the arena's combatants.
+    Raises:
+        400 error if the meal is not found, the arena is not found or full, or already has the meal.
+        500 error if there is an issue preparing the combatant.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        meal = data.get('meal')
+        app.logger.info("Preparing combatant %s in arena %s", meal, arena_id)
+
+        if not meal:
+            return make_response(jsonify({'error': 'You must name a combatant'}), 400)
+
+        combatants = arena_model.prep_combatant(arena_id, kitchen_model.get_meal_by_name(meal))
+        return make_response(jsonify({'status': 'success', 'combatants': combatants}), 200)
+    except ValueError as e:
+        return make_response(jsonify({'error': str(e)}), 400)
+    except Exception as e:
+        app.logger.error("Failed to prepare arena combatant: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/arenas/<string:arena_id>/battle', methods=['GET'])
+def arena_battle(arena_id: str) -> Response:
+    """
+    Route to fight the battle between an arena's two combatants. The winner stays in the arena.
+
+    Path Parameter:
+        - arena_id (str): The ID of the arena.
+
+    Returns:
+        JSON response with the winner.
+    Raises:
+        400 error if the arena is not found or does not have two combatants.
+        500 error if there is an issue during the battle.
+    """
+    try:
+        winner = arena_model.battle(arena_id)
+        return make_response(jsonify({'status': 'success', 'winner': winner}), 200)
+    except ValueError as e:
+        return make_response(jsonify({'error': str(e)}), 400)
+    except Exception as e:
+        app.logger.error("Arena battle error: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/arenas/<string:arena_id>/clear-combatants', methods=['POST'])
+def clear_arena_combatants(arena_id: str) -> Response:
+    """
+    Route to remove both combatants from an arena.
+
+    Path Parameter:
+        - arena_id (str): The ID of the arena.
+
+    Returns:
+        JSON response indicating success of the operation.
+    Raises:
+        404 error if the arena is not found or has expired.
+    """
+    try:
+        arena_model.clear_combatants(arena_id)
+        return make_response(jsonify({'status': 'success'}), 200)
+    except ValueError as e:
+        return make_response(jsonify({'error': str(e)}), 404)
+    except Exception as e:
+        app.logger.error("Failed to clear arena combatants: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/arenas/<string:arena_id>', methods=['DELETE'])
+def delete_arena(arena_id: str) -> Response:
+    """
+    Route to close an arena.
+
+    Path Parameter:
+        - arena_id (str): The ID of the arena.
+
+    Returns:
+        JSON response indicating success of the operation.
+    Raises:
+        404 error if the arena is not found.
+    """
+    try:
+        arena_model.delete_arena(arena_id)
+        return make_response(jsonify({'status': 'success'}), 200)
+    except ValueError as e:
+        return make_response(jsonify({'error': str(e)}), 404)
+    except Exception as e:
+        app.logger.error("Failed to delete arena: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/matchmaking/enqueue', methods=['POST'])
+def enqueue_for_matchmaking() -> Response:
+    """
+    Route to queue a meal for a battle against a waiting meal of similar battle score.
+
+    Expected JSON Input:
+        - meal (str): The name of the meal to queue.
+
+    Returns:
+        JSON response with the meal's ticket. If an opponent was waiting the ticket is already
+        matched, otherwise it waits; poll the ticket for the outcome.
+    Raises:
+        400 error if input validation fails or the meal is already waiting.
+        500 error if there is an issue queueing the meal.
+    """
+    try:
+        data = request.get_json()
+        meal = data.get('meal')
+        app.logger.info("Queueing meal for matchmaking: %s", meal)
+
+        if not meal:
+            return make_response(jsonify({'error': 'You must name a meal'}), 400)
+
+        try:
+            ticket = matchmaking_queue.enqueue(kitchen_model.get_meal_by_name(meal))
+        except ValueError as e:
+            app.logger.error("Failed to queue meal: %s", str(e))
+            return make_response(jsonify({'error': str(e)}), 400)
+
+        return make_response(jsonify({'status': 'success', 'ticket': ticket.to_dict()}), 202)
+    except Exception as e:
+        app.logger.error("Failed to queue meal: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/matchmaking/tickets/<string:ticket_id>', methods=['GET'])
+def get_matchmaking_ticket(ticket_id: str) -> Response:
+    """
+    Route to poll a matchmaking ticket.
+
+    Path Parameter:
+        - ticket_id (str): The ID of the ticket.
+
+    Query Parameters:
+        - wait (float, optional): Seconds to wait for the battle to finish before answering,
+          up to 30, for long polling. Default is 0.
+
+    Returns:
+        JSON response with the ticket's status, opponent and winner.
+    Raises:
+        404 error if the ticket is not known.
+    """
+    try:
+        wait = request.args.get('wait', 0, type=float)
+        ticket = matchmaking_queue.get_ticket(ticket_id, timeout=min(max(wait, 0), MATCHMAKING_MAX_POLL_SECONDS))
+        return make_response(jsonify({'status': 'success', 'ticket': ticket.to_dict()}), 200)
+    except ValueError as e:
+        return make_response(jsonify({'error': str(e)}), 404)
+    except Exception as e:
+        app.logger.error("Failed to get ticket: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/matchmaking/tickets/<string:ticket_id>', methods=['DELETE'])
+def cancel_matchmaking_ticket(ticket_id: str) -> Response:
+    """
+    Route to take a waiting meal out of the matchmaking queue.
+
+    Path Parameter:
+        - ticket_id (str): The ID of the ticket.
+
+    Returns:
+        JSON response with the cancelled ticket.
+    Raises:
+        409 error if the ticket is not known or no longer waiting.
+    """
+    try:
+        ticket = matchmaking_queue.cancel(ticket_id)
+        return make_response(jsonify({'status': 'success', 'ticket': ticket.to_dict()}), 200)
+    except ValueError as e:
+        return make_response(jsonify({'error': str(e)}), 409)
+    except Exception as e:
+        app.logger.error("Failed to cancel ticket: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/find-opponent/<int:meal_id>', methods=['GET'])
+def find_opponent(meal_id: int) -> Response:
+    """
+    Route to find the meals closest in battle score to a meal, for a fair battle.
+
+    Path Parameter:
+        - meal_id (int): The ID of the meal looking for an opponent.
+
+    Query Parameters:
+        - k (int, optional): The number of opponents to return, between 1 and 100. Default is 5.
+
+    Returns:
+        JSON response with the opponents, closest score first.
+    Raises:
+        400 error if input validation fails.
+        500 error if there is an issue finding opponents.
+    """
+    try:
+        k = request.args.get('k', type=int) if 'k' in request.args else 5
+        app.logger.info("Finding %s opponents for meal %d", k, meal_id)
+
+        if k is None or not 1 <= k <= 100:
+            return make_response(jsonify({'error': 'k must be an integer between 1 and 100'}), 400)
+
+        try:
+            opponents = kitchen_model.find_opponents(meal_id, k)
+        except ValueError as e:
+            app.logger.error("Invalid opponent search: %s", str(e))
+            return make_response(jsonify({'error': str(e)}), 400)
+
+        return make_response(jsonify({'status': 'success', 'opponents': opponents}), 200)
+    except Exception as e:
+        app.logger.error(f"Error finding opponents: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/simulate-battle', methods=['GET'])
+def simulate() -> Response:
+    """
+    Route to estimate the odds of a battle by simulating it many times, without recording anything.
+
+    Query Parameters:
+        - meal1 (int): The ID of the first combatant.
+        - meal2 (int): The ID of the second combatant.
+        - n (int, optional): The number of battles to simulate. Default is 100000.
+
+    Returns:
+        JSON response with each meal's win probability and its 95% confidence interval.
+    Raises:
+        400 error if input validation fails.
+        500 error if there is an issue running the simulation.
+    """
+    try:
+        meal_1_id = request.args.get('meal1', type=int)
+        meal_2_id = request.args.get('meal2', type=int)
+        n = request.args.get('n', type=int) if 'n' in request.args else 100000
+        app.logger.info("Simulating %s battles between meals %s and %s", n, meal_1_id, meal_2_id)
+
+        if meal_1_id is None or meal_2_id is None:
+            return make_response(jsonify({'error': 'meal1 and meal2 must be meal IDs'}), 400)
+        if n is None:
+            return make_response(jsonify({'error': 'n must be an integer'}), 400)
+
+        try:
+            meal_1 = kitchen_model.get_meal_by_id(meal_1_id)
+            meal_2 = kitchen_model.get_meal_by_id(meal_2_id)
+            simulation = simulate_battle(meal_1, meal_2, n)
+        except ValueError as e:
+            app.logger.error("Invalid simulation: %s", str(e))
+            return make_response(jsonify({'error': str(e)}), 400)
+
+        return make_response(jsonify({'status': 'success', 'simulation': simulation}), 200)
+    except Exception as e:
+        app.logger.error(f"Simulation error: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/tournament', methods=['POST'])
+def tournament() -> Response:
+    """
+    Route to run a tournament between many meals and record every battle.
+
+    Expected JSON Input:
+        - format (str): 'single_elimination', 'round_robin' or 'swiss'.
+        - meal_ids (List[int], optional): The meals taking part. If omitted, every live meal
+          matching the filters below takes part.
+        - cuisine (str, optional): Only meals of this cuisine take part.
+        - difficulty (str, optional): Only meals of this difficulty take part.
+        - rounds (int, optional): The number of rounds of a Swiss tournament.
+        - seed (int, optional): Seeds the random numbers so the tournament can be repeated.
+
+    Returns:
+        JSON response with the champion, the standings and the matches of every round.
+    Raises:
+        400 error if input validation fails.
+        500 error if there is an issue running the tournament.
+    """
+    try:
+        data = request.get_json()
+        tournament_format = data.get('format')
+        meal_ids = data.get('meal_ids')
+        rounds = data.get('rounds')
+        seed = data.get('seed')
+        app.logger.info("Starting %s tournament", tournament_format)
+
+        if tournament_format not in TOURNAMENT_FORMATS:
+            return make_response(jsonify({'error': f"Format must be one of {', '.join(TOURNAMENT_FORMATS)}"}), 400)
+        if meal_ids is not None and (not isinstance(meal_ids, list) or not all(isinstance(meal_id, int) for meal_id in meal_ids)):
+            return make_response(jsonify({'error': 'meal_ids must be a list of integers'}), 400)
+        if rounds is not None and not isinstance(rounds, int):
+            return make_response(jsonify({'error': 'rounds must be an integer'}), 400)
+        if seed is not None and not isinstance(seed, int):
+            return make_response(jsonify({'error': 'seed must be an integer'}), 400)
+
+        try:
+            meals = kitchen_model.get_meals(meal_ids, cuisine=data.get('cuisine'), difficulty=data.get('difficulty'))
+            result = run_tournament(meals, tournament_format, rounds=rounds, seed=seed)
+        except ValueError as e:
+            app.logger.error("Invalid tournament: %s", str(e))
+            return make_response(jsonify({'error': str(e)}), 400)
+
+        return make_response(jsonify({'status': 'success', 'tournament': result}), 200)
+    except Exception as e:
+        app.logger.error(f"Tournament error: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
+
 ############################################################
 #
 # Leaderboard
@@ -302,27 +685,112 @@ def prep_combatant() -> Response:
 @app.route('/api/leaderboard', methods=['GET'])
 def get_leaderboard() -> Response:
     """
-    Route to get the leaderboard of meals sorted by wins, battles, or win percentage.
+    Route to get the leaderboard of meals sorted by wins, battles, win percentage, or rating.
+    Tournaments do not change ratings, so meals that have only battled in tournaments are not
+    on the rating leaderboard.
 
     Query Parameters:
-        - sort (str): The field to sort by ('wins', 'battles', or 'win_pct'). Default is 'wins'.
+        - sort (str): The field to sort by ('wins', 'battles', 'win_pct', or 'rating'). Default is 'wins'.
+        - limit (int, optional): The number of meals per page, up to 1000. Default is every meal.
+        - cursor (str, optional): The next_cursor of the previous page.
 
     Returns:
-        JSON response with a sorted leaderboard of meals.
+        JSON response with a sorted leaderboard of meals and the cursor of the next page (null on
+        the last page), with ETag and Last-Modified headers.
+        304 with no body if the request's If-None-Match or If-Modified-Since shows that the
+        client's copy is current.
     Raises:
+        400 error if the sort field, limit or cursor is invalid.
         500 error if there is an issue generating the leaderboard.
     """
     try:
         sort_by = request.args.get('sort', 'wins')  # Default sort by wins
+        limit = request.args.get('limit', type=int) if 'limit' in request.args else None
+        cursor = request.args.get('cursor')
         app.logger.info("Generating leaderboard sorted by %s", sort_by)
 
-        leaderboard_data = kitchen_model.get_leaderboard(sort_by)
-
-        return make_response(jsonify({'status': 'success', 'leaderboard': leaderboard_data}), 200)
+        if 'limit' in request.args and (limit is None or not 1 <= limit <= LEADERBOARD_MAX_LIMIT):
+            return make_response(jsonify({'error': f'limit must be between 1 and {LEADERBOARD_MAX_LIMIT}'}), 400)
+
+        leaderboard = kitchen_model.get_cached_leaderboard(sort_by, limit, cursor)
+        last_modified = datetime.fromtimestamp(int(leaderboard.last_modified), tz=timezone.utc)
+
+        if is_resource_modified(request.environ, etag=leaderboard.etag, last_modified=last_modified):
+            response = make_response(jsonify({
+                'status': 'success',
+                'leaderboard': leaderboard.entries,
+                'next_cursor': leaderboard.next_cursor
+            }), 200)
+        else:
+            response = make_response('', 304)
+        response.set_etag(leaderboard.etag)
+        response.last_modified = last_modified
+        # Clients may keep the leaderboard but must revalidate it before each use
+        response.cache_control.no_cache = True
+        return response
+    except ValueError as e:
+        return make_response(jsonify({'error': str(e)}), 400)
     except Exception as e:
         app.logger.error(f"Error generating leaderboard: {e}")
         return make_response(jsonify({'error': str(e)}), 500)
 
+@app.route('/api/meal-rank/<int:meal_id>', methods=['GET'])
+def get_meal_rank(meal_id: int) -> Response:
+    """
+    Route to get a meal's place on the leaderboard and the meals around it.
+
+    Path Parameter:
+        - meal_id (int): The ID of the meal.
+
+    Query Parameters:
+        - sort (str): The field to rank by ('wins', 'battles', 'win_pct', or 'rating'). Default is 'wins'.
+        - neighbors (int, optional): How many meals to return above and below it, up to 50. Default is 2.
+
+    Returns:
+        JSON response with the meal's rank (shared by ties), its position and its neighbors.
+    Raises:
+        400 error if the sort field or number of neighbors is invalid.
+        404 error if the meal is not found, has been deleted, has not battled yet or, by rating,
+            has no rated battles.
+        500 error if there is an issue ranking the meal.
+    """
+    try:
+        sort_by = request.args.get('sort', 'wins')
+        neighbors = request.args.get('neighbors', type=int) if 'neighbors' in request.args else 2
+        app.logger.info("Ranking meal %s by %s", meal_id, sort_by)
+
+        if sort_by not in kitchen_model.LEADERBOARD_SORTS:
+            return make_response(jsonify({'error': f'Invalid sort field: {sort_by}'}), 400)
+        if neighbors is None or not 0 <= neighbors <= MEAL_RANK_MAX_NEIGHBORS:
+            return make_response(jsonify({'error': f'neighbors must be between 0 and {MEAL_RANK_MAX_NEIGHBORS}'}), 400)
+
+        try:
+            rank = kitchen_model.get_meal_rank(meal_id, sort_by, neighbors)
+        except ValueError as e:
+            return make_response(jsonify({'error': str(e)}), 404)
+
+        return make_response(jsonify({'status': 'success', 'rank': rank}), 200)
+    except Exception as e:
+        app.logger.error("Error ranking meal: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/rebuild-ratings', methods=['POST'])
+def rebuild_ratings() -> Response:
+    """
+    Route to recompute every meal's rating by replaying the battle log.
+
+    Returns:
+        JSON response with the number of battles replayed and meals rated.
+    Raises:
+        500 error if there is an issue rebuilding the ratings.
+    """
+    try:
+        app.logger.info("Rebuilding ratings from the battle log")
+        summary = kitchen_model.rebuild_ratings()
+        return make_response(jsonify({'status': 'success', **summary}), 200)
+    except Exception as e:
+        app.logger.error("Failed to rebuild ratings: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,259 @@
+import logging
+import os
+import sqlite3
+import time
+from typing import List, Optional, Tuple
+import uuid
+
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.kitchen_model import (
+    MEAL_COLUMNS, Meal, meal_from_row, record_battle_result
+)
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.sql_utils import get_db_connection, write_with_busy_retry
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Seconds an arena is kept after it was last used
+ARENA_TTL_SECONDS = float(os.getenv("ARENA_TTL_SECONDS", "1800"))
+
+# Times a battle is drawn again when its arena's combatants change while the winner is drawn
+BATTLE_ATTEMPTS = 3
+
+
+##################################################
+# Arenas
+#
+# An arena is a battle ground of its own: its combatants live in the arenas table instead of
+# process memory, so any worker process can serve any request for it. Every change happens in
+# a single BEGIN IMMEDIATE transaction, so concurrent requests on one arena are serialized.
+# Reads take no write lock. Each use pushes back the arena's expiry, a read only once half of it
+# has passed; expired arenas are removed when arenas are created.
+##################################################
+
+def create_arena() -> str:
+    """
+    Creates an empty arena and removes arenas that have expired.
+
+    Returns:
+        str: The ID of the new arena.
+
+    Raises:
+        sqlite3.Error: If any database error occurs.
+    """
+    arena_id = uuid.uuid4().hex
+
+    def create(cursor: sqlite3.Cursor) -> None:
+        now = time.time()
+        cursor.execute("DELETE FROM arenas WHERE expires_at < ?", (now,))
+        if cursor.rowcount:
+            logger.info("Removed %d expired arenas", cursor.rowcount)
+        cursor.execute("INSERT INTO arenas (id, expires_at) VALUES (?, ?)", (arena_id, now + ARENA_TTL_SECONDS))
+
+    write_with_busy_retry(create)
+    logger.info("Created arena %s", arena_id)
+    return arena_id
+
+def get_combatants(arena_id: str) -> List[Meal]:
+    """
+    Retrieves the combatants prepped in an arena. The arena is read without taking the write
+    lock, and its expiry is only pushed back once less than half of the TTL is left, so polling
+    an arena rarely writes.
+
+    Args:
+        arena_id (str): The ID of the arena.
+
+    Returns:
+        List[Meal]: The combatants, in the order they were prepped.
+
+    Raises:
+        ValueError: If the arena is not found or has expired.
+        sqlite3.Error: If any database error occurs.
+    """
+    combatants, expires_at = _read_combatants(arena_id)
+    if expires_at - time.time() < ARENA_TTL_SECONDS / 2:
+        write_with_busy_retry(lambda cursor: _touch_arena(cursor, arena_id))
+    return combatants
+
+def prep_combatant(arena_id: str, meal: Meal) -> List[Meal]:
+    """
+    Adds a combatant to an arena.
+
+    Args:
+        arena_id (str): The ID of the arena.
+        meal (Meal): The meal to prep.
+
+    Returns:
+        List[Meal]: The combatants after the meal was added.
+
+    Raises:
+        ValueError: If the arena is not found or has expired, already has two combatants,
+            or already has this meal.
+        sqlite3.Error: If any database error occurs.
+    """
+    def prep(cursor: sqlite3.Cursor) -> List[Meal]:
+        combatant_ids = _touch_arena(cursor, arena_id)
+        if combatant_ids[1] is not None:
+            logger.error("Attempted to add combatant '%s' but arena %s is full", meal.meal, arena_id)
+            raise ValueError("Combatant list is full, cannot add more combatants.")
+        if combatant_ids[0] == meal.id:
+            logger.error("Combatant '%s' is already in arena %s", meal.meal, arena_id)
+            raise ValueError(f"Meal '{meal.meal}' is already a combatant in this arena.")
+
+        if combatant_ids[0] is None:
+            cursor.execute("UPDATE arenas SET combatant_1 = ? WHERE id = ?", (meal.id, arena_id))
+            combatant_ids = (meal.id, None)
+        else:
+            cursor.execute("UPDATE arenas SET combatant_2 = ? WHERE id = ?", (meal.id, arena_id))
+            combatant_ids = (combatant_ids[0], meal.id)
+        return _load_combatants(cursor, combatant_ids)
+
+    combatants = write_with_busy_retry(prep)
+    logger.info("Added combatant '%s' to arena %s", meal.meal, arena_id)
+    return combatants
+
+def battle(arena_id: str) -> str:
+    """
+    Fights the battle between an arena's two combatants with the rule of BattleModel. The result
+    is recorded and the loser removed from the arena in the same transaction, so a battle can
+    neither be fought twice nor recorded without its arena being updated.
+
+    The winner is drawn before the transaction, since the random number may wait on random.org,
+    and the write lock is not held meanwhile. The transaction then checks the arena still has the
+    same combatants; if another request changed them, the battle is drawn again.
+
+    Args:
+        arena_id (str): The ID of the arena.
+
+    Returns:
+        str: The name of the winning meal, which stays in the arena.
+
+    Raises:
+        ValueError: If the arena is not found or has expired, has fewer than two combatants,
+            or its combatants kept changing during the battle.
+        sqlite3.Error: If any database error occurs.
+    """
+    for _ in range(BATTLE_ATTEMPTS):
+        combatants = _read_combatants(arena_id)[0]
+        if len(combatants) < 2:
+            logger.error("Not enough combatants to start a battle in arena %s", arena_id)
+            raise ValueError("Two combatants must be prepped for a battle.")
+        winner, loser = BattleModel().pick_winner(combatants[0], combatants[1])
+
+        def fight(cursor: sqlite3.Cursor) -> bool:
+            if _touch_arena(cursor, arena_id) != (combatants[0].id, combatants[1].id):
+                return False
+            record_battle_result(winner.id, loser.id, cursor=cursor)
+            cursor.execute("UPDATE arenas SET combatant_1 = ?, combatant_2 = NULL WHERE id = ?", (winner.id, arena_id))
+            return True
+
+        if write_with_busy_retry(fight):
+            logger.info("Arena %s battle won by %s", arena_id, winner.meal)
+            return winner.meal
+        logger.info("Combatants of arena %s changed during the battle, drawing again", arena_id)
+
+    logger.error("Combatants of arena %s kept changing during the battle", arena_id)
+    raise ValueError(f"The combatants of arena {arena_id} kept changing, please retry the battle.")
+
+def clear_combatants(arena_id: str) -> None:
+    """
+    Removes both combatants from an arena.
+
+    Args:
+        arena_id (str): The ID of the arena.
+
+    Raises:
+        ValueError: If the arena is not found or has expired.
+        sqlite3.Error: If any database error occurs.
+    """
+    def clear(cursor: sqlite3.Cursor) -> None:
+        _touch_arena(cursor, arena_id)
+        cursor.execute("UPDATE arenas SET combatant_1 = NULL, combatant_2 = NULL WHERE id = ?", (arena_id,))
+
+    write_with_busy_retry(clear)
+    logger.info("Cleared the combatants of arena %s", arena_id)
+
+def delete_arena(arena_id: str) -> None:
+    """
+    Removes an arena.
+
+    Args:
+        arena_id (str): The ID of the arena.
+
+    Raises:
+        ValueError: If the arena is not found.
+        sqlite3.Error: If any database error occurs.
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM arenas WHERE id = ?", (arena_id,))
+            conn.commit()
+            if not cursor.rowcount:
+                logger.info("Arena %s not found", arena_id)
+                raise ValueError(f"Arena {arena_id} not found")
+
+            logger.info("Deleted arena %s", arena_id)
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+def _read_combatants(arena_id: str) -> Tuple[List[Meal], float]:
+    """
+    Loads an arena's combatants and its expiry outside of any write transaction.
+
+    Raises:
+        ValueError: If the arena is not found or has expired.
+        sqlite3.Error: If any database error occurs.
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            combatant_ids, expires_at = _read_arena(cursor, arena_id)
+            return _load_combatants(cursor, combatant_ids), expires_at
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+def _read_arena(cursor: sqlite3.Cursor, arena_id: str) -> Tuple[Tuple[Optional[int], Optional[int]], float]:
+    """
+    Returns an arena's combatant IDs and expiry.
+
+    Raises:
+        ValueError: If the arena is not found or has expired.
+    """
+    cursor.execute("SELECT combatant_1, combatant_2, expires_at FROM arenas WHERE id = ?", (arena_id,))
+    row = cursor.fetchone()
+    if not row or row[2] < time.time():
+        logger.info("Arena %s not found or expired", arena_id)
+        raise ValueError(f"Arena {arena_id} not found")
+    return (row[0], row[1]), row[2]
+
+def _touch_arena(cursor: sqlite3.Cursor, arena_id: str) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Pushes back an arena's expiry and returns its combatant IDs.
+
+    Raises:
+        ValueError: If the arena is not found or has expired.
+    """
+    combatant_ids, _ = _read_arena(cursor, arena_id)
+    cursor.execute("UPDATE arenas SET expires_at = ? WHERE id = ?", (time.time() + ARENA_TTL_SECONDS, arena_id))
+    return combatant_ids
+
+def _load_combatants(cursor: sqlite3.Cursor, combatant_ids: Tuple[Optional[int], Optional[int]]) -> List[Meal]:
+    """
+    Loads the meals of an arena's combatants, in order. Meals deleted since they were prepped
+    are still returned, as with combatants prepped in a BattleModel; recording a battle rejects them.
+    """
+    ids = [meal_id for meal_id in combatant_ids if meal_id is not None]
+    if not ids:
+        return []
+    placeholders = ", ".join("?" * len(ids))
+    cursor.execute(f"SELECT {MEAL_COLUMNS} FROM meals WHERE id IN ({placeholders})", ids)
+    meals_by_id = {row[0]: meal_from_row(row) for row in cursor.fetchall()}
+    return [meals_by_id[meal_id] for meal_id in ids if meal_id in meals_by_id]
@@ -1,7 +1,7 @@
 import logging
-from typing import List
+from typing import List, Tuple
 
-from meal_max.models.kitchen_model import Meal, update_meal_stats
+from meal_max.models.kitchen_model import Meal, record_battle_result
 from meal_max.utils.logger import configure_logger
 from meal_max.utils.random_utils import get_random
 
@@ -25,6 +25,28 @@ class BattleModel:
         combatant_1 = self.combatants[0]
         combatant_2 = self.combatants[1]
 
+        winner, loser = self.pick_winner(combatant_1, combatant_2)
+
+        # Update stats for both combatants in one transaction
+        record_battle_result(winner.id, loser.id)
+
+        # Remove the losing combatant from combatants
+        self.combatants.remove(loser)
+
+        return winner.meal
+
+    def pick_winner(self, combatant_1: Meal, combatant_2: Meal) -> Tuple[Meal, Meal]:
+        """
+        Decides a battle without recording it: the first combatant wins when the gap between
+        the battle scores, divided by 100, exceeds a random number.
+
+        Args:
+            combatant_1 (Meal): The first combatant.
+            combatant_2 (Meal): The second combatant.
+
+        Returns:
+            Tuple[Meal, Meal]: The winner and the loser.
+        """
         # Log the start of the battle
         logger.info("Battle started between %s and %s", combatant_1.meal, combatant_2.meal)
 
@@ -59,33 +81,22 @@ class BattleModel:
         # Log the winner
         logger.info("The winner is: %s", winner.meal)
 
-        # Update stats for both combatants
-        update_meal_stats(winner.id, 'win')
-        update_meal_stats(loser.id, 'loss')
-
-        # Remove the losing combatant from combatants
-        self.combatants.remove(loser)
-
-        return winner.meal
+        return winner, loser
 
     def clear_combatants(self):
         logger.info("Clearing the combatants list.")
         self.combatants.clear()
 
     def get_battle_score(self, combatant: Meal) -> float:
-        difficulty_modifier = {"HIGH": 1, "MED": 2, "LOW": 3}
+        """
+        Returns a meal's battle score. Meals loaded from the database carry the score stored in
+        the meals table; it is only computed for meals built in memory.
+        """
+        if combatant.battle_score is not None:
+            return combatant.battle_score
 
-        # Log the calculation process
-        logger.info("Calculating battle score for %s: price=%.3f, cuisine=%s, difficulty=%s",
-                    combatant.meal, combatant.price, combatant.cuisine, combatant.difficulty)
-
-        # Calculate score
-        score = (combatant.price * len(combatant.cuisine)) - difficulty_modifier[combatant.difficulty]
-
-        # Log the calculated score
-        logger.info("Battle score for %s: %.3f", combatant.meal, score)
-
-        return score
+        difficulty_modifier = {"HIGH": 1, "MED": 2, "LOW": 3}
+        return (combatant.price * len(combatant.cuisine)) - difficulty_modifier[combatant.difficulty]
 
     def get_combatants(self) -> List[Meal]:
         logger.info("Retrieving current list of combatants.")
@@ -1,17 +1,41 @@
-from dataclasses import dataclass
+import base64
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import hashlib
+import json
 import logging
 import os
 import sqlite3
-from typing import Any
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
-from meal_max.utils.sql_utils import get_db_connection
+from meal_max.utils.sql_utils import get_db_connection, write_with_busy_retry
 from meal_max.utils.logger import configure_logger
+from meal_max.utils.rating_utils import INITIAL_RATING, replay_ratings, update_ratings
 
 
 logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 
+# Meal IDs per query when loading many meals, below SQLite's limit on bound parameters
+SQL_IN_CHUNK_SIZE = 500
+
+# Longest time a cached leaderboard is served. Any write to the meals table, from any process,
+# already invalidates it at once through the meals_version row; this is only a safety net.
+LEADERBOARD_CACHE_SECONDS = float(os.getenv("LEADERBOARD_CACHE_SECONDS", "5"))
+
+# Number of leaderboards and leaderboard pages kept in the cache
+LEADERBOARD_CACHE_ENTRIES = 256
+
+LEADERBOARD_SORTS = ("wins", "battles", "win_pct", "rating")
+
+LEADERBOARD_COLUMNS = "id, meal, cuisine, price, difficulty, battles, wins, win_pct, rating"
+
+MEAL_COLUMNS = "id, meal, cuisine, price, difficulty, battle_score"
+
+
 @dataclass
 class Meal:
     id: int
@@ -19,6 +43,9 @@ class Meal:
     cuisine: str
     price: float
     difficulty: str
+    # Loaded from the meals table's generated column, so battles need not compute it again.
+    # None for meals built in memory.
+    battle_score: Optional[float] = field(default=None, compare=False)
 
     def __post_init__(self):
         if self.price < 0:
@@ -27,6 +54,36 @@ class Meal:
             raise ValueError("Difficulty must be 'LOW', 'MED', or 'HIGH'.")
 
 
+@dataclass
+class Leaderboard:
+    """
+    A cached leaderboard or leaderboard page.
+
+    Attributes:
+        sort_by (str): The sort key.
+        entries (List[dict]): The rows, as returned by get_leaderboard_page. Must not be modified.
+        next_cursor (Optional[str]): The cursor of the next page, or None if this is the last.
+        etag (str): A hash of the entries, the same in every process for the same leaderboard.
+        last_modified (float): When the meals table last changed before the entries were read,
+            as a Unix timestamp, the same in every process.
+        version (int): The version of the meals table when the entries were read.
+        built_at (float): When the entries were read, on the monotonic clock.
+    """
+    sort_by: str
+    entries: List[dict]
+    next_cursor: Optional[str]
+    etag: str
+    last_modified: float
+    version: int
+    built_at: float
+
+
+# Keyed by (sort_by, limit, cursor)
+_leaderboards: "OrderedDict[Tuple[str, Optional[int], Optional[str]], Leaderboard]" = OrderedDict()
+_leaderboard_builds: Set[Tuple[str, Optional[int], Optional[str]]] = set()
+_leaderboard_condition = threading.Condition()
+
+
 def create_meal(meal: str, cuisine: str, price: float, difficulty: str) -> None:
     if not isinstance(price, (int, float)) or price <= 0:
         raise ValueError(f"Invalid price: {price}. Price must be a positive number.")
@@ -96,42 +153,353 @@ def delete_meal(meal_id: int) -> None:
         logger.error("Database error: %s", str(e))
         raise e
 
-def get_leaderboard(sort_by: str="wins") -> dict[str, Any]:
-    query = """
-        SELECT id, meal, cuisine, price, difficulty, battles, wins, (wins * 1.0 / battles) AS win_pct
-        FROM meals WHERE deleted = false AND battles > 0
+def get_leaderboard(sort_by: str="wins") -> List[dict]:
     """
+    Retrieves every meal that has battled, best first.
 
-    if sort_by == "win_pct":
-        query += " ORDER BY win_pct DESC"
-    elif sort_by == "wins":
-        query += " ORDER BY wins DESC"
-    else:
+    Args:
+        sort_by (str, optional): 'wins', 'battles', 'win_pct' or 'rating'. Defaults to 'wins'.
+
+    Returns:
+        List[dict]: The meals with their stats, win_pct as a percentage.
+
+    Raises:
+        ValueError: If the sort key is invalid.
+        sqlite3.Error: If any database error occurs.
+    """
+    return get_leaderboard_page(sort_by)[0]
+
+def get_leaderboard_page(
+    sort_by: str="wins",
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Retrieves a page of the leaderboard. Meals are ordered by the sort key, descending, with
+    ties broken by ID, descending, so every meal has one position. Only meals that have battled
+    are listed; by rating, only meals with rated battles, since tournaments leave ratings alone.
+
+    Pages are addressed by keyset: the cursor holds the sort key and ID of the last meal of the
+    previous page, and the next page is a range scan of the sort key's index starting after it.
+    Fetching a page costs the same however deep into the leaderboard it is, and battles fought
+    between requests do not make a page repeat or skip meals that did not move.
+
+    Args:
+        sort_by (str, optional): 'wins', 'battles', 'win_pct' or 'rating'. Defaults to 'wins'.
+        limit (int, optional): The largest number of meals to return. Defaults to None (all).
+        cursor (str, optional): The next_cursor of the previous page. Defaults to None (the top).
+
+    Returns:
+        Tuple[List[dict], Optional[str]]: The meals with their stats, win_pct as a percentage,
+            and the cursor of the next page, or None if there are no more meals.
+
+    Raises:
+        ValueError: If the sort key, limit or cursor is invalid.
+        sqlite3.Error: If any database error occurs.
+    """
+    _check_leaderboard_sort(sort_by)
+    if limit is not None and limit < 1:
+        logger.error("Invalid leaderboard limit: %s", limit)
+        raise ValueError(f"Invalid limit: {limit}. Limit must be a positive number.")
+
+    query = f"SELECT {LEADERBOARD_COLUMNS} FROM {_leaderboard_source(sort_by)} WHERE {_leaderboard_filter(sort_by)}"
+    params: List[Any] = []
+    if cursor is not None:
+        query += f" AND ({sort_by}, id) < (?, ?)"
+        params.extend(_decode_leaderboard_cursor(sort_by, cursor))
+    query += f" ORDER BY {sort_by} DESC, id DESC"
+    if limit is not None:
+        # One row more than asked for tells whether there is a next page
+        query += " LIMIT ?"
+        params.append(limit + 1)
+
+    try:
+        with get_db_connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_leaderboard_cursor(sort_by, rows[-1])
+        leaderboard = [_leaderboard_entry(row) for row in rows]
+
+        logger.info("Leaderboard retrieved successfully")
+        return leaderboard, next_cursor
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+def get_meal_rank(meal_id: int, sort_by: str="wins", neighbors: int = 2) -> dict:
+    """
+    Finds a meal's place on the leaderboard and the meals just above and below it.
+
+    The rank is one more than the number of meals with a better sort key, counted over a range
+    of the sort key's index, so the leaderboard is never sorted or read in full. Tied meals share
+    a rank; position breaks ties by ID, as on the leaderboard pages.
+
+    Args:
+        meal_id (int): The ID of the meal.
+        sort_by (str, optional): 'wins', 'battles', 'win_pct' or 'rating'. Defaults to 'wins'.
+        neighbors (int, optional): How many meals to return on each side. Defaults to 2.
+
+    Returns:
+        dict: The sort key, the meal's rank and position, the meal itself and its neighbors
+            'above' (best first) and 'below', each with its position.
+
+    Raises:
+        ValueError: If the sort key is invalid, or the meal is not found, has been deleted,
+            has not battled yet or, by rating, has no rated battles.
+        sqlite3.Error: If any database error occurs.
+    """
+    _check_leaderboard_sort(sort_by)
+    ranked = f"{_leaderboard_source(sort_by)} WHERE {_leaderboard_filter(sort_by)}"
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {LEADERBOARD_COLUMNS}, deleted, rated_battles FROM meals WHERE id = ?", (meal_id,))
+            row = cursor.fetchone()
+            if not row:
+                logger.info("Meal with ID %s not found", meal_id)
+                raise ValueError(f"Meal with ID {meal_id} not found")
+            if row[9]:
+                logger.info("Meal with ID %s has been deleted", meal_id)
+                raise ValueError(f"Meal with ID {meal_id} has been deleted")
+            if not row[5]:
+                logger.info("Meal with ID %s has not battled yet", meal_id)
+                raise ValueError(f"Meal with ID {meal_id} has not battled yet")
+            if sort_by == "rating" and not row[10]:
+                logger.info("Meal with ID %s has no rated battles yet", meal_id)
+                raise ValueError(f"Meal with ID {meal_id} has no rated battles yet")
+            value = row[LEADERBOARD_COLUMNS.split(", ").index(sort_by)]
+
+            cursor.execute(f"SELECT count(*) FROM {ranked} AND {sort_by} > ?", (value,))
+            rank = cursor.fetchone()[0] + 1
+            # Only the meals tied with it are left to count for its position
+            cursor.execute(f"SELECT count(*) FROM {ranked} AND {sort_by} = ? AND id > ?", (value, meal_id))
+            position = rank + cursor.fetchone()[0]
+
+            cursor.execute(f"""
+                SELECT {LEADERBOARD_COLUMNS} FROM {ranked} AND ({sort_by}, id) > (?, ?)
+                ORDER BY {sort_by}, id LIMIT ?
+            """, (value, meal_id, neighbors))
+            above = cursor.fetchall()[::-1]
+            cursor.execute(f"""
+                SELECT {LEADERBOARD_COLUMNS} FROM {ranked} AND ({sort_by}, id) < (?, ?)
+                ORDER BY {sort_by} DESC, id DESC LIMIT ?
+            """, (value, meal_id, neighbors))
+            below = cursor.fetchall()
+
+        logger.info("Meal with ID %s is ranked %d by %s", meal_id, rank, sort_by)
+        return {
+            'sort': sort_by,
+            'rank': rank,
+            'position': position,
+            'meal': _leaderboard_entry(row),
+            'above': [dict(_leaderboard_entry(neighbor), position=position - len(above) + index)
+                      for index, neighbor in enumerate(above)],
+            'below': [dict(_leaderboard_entry(neighbor), position=position + 1 + index)
+                      for index, neighbor in enumerate(below)]
+        }
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+def get_cached_leaderboard(
+    sort_by: str="wins",
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> Leaderboard:
+    """
+    Returns a leaderboard or leaderboard page from the cache, reading it again only once the
+    meals table has changed or it is older than LEADERBOARD_CACHE_SECONDS. The most recently
+    used LEADERBOARD_CACHE_ENTRIES pages are kept.
+
+    Changes are detected with the meals_version row, which triggers bump on every write to the
+    meals table. Every worker process sharing the database therefore sees every write at once,
+    at the cost of one single-row read per request, and they all report the same Last-Modified.
+
+    Concurrent misses for the same page are coalesced: the first caller runs the query and the
+    others wait for its result, so a burst of requests after a battle costs a single query.
+
+    Args:
+        sort_by (str, optional): 'wins', 'battles', 'win_pct' or 'rating'. Defaults to 'wins'.
+        limit (int, optional): The page size. Defaults to None (all meals).
+        cursor (str, optional): The cursor of the page. Defaults to None (the top).
+
+    Returns:
+        Leaderboard: The cached leaderboard with its ETag and last modification time.
+
+    Raises:
+        ValueError: If the sort key, limit or cursor is invalid.
+        sqlite3.Error: If any database error occurs.
+    """
+    _check_leaderboard_sort(sort_by)
+    if cursor is not None:
+        # Rejects a malformed cursor before anything is read
+        _decode_leaderboard_cursor(sort_by, cursor)
+    key = (sort_by, limit, cursor)
+    # Read before the entries, so cached entries are never older than the version they are kept under
+    version, changed_at = get_meals_version()
+    with _leaderboard_condition:
+        while True:
+            cached = _leaderboards.get(key)
+            # A build that started before this call may have missed a write this caller has seen
+            if (cached is not None and cached.version >= version
+                    and time.monotonic() - cached.built_at < LEADERBOARD_CACHE_SECONDS):
+                _leaderboards.move_to_end(key)
+                return cached
+            if key not in _leaderboard_builds:
+                break
+            _leaderboard_condition.wait()
+        _leaderboard_builds.add(key)
+
+    try:
+        built_at = time.monotonic()
+        entries, next_cursor = get_leaderboard_page(sort_by, limit, cursor)
+        etag = hashlib.sha1(json.dumps([entries, next_cursor], separators=(",", ":")).encode()).hexdigest()
+    except Exception:
+        # Let one of the waiting callers try again
+        with _leaderboard_condition:
+            _leaderboard_builds.discard(key)
+            _leaderboard_condition.notify_all()
+        raise
+
+    with _leaderboard_condition:
+        leaderboard = Leaderboard(sort_by, entries, next_cursor, etag, changed_at, version, built_at)
+        _leaderboards[key] = leaderboard
+        _leaderboards.move_to_end(key)
+        while len(_leaderboards) > LEADERBOARD_CACHE_ENTRIES:
+            _leaderboards.popitem(last=False)
+        _leaderboard_builds.discard(key)
+        _leaderboard_condition.notify_all()
+    logger.info("Cached leaderboard sorted by %s", sort_by)
+    return leaderboard
+
+def get_meals_version() -> Tuple[int, float]:
+    """
+    Reads the version of the meals table, which triggers bump on every insert, update and delete,
+    and when it last changed.
+
+    Returns:
+        Tuple[int, float]: The version and when it last changed, as a Unix timestamp.
+
+    Raises:
+        sqlite3.Error: If any database error occurs.
+    """
+    try:
+        with get_db_connection() as conn:
+            version, changed_at = conn.execute("SELECT version, changed_at FROM meals_version").fetchone()
+        return version, changed_at
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+def _check_leaderboard_sort(sort_by: str) -> None:
+    if sort_by not in LEADERBOARD_SORTS:
         logger.error("Invalid sort_by parameter: %s", sort_by)
         raise ValueError("Invalid sort_by parameter: %s" % sort_by)
 
+def _leaderboard_source(sort_by: str) -> str:
+    # The battles > 0 term would otherwise lead SQLite to scan the battles index for every sort key
+    return f"meals INDEXED BY idx_meals_leaderboard_{sort_by}"
+
+def _leaderboard_filter(sort_by: str) -> str:
+    # Must match the WHERE clause of the sort key's partial index in create_meal_table.sql
+    if sort_by == "rating":
+        return "deleted = FALSE AND rated_battles > 0"
+    return "deleted = FALSE AND battles > 0"
+
+def _leaderboard_entry(row: tuple) -> dict:
+    return {
+        'id': row[0],
+        'meal': row[1],
+        'cuisine': row[2],
+        'price': row[3],
+        'difficulty': row[4],
+        'battles': row[5],
+        'wins': row[6],
+        'win_pct': round(row[7] * 100, 1),  # Convert to percentage
+        'rating': round(row[8], 1)
+    }
+
+def _encode_leaderboard_cursor(sort_by: str, row: tuple) -> str:
+    value = row[LEADERBOARD_COLUMNS.split(", ").index(sort_by)]
+    return base64.urlsafe_b64encode(json.dumps([value, row[0]]).encode()).decode()
+
+def _decode_leaderboard_cursor(sort_by: str, cursor: str) -> Tuple[Any, int]:
+    try:
+        value, meal_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        value_type = float if sort_by in ("win_pct", "rating") else int
+        if not isinstance(value, (int, float)) or isinstance(value, bool) or type(meal_id) is not int:
+            raise ValueError
+        return value_type(value), meal_id
+    except (ValueError, TypeError):
+        logger.error("Invalid leaderboard cursor: %s", cursor)
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+def find_opponents(meal_id: int, k: int = 5) -> List[dict]:
+    """
+    Finds the live meals whose battle scores are closest to a meal's, for a fair battle.
+
+    The k nearest scores must be among the k next scores at or above the meal's and the k next
+    below it, so two bounded range scans of the battle score index suffice, however many
+    meals there are.
+
+    Args:
+        meal_id (int): The ID of the meal looking for an opponent.
+        k (int, optional): The number of opponents to return. Defaults to 5.
+
+    Returns:
+        List[dict]: Up to k meals, closest score first, each with its battle score and score gap.
+
+    Raises:
+        ValueError: If the meal is not found or has been deleted.
+        sqlite3.Error: If any database error occurs.
+    """
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(query)
-            rows = cursor.fetchall()
-
-        leaderboard = []
-        for row in rows:
-            meal = {
-                'id': row[0],
-                'meal': row[1],
-                'cuisine': row[2],
-                'price': row[3],
-                'difficulty': row[4],
-                'battles': row[5],
-                'wins': row[6],
-                'win_pct': round(row[7] * 100, 1)  # Convert to percentage
+            cursor.execute("SELECT battle_score, deleted FROM meals WHERE id = ?", (meal_id,))
+            row = cursor.fetchone()
+            if not row:
+                logger.info("Meal with ID %s not found", meal_id)
+                raise ValueError(f"Meal with ID {meal_id} not found")
+            if row[1]:
+                logger.info("Meal with ID %s has been deleted", meal_id)
+                raise ValueError(f"Meal with ID {meal_id} has been deleted")
+            score = row[0]
+
+            columns = "SELECT id, meal, cuisine, price, difficulty, battle_score FROM meals"
+            cursor.execute(f"""
+                {columns} WHERE deleted = FALSE AND battle_score >= ? AND id != ?
+                ORDER BY battle_score LIMIT ?
+            """, (score, meal_id, k))
+            candidates = cursor.fetchall()
+            cursor.execute(f"""
+                {columns} WHERE deleted = FALSE AND battle_score < ?
+                ORDER BY battle_score DESC LIMIT ?
+            """, (score, k))
+            candidates += cursor.fetchall()
+
+        candidates.sort(key=lambda candidate: (abs(candidate[5] - score), candidate[0]))
+        opponents = [
+            {
+                'id': candidate[0],
+                'meal': candidate[1],
+                'cuisine': candidate[2],
+                'price': candidate[3],
+                'difficulty': candidate[4],
+                'battle_score': candidate[5],
+                'score_gap': round(abs(candidate[5] - score), 3)
             }
-            leaderboard.append(meal)
+            for candidate in candidates[:k]
+        ]
 
-        logger.info("Leaderboard retrieved successfully")
-        return leaderboard
+        logger.info("Found %d opponents for meal with ID %s", len(opponents), meal_id)
+        return opponents
 
     except sqlite3.Error as e:
         logger.error("Database error: %s", str(e))
@@ -141,14 +509,14 @@ def get_meal_by_id(meal_id: int) -> Meal:
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT id, meal, cuisine, price, difficulty, deleted FROM meals WHERE id = ?", (meal_id,))
+            cursor.execute(f"SELECT {MEAL_COLUMNS}, deleted FROM meals WHERE id = ?", (meal_id,))
             row = cursor.fetchone()
 
             if row:
-                if row[5]:
+                if row[6]:
                     logger.info("Meal with ID %s has been deleted", meal_id)
                     raise ValueError(f"Meal with ID {meal_id} has been deleted")
-                return Meal(id=row[0], meal=row[1], cuisine=row[2], price=row[3], difficulty=row[4])
+                return meal_from_row(row)
             else:
                 logger.info("Meal with ID %s not found", meal_id)
                 raise ValueError(f"Meal with ID {meal_id} not found")
@@ -162,14 +530,14 @@ def get_meal_by_name(meal_name: str) -> Meal:
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT id, meal, cuisine, price, difficulty, deleted FROM meals WHERE meal = ?", (meal_name,))
+            cursor.execute(f"SELECT {MEAL_COLUMNS}, deleted FROM meals WHERE meal = ?", (meal_name,))
             row = cursor.fetchone()
 
             if row:
-                if row[5]:
+                if row[6]:
                     logger.info("Meal with name %s has been deleted", meal_name)
                     raise ValueError(f"Meal with name {meal_name} has been deleted")
-                return Meal(id=row[0], meal=row[1], cuisine=row[2], price=row[3], difficulty=row[4])
+                return meal_from_row(row)
             else:
                 logger.info("Meal with name %s not found", meal_name)
                 raise ValueError(f"Meal with name {meal_name} not found")
@@ -205,3 +573,177 @@ def update_meal_stats(meal_id: int, result: str) -> None:
     except sqlite3.Error as e:
         logger.error("Database error: %s", str(e))
         raise e
+
+def get_meals(
+    meal_ids: Optional[List[int]] = None,
+    cuisine: Optional[str] = None,
+    difficulty: Optional[str] = None
+) -> List[Meal]:
+    """
+    Loads many live meals at once, either by ID or by filter.
+
+    Args:
+        meal_ids (List[int], optional): The IDs of the meals to load, in the order to return them.
+        cuisine (str, optional): If given without IDs, only meals of this cuisine are loaded.
+        difficulty (str, optional): If given without IDs, only meals of this difficulty are loaded.
+
+    Returns:
+        List[Meal]: The meals, in the order of meal_ids or else by ID.
+
+    Raises:
+        ValueError: If any of the given IDs is not found or has been deleted.
+        sqlite3.Error: If any database error occurs.
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            if meal_ids is None:
+                query = f"SELECT {MEAL_COLUMNS} FROM meals WHERE deleted = FALSE"
+                params: List[Any] = []
+                if cuisine is not None:
+                    query += " AND cuisine = ?"
+                    params.append(cuisine)
+                if difficulty is not None:
+                    query += " AND difficulty = ?"
+                    params.append(difficulty)
+                cursor.execute(query + " ORDER BY id", params)
+                meals = [meal_from_row(row) for row in cursor.fetchall()]
+                logger.info("Retrieved %d meals", len(meals))
+                return meals
+
+            rows_by_id = {}
+            for start in range(0, len(meal_ids), SQL_IN_CHUNK_SIZE):
+                chunk = meal_ids[start:start + SQL_IN_CHUNK_SIZE]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(
+                    f"SELECT {MEAL_COLUMNS}, deleted FROM meals WHERE id IN ({placeholders})",
+                    chunk
+                )
+                rows_by_id.update((row[0], row) for row in cursor.fetchall())
+
+            meals = []
+            for meal_id in meal_ids:
+                row = rows_by_id.get(meal_id)
+                if row is None:
+                    logger.info("Meal with ID %s not found", meal_id)
+                    raise ValueError(f"Meal with ID {meal_id} not found")
+                if row[6]:
+                    logger.info("Meal with ID %s has been deleted", meal_id)
+                    raise ValueError(f"Meal with ID {meal_id} has been deleted")
+                meals.append(meal_from_row(row))
+            logger.info("Retrieved %d meals", len(meals))
+            return meals
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+def meal_from_row(row: tuple) -> Meal:
+    """
+    Builds a meal from a row starting with the MEAL_COLUMNS, carrying its stored battle score.
+    """
+    return Meal(id=row[0], meal=row[1], cuisine=row[2], price=row[3], difficulty=row[4], battle_score=row[5])
+
+def record_battle_result(winner_id: int, loser_id: int, cursor: Optional[sqlite3.Cursor] = None) -> None:
+    """
+    Records the outcome of a battle for both meals in a single transaction, so either both
+    rows are updated or neither is. Both meals' Elo ratings are updated from their current
+    ratings alone, and the battle is appended to the battle log the ratings can be rebuilt from.
+
+    Args:
+        winner_id (int): The ID of the meal that won.
+        loser_id (int): The ID of the meal that lost.
+        cursor (sqlite3.Cursor, optional): If given, the result is written as part of the caller's
+            transaction, which the caller commits. Defaults to None (a transaction of its own).
+
+    Raises:
+        ValueError: If the IDs are the same, or either meal is not found or has been deleted.
+        sqlite3.Error: If any database error occurs, or the database stays locked after all retries.
+    """
+    if winner_id == loser_id:
+        logger.error("Meal with ID %s cannot battle itself", winner_id)
+        raise ValueError(f"Meal with ID {winner_id} cannot battle itself")
+
+    def record(cursor: sqlite3.Cursor) -> None:
+        cursor.execute(
+            "SELECT id, deleted, rating, rated_battles FROM meals WHERE id IN (?, ?)",
+            (winner_id, loser_id)
+        )
+        rows_by_id = {row[0]: row for row in cursor.fetchall()}
+        for meal_id in (winner_id, loser_id):
+            if meal_id not in rows_by_id:
+                logger.info("Meal with ID %s not found", meal_id)
+                raise ValueError(f"Meal with ID {meal_id} not found")
+            if rows_by_id[meal_id][1]:
+                logger.info("Meal with ID %s has been deleted", meal_id)
+                raise ValueError(f"Meal with ID {meal_id} has been deleted")
+
+        winner, loser = rows_by_id[winner_id], rows_by_id[loser_id]
+        winner_rating, loser_rating = update_ratings(winner[2], winner[3], loser[2], loser[3])
+        cursor.execute("""
+            UPDATE meals SET battles = battles + 1, wins = wins + (id = ?), rated_battles = rated_battles + 1,
+                rating = CASE id WHEN ? THEN ? ELSE ? END
+            WHERE id IN (?, ?)
+        """, (winner_id, winner_id, winner_rating, loser_rating, winner_id, loser_id))
+        cursor.execute(
+            "INSERT INTO battle_log (winner_id, loser_id, fought_at) VALUES (?, ?, ?)",
+            (winner_id, loser_id, time.time())
+        )
+
+    if cursor is None:
+        write_with_busy_retry(record)
+    else:
+        record(cursor)
+    logger.info("Recorded battle result: meal %s beat meal %s", winner_id, loser_id)
+
+def record_tournament_results(results: Iterable[Tuple[int, int, int]]) -> None:
+    """
+    Adds the battles and wins of a whole tournament to the meals' stats with a single
+    executemany in one transaction. Meals deleted in the meantime are left untouched.
+    Only totals are recorded, not single battles, so tournaments do not change ratings, and a
+    meal that has only fought in tournaments stays off the rating leaderboard.
+
+    Args:
+        results (Iterable[Tuple[int, int, int]]): (meal_id, battles, wins) for every meal that battled.
+
+    Raises:
+        sqlite3.Error: If any database error occurs, or the database stays locked after all retries.
+    """
+    rows = [(battles, wins, meal_id) for meal_id, battles, wins in results]
+
+    def record(cursor: sqlite3.Cursor) -> None:
+        cursor.executemany(
+            "UPDATE meals SET battles = battles + ?, wins = wins + ? WHERE id = ? AND deleted = FALSE",
+            rows
+        )
+
+    write_with_busy_retry(record)
+    logger.info("Recorded tournament results for %d meals", len(rows))
+
+def rebuild_ratings() -> dict:
+    """
+    Recomputes every meal's rating from the battle log in one pass over the log, oldest battle
+    first, and writes the results in the same transaction, so no battle recorded meanwhile is lost.
+
+    Returns:
+        dict: The number of battles replayed and of meals rated.
+
+    Raises:
+        sqlite3.Error: If any database error occurs, or the database stays locked after all retries.
+    """
+    def rebuild(cursor: sqlite3.Cursor) -> dict:
+        cursor.execute("SELECT winner_id, loser_id FROM battle_log ORDER BY id")
+        ratings = replay_ratings(cursor)
+        cursor.execute("UPDATE meals SET rating = ?, rated_battles = 0", (INITIAL_RATING,))
+        cursor.executemany(
+            "UPDATE meals SET rating = ?, rated_battles = ? WHERE id = ?",
+            ((rating, rated_battles, meal_id) for meal_id, (rating, rated_battles) in ratings.items())
+        )
+        return {
+            'battles': sum(rated_battles for _, rated_battles in ratings.values()) // 2,
+            'meals': len(ratings)
+        }
+
+    summary = write_with_busy_retry(rebuild)
+    logger.info("Rebuilt ratings from %d battles", summary['battles'])
+    return summary
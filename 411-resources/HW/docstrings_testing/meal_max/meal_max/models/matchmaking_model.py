@@ -0,0 +1,304 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import logging
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+import uuid
+
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.kitchen_model import Meal, get_meal_by_id
+from meal_max.models.tournament_model import get_battle_scores
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.sql_utils import get_db_connection, write_with_busy_retry
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+TICKET_COLUMNS = "id, meal_id, meal, score, status, opponent_id, opponent, winner, error, created_at"
+
+# Statuses a ticket never leaves
+FINAL_STATUSES = ("finished", "failed", "cancelled", "expired")
+
+
+@dataclass
+class Ticket:
+    """
+    A meal's place in the matchmaking queue, and later the outcome of its battle, as last read
+    from the matchmaking_tickets table.
+
+    Attributes:
+        id (str): The unique ID of the ticket.
+        meal_id (int): The ID of the queued meal.
+        meal (str): The name of the queued meal.
+        score (float): The meal's battle score.
+        status (str): One of 'waiting', 'matched', 'finished', 'failed', 'cancelled' or 'expired'.
+        opponent_id (Optional[int]): The ID of the meal it was paired with.
+        opponent (Optional[str]): The name of the meal it was paired with.
+        winner (Optional[str]): The name of the winning meal once the battle has been fought.
+        error (Optional[str]): The error message if the battle failed.
+    """
+    id: str
+    meal_id: int
+    meal: str
+    score: float
+    status: str
+    opponent_id: Optional[int] = None
+    opponent: Optional[str] = None
+    winner: Optional[str] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        """
+        Returns a JSON-serializable summary of the ticket.
+        """
+        return {
+            'id': self.id,
+            'status': self.status,
+            'meal': {'id': self.meal_id, 'meal': self.meal},
+            'opponent': {'id': self.opponent_id, 'meal': self.opponent} if self.opponent_id is not None else None,
+            'winner': self.winner,
+            'error': self.error
+        }
+
+
+class MatchmakingQueue:
+    """
+    Pairs queued meals with a waiting meal of similar battle score and fights their battles
+    on a worker pool, so any number of users can battle at once without sharing combatants.
+
+    Tickets live in the matchmaking_tickets table rather than process memory, so with several
+    worker processes a ticket can be queued, polled and cancelled through any of them. Pairing
+    is one BEGIN IMMEDIATE transaction, so two processes never take the same waiting meal. The
+    battle is fought on the pool of the process that made the pair; if that process dies first,
+    its tickets stay matched.
+
+    Two waiting meals are never within the tolerance of each other, or they would have been
+    paired, so at most two waiting meals are within the tolerance of a new meal and finding the
+    closest is one short range scan of the waiting scores' index. A new meal is paired with the
+    closest waiting meal within the tolerance; otherwise it waits. Waiting meals expire after
+    max_wait seconds.
+
+    Attributes:
+        tolerance (float): The largest score gap between paired meals.
+        max_wait (float): How long a meal waits for an opponent before its ticket expires.
+        keep_finished (float): How long finished tickets are kept for polling, in seconds.
+        poll_interval (float): How often a long poll reads its ticket again, in seconds.
+    """
+
+    def __init__(
+        self,
+        tolerance: float = 50.0,
+        max_workers: int = 4,
+        max_wait: float = 300.0,
+        keep_finished: float = 3600.0,
+        poll_interval: float = 0.1
+    ):
+        self.tolerance = tolerance
+        self.max_wait = max_wait
+        self.keep_finished = keep_finished
+        self.poll_interval = poll_interval
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="matchmaking")
+        # Wakes long polls in this process as soon as a battle fought here is over
+        self._battle_over = threading.Condition()
+
+    def enqueue(self, meal: Meal) -> Ticket:
+        """
+        Queues a meal for a battle. If a waiting meal is within the score tolerance, the closest
+        one is paired with it at once and their battle is handed to the worker pool.
+
+        Args:
+            meal (Meal): The meal to queue.
+
+        Returns:
+            Ticket: The meal's ticket, to poll for the outcome.
+
+        Raises:
+            ValueError: If the meal is already waiting in the queue.
+            sqlite3.Error: If any database error occurs.
+        """
+        score = meal.battle_score if meal.battle_score is not None else float(get_battle_scores([meal])[0])
+        ticket_id = uuid.uuid4().hex
+
+        def pair(cursor: sqlite3.Cursor) -> Tuple[Ticket, Optional[Ticket]]:
+            now = time.time()
+            self._expire_waiting(cursor, now)
+            cursor.execute("SELECT 1 FROM matchmaking_tickets WHERE status = 'waiting' AND meal_id = ?", (meal.id,))
+            if cursor.fetchone():
+                logger.error("Meal with ID %s is already waiting for an opponent", meal.id)
+                raise ValueError(f"Meal with ID {meal.id} is already waiting for an opponent")
+
+            # Of several meals with the same gap, the one that has waited longest is taken
+            cursor.execute(f"""
+                SELECT {TICKET_COLUMNS} FROM matchmaking_tickets
+                WHERE status = 'waiting' AND score BETWEEN ? AND ?
+                ORDER BY abs(score - ?), created_at LIMIT 1
+            """, (score - self.tolerance, score + self.tolerance, score))
+            row = cursor.fetchone()
+            if row is None:
+                cursor.execute("""
+                    INSERT INTO matchmaking_tickets (id, meal_id, meal, score, status, created_at)
+                    VALUES (?, ?, ?, ?, 'waiting', ?)
+                """, (ticket_id, meal.id, meal.meal, score, now))
+                return Ticket(ticket_id, meal.id, meal.meal, score, "waiting"), None
+
+            opponent_ticket = self._ticket_from_row(row, now)
+            opponent_ticket.status, opponent_ticket.opponent_id, opponent_ticket.opponent = "matched", meal.id, meal.meal
+            cursor.execute(
+                "UPDATE matchmaking_tickets SET status = 'matched', opponent_id = ?, opponent = ? WHERE id = ?",
+                (meal.id, meal.meal, opponent_ticket.id)
+            )
+            cursor.execute("""
+                INSERT INTO matchmaking_tickets (id, meal_id, meal, score, status, opponent_id, opponent, created_at)
+                VALUES (?, ?, ?, ?, 'matched', ?, ?, ?)
+            """, (ticket_id, meal.id, meal.meal, score, opponent_ticket.meal_id, opponent_ticket.meal, now))
+            return Ticket(ticket_id, meal.id, meal.meal, score, "matched",
+                          opponent_ticket.meal_id, opponent_ticket.meal), opponent_ticket
+
+        ticket, opponent_ticket = write_with_busy_retry(pair)
+        if opponent_ticket is None:
+            logger.info("Meal %s is waiting for an opponent", meal.meal)
+            return ticket
+
+        logger.info("Matched %s with %s", opponent_ticket.meal, meal.meal)
+        self._executor.submit(self._battle, opponent_ticket, ticket, meal)
+        return ticket
+
+    def get_ticket(self, ticket_id: str, timeout: float = 0.0) -> Ticket:
+        """
+        Retrieves a ticket by its ID, optionally waiting until its battle is over or it leaves
+        the queue. Waiting polls the ticket every poll_interval seconds, and wakes at once for
+        battles fought by this process.
+
+        Args:
+            ticket_id (str): The ID of the ticket.
+            timeout (float, optional): The longest time to wait for a final status, in seconds.
+                Defaults to 0 (do not wait).
+
+        Returns:
+            Ticket: The ticket.
+
+        Raises:
+            ValueError: If no ticket with that ID is known.
+            sqlite3.Error: If any database error occurs.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            ticket = self._read_ticket(ticket_id)
+            remaining = deadline - time.monotonic()
+            if ticket.status in FINAL_STATUSES or remaining <= 0:
+                return ticket
+            with self._battle_over:
+                self._battle_over.wait(min(remaining, self.poll_interval))
+
+    def cancel(self, ticket_id: str) -> Ticket:
+        """
+        Takes a waiting meal out of the queue.
+
+        Args:
+            ticket_id (str): The ID of the ticket.
+
+        Returns:
+            Ticket: The cancelled ticket.
+
+        Raises:
+            ValueError: If no ticket with that ID is known or it is no longer waiting.
+            sqlite3.Error: If any database error occurs.
+        """
+        def cancel(cursor: sqlite3.Cursor) -> Ticket:
+            now = time.time()
+            cursor.execute(f"SELECT {TICKET_COLUMNS} FROM matchmaking_tickets WHERE id = ?", (ticket_id,))
+            row = cursor.fetchone()
+            if row is None:
+                logger.error("Ticket %s not found", ticket_id)
+                raise ValueError(f"Ticket {ticket_id} not found")
+            ticket = self._ticket_from_row(row, now)
+            if ticket.status != "waiting":
+                logger.error("Ticket %s is %s and cannot be cancelled", ticket_id, ticket.status)
+                raise ValueError(f"Ticket {ticket_id} is {ticket.status} and cannot be cancelled")
+            cursor.execute(
+                "UPDATE matchmaking_tickets SET status = 'cancelled', finished_at = ? WHERE id = ?", (now, ticket_id)
+            )
+            ticket.status = "cancelled"
+            return ticket
+
+        ticket = write_with_busy_retry(cancel)
+        logger.info("Cancelled ticket %s", ticket_id)
+        return ticket
+
+    @property
+    def waiting_count(self) -> int:
+        try:
+            with get_db_connection() as conn:
+                return conn.execute(
+                    "SELECT count(*) FROM matchmaking_tickets WHERE status = 'waiting' AND created_at >= ?",
+                    (time.time() - self.max_wait,)
+                ).fetchone()[0]
+
+        except sqlite3.Error as e:
+            logger.error("Database error: %s", str(e))
+            raise e
+
+    def _read_ticket(self, ticket_id: str) -> Ticket:
+        try:
+            with get_db_connection() as conn:
+                row = conn.execute(f"SELECT {TICKET_COLUMNS} FROM matchmaking_tickets WHERE id = ?", (ticket_id,)).fetchone()
+
+        except sqlite3.Error as e:
+            logger.error("Database error: %s", str(e))
+            raise e
+
+        if row is None:
+            logger.error("Ticket %s not found", ticket_id)
+            raise ValueError(f"Ticket {ticket_id} not found")
+        return self._ticket_from_row(row, time.time())
+
+    def _ticket_from_row(self, row: tuple, now: float) -> Ticket:
+        """
+        Builds a ticket from a row of TICKET_COLUMNS. A waiting ticket older than max_wait is
+        reported as expired, so reads need not write; the next enqueue marks it expired.
+        """
+        status = "expired" if row[4] == "waiting" and row[9] < now - self.max_wait else row[4]
+        return Ticket(row[0], row[1], row[2], row[3], status, row[5], row[6], row[7], row[8])
+
+    def _expire_waiting(self, cursor: sqlite3.Cursor, now: float) -> None:
+        """
+        Expires tickets that have waited longer than max_wait and forgets tickets that finished
+        more than keep_finished seconds ago, within the caller's transaction.
+        """
+        cursor.execute("""
+            UPDATE matchmaking_tickets SET status = 'expired', finished_at = created_at + ?
+            WHERE status = 'waiting' AND created_at < ?
+        """, (self.max_wait, now - self.max_wait))
+        if cursor.rowcount:
+            logger.info("Expired %d tickets without an opponent", cursor.rowcount)
+        cursor.execute("DELETE FROM matchmaking_tickets WHERE finished_at < ?", (now - self.keep_finished,))
+
+    def _battle(self, first: Ticket, second: Ticket, second_meal: Meal) -> None:
+        """
+        Fights a matched pair's battle with the rule and stats recording of BattleModel, and
+        records its outcome on both tickets.
+        """
+        try:
+            battle_model = BattleModel()
+            battle_model.prep_combatant(get_meal_by_id(first.meal_id))
+            battle_model.prep_combatant(second_meal)
+            winner = battle_model.battle()
+            status, error = "finished", None
+        except Exception as e:
+            logger.error("Battle between %s and %s failed: %s", first.meal, second.meal, str(e))
+            winner, status, error = None, "failed", str(e)
+
+        try:
+            write_with_busy_retry(lambda cursor: cursor.execute(
+                "UPDATE matchmaking_tickets SET status = ?, winner = ?, error = ?, finished_at = ? WHERE id IN (?, ?)",
+                (status, winner, error, time.time(), first.id, second.id)
+            ))
+        except sqlite3.Error as e:
+            logger.error("Failed to record the outcome of tickets %s and %s: %s", first.id, second.id, str(e))
+
+        with self._battle_over:
+            self._battle_over.notify_all()
@@ -0,0 +1,183 @@
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import math
+import multiprocessing
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from meal_max.models.kitchen_model import Meal
+from meal_max.models.tournament_model import draw_randoms, get_battle_scores
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Largest number of battles one simulation may run
+SIMULATION_MAX_BATTLES = int(os.getenv("SIMULATION_MAX_BATTLES", "50000000"))
+
+# Simulations of at least this many battles are split across worker processes
+SIMULATION_PROCESS_THRESHOLD = int(os.getenv("SIMULATION_PROCESS_THRESHOLD", "10000000"))
+
+# Worker processes for large simulations; 0 or 1 keeps every simulation in the calling process
+SIMULATION_WORKERS = int(os.getenv("SIMULATION_WORKERS", str(os.cpu_count() or 1)))
+
+# Random numbers drawn at a time, bounding the memory of one simulation step
+SIMULATION_CHUNK_SIZE = 1_000_000
+
+# Number of simulation results kept for repeated queries
+SIMULATION_CACHE_SIZE = 1024
+
+# z-score of the 95% confidence intervals
+CONFIDENCE_Z = 1.96
+
+
+_cache: "OrderedDict[Tuple[float, int], int]" = OrderedDict()
+_cache_lock = threading.Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def simulate_battle(meal_1: Meal, meal_2: Meal, n: int) -> Dict[str, Any]:
+    """
+    Estimates each meal's chance of winning a battle by simulating it n times with the rule of
+    BattleModel.battle, meal_1 being the first combatant. The meals' stats are not touched.
+
+    Only the score gap decides a battle, so results are memoized per gap and number of battles:
+    repeating a query, or asking about another pair with the same gap, returns the same estimate
+    without simulating again.
+
+    Args:
+        meal_1 (Meal): The first combatant.
+        meal_2 (Meal): The second combatant.
+        n (int): The number of battles to simulate.
+
+    Returns:
+        Dict[str, Any]: For each meal its battle score, estimated win probability and 95%
+            confidence interval, plus the number of battles and whether the result was memoized.
+
+    Raises:
+        ValueError: If the meals are the same or n is out of range.
+    """
+    if meal_1.id == meal_2.id:
+        logger.error("Meal with ID %s cannot battle itself", meal_1.id)
+        raise ValueError(f"Meal with ID {meal_1.id} cannot battle itself")
+    if not 1 <= n <= SIMULATION_MAX_BATTLES:
+        logger.error("Invalid number of simulated battles: %s", n)
+        raise ValueError(f"The number of battles must be between 1 and {SIMULATION_MAX_BATTLES}")
+
+    score_1, score_2 = get_battle_scores([meal_1, meal_2]).tolist()
+    gap = abs(score_1 - score_2)
+    key = (gap, n)
+
+    with _cache_lock:
+        first_wins = _cache.get(key)
+        if first_wins is not None:
+            _cache.move_to_end(key)
+    cached = first_wins is not None
+    if first_wins is None:
+        logger.info("Simulating %d battles between %s and %s", n, meal_1.meal, meal_2.meal)
+        first_wins = _count_first_wins(gap, n)
+        with _cache_lock:
+            _cache[key] = first_wins
+            while len(_cache) > SIMULATION_CACHE_SIZE:
+                _cache.popitem(last=False)
+    else:
+        logger.info("Using memoized simulation of %d battles between %s and %s", n, meal_1.meal, meal_2.meal)
+
+    low, high = wilson_interval(first_wins, n)
+    return {
+        'meal_1': _describe_meal(meal_1, score_1, first_wins / n, (low, high)),
+        'meal_2': _describe_meal(meal_2, score_2, 1 - first_wins / n, (1 - high, 1 - low)),
+        'battles': n,
+        'confidence_level': 0.95,
+        'cached': cached
+    }
+
+
+def wilson_interval(successes: int, n: int, z: float = CONFIDENCE_Z) -> Tuple[float, float]:
+    """
+    Returns the Wilson score interval of a proportion, which unlike the normal approximation
+    stays within [0, 1] and is meaningful when the proportion is 0 or 1.
+
+    Args:
+        successes (int): The number of successes.
+        n (int): The number of trials.
+        z (float, optional): The z-score of the confidence level. Defaults to 1.96 (95%).
+
+    Returns:
+        Tuple[float, float]: The lower and upper bounds.
+    """
+    p = successes / n
+    denominator = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def clear_simulation_cache() -> None:
+    """
+    Forgets all memoized simulation results.
+    """
+    with _cache_lock:
+        _cache.clear()
+    logger.info("Simulation cache cleared")
+
+
+def _count_first_wins(gap: float, n: int) -> int:
+    """
+    Simulates n battles with the given score gap and returns how many the first combatant won.
+    Large simulations are split across the worker pool, each worker with its own random stream.
+    """
+    seeds = np.random.SeedSequence()
+    if n < SIMULATION_PROCESS_THRESHOLD or SIMULATION_WORKERS <= 1:
+        return _simulate_chunk(gap, n, seeds)
+
+    sizes = [n // SIMULATION_WORKERS + (1 if index < n % SIMULATION_WORKERS else 0) for index in range(SIMULATION_WORKERS)]
+    logger.info("Splitting %d simulated battles across %d processes", n, SIMULATION_WORKERS)
+    futures = [
+        _get_pool().submit(_simulate_chunk, gap, size, child)
+        for size, child in zip(sizes, seeds.spawn(SIMULATION_WORKERS))
+    ]
+    return sum(future.result() for future in futures)
+
+
+def _simulate_chunk(gap: float, n: int, seed: np.random.SeedSequence) -> int:
+    """
+    Counts the first combatant's wins in n battles: it wins when the gap exceeds the draw.
+    Runs in worker processes, so it only takes picklable arguments.
+    """
+    rng = np.random.default_rng(seed)
+    first_wins = 0
+    for start in range(0, n, SIMULATION_CHUNK_SIZE):
+        size = min(SIMULATION_CHUNK_SIZE, n - start)
+        first_wins += int(np.count_nonzero(draw_randoms(rng, size) < gap))
+    return first_wins
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Forking a server process that runs threads can copy a lock another thread holds into
+            # the child, so the workers start from a fresh interpreter instead
+            _pool = ProcessPoolExecutor(
+                max_workers=SIMULATION_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def _describe_meal(meal: Meal, score: float, probability: float, interval: Tuple[float, float]) -> Dict[str, Any]:
+    return {
+        'id': meal.id,
+        'meal': meal.meal,
+        'battle_score': round(score, 3),
+        'win_probability': round(probability, 6),
+        'confidence_interval': [round(interval[0], 6), round(interval[1], 6)]
+    }
@@ -0,0 +1,279 @@
+import logging
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from meal_max.models.kitchen_model import Meal, record_tournament_results
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+TOURNAMENT_FORMATS = ("single_elimination", "round_robin", "swiss")
+
+# Matches resolved per block of a round robin, bounding the memory of the score and draw matrices
+ROUND_ROBIN_BLOCK_MATCHES = 4_000_000
+
+DIFFICULTY_MODIFIERS = {"HIGH": 1, "MED": 2, "LOW": 3}
+
+
+def get_battle_scores(meals: List[Meal]) -> np.ndarray:
+    """
+    Computes the battle score of every meal in one vectorized pass, with the same formula as
+    BattleModel.get_battle_score.
+
+    Args:
+        meals (List[Meal]): The meals to score.
+
+    Returns:
+        np.ndarray: The scores, in the order of the meals.
+    """
+    prices = np.fromiter((meal.price for meal in meals), dtype=np.float64, count=len(meals))
+    cuisine_lengths = np.fromiter((len(meal.cuisine) for meal in meals), dtype=np.float64, count=len(meals))
+    modifiers = np.fromiter((DIFFICULTY_MODIFIERS[meal.difficulty] for meal in meals), dtype=np.float64, count=len(meals))
+    return prices * cuisine_lengths - modifiers
+
+
+def draw_randoms(rng: np.random.Generator, size: Any) -> np.ndarray:
+    """
+    Draws random numbers for many battles at once, as hundredths between 0 and 99 like the
+    two-decimal fractions of random.org.
+
+    The battle rule `|score_1 - score_2| / 100 > r` becomes `|score_1 - score_2| > 100 * r`,
+    so matches can be resolved by comparing the score gap with these integers directly.
+    """
+    return rng.integers(0, 100, size=size, dtype=np.uint8)
+
+
+def run_tournament(
+    meals: List[Meal],
+    tournament_format: str,
+    rounds: Optional[int] = None,
+    seed: Optional[int] = None,
+    record_results: bool = True
+) -> Dict[str, Any]:
+    """
+    Runs a tournament between many meals with the rule of BattleModel.battle: the first
+    combatant wins when the score gap divided by 100 exceeds a random fraction.
+
+    Scores are computed once for all meals, random numbers are drawn in batches and matches
+    are resolved with array comparisons. The battles and wins of every meal are then written
+    with a single executemany.
+
+    Args:
+        meals (List[Meal]): The meals taking part, at least two.
+        tournament_format (str): 'single_elimination', 'round_robin' or 'swiss'.
+        rounds (int, optional): The number of Swiss rounds. Defaults to ceil(log2(number of meals)).
+        seed (int, optional): Seeds the random numbers so the tournament can be repeated.
+        record_results (bool, optional): If False, the meals' stats are not updated. Defaults to True.
+
+    Returns:
+        Dict[str, Any]: The format, the number of matches, the champion, the standings of every
+            meal and, except for round robin, the matches of every round.
+
+    Raises:
+        ValueError: If the format is unknown, there are fewer than two meals, a meal appears twice
+            or the number of rounds is invalid.
+        sqlite3.Error: If writing the results fails.
+    """
+    if tournament_format not in TOURNAMENT_FORMATS:
+        logger.error("Invalid tournament format: %s", tournament_format)
+        raise ValueError(f"Invalid tournament format: {tournament_format}. Expected one of {', '.join(TOURNAMENT_FORMATS)}.")
+    if len(meals) < 2:
+        logger.error("Not enough meals for a tournament: %d", len(meals))
+        raise ValueError("At least two meals are needed for a tournament.")
+    if len({meal.id for meal in meals}) != len(meals):
+        logger.error("Duplicate meals in tournament")
+        raise ValueError("Each meal can only enter a tournament once.")
+    if rounds is not None and (tournament_format != "swiss" or rounds < 1):
+        logger.error("Invalid number of rounds %s for a %s tournament", rounds, tournament_format)
+        raise ValueError("Rounds must be a positive number and can only be set for a Swiss tournament.")
+
+    logger.info("Starting %s tournament between %d meals", tournament_format, len(meals))
+    scores = get_battle_scores(meals)
+    rng = np.random.default_rng(seed)
+    wins = np.zeros(len(meals), dtype=np.int64)
+    battles = np.zeros(len(meals), dtype=np.int64)
+    # Swiss standings also count byes; in the other formats points are just wins
+    points = wins
+
+    if tournament_format == "round_robin":
+        bracket = None
+        _play_round_robin(scores, rng, wins, battles)
+    elif tournament_format == "single_elimination":
+        bracket = _play_single_elimination(meals, scores, rng, wins, battles)
+    else:
+        rounds = rounds if rounds is not None else max(1, math.ceil(math.log2(len(meals))))
+        points = np.zeros(len(meals), dtype=np.int64)
+        bracket = _play_swiss(meals, scores, rng, wins, battles, points, rounds)
+    num_matches = int(battles.sum()) // 2
+
+    if record_results:
+        played = np.flatnonzero(battles)
+        record_tournament_results(
+            (meals[index].id, int(battles[index]), int(wins[index])) for index in played
+        )
+
+    # Most points first, then the higher battle score, then the order the meals were entered in
+    order = np.lexsort((np.arange(len(meals)), -scores, -points))
+    standings = [
+        {
+            'rank': rank,
+            'id': meals[index].id,
+            'meal': meals[index].meal,
+            'battle_score': round(float(scores[index]), 3),
+            'battles': int(battles[index]),
+            'wins': int(wins[index]),
+            'points': int(points[index])
+        }
+        for rank, index in enumerate(order.tolist(), start=1)
+    ]
+
+    logger.info("Finished %s tournament with %d matches, champion: %s",
+                tournament_format, num_matches, standings[0]['meal'])
+    result: Dict[str, Any] = {
+        'format': tournament_format,
+        'matches': num_matches,
+        'champion': {'id': standings[0]['id'], 'meal': standings[0]['meal']},
+        'standings': standings
+    }
+    if bracket is not None:
+        result['rounds'] = bracket
+    return result
+
+
+def _play_round_robin(scores: np.ndarray, rng: np.random.Generator, wins: np.ndarray, battles: np.ndarray) -> None:
+    """
+    Plays every pair of meals once, the earlier meal as the first combatant. Rows of the match
+    matrix are resolved a block at a time, so memory stays bounded for large fields.
+    """
+    n = len(scores)
+    battles += n - 1
+    block_rows = max(1, ROUND_ROBIN_BLOCK_MATCHES // n)
+    for start in range(0, n - 1, block_rows):
+        stop = min(start + block_rows, n - 1)
+        # Row i of the block plays every meal j > i; columns start at the first possible opponent
+        gaps = np.abs(scores[start:stop, None] - scores[None, start + 1:])
+        upper = np.arange(n - start - 1)[None, :] >= np.arange(stop - start)[:, None]
+        first_wins = gaps > draw_randoms(rng, gaps.shape)
+        wins[start:stop] += (first_wins & upper).sum(axis=1)
+        wins[start + 1:] += (~first_wins & upper).sum(axis=0)
+
+
+def _play_single_elimination(
+    meals: List[Meal],
+    scores: np.ndarray,
+    rng: np.random.Generator,
+    wins: np.ndarray,
+    battles: np.ndarray
+) -> List[List[Dict[str, Any]]]:
+    """
+    Seeds the meals by battle score into a standard bracket, so the top two seeds can only meet
+    in the final, and gives byes to the top seeds when the field is not a power of two.
+    All n - 1 random numbers are drawn up front.
+    """
+    n = len(meals)
+    size = 1 << (n - 1).bit_length()
+    seeds = np.lexsort((np.arange(n), -scores))
+
+    # Bracket positions of seeds 1..size, e.g. 1, 8, 4, 5, 2, 7, 3, 6 for eight slots
+    positions = [1]
+    while len(positions) < size:
+        positions = [seed for position in positions for seed in (position, 2 * len(positions) + 1 - position)]
+    seed_numbers = np.array(positions) - 1
+    slots = np.where(seed_numbers < n, seeds[np.minimum(seed_numbers, n - 1)], -1)
+
+    draws = draw_randoms(rng, n - 1)
+    drawn = 0
+    bracket = []
+    while len(slots) > 1:
+        first, second = slots[0::2], slots[1::2]
+        is_match = (first >= 0) & (second >= 0)
+        match_first, match_second = first[is_match], second[is_match]
+
+        gaps = np.abs(scores[match_first] - scores[match_second])
+        first_wins = gaps > draws[drawn:drawn + len(gaps)]
+        drawn += len(gaps)
+        match_winners = np.where(first_wins, match_first, match_second)
+
+        battles[match_first] += 1
+        battles[match_second] += 1
+        wins[match_winners] += 1
+
+        # A meal without an opponent advances on a bye
+        winners = np.maximum(first, second)
+        winners[is_match] = match_winners
+        bracket.append(_describe_matches(meals, first, second, winners, is_match))
+        slots = winners
+    return bracket
+
+
+def _play_swiss(
+    meals: List[Meal],
+    scores: np.ndarray,
+    rng: np.random.Generator,
+    wins: np.ndarray,
+    battles: np.ndarray,
+    points: np.ndarray,
+    rounds: int
+) -> List[List[Dict[str, Any]]]:
+    """
+    Each round pairs neighbours in the standings (points, then battle score), so meals meet
+    opponents with similar records. With an odd field the lowest-ranked meal that has not had
+    a bye yet sits out and gets a point. Rematches are not prevented. The random numbers for
+    every round are drawn up front.
+    """
+    n = len(meals)
+    had_bye = np.zeros(n, dtype=bool)
+    draws = draw_randoms(rng, (rounds, n // 2))
+    bracket = []
+    for round_index in range(rounds):
+        standing = np.lexsort((np.arange(n), -scores, -points))
+        bye = None
+        if n % 2:
+            candidates = standing[~had_bye[standing]]
+            bye = candidates[-1] if len(candidates) else standing[-1]
+            had_bye[bye] = True
+            points[bye] += 1
+            standing = standing[standing != bye]
+
+        first, second = standing[0::2], standing[1::2]
+        gaps = np.abs(scores[first] - scores[second])
+        first_wins = gaps > draws[round_index]
+        winners = np.where(first_wins, first, second)
+
+        battles[first] += 1
+        battles[second] += 1
+        wins[winners] += 1
+        points[winners] += 1
+
+        matches = _describe_matches(meals, first, second, winners, np.ones(len(first), dtype=bool))
+        if bye is not None:
+            matches.append({'meal_1': meals[bye].id, 'meal_2': None, 'winner': meals[bye].id})
+        bracket.append(matches)
+    return bracket
+
+
+def _describe_matches(
+    meals: List[Meal],
+    first: np.ndarray,
+    second: np.ndarray,
+    winners: np.ndarray,
+    is_match: np.ndarray
+) -> List[Dict[str, Any]]:
+    """
+    Lists the matches of a round by meal ID. A bye has no second meal.
+    """
+    matches = []
+    for first_index, second_index, winner_index, played in zip(
+        first.tolist(), second.tolist(), winners.tolist(), is_match.tolist()
+    ):
+        if played:
+            matches.append({'meal_1': meals[first_index].id, 'meal_2': meals[second_index].id,
+                            'winner': meals[winner_index].id})
+        else:
+            matches.append({'meal_1': meals[winner_index].id, 'meal_2': None, 'winner': meals[winner_index].id})
+    return matches
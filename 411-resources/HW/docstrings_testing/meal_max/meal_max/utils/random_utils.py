@@ -1,4 +1,12 @@
+from collections import deque
 import logging
+import os
+import random
+import secrets
+import threading
+import time
+from typing import Deque, List, Optional
+
 import requests
 
 from meal_max.utils.logger import configure_logger
@@ -7,32 +15,217 @@ logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 
-def get_random() -> float:
-    url = "https://www.random.org/decimal-fractions/?num=1&dec=2&col=1&format=plain&rnd=new"
+# Fractions fetched from random.org per request (random.org allows up to 10,000)
+RANDOM_POOL_SIZE = int(os.getenv("RANDOM_POOL_SIZE", "500"))
 
-    try:
-        # Log the request to random.org
-        logger.info("Fetching random number from %s", url)
+# The pool is refilled in the background once fewer fractions than this are left
+RANDOM_POOL_LOW_WATER = int(os.getenv("RANDOM_POOL_LOW_WATER", "100"))
 
-        response = requests.get(url, timeout=5)
+# Seconds a caller waits for an empty pool to be refilled before using the local generator
+RANDOM_POOL_WAIT = float(os.getenv("RANDOM_POOL_WAIT", "0.25"))
 
-        # Check if the request was successful
-        response.raise_for_status()
+# If set, random numbers come from a seeded local generator instead, for repeatable benchmarks
+RANDOM_SEED = os.getenv("RANDOM_SEED")
 
-        random_number_str = response.text.strip()
+# Longest pause between refill attempts while random.org keeps failing
+MAX_REFILL_BACKOFF_SECONDS = 60.0
 
-        try:
-            random_number = float(random_number_str)
-        except ValueError:
-            raise ValueError("Invalid response from random.org: %s" % random_number_str)
 
-        logger.info("Received random number: %.3f", random_number)
+class EntropyPool:
+    """
+    A pool of random two-decimal fractions fetched from random.org in batches.
+
+    A background thread refills the pool over a keep-alive session whenever it drops below
+    the low-water mark, so callers normally take a number without any network round trip.
+    The thread is started by the first get(), so each worker process starts its own.
+    If the pool is empty and does not refill within a short wait, or random.org is failing,
+    callers get a number from the operating system's CSPRNG instead and the fallback is counted.
+
+    Attributes:
+        batch_size (int): How many fractions one request fetches.
+        low_water (int): The depth below which a refill starts.
+        max_wait (float): How long get() waits for an empty pool before falling back.
+        timeout (float): The timeout of a request to random.org.
+        seed (Optional[str]): If set, the pool is bypassed and a seeded generator is used.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = RANDOM_POOL_SIZE,
+        low_water: int = RANDOM_POOL_LOW_WATER,
+        max_wait: float = RANDOM_POOL_WAIT,
+        timeout: float = 5.0,
+        seed: Optional[str] = None
+    ):
+        self.batch_size = batch_size
+        self.low_water = low_water
+        self.max_wait = max_wait
+        self.timeout = timeout
+        self.seed = seed
+        self._pool: Deque[float] = deque()
+        self._lock = threading.Lock()
+        self._refilled = threading.Condition(self._lock)
+        self._refill_needed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._session = requests.Session()
+        self._seeded_random = random.Random(seed) if seed is not None else None
+        self._served = 0
+        self._fallbacks = 0
+        self._refills = 0
+        self._refill_failures = 0
+        self._failing = False
+        self._last_refill_seconds: Optional[float] = None
+        self._total_refill_seconds = 0.0
+
+    def start(self) -> None:
+        """
+        Starts the refill thread, if it is not running, and asks it to fill the pool. A thread
+        that has died, or that was left behind in the parent when a worker process was forked,
+        is replaced.
+        """
+        if self.seed is not None:
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._refill_loop, name="random-pool", daemon=True)
+                self._thread.start()
+        self._refill_needed.set()
+
+    def get(self) -> float:
+        """
+        Takes a random fraction between 0 and 1 from the pool.
+
+        Returns:
+            float: The random number, with two decimals.
+        """
+        if self._seeded_random is not None:
+            with self._lock:
+                self._served += 1
+                return self._seeded_random.randrange(100) / 100
+
+        self.start()
+        with self._lock:
+            if not self._pool and not self._failing:
+                # While random.org is failing, fall back at once rather than wait on every call
+                self._refilled.wait_for(lambda: bool(self._pool), self.max_wait)
+            self._served += 1
+            if self._pool:
+                random_number = self._pool.popleft()
+            else:
+                self._fallbacks += 1
+                random_number = None
+            depth = len(self._pool)
+
+        if depth < self.low_water:
+            self._refill_needed.set()
+        if random_number is None:
+            logger.warning("Random pool is empty, using the local generator")
+            random_number = secrets.randbelow(100) / 100
         return random_number
 
-    except requests.exceptions.Timeout:
-        logger.error("Request to random.org timed out.")
-        raise RuntimeError("Request to random.org timed out.")
+    def stats(self) -> dict:
+        """
+        Returns counters describing the pool.
+
+        Returns:
+            dict: The pool depth, how many numbers were served and how many of those came from
+                the local generator, and the count and latency of refills from random.org.
+        """
+        with self._lock:
+            return {
+                'mode': 'seeded' if self.seed is not None else 'random.org',
+                'depth': len(self._pool),
+                'served': self._served,
+                'fallbacks': self._fallbacks,
+                'refills': self._refills,
+                'refill_failures': self._refill_failures,
+                'last_refill_seconds': self._last_refill_seconds,
+                'avg_refill_seconds': self._total_refill_seconds / self._refills if self._refills else None
+            }
+
+    def _refill_loop(self) -> None:
+        backoff = 1.0
+        while True:
+            self._refill_needed.wait()
+            self._refill_needed.clear()
+            with self._lock:
+                if len(self._pool) >= self.low_water:
+                    continue
+            try:
+                self._refill()
+                backoff = 1.0
+            except RuntimeError:
+                # Callers use the local generator meanwhile; try again later rather than at once
+                time.sleep(backoff)
+                backoff = min(backoff * 2, MAX_REFILL_BACKOFF_SECONDS)
+                self._refill_needed.set()
+
+    def _refill(self) -> None:
+        """
+        Fetches one batch of fractions from random.org and adds it to the pool.
+
+        Raises:
+            RuntimeError: If the request fails, times out or returns an invalid response.
+        """
+        started_at = time.monotonic()
+        try:
+            batch = self._fetch(self.batch_size)
+        except RuntimeError:
+            with self._lock:
+                self._refill_failures += 1
+                self._failing = True
+            raise
+        elapsed = time.monotonic() - started_at
+
+        with self._lock:
+            self._pool.extend(batch)
+            self._refills += 1
+            self._failing = False
+            self._last_refill_seconds = elapsed
+            self._total_refill_seconds += elapsed
+            depth = len(self._pool)
+            self._refilled.notify_all()
+        logger.info("Refilled random pool with %d numbers in %.3f seconds, depth %d", len(batch), elapsed, depth)
+
+    def _fetch(self, num: int) -> List[float]:
+        url = f"https://www.random.org/decimal-fractions/?num={num}&dec=2&col=1&format=plain&rnd=new"
+
+        try:
+            logger.info("Fetching %d random numbers from %s", num, url)
+
+            response = self._session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+
+            try:
+                batch = [float(line) for line in response.text.split()]
+            except ValueError:
+                batch = []
+            if len(batch) != num:
+                logger.error("Invalid response from random.org: %s", response.text.strip()[:100])
+                raise RuntimeError("Invalid response from random.org: %s" % response.text.strip()[:100])
+            return batch
+
+        except requests.exceptions.Timeout:
+            logger.error("Request to random.org timed out.")
+            raise RuntimeError("Request to random.org timed out.")
+
+        except requests.exceptions.RequestException as e:
+            logger.error("Request to random.org failed: %s", e)
+            raise RuntimeError("Request to random.org failed: %s" % e)
+
+
+entropy_pool = EntropyPool(seed=RANDOM_SEED)
+
+
+def get_random() -> float:
+    """
+    Returns a random fraction between 0 and 1 with two decimals, taken from the shared pool of
+    numbers pre-fetched from random.org.
 
-    except requests.exceptions.RequestException as e:
-        logger.error("Request to random.org failed: %s", e)
-        raise RuntimeError("Request to random.org failed: %s" % e)
+    Returns:
+        float: The random number. If random.org is unavailable it comes from the local CSPRNG,
+            so this does not fail when the network does.
+    """
+    random_number = entropy_pool.get()
+    logger.info("Received random number: %.3f", random_number)
+    return random_number
@@ -0,0 +1,88 @@
+import logging
+from typing import Dict, Iterable, Tuple
+
+from meal_max.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Rating of a meal that has not fought a rated battle
+INITIAL_RATING = 1500.0
+
+# Rating points at stake in a battle. New meals move faster so they reach their level quickly;
+# established meals move slower so one upset does not undo many results.
+PROVISIONAL_K_FACTOR = 40.0
+ESTABLISHED_K_FACTOR = 20.0
+
+# Number of rated battles after which a meal's rating is established
+PROVISIONAL_BATTLES = 30
+
+
+def expected_score(rating: float, opponent_rating: float) -> float:
+    """
+    Returns the chance of a meal beating an opponent that the Elo model predicts from their ratings.
+
+    Args:
+        rating (float): The meal's rating.
+        opponent_rating (float): The opponent's rating.
+
+    Returns:
+        float: The expected score, between 0 and 1.
+    """
+    return 1 / (1 + 10 ** ((opponent_rating - rating) / 400))
+
+def k_factor(rated_battles: int) -> float:
+    """
+    Returns the rating points at stake for a meal with the given number of rated battles.
+    """
+    return PROVISIONAL_K_FACTOR if rated_battles < PROVISIONAL_BATTLES else ESTABLISHED_K_FACTOR
+
+def update_ratings(
+    winner_rating: float,
+    winner_battles: int,
+    loser_rating: float,
+    loser_battles: int
+) -> Tuple[float, float]:
+    """
+    Computes both meals' ratings after a battle. An upset moves the ratings more than an
+    expected result.
+
+    Args:
+        winner_rating (float): The winner's rating before the battle.
+        winner_battles (int): The winner's number of rated battles before this one.
+        loser_rating (float): The loser's rating before the battle.
+        loser_battles (int): The loser's number of rated battles before this one.
+
+    Returns:
+        Tuple[float, float]: The new ratings of the winner and the loser.
+    """
+    surprise = 1 - expected_score(winner_rating, loser_rating)
+    return (
+        winner_rating + k_factor(winner_battles) * surprise,
+        loser_rating - k_factor(loser_battles) * surprise
+    )
+
+def replay_ratings(battles: Iterable[Tuple[int, int]]) -> Dict[int, Tuple[float, int]]:
+    """
+    Computes every meal's rating from scratch by applying battles in the order they were fought.
+
+    The battles are consumed one at a time, so they can be streamed from a database cursor;
+    only the current rating of each meal seen is held in memory.
+
+    Args:
+        battles (Iterable[Tuple[int, int]]): (winner_id, loser_id) of every battle, oldest first.
+
+    Returns:
+        Dict[int, Tuple[float, int]]: For every meal that battled, its rating and number of rated battles.
+    """
+    ratings: Dict[int, Tuple[float, int]] = {}
+    unrated = (INITIAL_RATING, 0)
+    for winner_id, loser_id in battles:
+        winner_rating, winner_battles = ratings.get(winner_id, unrated)
+        loser_rating, loser_battles = ratings.get(loser_id, unrated)
+        winner_rating, loser_rating = update_ratings(winner_rating, winner_battles, loser_rating, loser_battles)
+        ratings[winner_id] = (winner_rating, winner_battles + 1)
+        ratings[loser_id] = (loser_rating, loser_battles + 1)
+    logger.info("Replayed the ratings of %d meals", len(ratings))
+    return ratings
@@ -1,7 +1,10 @@
 from contextlib import contextmanager
 import logging
 import os
+import random
 import sqlite3
+import time
+from typing import Callable, TypeVar
 
 from meal_max.utils.logger import configure_logger
 
@@ -13,6 +16,14 @@ configure_logger(logger)
 # load the db path from the environment with a default value
 DB_PATH = os.getenv("DB_PATH", "/app/sql/meal_max.db")
 
+# How often a write is retried when another writer holds the database lock
+BUSY_RETRIES = 5
+
+# Delay before the first retry, doubled on every further attempt
+BUSY_BACKOFF_SECONDS = 0.05
+
+T = TypeVar("T")
+
 
 def check_database_connection():
     try:
@@ -56,3 +67,45 @@ def get_db_connection():
         if conn:
             conn.close()
             logger.info("Database connection closed.")
+
+def write_with_busy_retry(write: Callable[[sqlite3.Cursor], T]) -> T:
+    """
+    Runs a write in its own transaction and commits it.
+
+    The write lock is taken up front with BEGIN IMMEDIATE. If another writer holds it past
+    the connection's busy timeout, the whole transaction is retried with exponential backoff.
+
+    Args:
+        write (Callable[[sqlite3.Cursor], T]): Issues the statements of the transaction. If it raises,
+            the transaction is rolled back.
+
+    Returns:
+        T: The return value of write.
+
+    Raises:
+        sqlite3.Error: If any database error occurs, or the database stays locked after all retries.
+    """
+    for attempt in range(BUSY_RETRIES + 1):
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("BEGIN IMMEDIATE")
+                result = write(cursor)
+                conn.commit()
+                return result
+
+        except sqlite3.OperationalError as e:
+            if attempt == BUSY_RETRIES or not _is_busy_error(e):
+                logger.error("Database error: %s", str(e))
+                raise e
+            delay = BUSY_BACKOFF_SECONDS * 2 ** attempt * random.uniform(0.5, 1.5)
+            logger.warning("Database is busy, retrying in %.3f seconds", delay)
+            time.sleep(delay)
+
+        except sqlite3.Error as e:
+            logger.error("Database error: %s", str(e))
+            raise e
+
+def _is_busy_error(error: sqlite3.OperationalError) -> bool:
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
@@ -0,0 +1,9 @@
+DROP TABLE IF EXISTS arenas;
+CREATE TABLE arenas (
+    id TEXT PRIMARY KEY,
+    combatant_1 INTEGER,
+    combatant_2 INTEGER,
+    expires_at REAL NOT NULL
+);
+-- Finds idle arenas to expire
+CREATE INDEX idx_arenas_expires_at ON arenas(expires_at);
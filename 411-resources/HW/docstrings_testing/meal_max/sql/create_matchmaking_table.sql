@@ -0,0 +1,22 @@
+DROP TABLE IF EXISTS matchmaking_tickets;
+CREATE TABLE matchmaking_tickets (
+    id TEXT PRIMARY KEY,
+    meal_id INTEGER NOT NULL,
+    meal TEXT NOT NULL,
+    score REAL NOT NULL,
+    status TEXT NOT NULL CHECK(status IN ('waiting', 'matched', 'finished', 'failed', 'cancelled', 'expired')),
+    opponent_id INTEGER,
+    opponent TEXT,
+    winner TEXT,
+    error TEXT,
+    -- Unix timestamps, shared by every worker process
+    created_at REAL NOT NULL,
+    finished_at REAL
+);
+-- Finds the waiting meals within the tolerance of a score with one range scan
+CREATE INDEX idx_matchmaking_waiting_score ON matchmaking_tickets(score) WHERE status = 'waiting';
+-- A meal waits at most once
+CREATE UNIQUE INDEX idx_matchmaking_waiting_meal ON matchmaking_tickets(meal_id) WHERE status = 'waiting';
+-- Finds waiting tickets to expire and finished tickets to forget
+CREATE INDEX idx_matchmaking_waiting_created_at ON matchmaking_tickets(created_at) WHERE status = 'waiting';
+CREATE INDEX idx_matchmaking_finished_at ON matchmaking_tickets(finished_at) WHERE finished_at IS NOT NULL;
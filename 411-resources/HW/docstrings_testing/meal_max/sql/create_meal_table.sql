@@ -7,5 +7,53 @@ CREATE TABLE meals (
     difficulty TEXT CHECK(difficulty IN ('HIGH', 'MED', 'LOW')),
     battles INTEGER DEFAULT 0,
     wins INTEGER DEFAULT 0,
-    deleted BOOLEAN DEFAULT FALSE
-);
\ No newline at end of file
+    deleted BOOLEAN DEFAULT FALSE,
+    -- Elo rating, updated with every battle recorded by record_battle_result
+    rating REAL NOT NULL DEFAULT 1500,
+    rated_battles INTEGER NOT NULL DEFAULT 0,
+    -- Same formula as BattleModel.get_battle_score, kept up to date by SQLite
+    battle_score REAL GENERATED ALWAYS AS (
+        price * length(cuisine) - CASE difficulty WHEN 'HIGH' THEN 1 WHEN 'MED' THEN 2 WHEN 'LOW' THEN 3 END
+    ) STORED,
+    -- Share of battles won, NULL until the meal has battled
+    win_pct REAL GENERATED ALWAYS AS (
+        CASE WHEN battles > 0 THEN wins * 1.0 / battles END
+    ) STORED
+);
+-- Finds the live meals closest in score to an opponent
+CREATE INDEX idx_meals_battle_score ON meals(battle_score) WHERE deleted = FALSE;
+-- Leaderboard order for each sort key, ties broken by ID, for pages and rank counts
+CREATE INDEX idx_meals_leaderboard_wins ON meals(wins, id) WHERE deleted = FALSE AND battles > 0;
+CREATE INDEX idx_meals_leaderboard_battles ON meals(battles, id) WHERE deleted = FALSE AND battles > 0;
+CREATE INDEX idx_meals_leaderboard_win_pct ON meals(win_pct, id) WHERE deleted = FALSE AND battles > 0;
+-- Tournaments record only totals and leave ratings alone, so only meals with rated battles are rated
+CREATE INDEX idx_meals_leaderboard_rating ON meals(rating, id) WHERE deleted = FALSE AND rated_battles > 0;
+
+-- Counts the writes to the meals table, so every worker process can tell when its cached
+-- leaderboards are stale. It outlives the meals table, and recreating the table is a change too.
+CREATE TABLE IF NOT EXISTS meals_version (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    version INTEGER NOT NULL,
+    -- Unix timestamp of the last change
+    changed_at REAL NOT NULL
+);
+INSERT OR IGNORE INTO meals_version (id, version, changed_at) VALUES (0, 0, 0);
+UPDATE meals_version SET version = version + 1, changed_at = (julianday('now') - 2440587.5) * 86400;
+CREATE TRIGGER meals_version_insert AFTER INSERT ON meals BEGIN
+    UPDATE meals_version SET version = version + 1, changed_at = (julianday('now') - 2440587.5) * 86400;
+END;
+CREATE TRIGGER meals_version_update AFTER UPDATE ON meals BEGIN
+    UPDATE meals_version SET version = version + 1, changed_at = (julianday('now') - 2440587.5) * 86400;
+END;
+CREATE TRIGGER meals_version_delete AFTER DELETE ON meals BEGIN
+    UPDATE meals_version SET version = version + 1, changed_at = (julianday('now') - 2440587.5) * 86400;
+END;
+
+-- Every rated battle in the order it was fought, to rebuild the ratings from
+DROP TABLE IF EXISTS battle_log;
+CREATE TABLE battle_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    winner_id INTEGER NOT NULL,
+    loser_id INTEGER NOT NULL,
+    fought_at REAL NOT NULL
+);
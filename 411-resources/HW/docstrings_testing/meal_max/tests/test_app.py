@@ -0,0 +1,164 @@
+import pytest
+
+from meal_max.models import kitchen_model
+from meal_max.models.kitchen_model import Meal
+
+import app as meal_max_app
+
+
+LEADERBOARD = [{'id': 1, 'meal': "Spaghetti", 'cuisine': "Italian", 'price': 12.5, 'difficulty': "MED",
+                'battles': 2, 'wins': 2, 'win_pct': 100.0, 'rating': 1539.1}]
+
+@pytest.fixture
+def client():
+    """Fixture to provide a Flask test client."""
+    meal_max_app.app.config['TESTING'] = True
+    return meal_max_app.app.test_client()
+
+@pytest.fixture
+def mock_get_leaderboard_page(mocker):
+    """Mock the leaderboard query behind an empty cache."""
+    mocker.patch.dict(kitchen_model._leaderboards, clear=True)
+    kitchen_model._leaderboard_builds.clear()
+    mocker.patch("meal_max.models.kitchen_model.get_meals_version", return_value=(1, 1000.0))
+    return mocker.patch("meal_max.models.kitchen_model.get_leaderboard_page", return_value=(LEADERBOARD, None))
+
+##################################################
+# Leaderboard Test Cases
+##################################################
+
+def test_leaderboard(client, mock_get_leaderboard_page):
+    """Test that the leaderboard is returned with validators and must be revalidated."""
+    response = client.get('/api/leaderboard?sort=wins')
+
+    assert response.status_code == 200
+    assert response.get_json() == {'status': 'success', 'leaderboard': LEADERBOARD, 'next_cursor': None}
+    assert response.headers['ETag'] and response.headers['Last-Modified']
+    assert 'no-cache' in response.headers['Cache-Control']
+
+def test_leaderboard_if_none_match(client, mock_get_leaderboard_page):
+    """Test that a client holding the current ETag gets a 304 with no body."""
+    etag = client.get('/api/leaderboard').headers['ETag']
+
+    response = client.get('/api/leaderboard', headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+
+def test_leaderboard_if_modified_since(client, mock_get_leaderboard_page):
+    """Test that a client whose copy is as recent as Last-Modified gets a 304."""
+    last_modified = client.get('/api/leaderboard').headers['Last-Modified']
+
+    response = client.get('/api/leaderboard', headers={'If-Modified-Since': last_modified})
+
+    assert response.status_code == 304
+
+def test_leaderboard_changed_after_write(client, mocker, mock_get_leaderboard_page):
+    """Test that once a write changes the leaderboard, the old ETag gets the new entries."""
+    etag = client.get('/api/leaderboard').headers['ETag']
+    mock_get_leaderboard_page.return_value = ([{**LEADERBOARD[0], 'wins': 3, 'battles': 3}], None)
+    mocker.patch("meal_max.models.kitchen_model.get_meals_version", return_value=(2, 2000.0))
+
+    response = client.get('/api/leaderboard', headers={'If-None-Match': etag})
+
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.get_json()['leaderboard'][0]['wins'] == 3
+
+def test_leaderboard_invalid_sort(client, mock_get_leaderboard_page):
+    """Test error when the sort field is unknown."""
+    response = client.get('/api/leaderboard?sort=price')
+
+    assert response.status_code == 400
+    mock_get_leaderboard_page.assert_not_called()
+
+@pytest.mark.parametrize("query", ["limit=0", "limit=1001", "limit=abc", "limit="])
+def test_leaderboard_invalid_limit(client, mock_get_leaderboard_page, query):
+    """Test that a page size outside 1 to LEADERBOARD_MAX_LIMIT is rejected."""
+    response = client.get(f'/api/leaderboard?{query}')
+
+    assert response.status_code == 400
+    assert "limit must be between 1 and 1000" in response.get_json()['error']
+    mock_get_leaderboard_page.assert_not_called()
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "WzEsICIyIl0=", "dHJ1ZQ=="])
+def test_leaderboard_invalid_cursor(client, mocker, cursor):
+    """Test that a malformed or tampered cursor is a client error, not a server error."""
+    mocker.patch.dict(kitchen_model._leaderboards, clear=True)
+    mock_get_db_connection = mocker.patch("meal_max.models.kitchen_model.get_db_connection")
+
+    response = client.get(f'/api/leaderboard?limit=10&cursor={cursor}')
+
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith("Invalid cursor")
+    mock_get_db_connection.assert_not_called()
+
+@pytest.mark.parametrize("query", ["neighbors=-1", "neighbors=51", "neighbors=abc", "sort=price"])
+def test_meal_rank_invalid_parameters(client, mocker, query):
+    """Test that the number of neighbors and the sort field are checked."""
+    mock_get_meal_rank = mocker.patch("meal_max.models.kitchen_model.get_meal_rank")
+
+    response = client.get(f'/api/meal-rank/1?{query}')
+
+    assert response.status_code == 400
+    mock_get_meal_rank.assert_not_called()
+
+def test_meal_rank_not_ranked(client, mocker):
+    """Test that a meal without a rank is a 404."""
+    mocker.patch("meal_max.models.kitchen_model.get_meal_rank", side_effect=ValueError("Meal with ID 1 has not battled yet"))
+
+    response = client.get('/api/meal-rank/1')
+
+    assert response.status_code == 404
+
+##################################################
+# Tournament Test Cases
+##################################################
+
+@pytest.fixture
+def tournament_meals():
+    return [Meal(1, "Spaghetti", "Italian", 12.5, "MED"), Meal(2, "Sushi", "Japanese", 10.0, "HIGH"),
+            Meal(3, "Tacos", "Mexican", 8.0, "LOW")]
+
+@pytest.fixture
+def mock_record_tournament_results(mocker):
+    return mocker.patch("meal_max.models.tournament_model.record_tournament_results")
+
+def test_tournament(client, mocker, tournament_meals, mock_record_tournament_results):
+    """Test that a tournament is run between the requested meals and its results recorded."""
+    mock_get_meals = mocker.patch("meal_max.models.kitchen_model.get_meals", return_value=tournament_meals)
+
+    response = client.post('/api/tournament', json={'format': 'round_robin', 'meal_ids': [1, 2, 3], 'seed': 7})
+
+    assert response.status_code == 200
+    tournament = response.get_json()['tournament']
+    assert tournament['matches'] == 3
+    assert sorted(entry['id'] for entry in tournament['standings']) == [1, 2, 3]
+    mock_get_meals.assert_called_once_with([1, 2, 3], cuisine=None, difficulty=None)
+    mock_record_tournament_results.assert_called_once()
+
+@pytest.mark.parametrize("body", [
+    {'format': 'knockout'},
+    {'format': 'swiss', 'meal_ids': "1,2"},
+    {'format': 'swiss', 'rounds': "3"},
+    {'format': 'swiss', 'seed': 1.5}
+])
+def test_tournament_invalid_input(client, mocker, body):
+    """Test that the format and parameter types are checked before any meal is loaded."""
+    mock_get_meals = mocker.patch("meal_max.models.kitchen_model.get_meals")
+
+    response = client.post('/api/tournament', json=body)
+
+    assert response.status_code == 400
+    mock_get_meals.assert_not_called()
+
+def test_tournament_invalid_field(client, mocker, tournament_meals, mock_record_tournament_results):
+    """Test that a tournament the model rejects is a client error and nothing is recorded."""
+    mocker.patch("meal_max.models.kitchen_model.get_meals", return_value=tournament_meals[:1])
+
+    response = client.post('/api/tournament', json={'format': 'single_elimination'})
+
+    assert response.status_code == 400
+    assert "At least two meals" in response.get_json()['error']
+    mock_record_tournament_results.assert_not_called()
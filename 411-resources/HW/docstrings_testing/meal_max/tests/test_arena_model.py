@@ -0,0 +1,174 @@
+from contextlib import contextmanager
+import re
+import time
+
+import pytest
+
+from meal_max.models.arena_model import ARENA_TTL_SECONDS, battle, get_combatants, prep_combatant
+from meal_max.models.kitchen_model import Meal
+
+######################################################
+#
+#    Fixtures
+#
+######################################################
+
+def normalize_whitespace(sql_query: str) -> str:
+    return re.sub(r'\s+', ' ', sql_query).strip()
+
+@pytest.fixture
+def mock_conn(mocker):
+    mock_conn = mocker.Mock()
+    mock_cursor = mocker.Mock()
+
+    # Mock the connection's cursor
+    mock_conn.cursor.return_value = mock_cursor
+    mock_cursor.fetchone.return_value = None  # Default return for queries
+    mock_cursor.fetchall.return_value = []
+    mock_conn.commit.return_value = None
+
+    # Mock the get_db_connection context manager, both for reads and for write_with_busy_retry
+    @contextmanager
+    def mock_get_db_connection():
+        yield mock_conn  # Yield the mocked connection object
+
+    mocker.patch("meal_max.models.arena_model.get_db_connection", mock_get_db_connection)
+    mocker.patch("meal_max.utils.sql_utils.get_db_connection", mock_get_db_connection)
+
+    return mock_conn
+
+@pytest.fixture
+def mock_cursor(mock_conn):
+    return mock_conn.cursor.return_value
+
+@pytest.fixture
+def mock_record_battle_result(mocker):
+    return mocker.patch("meal_max.models.arena_model.record_battle_result")
+
+@pytest.fixture
+def mock_battle_model(mocker):
+    """Mock the winner draw of the battle rule, which may wait on random.org."""
+    return mocker.patch("meal_max.models.arena_model.BattleModel")
+
+"""Fixtures providing sample meals for the tests."""
+@pytest.fixture
+def sample_meal1():
+    return Meal(1, "Spaghetti", "Italian", 20.0, "MED", battle_score=138.0)
+
+@pytest.fixture
+def sample_meal2():
+    return Meal(2, "Sushi", "Japanese", 10.0, "HIGH", battle_score=79.0)
+
+def meal_row(meal: Meal) -> tuple:
+    return (meal.id, meal.meal, meal.cuisine, meal.price, meal.difficulty, meal.battle_score)
+
+def executed_sql(mock_cursor):
+    return [normalize_whitespace(call[0][0]) for call in mock_cursor.execute.call_args_list]
+
+######################################################
+#
+#    Combatants
+#
+######################################################
+
+def test_get_combatants_reads_without_writing(mock_conn, mock_cursor, sample_meal1):
+    """Test that reading a recently used arena takes no write lock and does not push back its expiry."""
+    mock_cursor.fetchone.return_value = (1, None, time.time() + ARENA_TTL_SECONDS - 10)
+    mock_cursor.fetchall.return_value = [meal_row(sample_meal1)]
+
+    assert get_combatants("arena") == [sample_meal1]
+
+    assert not any(statement == "BEGIN IMMEDIATE" or statement.startswith("UPDATE")
+                   for statement in executed_sql(mock_cursor))
+    mock_conn.commit.assert_not_called()
+
+def test_get_combatants_touches_stale_expiry(mock_conn, mock_cursor, sample_meal1):
+    """Test that reading an arena past half of its TTL pushes back its expiry."""
+    mock_cursor.fetchone.return_value = (1, None, time.time() + ARENA_TTL_SECONDS / 4)
+    mock_cursor.fetchall.return_value = [meal_row(sample_meal1)]
+
+    assert get_combatants("arena") == [sample_meal1]
+
+    statements = executed_sql(mock_cursor)
+    assert "BEGIN IMMEDIATE" in statements
+    assert statements[-1] == "UPDATE arenas SET expires_at = ? WHERE id = ?"
+    mock_conn.commit.assert_called_once()
+
+def test_get_combatants_expired(mock_cursor):
+    """Test error when the arena has expired."""
+    mock_cursor.fetchone.return_value = (1, None, time.time() - 1)
+
+    with pytest.raises(ValueError, match="Arena arena not found"):
+        get_combatants("arena")
+
+def test_prep_combatant_same_meal(mock_conn, mock_cursor, sample_meal1):
+    """Test error when prepping a meal that is already in the arena."""
+    mock_cursor.fetchone.return_value = (1, None, time.time() + ARENA_TTL_SECONDS)
+
+    with pytest.raises(ValueError, match="Meal 'Spaghetti' is already a combatant"):
+        prep_combatant("arena", sample_meal1)
+    mock_conn.commit.assert_not_called()
+
+######################################################
+#
+#    Battles
+#
+######################################################
+
+def test_battle_draws_before_transaction(mock_conn, mock_cursor, mock_battle_model, mock_record_battle_result,
+                                         sample_meal1, sample_meal2):
+    """Test that the winner is drawn before the write lock is taken, then recorded in one transaction."""
+    expires_at = time.time() + ARENA_TTL_SECONDS
+    mock_cursor.fetchone.return_value = (1, 2, expires_at)
+    mock_cursor.fetchall.return_value = [meal_row(sample_meal1), meal_row(sample_meal2)]
+
+    def pick_winner(combatant_1, combatant_2):
+        assert "BEGIN IMMEDIATE" not in executed_sql(mock_cursor)
+        return combatant_1, combatant_2
+    mock_battle_model.return_value.pick_winner.side_effect = pick_winner
+
+    assert battle("arena") == "Spaghetti"
+
+    mock_record_battle_result.assert_called_once_with(1, 2, cursor=mock_cursor)
+    assert executed_sql(mock_cursor)[-1] == "UPDATE arenas SET combatant_1 = ?, combatant_2 = NULL WHERE id = ?"
+    assert mock_cursor.execute.call_args[0][1] == (1, "arena")
+    mock_conn.commit.assert_called_once()
+
+def test_battle_redrawn_when_combatants_change(mock_cursor, mock_battle_model, mock_record_battle_result,
+                                               sample_meal1, sample_meal2):
+    """Test that a battle whose combatants changed while its winner was drawn is drawn again."""
+    expires_at = time.time() + ARENA_TTL_SECONDS
+    sample_meal3 = Meal(3, "Tacos", "Mexican", 8.0, "LOW", battle_score=53.0)
+    mock_cursor.fetchone.side_effect = [(1, 2, expires_at), (1, 3, expires_at), (1, 3, expires_at), (1, 3, expires_at)]
+    mock_cursor.fetchall.side_effect = [
+        [meal_row(sample_meal1), meal_row(sample_meal2)],
+        [meal_row(sample_meal1), meal_row(sample_meal3)]
+    ]
+    mock_battle_model.return_value.pick_winner.side_effect = lambda combatant_1, combatant_2: (combatant_2, combatant_1)
+
+    assert battle("arena") == "Tacos"
+
+    assert mock_battle_model.return_value.pick_winner.call_count == 2
+    mock_record_battle_result.assert_called_once_with(3, 1, cursor=mock_cursor)
+
+def test_battle_gives_up_when_combatants_keep_changing(mock_conn, mock_cursor, mock_battle_model,
+                                                       mock_record_battle_result, sample_meal1, sample_meal2):
+    """Test error when the combatants change during every attempt."""
+    expires_at = time.time() + ARENA_TTL_SECONDS
+    mock_cursor.fetchone.side_effect = [(1, 2, expires_at), (1, None, expires_at)] * 3
+    mock_cursor.fetchall.return_value = [meal_row(sample_meal1), meal_row(sample_meal2)]
+    mock_battle_model.return_value.pick_winner.side_effect = lambda combatant_1, combatant_2: (combatant_1, combatant_2)
+
+    with pytest.raises(ValueError, match="kept changing"):
+        battle("arena")
+
+    mock_record_battle_result.assert_not_called()
+
+def test_battle_not_enough_combatants(mock_cursor, mock_battle_model, sample_meal1):
+    """Test error when the arena has a single combatant."""
+    mock_cursor.fetchone.return_value = (1, None, time.time() + ARENA_TTL_SECONDS)
+    mock_cursor.fetchall.return_value = [meal_row(sample_meal1)]
+
+    with pytest.raises(ValueError, match="Two combatants must be prepped"):
+        battle("arena")
+    mock_battle_model.return_value.pick_winner.assert_not_called()
@@ -0,0 +1,102 @@
+import pytest
+
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.kitchen_model import Meal
+
+
+@pytest.fixture
+def battle_model():
+    """Fixture to provide a new instance of BattleModel for each test."""
+    return BattleModel()
+
+@pytest.fixture
+def mock_record_battle_result(mocker):
+    """Mock the recording of battle results in the database."""
+    return mocker.patch("meal_max.models.battle_model.record_battle_result")
+
+@pytest.fixture
+def mock_get_random(mocker):
+    """Mock the random number that decides battles."""
+    return mocker.patch("meal_max.models.battle_model.get_random", return_value=0.5)
+
+"""Fixtures providing sample meals for the tests."""
+@pytest.fixture
+def sample_meal1():
+    return Meal(1, "Spaghetti", "Italian", 20.0, "MED")
+
+@pytest.fixture
+def sample_meal2():
+    return Meal(2, "Sushi", "Japanese", 10.0, "HIGH")
+
+##################################################
+# Combatant Management Test Cases
+##################################################
+
+def test_prep_combatant(battle_model, sample_meal1):
+    """Test adding a combatant."""
+    battle_model.prep_combatant(sample_meal1)
+    assert battle_model.get_combatants() == [sample_meal1]
+
+def test_prep_combatant_full(battle_model, sample_meal1, sample_meal2):
+    """Test error when adding a third combatant."""
+    battle_model.prep_combatant(sample_meal1)
+    battle_model.prep_combatant(sample_meal2)
+
+    with pytest.raises(ValueError, match="Combatant list is full"):
+        battle_model.prep_combatant(Meal(3, "Tacos", "Mexican", 8.0, "LOW"))
+
+def test_clear_combatants(battle_model, sample_meal1):
+    """Test removing every combatant."""
+    battle_model.prep_combatant(sample_meal1)
+    battle_model.clear_combatants()
+    assert battle_model.get_combatants() == []
+
+##################################################
+# Battle Test Cases
+##################################################
+
+def test_get_battle_score(battle_model, sample_meal1):
+    """Test the battle score: price times cuisine length, minus the difficulty modifier."""
+    assert battle_model.get_battle_score(sample_meal1) == 20.0 * len("Italian") - 2
+
+def test_get_battle_score_stored(battle_model):
+    """Test that the battle score stored with a loaded meal is used rather than computed."""
+    meal = Meal(1, "Spaghetti", "Italian", 20.0, "MED", battle_score=99.0)
+    assert battle_model.get_battle_score(meal) == 99.0
+
+def test_pick_winner(battle_model, mock_get_random, sample_meal1, sample_meal2):
+    """Test that the first combatant wins when the score gap exceeds the random number."""
+    # Scores 138 and 79: the gap of 0.59 beats 0.5
+    assert battle_model.pick_winner(sample_meal1, sample_meal2) == (sample_meal1, sample_meal2)
+
+    mock_get_random.return_value = 0.6
+    assert battle_model.pick_winner(sample_meal1, sample_meal2) == (sample_meal2, sample_meal1)
+
+def test_battle(battle_model, mock_get_random, mock_record_battle_result, sample_meal1, sample_meal2):
+    """Test that a battle records both sides at once and removes the loser."""
+    battle_model.prep_combatant(sample_meal1)
+    battle_model.prep_combatant(sample_meal2)
+
+    assert battle_model.battle() == "Spaghetti"
+
+    mock_record_battle_result.assert_called_once_with(1, 2)
+    assert battle_model.get_combatants() == [sample_meal1]
+
+def test_battle_failed_record_keeps_combatants(battle_model, mock_get_random, mock_record_battle_result,
+                                               sample_meal1, sample_meal2):
+    """Test that both combatants stay when the result cannot be recorded."""
+    mock_record_battle_result.side_effect = ValueError("Meal with ID 2 has been deleted")
+    battle_model.prep_combatant(sample_meal1)
+    battle_model.prep_combatant(sample_meal2)
+
+    with pytest.raises(ValueError, match="has been deleted"):
+        battle_model.battle()
+
+    assert battle_model.get_combatants() == [sample_meal1, sample_meal2]
+
+def test_battle_not_enough_combatants(battle_model, sample_meal1):
+    """Test error when battling with fewer than two combatants."""
+    battle_model.prep_combatant(sample_meal1)
+
+    with pytest.raises(ValueError, match="Two combatants must be prepped"):
+        battle_model.battle()
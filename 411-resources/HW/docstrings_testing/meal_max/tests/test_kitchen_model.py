@@ -0,0 +1,541 @@
+import base64
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from meal_max.models import kitchen_model
+from meal_max.models.kitchen_model import (
+    Meal,
+    create_meal,
+    delete_meal,
+    get_cached_leaderboard,
+    get_leaderboard_page,
+    get_meal_by_id,
+    get_meal_by_name,
+    get_meal_rank,
+    get_meals,
+    get_meals_version,
+    rebuild_ratings,
+    record_battle_result,
+    record_tournament_results
+)
+
+######################################################
+#
+#    Fixtures
+#
+######################################################
+
+def normalize_whitespace(sql_query: str) -> str:
+    return re.sub(r'\s+', ' ', sql_query).strip()
+
+@pytest.fixture
+def mock_conn(mocker):
+    mock_conn = mocker.Mock()
+    mock_cursor = mocker.Mock()
+
+    # Mock the connection's cursor
+    mock_conn.cursor.return_value = mock_cursor
+    mock_conn.execute = mock_cursor.execute
+    mock_cursor.fetchone.return_value = None  # Default return for queries
+    mock_cursor.fetchall.return_value = []
+    mock_conn.commit.return_value = None
+
+    # Mock the get_db_connection context manager, both where the models use it and where
+    # write_with_busy_retry opens its transactions
+    @contextmanager
+    def mock_get_db_connection():
+        yield mock_conn  # Yield the mocked connection object
+
+    mocker.patch("meal_max.models.kitchen_model.get_db_connection", mock_get_db_connection)
+    mocker.patch("meal_max.utils.sql_utils.get_db_connection", mock_get_db_connection)
+    mocker.patch("meal_max.utils.sql_utils.time.sleep")
+
+    return mock_conn
+
+@pytest.fixture
+def mock_cursor(mock_conn):
+    return mock_conn.cursor.return_value  # Return the mock cursor so we can set expectations per test
+
+def executed_sql(mock_cursor):
+    return [normalize_whitespace(call[0][0]) for call in mock_cursor.execute.call_args_list]
+
+######################################################
+#
+#    Meal management
+#
+######################################################
+
+def test_create_meal(mock_conn, mock_cursor):
+    """Test creating a meal."""
+    create_meal(meal="Spaghetti", cuisine="Italian", price=12.5, difficulty="MED")
+
+    expected_query = normalize_whitespace("""
+        INSERT INTO meals (meal, cuisine, price, difficulty)
+        VALUES (?, ?, ?, ?)
+    """)
+    assert normalize_whitespace(mock_cursor.execute.call_args[0][0]) == expected_query
+    assert mock_cursor.execute.call_args[0][1] == ("Spaghetti", "Italian", 12.5, "MED")
+    mock_conn.commit.assert_called_once()
+
+def test_create_meal_duplicate(mock_cursor):
+    """Test creating a meal whose name is taken."""
+    mock_cursor.execute.side_effect = sqlite3.IntegrityError("UNIQUE constraint failed: meals.meal")
+
+    with pytest.raises(ValueError, match="Meal with name 'Spaghetti' already exists"):
+        create_meal(meal="Spaghetti", cuisine="Italian", price=12.5, difficulty="MED")
+
+@pytest.mark.parametrize("price, difficulty, message", [
+    (-1, "MED", "Invalid price: -1"),
+    ("12", "MED", "Invalid price: 12"),
+    (12.5, "EASY", "Invalid difficulty level: EASY")
+])
+def test_create_meal_invalid(mock_cursor, price, difficulty, message):
+    """Test that invalid prices and difficulties are rejected before touching the database."""
+    with pytest.raises(ValueError, match=message):
+        create_meal(meal="Spaghetti", cuisine="Italian", price=price, difficulty=difficulty)
+    mock_cursor.execute.assert_not_called()
+
+def test_delete_meal(mock_conn, mock_cursor):
+    """Test soft deleting a meal."""
+    mock_cursor.fetchone.return_value = (False,)
+
+    delete_meal(1)
+
+    assert normalize_whitespace(mock_cursor.execute.call_args[0][0]) == "UPDATE meals SET deleted = TRUE WHERE id = ?"
+    assert mock_cursor.execute.call_args[0][1] == (1,)
+    mock_conn.commit.assert_called_once()
+
+def test_delete_meal_already_deleted(mock_cursor):
+    """Test error when deleting a meal twice."""
+    mock_cursor.fetchone.return_value = (True,)
+
+    with pytest.raises(ValueError, match="Meal with ID 1 has been deleted"):
+        delete_meal(1)
+
+def test_delete_meal_not_found(mock_cursor):
+    """Test error when deleting a meal that does not exist."""
+    with pytest.raises(ValueError, match="Meal with ID 1 not found"):
+        delete_meal(1)
+
+######################################################
+#
+#    Meal retrieval
+#
+######################################################
+
+def test_get_meal_by_id(mock_cursor):
+    """Test retrieving a meal by its ID."""
+    mock_cursor.fetchone.return_value = (1, "Spaghetti", "Italian", 12.5, "MED", 85.5, False)
+
+    meal = get_meal_by_id(1)
+
+    assert meal == Meal(1, "Spaghetti", "Italian", 12.5, "MED")
+    assert meal.battle_score == 85.5
+
+def test_get_meal_by_id_deleted(mock_cursor):
+    """Test error when retrieving a deleted meal."""
+    mock_cursor.fetchone.return_value = (1, "Spaghetti", "Italian", 12.5, "MED", 85.5, True)
+
+    with pytest.raises(ValueError, match="Meal with ID 1 has been deleted"):
+        get_meal_by_id(1)
+
+def test_get_meal_by_name_not_found(mock_cursor):
+    """Test error when retrieving a meal name that does not exist."""
+    with pytest.raises(ValueError, match="Meal with name Spaghetti not found"):
+        get_meal_by_name("Spaghetti")
+
+def test_get_meals_by_ids_in_order(mock_cursor):
+    """Test that meals loaded by ID come back in the requested order."""
+    mock_cursor.fetchall.return_value = [
+        (1, "Spaghetti", "Italian", 12.5, "MED", 85.5, False),
+        (2, "Sushi", "Japanese", 20.0, "HIGH", 159.0, False)
+    ]
+
+    assert get_meals([2, 1]) == [Meal(2, "Sushi", "Japanese", 20.0, "HIGH"), Meal(1, "Spaghetti", "Italian", 12.5, "MED")]
+    mock_cursor.execute.assert_called_once()
+
+def test_get_meals_missing_id(mock_cursor):
+    """Test error when one of the requested meals does not exist."""
+    mock_cursor.fetchall.return_value = [(1, "Spaghetti", "Italian", 12.5, "MED", 85.5, False)]
+
+    with pytest.raises(ValueError, match="Meal with ID 3 not found"):
+        get_meals([1, 3])
+
+def test_get_meals_by_filter(mock_cursor):
+    """Test loading the live meals of a cuisine."""
+    mock_cursor.fetchall.return_value = [(1, "Spaghetti", "Italian", 12.5, "MED", 85.5)]
+
+    assert get_meals(cuisine="Italian") == [Meal(1, "Spaghetti", "Italian", 12.5, "MED")]
+    assert normalize_whitespace(mock_cursor.execute.call_args[0][0]) == (
+        "SELECT id, meal, cuisine, price, difficulty, battle_score FROM meals WHERE deleted = FALSE AND cuisine = ? ORDER BY id"
+    )
+    assert mock_cursor.execute.call_args[0][1] == ["Italian"]
+
+######################################################
+#
+#    Battle results
+#
+######################################################
+
+def test_record_battle_result(mock_conn, mock_cursor):
+    """Test that both meals are updated and the battle logged in one committed transaction."""
+    mock_cursor.fetchall.return_value = [(1, False, 1500.0, 0), (2, False, 1500.0, 0)]
+
+    record_battle_result(1, 2)
+
+    statements = executed_sql(mock_cursor)
+    assert statements[0] == "BEGIN IMMEDIATE"
+    assert statements[2].startswith("UPDATE meals SET battles = battles + 1, wins = wins + (id = ?)")
+    assert mock_cursor.execute.call_args_list[2][0][1] == (1, 1, 1520.0, 1480.0, 1, 2)
+    assert statements[3] == "INSERT INTO battle_log (winner_id, loser_id, fought_at) VALUES (?, ?, ?)"
+    mock_conn.commit.assert_called_once()
+
+def test_record_battle_result_self_battle(mock_conn, mock_cursor):
+    """Test that a meal cannot battle itself and nothing is written."""
+    with pytest.raises(ValueError, match="Meal with ID 1 cannot battle itself"):
+        record_battle_result(1, 1)
+
+    mock_cursor.execute.assert_not_called()
+    mock_conn.commit.assert_not_called()
+
+@pytest.mark.parametrize("rows, message", [
+    ([(1, False, 1500.0, 0)], "Meal with ID 2 not found"),
+    ([(1, False, 1500.0, 0), (2, True, 1500.0, 0)], "Meal with ID 2 has been deleted")
+])
+def test_record_battle_result_rolls_back(mock_conn, mock_cursor, rows, message):
+    """Test that a missing or deleted meal aborts the transaction before either meal is updated."""
+    mock_cursor.fetchall.return_value = rows
+
+    with pytest.raises(ValueError, match=message):
+        record_battle_result(1, 2)
+
+    assert not any(statement.startswith("UPDATE") for statement in executed_sql(mock_cursor))
+    mock_conn.commit.assert_not_called()
+
+def test_record_battle_result_retries_when_busy(mock_conn, mock_cursor):
+    """Test that the whole transaction is retried while another writer holds the lock."""
+    mock_cursor.fetchall.return_value = [(1, False, 1500.0, 0), (2, False, 1500.0, 0)]
+    mock_cursor.execute.side_effect = [sqlite3.OperationalError("database is locked")] + [None] * 4
+
+    record_battle_result(1, 2)
+
+    statements = executed_sql(mock_cursor)
+    assert statements.count("BEGIN IMMEDIATE") == 2
+    assert len(statements) == 5
+    mock_conn.commit.assert_called_once()
+
+def test_record_battle_result_gives_up_when_busy(mock_conn, mock_cursor, mocker):
+    """Test that the lock error is raised once the retries run out."""
+    mocker.patch("meal_max.utils.sql_utils.BUSY_RETRIES", 2)
+    mock_cursor.execute.side_effect = sqlite3.OperationalError("database is locked")
+
+    with pytest.raises(sqlite3.OperationalError, match="database is locked"):
+        record_battle_result(1, 2)
+
+    assert mock_cursor.execute.call_count == 3
+    mock_conn.commit.assert_not_called()
+
+def test_record_battle_result_other_error_not_retried(mock_cursor):
+    """Test that database errors other than a busy lock are raised at once."""
+    mock_cursor.execute.side_effect = sqlite3.OperationalError("no such table: meals")
+
+    with pytest.raises(sqlite3.OperationalError, match="no such table"):
+        record_battle_result(1, 2)
+
+    mock_cursor.execute.assert_called_once()
+
+def test_record_battle_result_in_caller_transaction(mock_cursor, mocker):
+    """Test that a given cursor is used as is, leaving the commit to the caller."""
+    cursor = mocker.Mock()
+    cursor.fetchall.return_value = [(1, False, 1500.0, 0), (2, False, 1500.0, 0)]
+
+    record_battle_result(1, 2, cursor=cursor)
+
+    assert cursor.execute.call_count == 3
+    mock_cursor.execute.assert_not_called()
+
+def test_record_tournament_results(mock_conn, mock_cursor):
+    """Test that tournament totals are added with one executemany in one transaction."""
+    record_tournament_results([(1, 3, 2), (2, 3, 1)])
+
+    query, rows = mock_cursor.executemany.call_args[0]
+    assert normalize_whitespace(query) == (
+        "UPDATE meals SET battles = battles + ?, wins = wins + ? WHERE id = ? AND deleted = FALSE"
+    )
+    assert rows == [(3, 2, 1), (3, 1, 2)]
+    mock_conn.commit.assert_called_once()
+
+######################################################
+#
+#    Leaderboard cache
+#
+######################################################
+
+LEADERBOARD = [{'id': 1, 'meal': "Spaghetti", 'cuisine': "Italian", 'price': 12.5, 'difficulty': "MED",
+                'battles': 2, 'wins': 2, 'win_pct': 100.0, 'rating': 1539.1}]
+
+@pytest.fixture
+def empty_leaderboard_cache(mocker):
+    """Start every cache test with an empty cache."""
+    mocker.patch.dict(kitchen_model._leaderboards, clear=True)
+    kitchen_model._leaderboard_builds.clear()
+
+@pytest.fixture
+def mock_meals_version(mocker):
+    """Mock the meals table's version; tests bump it to simulate a write from any process."""
+    return mocker.patch("meal_max.models.kitchen_model.get_meals_version", return_value=(1, 1000.0))
+
+@pytest.fixture
+def mock_get_leaderboard_page(mocker, empty_leaderboard_cache, mock_meals_version):
+    return mocker.patch("meal_max.models.kitchen_model.get_leaderboard_page", return_value=(LEADERBOARD, None))
+
+def test_cached_leaderboard_hit(mock_get_leaderboard_page):
+    """Test that a leaderboard is read once and then served from the cache."""
+    first = get_cached_leaderboard("wins")
+    second = get_cached_leaderboard("wins")
+
+    assert second is first
+    assert first.entries == LEADERBOARD
+    mock_get_leaderboard_page.assert_called_once_with("wins", None, None)
+
+def test_cached_leaderboard_invalidated(mock_get_leaderboard_page, mock_meals_version):
+    """Test that a new version of the meals table makes the next request read the leaderboard
+    again, with the version's change time as last_modified."""
+    first = get_cached_leaderboard("wins")
+    mock_meals_version.return_value = (2, 2000.0)
+    second = get_cached_leaderboard("wins")
+
+    assert second is not first
+    assert second.etag == first.etag
+    assert (first.last_modified, second.last_modified) == (1000.0, 2000.0)
+    assert mock_get_leaderboard_page.call_count == 2
+
+def test_cached_leaderboard_expires(mock_get_leaderboard_page, mocker):
+    """Test that a leaderboard older than LEADERBOARD_CACHE_SECONDS is read again."""
+    mocker.patch("meal_max.models.kitchen_model.LEADERBOARD_CACHE_SECONDS", 0)
+
+    get_cached_leaderboard("wins")
+    get_cached_leaderboard("wins")
+
+    assert mock_get_leaderboard_page.call_count == 2
+
+def test_cached_leaderboard_single_flight(mock_get_leaderboard_page):
+    """Test that concurrent misses for the same page wait for one query instead of each running it."""
+    started, release = threading.Event(), threading.Event()
+
+    def slow_page(*args):
+        started.set()
+        release.wait(5)
+        return LEADERBOARD, None
+    mock_get_leaderboard_page.side_effect = slow_page
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(get_cached_leaderboard, "wins") for _ in range(8)]
+        assert started.wait(5)
+        time.sleep(0.05)  # Let the other callers reach the wait
+        release.set()
+        results = [future.result(5) for future in futures]
+
+    mock_get_leaderboard_page.assert_called_once()
+    assert all(result is results[0] for result in results)
+
+def test_cached_leaderboard_write_during_build(mock_get_leaderboard_page, mock_meals_version):
+    """Test that a caller who saw a write made after a build started gets a new build, not that one."""
+    started, release = threading.Event(), threading.Event()
+    stale = [{**LEADERBOARD[0], 'wins': 1}]
+
+    def page(*args):
+        if mock_get_leaderboard_page.call_count == 1:
+            started.set()
+            release.wait(5)
+            return stale, None
+        return LEADERBOARD, None
+    mock_get_leaderboard_page.side_effect = page
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        before_write = executor.submit(get_cached_leaderboard, "wins")
+        assert started.wait(5)
+        mock_meals_version.return_value = (2, 2000.0)
+        after_write = executor.submit(get_cached_leaderboard, "wins")
+        time.sleep(0.05)  # Let the second caller wait for the first build
+        release.set()
+
+        assert before_write.result(5).entries == stale
+        assert after_write.result(5).entries == LEADERBOARD
+    assert mock_get_leaderboard_page.call_count == 2
+
+def test_cached_leaderboard_failed_build(mock_get_leaderboard_page):
+    """Test that a failed build is not cached and the next request tries again."""
+    mock_get_leaderboard_page.side_effect = [sqlite3.Error("Database error"), (LEADERBOARD, None)]
+
+    with pytest.raises(sqlite3.Error):
+        get_cached_leaderboard("wins")
+
+    assert get_cached_leaderboard("wins").entries == LEADERBOARD
+
+def test_cached_leaderboard_sees_other_process_writes(meal_db, empty_leaderboard_cache):
+    """Test that a write from another connection, as from another worker process, makes the
+    cached leaderboard stale at once."""
+    first = get_cached_leaderboard("wins")
+    meal_db.execute("UPDATE meals SET battles = battles + 10, wins = wins + 10 WHERE id = 2")
+    meal_db.commit()
+
+    second = get_cached_leaderboard("wins")
+
+    assert second.version > first.version
+    assert second.entries[0]['id'] == 2
+    assert get_cached_leaderboard("wins") is second
+
+def test_meals_version_bumped_by_writes(meal_db, mocker):
+    """Test that every kind of write to the meals table bumps its version, recreating it included."""
+    versions = [get_meals_version()[0]]
+    record_battle_result(1, 2)
+    versions.append(get_meals_version()[0])
+    delete_meal(3)
+    versions.append(get_meals_version()[0])
+    mocker.patch.dict(os.environ, {"SQL_CREATE_TABLE_PATH": os.path.join(os.path.dirname(__file__), "..", "sql", "create_meal_table.sql")})
+    kitchen_model.clear_meals()
+    versions.append(get_meals_version()[0])
+
+    assert versions == sorted(set(versions))
+    assert get_meals_version()[1] == pytest.approx(time.time(), abs=60)
+
+######################################################
+#
+#    Leaderboard order
+#
+######################################################
+
+@pytest.fixture
+def meal_db(tmp_path, mocker):
+    """A real database of 30 meals with many tied stats, since the leaderboard order is decided
+    by SQLite's indexes and row value comparisons."""
+    db_path = str(tmp_path / "meal_max.db")
+    mocker.patch("meal_max.utils.sql_utils.DB_PATH", db_path)
+    with open(os.path.join(os.path.dirname(__file__), "..", "sql", "create_meal_table.sql")) as fh:
+        create_table_script = fh.read()
+
+    conn = sqlite3.connect(db_path)
+    conn.executescript(create_table_script)
+    rng = random.Random(49)
+    for meal_id in range(1, 31):
+        battles = rng.choice([0, 2, 4, 4, 5])
+        conn.execute(
+            "INSERT INTO meals (meal, cuisine, price, difficulty, battles, wins, rating, rated_battles, deleted) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (f"Meal {meal_id}", "Italian", 10.0, "MED", battles, rng.randint(0, battles),
+             rng.choice([1480.0, 1500.0, 1520.0]), rng.randint(0, battles), meal_id % 11 == 0)
+        )
+    conn.commit()
+    yield conn
+    conn.close()
+
+def brute_force_leaderboard(conn, sort_by):
+    """Every ranked meal's ID and sort key, best first, ties by ID descending, sorted in Python.
+    By rating, meals that have only battled in tournaments are not ranked."""
+    played = "rated_battles" if sort_by == "rating" else "battles"
+    rows = conn.execute(f"SELECT id, {sort_by} FROM meals WHERE deleted = FALSE AND {played} > 0").fetchall()
+    return sorted(rows, key=lambda row: (row[1], row[0]), reverse=True)
+
+@pytest.mark.parametrize("sort_by", kitchen_model.LEADERBOARD_SORTS)
+def test_leaderboard_pages_match_brute_force(meal_db, sort_by):
+    """Test that following the cursors visits every ranked meal once, in the brute force order."""
+    expected = [meal_id for meal_id, _ in brute_force_leaderboard(meal_db, sort_by)]
+
+    meal_ids, cursor = [], None
+    while True:
+        page, cursor = get_leaderboard_page(sort_by, limit=4, cursor=cursor)
+        assert len(page) <= 4
+        meal_ids.extend(entry['id'] for entry in page)
+        if cursor is None:
+            break
+
+    assert meal_ids == expected
+    assert [entry['id'] for entry in get_leaderboard_page(sort_by)[0]] == expected
+
+@pytest.mark.parametrize("sort_by", kitchen_model.LEADERBOARD_SORTS)
+def test_meal_rank_matches_brute_force(meal_db, sort_by):
+    """Test every ranked meal's rank, tie-broken position and neighbor windows against the brute force order."""
+    expected = brute_force_leaderboard(meal_db, sort_by)
+    meal_ids = [meal_id for meal_id, _ in expected]
+
+    for index, (meal_id, value) in enumerate(expected):
+        ranked = get_meal_rank(meal_id, sort_by, neighbors=3)
+
+        assert ranked['rank'] == 1 + sum(other > value for _, other in expected)
+        assert ranked['position'] == index + 1
+        assert [entry['id'] for entry in ranked['above']] == meal_ids[max(0, index - 3):index]
+        assert [entry['id'] for entry in ranked['below']] == meal_ids[index + 1:index + 4]
+        assert [entry['position'] for entry in ranked['above'] + ranked['below']] == (
+            list(range(max(0, index - 3) + 1, index + 1)) + list(range(index + 2, min(len(expected), index + 4) + 1))
+        )
+
+def test_meal_rank_unranked_meals(meal_db):
+    """Test that deleted meals and meals that have not battled have no rank."""
+    meal_db.execute("UPDATE meals SET battles = 0, wins = 0 WHERE id = 1")
+    meal_db.commit()
+
+    with pytest.raises(ValueError, match="Meal with ID 1 has not battled yet"):
+        get_meal_rank(1)
+    with pytest.raises(ValueError, match="Meal with ID 11 has been deleted"):
+        get_meal_rank(11)
+    with pytest.raises(ValueError, match="Meal with ID 99 not found"):
+        get_meal_rank(99)
+
+def test_tournament_only_meal_not_rated(meal_db):
+    """Test that a meal that has only battled in a tournament is ranked by wins but not by rating."""
+    meal_db.execute("UPDATE meals SET battles = 0, wins = 0, rated_battles = 0 WHERE id = 1")
+    meal_db.commit()
+
+    record_tournament_results([(1, 3, 3)])
+
+    assert get_meal_rank(1)['meal']['wins'] == 3
+    assert 1 in [entry['id'] for entry in get_leaderboard_page("wins")[0]]
+    assert 1 not in [entry['id'] for entry in get_leaderboard_page("rating")[0]]
+    with pytest.raises(ValueError, match="Meal with ID 1 has no rated battles yet"):
+        get_meal_rank(1, "rating")
+
+def test_rebuild_ratings_matches_recorded_battles(meal_db):
+    """Test that replaying the battle log gives every meal the rating its battles gave it one at a time."""
+    meal_db.execute("UPDATE meals SET rating = 1500, rated_battles = 0")
+    meal_db.commit()
+    live_ids = [row[0] for row in meal_db.execute("SELECT id FROM meals WHERE deleted = FALSE")]
+    rng = random.Random(50)
+    for _ in range(300):
+        record_battle_result(*rng.sample(live_ids, 2))
+    incremental = dict(meal_db.execute("SELECT id, rating FROM meals").fetchall())
+    rated_battles = dict(meal_db.execute("SELECT id, rated_battles FROM meals").fetchall())
+
+    assert rebuild_ratings() == {'battles': 300, 'meals': len({meal_id for meal_id in live_ids if rated_battles[meal_id]})}
+
+    assert dict(meal_db.execute("SELECT id, rated_battles FROM meals").fetchall()) == rated_battles
+    rebuilt = dict(meal_db.execute("SELECT id, rating FROM meals").fetchall())
+    assert rebuilt == pytest.approx(incremental)
+    assert max(incremental.values()) > 1500 > min(incremental.values())
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    base64.urlsafe_b64encode(b"[1, 2, 3]").decode(),
+    base64.urlsafe_b64encode(b'{"wins": 1}').decode(),
+    base64.urlsafe_b64encode(b"[true, 2]").decode(),
+    base64.urlsafe_b64encode(b'[1, "2"]').decode(),
+    base64.urlsafe_b64encode(b"7").decode()
+])
+def test_leaderboard_page_invalid_cursor(mock_cursor, cursor):
+    """Test that malformed or tampered cursors are rejected before any query runs."""
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        get_leaderboard_page("wins", limit=10, cursor=cursor)
+    mock_cursor.execute.assert_not_called()
+
+def test_leaderboard_page_invalid_limit(mock_cursor):
+    """Test error when the page size is not positive."""
+    with pytest.raises(ValueError, match="Invalid limit: 0"):
+        get_leaderboard_page("wins", limit=0)
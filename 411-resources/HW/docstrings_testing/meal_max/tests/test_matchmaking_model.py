@@ -0,0 +1,186 @@
+import os
+import sqlite3
+
+import pytest
+
+from meal_max.models.kitchen_model import Meal
+from meal_max.models.matchmaking_model import MatchmakingQueue
+
+
+@pytest.fixture
+def ticket_db(tmp_path, mocker):
+    """A real database with the matchmaking_tickets table, shared by every queue of a test as by worker processes."""
+    db_path = str(tmp_path / "meal_max.db")
+    mocker.patch("meal_max.utils.sql_utils.DB_PATH", db_path)
+    with open(os.path.join(os.path.dirname(__file__), "..", "sql", "create_matchmaking_table.sql")) as fh:
+        create_table_script = fh.read()
+    conn = sqlite3.connect(db_path)
+    conn.executescript(create_table_script)
+    conn.close()
+    return db_path
+
+@pytest.fixture
+def mock_battle_model(mocker):
+    """Mock the battles of matched pairs, all won by Meal 1, and the loading of waiting meals."""
+    mocker.patch("meal_max.models.matchmaking_model.get_meal_by_id", side_effect=lambda meal_id: meal(meal_id, 100.0))
+    mock_battle_model = mocker.patch("meal_max.models.matchmaking_model.BattleModel")
+    mock_battle_model.return_value.battle.return_value = "Meal 1"
+    return mock_battle_model
+
+@pytest.fixture
+def queue(ticket_db, mock_battle_model):
+    """Fixture to provide a matchmaking queue with a tolerance of 50."""
+    return MatchmakingQueue(tolerance=50.0, max_workers=1, max_wait=300.0)
+
+def meal(meal_id: int, battle_score: float) -> Meal:
+    return Meal(meal_id, f"Meal {meal_id}", "Italian", 10.0, "MED", battle_score=battle_score)
+
+##################################################
+# Pairing Test Cases
+##################################################
+
+def test_pairs_within_tolerance(queue, mock_battle_model):
+    """Test that a meal within the tolerance of a waiting meal is paired with it and battles."""
+    first = queue.enqueue(meal(1, 100.0))
+    second = queue.enqueue(meal(2, 150.0))
+
+    second = queue.get_ticket(second.id, timeout=5)
+    first = queue.get_ticket(first.id, timeout=5)
+    assert first.status == second.status == "finished"
+    assert first.winner == second.winner == "Meal 1"
+    assert first.opponent_id == 2 and second.opponent_id == 1
+    assert queue.waiting_count == 0
+    assert [call[0][0].id for call in mock_battle_model.return_value.prep_combatant.call_args_list] == [1, 2]
+
+def test_waits_beyond_tolerance(queue):
+    """Test that meals further apart than the tolerance both wait."""
+    first = queue.enqueue(meal(1, 100.0))
+    second = queue.enqueue(meal(2, 150.5))
+
+    assert first.status == second.status == "waiting"
+    assert queue.waiting_count == 2
+
+def test_pairs_closest_meal(queue):
+    """Test that of the waiting meals within the tolerance, the closest is taken."""
+    queue.enqueue(meal(1, 40.0))
+    closest = queue.enqueue(meal(2, 105.0))
+    queue.enqueue(meal(3, 170.0))
+
+    ticket = queue.enqueue(meal(4, 110.0))
+
+    assert ticket.opponent_id == 2 and queue.get_ticket(closest.id).opponent_id == 4
+    assert queue.waiting_count == 2
+
+def test_zero_tolerance_pairs_equal_scores(ticket_db, mock_battle_model):
+    """Test that without a tolerance only meals with the same score are paired."""
+    queue = MatchmakingQueue(tolerance=0.0, max_workers=1)
+    queue.enqueue(meal(1, 100.0))
+    queue.enqueue(meal(2, 100.5))
+
+    assert queue.enqueue(meal(3, 100.0)).opponent_id == 1
+    assert queue.waiting_count == 1
+
+def test_meal_already_waiting(queue):
+    """Test error when a meal is queued twice."""
+    queue.enqueue(meal(1, 100.0))
+
+    with pytest.raises(ValueError, match="Meal with ID 1 is already waiting"):
+        queue.enqueue(meal(1, 100.0))
+
+def test_failed_battle(queue, mock_battle_model):
+    """Test that a battle that cannot be recorded fails both tickets with its error."""
+    mock_battle_model.return_value.battle.side_effect = ValueError("Meal with ID 1 has been deleted")
+    first = queue.enqueue(meal(1, 100.0))
+    second = queue.enqueue(meal(2, 100.0))
+
+    assert queue.get_ticket(second.id, timeout=5).status == "failed"
+    first = queue.get_ticket(first.id)
+    assert first.status == "failed"
+    assert first.error == "Meal with ID 1 has been deleted"
+
+##################################################
+# Worker Process Test Cases
+##################################################
+
+def test_tickets_shared_between_processes(ticket_db, mock_battle_model):
+    """Test that a ticket queued through one worker can be paired, polled and cancelled through another."""
+    worker_1 = MatchmakingQueue(tolerance=50.0, max_workers=1, poll_interval=0.01)
+    worker_2 = MatchmakingQueue(tolerance=50.0, max_workers=1, poll_interval=0.01)
+
+    first = worker_1.enqueue(meal(1, 100.0))
+    assert worker_2.get_ticket(first.id).status == "waiting"
+    second = worker_2.enqueue(meal(2, 120.0))
+    assert second.opponent_id == 1
+
+    # The battle is fought by worker_2; worker_1 sees its outcome by polling
+    first = worker_1.get_ticket(first.id, timeout=5)
+    assert first.status == "finished" and first.opponent_id == 2
+
+    waiting = worker_2.enqueue(meal(3, 500.0))
+    assert worker_1.cancel(waiting.id).status == "cancelled"
+    assert worker_2.waiting_count == 0
+
+##################################################
+# Cancellation and Expiry Test Cases
+##################################################
+
+def test_cancel(queue):
+    """Test that a cancelled meal leaves the queue and is not paired."""
+    ticket = queue.enqueue(meal(1, 100.0))
+
+    assert queue.cancel(ticket.id).status == "cancelled"
+    assert queue.waiting_count == 0
+    assert queue.enqueue(meal(2, 100.0)).status == "waiting"
+
+def test_cancel_matched_ticket(queue):
+    """Test error when cancelling a ticket that has already been paired."""
+    first = queue.enqueue(meal(1, 100.0))
+    queue.enqueue(meal(2, 100.0))
+    queue.get_ticket(first.id, timeout=5)
+
+    with pytest.raises(ValueError, match="cannot be cancelled"):
+        queue.cancel(first.id)
+
+def test_unknown_ticket(queue):
+    """Test error when polling a ticket that does not exist."""
+    with pytest.raises(ValueError, match="Ticket missing not found"):
+        queue.get_ticket("missing")
+
+def test_poll_times_out(queue):
+    """Test that a long poll of a waiting ticket gives up after its timeout."""
+    ticket = queue.enqueue(meal(1, 100.0))
+
+    assert queue.get_ticket(ticket.id, timeout=0.05).status == "waiting"
+
+def test_expiry(queue, mocker):
+    """Test that a meal waiting longer than max_wait expires and is no longer paired."""
+    mock_time = mocker.patch("meal_max.models.matchmaking_model.time.time", return_value=1000.0)
+    ticket = queue.enqueue(meal(1, 100.0))
+
+    mock_time.return_value = 1000.0 + 301
+    assert queue.get_ticket(ticket.id).status == "expired"
+    assert queue.waiting_count == 0
+    assert queue.enqueue(meal(2, 100.0)).status == "waiting"
+    with pytest.raises(ValueError, match="is expired and cannot be cancelled"):
+        queue.cancel(ticket.id)
+
+def test_not_expired_before_max_wait(queue, mocker):
+    """Test that a meal is still paired just before max_wait."""
+    mock_time = mocker.patch("meal_max.models.matchmaking_model.time.time", return_value=1000.0)
+    first = queue.enqueue(meal(1, 100.0))
+
+    mock_time.return_value = 1000.0 + 299
+    assert queue.enqueue(meal(2, 100.0)).opponent_id == 1
+    assert queue.get_ticket(first.id).status != "expired"
+
+def test_finished_tickets_forgotten(queue, mocker):
+    """Test that tickets finished more than keep_finished seconds ago are removed."""
+    mock_time = mocker.patch("meal_max.models.matchmaking_model.time.time", return_value=1000.0)
+    ticket = queue.enqueue(meal(1, 100.0))
+    queue.cancel(ticket.id)
+
+    mock_time.return_value = 1000.0 + queue.keep_finished + 1
+    queue.enqueue(meal(2, 100.0))
+
+    with pytest.raises(ValueError, match="not found"):
+        queue.get_ticket(ticket.id)
@@ -0,0 +1,74 @@
+import pytest
+import requests
+
+from meal_max.utils.random_utils import EntropyPool
+
+
+@pytest.fixture
+def mock_random_org(mocker):
+    """Mock the session's requests to random.org, answering with a batch of fractions."""
+    mock_response = mocker.Mock()
+    mock_response.text = "0.25\n0.5\n0.75\n"
+    return mocker.patch("requests.Session.get", return_value=mock_response)
+
+
+def test_get_takes_from_pool(mock_random_org):
+    """Test that numbers come from a batch fetched from random.org."""
+    pool = EntropyPool(batch_size=3, low_water=1, max_wait=5)
+
+    assert [pool.get() for _ in range(3)] == [0.25, 0.5, 0.75]
+    assert pool.stats()['fallbacks'] == 0
+    assert "num=3" in mock_random_org.call_args[0][0]
+
+def test_get_falls_back_when_random_org_fails(mocker):
+    """Test that a failing random.org is replaced by the local generator instead of raising."""
+    mocker.patch("requests.Session.get", side_effect=requests.exceptions.RequestException("Connection error"))
+    pool = EntropyPool(batch_size=3, low_water=1, max_wait=0.01)
+
+    assert 0 <= pool.get() < 1
+    assert pool.stats()['fallbacks'] == 1
+
+def test_seeded_pool_is_repeatable(mock_random_org):
+    """Test that a seeded pool never calls random.org and repeats its numbers."""
+    numbers = [EntropyPool(seed="7").get() for _ in range(2)]
+
+    assert numbers[0] == numbers[1]
+    mock_random_org.assert_not_called()
+
+def test_seeded_pool_matches_pool_range():
+    """Test that a seeded pool draws the same hundredths from 0.00 to 0.99 as the pool and fallback."""
+    pool = EntropyPool(seed="7")
+    numbers = {pool.get() for _ in range(5000)}
+
+    assert numbers == {value / 100 for value in range(100)}
+
+def test_not_started_until_used():
+    """Test that creating a pool does not start its refill thread."""
+    pool = EntropyPool()
+    assert pool._thread is None
+
+def test_start_replaces_dead_thread(mocker):
+    """Test that start runs a new refill thread when the previous one is no longer alive."""
+    pool = EntropyPool()
+    dead_thread = mocker.Mock()
+    dead_thread.is_alive.return_value = False
+    pool._thread = dead_thread
+    mock_thread = mocker.patch("meal_max.utils.random_utils.threading.Thread")
+
+    pool.start()
+
+    mock_thread.return_value.start.assert_called_once()
+    assert pool._thread is mock_thread.return_value
+
+def test_start_keeps_live_thread(mocker):
+    """Test that start does not start a second refill thread."""
+    pool = EntropyPool()
+    live_thread = mocker.Mock()
+    live_thread.is_alive.return_value = True
+    pool._thread = live_thread
+    mock_thread = mocker.patch("meal_max.utils.random_utils.threading.Thread")
+
+    pool.start()
+
+    mock_thread.assert_not_called()
+    assert pool._thread is live_thread
@@ -0,0 +1,60 @@
+import pytest
+
+from meal_max.utils.rating_utils import (
+    ESTABLISHED_K_FACTOR,
+    INITIAL_RATING,
+    PROVISIONAL_BATTLES,
+    PROVISIONAL_K_FACTOR,
+    expected_score,
+    k_factor,
+    replay_ratings,
+    update_ratings
+)
+
+
+def test_expected_score():
+    """Test that equal ratings are even and the two sides' chances add up to one."""
+    assert expected_score(1500, 1500) == 0.5
+    assert expected_score(1900, 1500) == pytest.approx(10 / 11)
+    assert expected_score(1620, 1480) + expected_score(1480, 1620) == pytest.approx(1.0)
+
+def test_k_factor():
+    """Test that ratings move slower once a meal is established."""
+    assert k_factor(0) == PROVISIONAL_K_FACTOR
+    assert k_factor(PROVISIONAL_BATTLES - 1) == PROVISIONAL_K_FACTOR
+    assert k_factor(PROVISIONAL_BATTLES) == ESTABLISHED_K_FACTOR
+
+def test_update_ratings_even_battle():
+    """Test that between equal new meals the winner takes half the provisional K from the loser."""
+    assert update_ratings(1500, 0, 1500, 0) == (1520, 1480)
+
+def test_update_ratings_established_meals():
+    """Test that established meals use the smaller K, each with its own."""
+    assert update_ratings(1500, PROVISIONAL_BATTLES, 1500, PROVISIONAL_BATTLES) == (1510, 1490)
+    assert update_ratings(1500, PROVISIONAL_BATTLES, 1500, 0) == (1510, 1480)
+
+def test_update_ratings_upset():
+    """Test that an upset moves the ratings more than an expected result."""
+    favorite_wins = update_ratings(1700, 0, 1500, 0)
+    upset = update_ratings(1500, 0, 1700, 0)
+
+    assert upset[0] - 1500 > favorite_wins[0] - 1700 > 0
+    assert upset[0] - 1500 == pytest.approx(1700 - upset[1])
+
+def test_replay_ratings():
+    """Test that replaying battles applies update_ratings to each in order."""
+    battles = [(1, 2), (1, 3), (3, 2), (2, 1)]
+
+    expected = {meal_id: (INITIAL_RATING, 0) for meal_id in (1, 2, 3)}
+    for winner_id, loser_id in battles:
+        (winner_rating, winner_battles), (loser_rating, loser_battles) = expected[winner_id], expected[loser_id]
+        winner_rating, loser_rating = update_ratings(winner_rating, winner_battles, loser_rating, loser_battles)
+        expected[winner_id] = (winner_rating, winner_battles + 1)
+        expected[loser_id] = (loser_rating, loser_battles + 1)
+
+    assert replay_ratings(iter(battles)) == expected
+    assert [rated_battles for _, rated_battles in expected.values()] == [3, 3, 2]
+
+def test_replay_ratings_no_battles():
+    """Test that an empty battle log rates no meals."""
+    assert replay_ratings([]) == {}
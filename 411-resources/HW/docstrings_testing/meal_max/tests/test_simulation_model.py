@@ -0,0 +1,69 @@
+import pytest
+
+from meal_max.models import simulation_model
+from meal_max.models.kitchen_model import Meal
+from meal_max.models.simulation_model import clear_simulation_cache, simulate_battle, wilson_interval
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test without memoized simulations or a worker pool."""
+    clear_simulation_cache()
+    yield
+    clear_simulation_cache()
+
+"""Fixtures providing sample meals for the tests."""
+@pytest.fixture
+def sample_meal1():
+    return Meal(1, "Spaghetti", "Italian", 20.0, "MED")
+
+@pytest.fixture
+def sample_meal2():
+    return Meal(2, "Sushi", "Japanese", 10.0, "HIGH")
+
+##################################################
+# Simulation Test Cases
+##################################################
+
+def test_simulate_battle(sample_meal1, sample_meal2):
+    """Test that the estimate matches the battle rule: the gap of 59 beats draws 0 to 58."""
+    result = simulate_battle(sample_meal1, sample_meal2, 100_000)
+
+    assert result['meal_1']['win_probability'] == pytest.approx(0.59, abs=0.01)
+    assert result['meal_2']['win_probability'] == pytest.approx(0.41, abs=0.01)
+    assert result['battles'] == 100_000
+    assert not result['cached']
+
+def test_simulate_battle_memoized(sample_meal1, sample_meal2):
+    """Test that repeating a simulation returns the memoized result."""
+    first = simulate_battle(sample_meal1, sample_meal2, 1000)
+    second = simulate_battle(sample_meal1, sample_meal2, 1000)
+
+    assert second['cached']
+    assert second['meal_1'] == first['meal_1']
+
+def test_simulate_battle_self(sample_meal1):
+    """Test error when simulating a meal against itself."""
+    with pytest.raises(ValueError, match="cannot battle itself"):
+        simulate_battle(sample_meal1, sample_meal1, 1000)
+
+def test_simulate_battle_invalid_count(sample_meal1, sample_meal2):
+    """Test error when the number of battles is out of range."""
+    with pytest.raises(ValueError, match="The number of battles must be between 1 and"):
+        simulate_battle(sample_meal1, sample_meal2, 0)
+
+def test_wilson_interval_bounds():
+    """Test that the interval stays within [0, 1] when every trial succeeds."""
+    low, high = wilson_interval(100, 100)
+    assert 0.96 < low < 1.0
+    assert high == pytest.approx(1.0)
+
+def test_worker_pool_spawns_processes(mocker):
+    """Test that the worker pool starts its processes with spawn rather than fork."""
+    mock_executor = mocker.patch("meal_max.models.simulation_model.ProcessPoolExecutor")
+    mocker.patch.object(simulation_model, "_pool", None)
+
+    simulation_model._get_pool()
+
+    assert mock_executor.call_args.kwargs['mp_context'].get_start_method() == "spawn"
+    assert mock_executor.call_args.kwargs['max_workers'] == simulation_model.SIMULATION_WORKERS
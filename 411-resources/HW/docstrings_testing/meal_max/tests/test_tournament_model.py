@@ -0,0 +1,163 @@
+from contextlib import contextmanager
+import random
+
+import numpy as np
+import pytest
+
+from meal_max.models.kitchen_model import Meal
+from meal_max.models.tournament_model import run_tournament
+
+
+def make_meals(n, seed=43):
+    """Meals with distinct battle scores less than 100 apart, so every match can go either way."""
+    rng = random.Random(seed)
+    return [Meal(meal_id, f"Meal {meal_id}", "Thai", round(rng.uniform(1, 20), 2), rng.choice(["LOW", "MED", "HIGH"]))
+            for meal_id in range(1, n + 1)]
+
+def battle_score(meal):
+    return meal.price * len(meal.cuisine) - {"HIGH": 1, "MED": 2, "LOW": 3}[meal.difficulty]
+
+def seed_order(meals):
+    """Meal IDs from the highest battle score down, ties by entry order."""
+    return [meal.id for _, meal in sorted(enumerate(meals), key=lambda item: (-battle_score(item[1]), item[0]))]
+
+@pytest.fixture
+def mock_cursor(mocker):
+    mock_conn = mocker.Mock()
+    mock_cursor = mock_conn.cursor.return_value
+
+    @contextmanager
+    def mock_get_db_connection():
+        yield mock_conn
+
+    mocker.patch("meal_max.utils.sql_utils.get_db_connection", mock_get_db_connection)
+    return mock_cursor
+
+##################################################
+# Round Robin Test Cases
+##################################################
+
+def test_round_robin_matches_brute_force(mock_cursor):
+    """Test the vectorized win totals against a pairwise loop over the same seeded draws."""
+    meals = make_meals(12)
+    n = len(meals)
+    # With one block the draw for meals i < j is row i, column j - 1 of a single matrix
+    draws = np.random.default_rng(7).integers(0, 100, size=(n - 1, n - 1), dtype=np.uint8)
+    expected_wins = [0] * n
+    for i in range(n):
+        for j in range(i + 1, n):
+            winner = i if abs(battle_score(meals[i]) - battle_score(meals[j])) > draws[i, j - 1] else j
+            expected_wins[winner] += 1
+
+    result = run_tournament(meals, "round_robin", seed=7, record_results=False)
+
+    standings = {entry['id']: entry for entry in result['standings']}
+    assert [standings[meal.id]['wins'] for meal in meals] == expected_wins
+    assert all(entry['battles'] == n - 1 for entry in result['standings'])
+    assert result['matches'] == n * (n - 1) // 2
+    assert 'rounds' not in result
+
+def test_round_robin_blocks(mocker):
+    """Test that resolving the matches a few rows at a time plays every pair once."""
+    mocker.patch("meal_max.models.tournament_model.ROUND_ROBIN_BLOCK_MATCHES", 20)
+    # Drawing 0 every time, the first combatant, the meal entered earlier, wins every match
+    mocker.patch("meal_max.models.tournament_model.draw_randoms",
+                 side_effect=lambda rng, size: np.zeros(size, dtype=np.uint8))
+    meals = make_meals(9)
+
+    result = run_tournament(meals, "round_robin", record_results=False)
+
+    assert [entry['id'] for entry in result['standings']] == [meal.id for meal in meals]
+    assert [entry['wins'] for entry in result['standings']] == list(range(8, -1, -1))
+    assert all(entry['battles'] == 8 for entry in result['standings'])
+
+##################################################
+# Single Elimination Test Cases
+##################################################
+
+@pytest.mark.parametrize("n", [3, 5, 9])
+def test_single_elimination_byes_and_seeding(n):
+    """Test that the top seeds get the byes, the top two are in opposite halves and the final's winner is champion."""
+    meals = make_meals(n)
+    seeds = seed_order(meals)
+    size = 1 << (n - 1).bit_length()
+
+    result = run_tournament(meals, "single_elimination", seed=n, record_results=False)
+
+    rounds = result['rounds']
+    assert result['matches'] == n - 1
+    assert len(rounds) == size.bit_length() - 1
+    assert {match['meal_1'] for match in rounds[0] if match['meal_2'] is None} == set(seeds[:size - n])
+    first_round_meals = [[match['meal_1'], match['meal_2']] for match in rounds[0]]
+    assert seeds[0] in first_round_meals[0]
+    assert any(seeds[1] in pair for pair in first_round_meals[len(first_round_meals) // 2:])
+    for previous, following in zip(rounds, rounds[1:]):
+        assert [match['winner'] for match in previous] == [meal_id for match in following
+                                                          for meal_id in (match['meal_1'], match['meal_2'])]
+    assert len(rounds[-1]) == 1
+    assert result['champion']['id'] == rounds[-1][0]['winner']
+    standings = {entry['id']: entry for entry in result['standings']}
+    assert standings[result['champion']['id']]['wins'] == standings[result['champion']['id']]['battles']
+    assert sum(entry['battles'] for entry in result['standings']) == 2 * (n - 1)
+
+##################################################
+# Swiss Test Cases
+##################################################
+
+def test_swiss_byes_and_points():
+    """Test that with an odd field no meal gets a second bye before every meal has had one."""
+    meals = make_meals(5)
+
+    result = run_tournament(meals, "swiss", rounds=5, seed=3, record_results=False)
+
+    byes = [match['meal_1'] for round_matches in result['rounds'] for match in round_matches if match['meal_2'] is None]
+    assert sorted(byes) == [1, 2, 3, 4, 5]
+    for entry in result['standings']:
+        assert entry['points'] == entry['wins'] + 1
+        assert entry['battles'] == 4
+    assert result['matches'] == 10
+
+def test_swiss_default_rounds():
+    """Test that a Swiss tournament defaults to ceil(log2(n)) rounds."""
+    result = run_tournament(make_meals(6), "swiss", seed=1, record_results=False)
+
+    assert len(result['rounds']) == 3
+    assert result['matches'] == 9
+
+##################################################
+# Validation and Recording Test Cases
+##################################################
+
+@pytest.mark.parametrize("num_meals, meal_ids, tournament_format, rounds, message", [
+    (4, None, "knockout", None, "Invalid tournament format: knockout"),
+    (1, None, "round_robin", None, "At least two meals are needed"),
+    (3, [1, 2, 1], "round_robin", None, "Each meal can only enter a tournament once"),
+    (4, None, "single_elimination", 2, "can only be set for a Swiss tournament"),
+    (4, None, "swiss", 0, "Rounds must be a positive number")
+])
+def test_run_tournament_invalid(mock_cursor, num_meals, meal_ids, tournament_format, rounds, message):
+    """Test that invalid tournaments are rejected before anything is recorded."""
+    meals = make_meals(num_meals)
+    if meal_ids is not None:
+        meals = [meals[meal_id - 1] for meal_id in meal_ids]
+
+    with pytest.raises(ValueError, match=message):
+        run_tournament(meals, tournament_format, rounds=rounds)
+    mock_cursor.executemany.assert_not_called()
+
+def test_run_tournament_records_results(mock_cursor):
+    """Test that the battles and wins of every meal are written with a single executemany."""
+    result = run_tournament(make_meals(5), "single_elimination", seed=2)
+
+    mock_cursor.executemany.assert_called_once()
+    mock_cursor.execute.assert_called_once_with("BEGIN IMMEDIATE")
+    _, rows = mock_cursor.executemany.call_args[0]
+    assert sorted(rows, key=lambda row: row[2]) == [
+        (entry['battles'], entry['wins'], entry['id']) for entry in sorted(result['standings'], key=lambda entry: entry['id'])
+    ]
+
+def test_run_tournament_without_recording(mock_cursor):
+    """Test that record_results=False leaves the meals' stats alone."""
+    run_tournament(make_meals(4), "round_robin", seed=2, record_results=False)
+
+    mock_cursor.executemany.assert_not_called()
@@ -1,8 +1,21 @@
+import dataclasses
+import io
+import json
+import os
+from typing import Callable
+
 from dotenv import load_dotenv
-from flask import Flask, jsonify, make_response, Response, request
+from flask import Flask, jsonify, make_response, Response, request, stream_with_context
 
-from music_collection.models import song_model
+from music_collection.models import playlist_store, song_model
+from music_collection.models.playlist_io import EXPORTERS, PARSERS, import_songs, iter_playlist_songs
 from music_collection.models.playlist_model import PlaylistModel
+from music_collection.models.playlist_operations import SET_OPERATIONS
+from music_collection.models.smart_playlist import MAX_TARGET_DURATION, generate_playlist
+from music_collection.models.song_cache import song_cache, song_fragment_cache
+from music_collection.utils.change_feed import StoredChangePoller
+from music_collection.utils.job_utils import Job, JobManager
+from music_collection.utils.json_utils import compress, join_fragments
 from music_collection.utils.sql_utils import check_database_connection, check_table_exists
 
 
@@ -11,7 +24,25 @@ load_dotenv()
 
 app = Flask(__name__)
 
-playlist_model = PlaylistModel()
+# In id-only mode playlists keep just the song IDs and read song details through a
+# shared cache, so large playlists do not hold a copy of the catalog
+PLAYLIST_ID_ONLY = os.getenv("PLAYLIST_ID_ONLY", "false").lower() == "true"
+
+# The playlist is stored next to the songs table, so it survives restarts and
+# every worker process restores the same track order on startup. Changes to it
+# can be undone within a memory budget (0 disables undo).
+playlist_model = PlaylistModel(
+    name=os.getenv("PLAYLIST_NAME", "default"),
+    id_only=PLAYLIST_ID_ONLY,
+    history_bytes=int(os.getenv("PLAYLIST_HISTORY_BYTES", "0"))
+)
+
+# Background playback runs on a small pool, and the number of queued or running
+# jobs is capped so a burst of requests cannot pile writes onto the database
+job_manager = JobManager(
+    max_workers=int(os.getenv("PLAYBACK_JOB_WORKERS", "2")),
+    max_jobs=int(os.getenv("PLAYBACK_JOB_LIMIT", "4"))
+)
 
 
 ####################################################
@@ -111,6 +142,9 @@ def clear_catalog() -> Response:
     try:
         app.logger.info("Clearing the song catalog")
         song_model.clear_catalog()
+        # Song IDs start over in the recreated table, so cached songs would be wrong
+        song_cache.clear()
+        song_fragment_cache.clear()
         return make_response(jsonify({'status': 'success'}), 200)
     except Exception as e:
         app.logger.error(f"Error clearing catalog: {e}")
@@ -274,6 +308,67 @@ def add_song_to_playlist() -> Response:
         app.logger.error(f"Error adding song to playlist: {e}")
         return make_response(jsonify({'error': str(e)}), 500)
 
+@app.route('/api/add-songs-to-playlist', methods=['POST'])
+def add_songs_to_playlist() -> Response:
+    """
+    Route to add many songs to the playlist at once, by compound key or by song ID.
+
+    All songs are resolved with one chunked catalog query and appended in one step.
+
+    Expected JSON Input:
+        - songs (list, optional): Objects with artist (str), title (str), and year (int).
+        - song_ids (list, optional): Song IDs (int).
+
+    Returns:
+        JSON response with one outcome per requested song, in request order: 'added',
+        'duplicate', 'not_found', or 'deleted'.
+    Raises:
+        400 error if input validation fails.
+        500 error if there is an issue adding the songs.
+    """
+    try:
+        data = request.get_json() or {}
+
+        keys = data.get('songs', [])
+        song_ids = data.get('song_ids', [])
+        if not isinstance(keys, list) or not isinstance(song_ids, list) or not (keys or song_ids):
+            return make_response(jsonify({'error': 'Invalid input. A list of songs or song_ids is required.'}), 400)
+
+        try:
+            keys = [(key['artist'], key['title'], int(key['year'])) for key in keys]
+            song_ids = [int(song_id) for song_id in song_ids]
+        except (KeyError, TypeError, ValueError):
+            return make_response(jsonify({'error': 'Invalid input. Songs need artist, title, and an integer year; song_ids must be integers.'}), 400)
+
+        app.logger.info(f"Adding {len(keys) + len(song_ids)} songs to playlist")
+        songs_by_key = song_model.get_songs_by_compound_keys(keys)
+        songs_by_id = song_model.get_songs_by_ids(song_ids)
+
+        requested = [({'artist': key[0], 'title': key[1], 'year': key[2]}, key, songs_by_key) for key in keys]
+        requested += [({'id': song_id}, song_id, songs_by_id) for song_id in song_ids]
+
+        results = []
+        songs_to_add = []
+        for request_fields, lookup, songs in requested:
+            if lookup not in songs:
+                results.append({**request_fields, 'outcome': 'not_found'})
+            elif songs[lookup] is None:
+                results.append({**request_fields, 'outcome': 'deleted'})
+            else:
+                results.append({**request_fields, 'outcome': None})
+                songs_to_add.append(songs[lookup])
+
+        added = iter(playlist_model.add_songs_to_playlist(songs_to_add))
+        for result in results:
+            if result['outcome'] is None:
+                result['outcome'] = 'added' if next(added) else 'duplicate'
+
+        return make_response(jsonify({'status': 'success', 'results': results}), 200)
+
+    except Exception as e:
+        app.logger.error(f"Error adding songs to playlist: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
 @app.route('/api/remove-song-from-playlist', methods=['DELETE'])
 def remove_song_by_song_id() -> Response:
     """
@@ -356,6 +451,70 @@ def clear_playlist() -> Response:
         app.logger.error(f"Error clearing the playlist: {e}")
         return make_response(jsonify({'error': str(e)}), 500)
 
+@app.route('/api/playlist/batch', methods=['POST'])
+def apply_playlist_batch() -> Response:
+    """
+    Route to apply an ordered list of playlist operations atomically.
+
+    All songs referenced by compound key are resolved with one catalog query, and the whole
+    batch is applied under the playlist lock and stored in one transaction. If any operation
+    fails, none of them take effect.
+
+    Expected JSON Input:
+        - operations (list): Each operation has an 'op' and its fields:
+            - add: artist, title, year.
+            - remove: artist, title, year, or track_number.
+            - move: artist, title, year, track_number.
+            - swap: track_number_1, track_number_2.
+            - go_to_track: track_number.
+
+    Returns:
+        JSON response with the new playlist version or an error message.
+    Raises:
+        400 error if an operation is invalid or references a song that cannot be used.
+        500 error if there is an issue applying the batch.
+    """
+    try:
+        data = request.get_json()
+        operations = data.get('operations') if data else None
+
+        if not isinstance(operations, list) or not all(isinstance(operation, dict) for operation in operations):
+            return make_response(jsonify({'error': 'Invalid input. A list of operations is required.'}), 400)
+
+        app.logger.info(f"Applying batch of {len(operations)} playlist operations")
+
+        # Resolve every compound key with a single catalog lookup
+        keys = []
+        for index, operation in enumerate(operations, start=1):
+            if operation.get('op') in ('add', 'move') or (operation.get('op') == 'remove' and 'track_number' not in operation):
+                try:
+                    keys.append((operation['artist'], operation['title'], int(operation['year'])))
+                except (KeyError, TypeError, ValueError):
+                    return make_response(jsonify({'error': f'Operation {index} requires artist, title, and an integer year.'}), 400)
+            else:
+                keys.append(None)
+        songs = song_model.get_songs_by_compound_keys(key for key in keys if key is not None)
+
+        resolved_operations = []
+        for index, (operation, key) in enumerate(zip(operations, keys), start=1):
+            if key is not None:
+                if key not in songs:
+                    return make_response(jsonify({'error': f'Operation {index}: song {key[0]} - {key[1]} ({key[2]}) not found'}), 400)
+                if songs[key] is None:
+                    return make_response(jsonify({'error': f'Operation {index}: song {key[0]} - {key[1]} ({key[2]}) has been deleted'}), 400)
+                operation = {**operation, 'song': songs[key]}
+            resolved_operations.append(operation)
+
+        version = playlist_model.apply_batch(resolved_operations)
+
+        return make_response(jsonify({'status': 'success', 'version': version}), 200)
+    except ValueError as e:
+        app.logger.error(f"Error applying playlist batch: {e}")
+        return make_response(jsonify({'error': str(e)}), 400)
+    except Exception as e:
+        app.logger.error(f"Error applying playlist batch: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
 ############################################################
 #
 # Play Playlist
@@ -393,20 +552,69 @@ def play_current_song() -> Response:
         return make_response(jsonify({'error': str(e)}), 500)
 
 
+def start_playback_job(kind: str, play: Callable, total_tracks: int) -> Response:
+    """
+    Starts a playlist playback method as a background job.
+
+    Args:
+        kind (str): The kind of job, used in logs and the job status.
+        play (Callable): The PlaylistModel playback method to run.
+        total_tracks (int): The number of tracks the job is expected to play.
+
+    Returns:
+        JSON response with the job ID, or a 429 error if too many jobs are in progress.
+    """
+    def run(job: Job) -> dict:
+        completed = 0
+
+        def on_track(track_number, song, played):
+            nonlocal completed
+            completed += 1
+            job.report(track_number=track_number, song_id=song.id, title=song.title, played=played,
+                       completed=completed, total=total_tracks)
+
+        skipped_song_ids = play(on_track=on_track, is_cancelled=job.is_cancelled)
+        return {'skipped_song_ids': skipped_song_ids}
+
+    try:
+        job = job_manager.submit(kind, run)
+    except RuntimeError as e:
+        app.logger.error(f"Error starting {kind} job: {e}")
+        return make_response(jsonify({'error': str(e)}), 429)
+
+    app.logger.info(f"Started {kind} job {job.id}")
+    return make_response(jsonify({
+        'status': 'accepted',
+        'job_id': job.id,
+        'status_url': f'/api/jobs/{job.id}',
+        'progress_url': f'/api/jobs/{job.id}/progress'
+    }), 202)
+
 @app.route('/api/play-entire-playlist', methods=['POST'])
 def play_entire_playlist() -> Response:
     """
     Route to play all songs in the playlist.
 
+    Query Parameter:
+        - async (bool, optional): If true, play in a background job and return its ID immediately.
+
     Returns:
-        JSON response indicating success of the operation.
+        JSON response indicating success of the operation, with the IDs of any songs that
+        were deleted from the catalog and skipped. In async mode, a 202 response with the job ID.
     Raises:
+        429 error if too many playback jobs are in progress.
         500 error if there is an issue playing the playlist.
     """
     try:
+        if request.args.get('async', 'false').lower() == 'true':
+            app.logger.info('Playing entire playlist in the background')
+            playlist_model.check_if_empty()
+            return start_playback_job('play-entire-playlist', playlist_model.play_entire_playlist,
+                                      playlist_model.get_playlist_length())
+
         app.logger.info('Playing entire playlist')
-        playlist_model.play_entire_playlist()
-        return make_response(jsonify({'status': 'success'}), 200)
+        skipped_song_ids = playlist_model.play_entire_playlist()
+        return make_response(jsonify({'status': 'success', 'skipped_song_ids': skipped_song_ids}), 200)
     except Exception as e:
         app.logger.error(f"Error playing playlist: {e}")
         return make_response(jsonify({'error': str(e)}), 500)
@@ -416,15 +624,26 @@ def play_rest_of_playlist() -> Response:
     """
     Route to play the rest of the playlist from the current track.
 
+    Query Parameter:
+        - async (bool, optional): If true, play in a background job and return its ID immediately.
+
     Returns:
-        JSON response indicating success of the operation.
+        JSON response indicating success of the operation, with the IDs of any songs that
+        were deleted from the catalog and skipped. In async mode, a 202 response with the job ID.
     Raises:
+        429 error if too many playback jobs are in progress.
         500 error if there is an issue playing the rest of the playlist.
     """
     try:
+        if request.args.get('async', 'false').lower() == 'true':
+            app.logger.info('Playing rest of the playlist in the background')
+            playlist_model.check_if_empty()
+            return start_playback_job('play-rest-of-playlist', playlist_model.play_rest_of_playlist,
+                                      playlist_model.get_remaining_track_count())
+
         app.logger.info('Playing rest of the playlist')
-        playlist_model.play_rest_of_playlist()
-        return make_response(jsonify({'status': 'success'}), 200)
+        skipped_song_ids = playlist_model.play_rest_of_playlist()
+        return make_response(jsonify({'status': 'success', 'skipped_song_ids': skipped_song_ids}), 200)
     except Exception as e:
         app.logger.error(f"Error playing rest of the playlist: {e}")
         return make_response(jsonify({'error': str(e)}), 500)
@@ -447,26 +666,147 @@ def rewind_playlist() -> Response:
         app.logger.error(f"Error rewinding playlist: {e}")
         return make_response(jsonify({'error': str(e)}), 500)
 
+@app.route('/api/enable-shuffle', methods=['POST'])
+def enable_shuffle() -> Response:
+    """
+    Route to turn on shuffle mode with a new random play order.
+
+    Returns:
+        JSON response indicating success of the operation.
+    Raises:
+        500 error if there is an issue shuffling the playlist.
+    """
+    try:
+        app.logger.info('Shuffling the playlist')
+        playlist_model.enable_shuffle()
+        return make_response(jsonify({'status': 'success'}), 200)
+    except Exception as e:
+        app.logger.error(f"Error shuffling playlist: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/disable-shuffle', methods=['POST'])
+def disable_shuffle() -> Response:
+    """
+    Route to turn off shuffle mode and continue in track order.
+
+    Returns:
+        JSON response indicating success of the operation.
+    Raises:
+        500 error if there is an issue turning off shuffle.
+    """
+    try:
+        app.logger.info('Turning off shuffle')
+        playlist_model.disable_shuffle()
+        return make_response(jsonify({'status': 'success'}), 200)
+    except Exception as e:
+        app.logger.error(f"Error turning off shuffle: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
 @app.route('/api/get-all-songs-from-playlist', methods=['GET'])
 def get_all_songs_from_playlist() -> Response:
     """
-    Route to retrieve all songs in the playlist.
+    Route to retrieve all songs in the playlist, optionally one page at a time.
+
+    Query Parameters:
+        - offset (int, optional): The number of tracks to skip. Defaults to 0.
+        - limit (int, optional): The maximum number of songs to return. Defaults to all.
 
     Returns:
         JSON response with the list of songs or an error message.
     """
     try:
-        app.logger.info("Retrieving all songs from the playlist")
+        offset = request.args.get('offset', 0, type=int)
+        limit = request.args.get('limit', type=int)
+        app.logger.info(f"Retrieving songs from the playlist from offset {offset}")
+
+        # Get the page of songs from the playlist
+        songs = playlist_model.get_all_songs(offset=offset, limit=limit)
+
+        # Each song's JSON is encoded once and reused, so only the envelope is encoded here
+        body = join_fragments(
+            {'status': 'success', 'offset': offset, 'playlist_length': playlist_model.get_playlist_length()},
+            'songs',
+            song_fragment_cache.encode(songs)
+        )
+        body, encoding = compress(body, request.accept_encodings)
+        response = make_response(body, 200)
+        response.mimetype = 'application/json'
+        response.vary.add('Accept-Encoding')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        return response
+
+    except Exception as e:
+        app.logger.error(f"Error retrieving songs from playlist: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
 
-        # Get all songs from the playlist
-        songs = playlist_model.get_all_songs()
+# Idle change streams send a comment this often so proxies keep the connection open
+CHANGE_FEED_HEARTBEAT_SECONDS = float(os.getenv("CHANGE_FEED_HEARTBEAT_SECONDS", "15"))
 
-        return make_response(jsonify({'status': 'success', 'songs': songs}), 200)
+# How often this process checks the store for versions written by other worker processes.
+# Changes made in this process are picked up at once.
+CHANGE_FEED_POLL_SECONDS = float(os.getenv("CHANGE_FEED_POLL_SECONDS", "1"))
 
+# One poller per process reads the stored changes and fans them out to every open change
+# stream, so the store is read once per poll however many clients are following the playlist
+change_poller = StoredChangePoller(
+    lambda since: playlist_store.load_playlist_changes(playlist_model.name, since),
+    wake=playlist_model.changes,
+    poll_interval=CHANGE_FEED_POLL_SECONDS
+)
+
+@app.route('/api/playlist/changes', methods=['GET'])
+def stream_playlist_changes() -> Response:
+    """
+    Route to follow the playlist as server-sent events instead of polling it.
+
+    Every change to the playlist produces one 'change' event whose id is the new playlist
+    version and whose data lists the compact changes ('add', 'remove', 'move', 'clear',
+    'shuffle' and 'current_track') in the order to apply them.
+
+    The events are replayed from the changes stored with each version, so a stream sees the
+    changes made by every worker process, not just its own. The store is read by a single poller
+    per process; an open stream only waits on its own event queue and makes no database calls.
+    Served by the gevent workers of entrypoint.sh, an idle stream is a parked greenlet rather
+    than a server thread.
+
+    Query Parameters:
+        - since (int, optional): The last version the client has seen. The standard Last-Event-ID
+          header is used when reconnecting. If neither is given, the stream starts with a 'ready'
+          event carrying the current version.
+
+    Returns:
+        A text/event-stream response. If the client is too far behind to resume, a 'reset' event
+        with the current version tells it to reload the playlist and continue from there.
+    Raises:
+        500 error if the stored changes cannot be read.
+    """
+    since = request.args.get('since', type=int)
+    if since is None:
+        since = request.headers.get('Last-Event-ID', type=int)
+
+    try:
+        subscription = change_poller.subscribe(since)
     except Exception as e:
-        app.logger.error(f"Error retrieving songs from playlist: {e}")
+        app.logger.error(f"Error following playlist changes: {e}")
         return make_response(jsonify({'error': str(e)}), 500)
 
+    def generate():
+        while True:
+            event = subscription.get(CHANGE_FEED_HEARTBEAT_SECONDS)
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            event_type, data = event
+            yield f"id: {data['version']}\nevent: {event_type}\ndata: {json.dumps(data)}\n\n"
+
+    app.logger.info(f"Streaming playlist changes since version {since}")
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache'})
+    # Runs when the server closes the response, including when the client disconnects early
+    response.call_on_close(subscription.close)
+    return response
+
 @app.route('/api/get-song-from-playlist-by-track-number/<int:track_number>', methods=['GET'])
 def get_song_by_track_number(track_number: int) -> Response:
     """
@@ -700,6 +1040,429 @@ def swap_songs_in_playlist() -> Response:
         app.logger.error(f"Error swapping songs in playlist: {e}")
         return make_response(jsonify({'error': str(e)}), 500)
 
+@app.route('/api/undo', methods=['POST'])
+def undo_playlist_change() -> Response:
+    """
+    Route to undo the last change to the songs in the playlist.
+
+    Returns:
+        JSON response with the new playlist version or an error message.
+    Raises:
+        400 error if undo is disabled or there is nothing to undo.
+        500 error if there is an issue restoring the playlist.
+    """
+    try:
+        app.logger.info("Undoing the last playlist change")
+        try:
+            version = playlist_model.undo()
+        except ValueError as e:
+            return make_response(jsonify({'error': str(e)}), 400)
+        return make_response(jsonify({'status': 'success', 'version': version}), 200)
+    except Exception as e:
+        app.logger.error(f"Error undoing playlist change: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/redo', methods=['POST'])
+def redo_playlist_change() -> Response:
+    """
+    Route to redo the last undone change to the playlist.
+
+    Returns:
+        JSON response with the new playlist version or an error message.
+    Raises:
+        400 error if undo is disabled or there is nothing to redo.
+        500 error if there is an issue restoring the playlist.
+    """
+    try:
+        app.logger.info("Redoing the last undone playlist change")
+        try:
+            version = playlist_model.redo()
+        except ValueError as e:
+            return make_response(jsonify({'error': str(e)}), 400)
+        return make_response(jsonify({'status': 'success', 'version': version}), 200)
+    except Exception as e:
+        app.logger.error(f"Error redoing playlist change: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/sort-playlist', methods=['POST'])
+def sort_playlist() -> Response:
+    """
+    Route to sort the playlist in place. The current track stays on the same song.
+
+    Expected JSON Input:
+        - key (str): 'artist', 'title', 'year', 'genre', 'duration' or 'play_count'.
+        - reverse (bool, optional): If True, sorts in descending order. Defaults to False.
+
+    Returns:
+        JSON response indicating success and the new current track number, or an error message.
+    Raises:
+        400 error if input validation fails.
+        500 error if there is an issue sorting the playlist.
+    """
+    try:
+        data = request.get_json() or {}
+        key = data.get('key')
+        reverse = data.get('reverse', False)
+
+        if not isinstance(key, str) or not isinstance(reverse, bool):
+            return make_response(jsonify({'error': 'Invalid input. key must be a string and reverse a boolean.'}), 400)
+
+        app.logger.info(f"Sorting playlist by {key}")
+        try:
+            playlist_model.sort_by(key, reverse=reverse)
+        except ValueError as e:
+            return make_response(jsonify({'error': str(e)}), 400)
+
+        return make_response(jsonify({
+            'status': 'success',
+            'current_track_number': playlist_model.current_track_number,
+            'version': playlist_model.version
+        }), 200)
+    except Exception as e:
+        app.logger.error(f"Error sorting playlist: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
+############################################################
+#
+# Named Playlists
+#
+############################################################
+
+def get_playlist_model(name: str) -> PlaylistModel:
+    """
+    Returns the model for a stored playlist, reusing the active playlist's model so it never goes stale.
+
+    Args:
+        name (str): The name of the playlist.
+
+    Returns:
+        PlaylistModel: The playlist model.
+    """
+    if name == playlist_model.name:
+        return playlist_model
+    return PlaylistModel(name=name, id_only=PLAYLIST_ID_ONLY)
+
+def playlist_exists(name: str) -> bool:
+    """
+    Returns whether a playlist is stored, or is the active playlist, which exists before its first change.
+
+    Args:
+        name (str): The name of the playlist.
+
+    Returns:
+        bool: True if the playlist exists.
+    """
+    return name == playlist_model.name or playlist_store.get_playlist_version(name) > 0
+
+@app.route('/api/playlists', methods=['GET'])
+def list_playlists() -> Response:
+    """
+    Route to list the stored playlists.
+
+    Returns:
+        JSON response with the name, length and version of each playlist or an error message.
+    """
+    try:
+        app.logger.info("Listing stored playlists")
+        playlists = playlist_store.list_playlists()
+        return make_response(jsonify({'status': 'success', 'playlists': playlists}), 200)
+    except Exception as e:
+        app.logger.error(f"Error listing playlists: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/playlists/<string:operation>', methods=['POST'])
+def combine_playlists(operation: str) -> Response:
+    """
+    Route to combine stored playlists with a set operation. The result keeps the left playlist's order.
+
+    Path Parameter:
+        - operation (str): 'union', 'intersect', 'difference', or 'dedupe' (same artist and title).
+
+    Expected JSON Input:
+        - left (str): The name of the left playlist.
+        - right (str): The name of the right playlist (not used by dedupe).
+        - target (str, optional): The name of a new playlist to store the result in.
+          If omitted, the result is streamed back as newline-delimited JSON songs.
+
+    Returns:
+        JSON response with the new playlist's name and length, or a stream of songs.
+    Raises:
+        400 error if input validation fails.
+        404 error if the left or right playlist does not exist.
+        409 error if the target playlist already has songs, or another request filled it first.
+        500 error if there is an issue combining the playlists.
+    """
+    try:
+        data = request.get_json() or {}
+        left = data.get('left')
+        right = data.get('right')
+        target = data.get('target')
+
+        if operation not in SET_OPERATIONS:
+            return make_response(jsonify({'error': f"Invalid operation: {operation}. Expected one of {', '.join(SET_OPERATIONS)}."}), 400)
+        if not left or (operation != 'dedupe' and not right):
+            return make_response(jsonify({'error': 'Invalid input. Left and right playlist names are required.'}), 400)
+
+        for name in (left, right):
+            if name and not playlist_exists(name):
+                return make_response(jsonify({'error': f'Playlist {name} not found'}), 404)
+
+        app.logger.info(f"Computing {operation} of playlists {left} and {right}")
+        left_songs = get_playlist_model(left).playlist
+        right_songs = get_playlist_model(right).playlist if right else []
+        songs = SET_OPERATIONS[operation](left_songs, right_songs)
+
+        if target:
+            # Checked again under the playlist's lock against the stored version, and the write
+            # itself only succeeds from that version, so concurrent requests cannot both fill it
+            try:
+                get_playlist_model(target).add_songs_to_playlist(songs, only_if_empty=True)
+            except (ValueError, RuntimeError) as e:
+                app.logger.error(f"Error storing playlist {target}: {e}")
+                return make_response(jsonify({'error': str(e)}), 409)
+            app.logger.info(f"Stored {len(songs)} songs in playlist {target}")
+            return make_response(jsonify({'status': 'success', 'playlist': target, 'playlist_length': len(songs)}), 201)
+
+        def generate():
+            for song in songs:
+                yield json.dumps(dataclasses.asdict(song)) + "\n"
+
+        return Response(generate(), mimetype='application/x-ndjson')
+
+    except Exception as e:
+        app.logger.error(f"Error combining playlists: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/generate-playlist', methods=['POST'])
+def generate_smart_playlist() -> Response:
+    """
+    Route to build a playlist from the catalog whose total duration is close to a target.
+
+    Expected JSON Input:
+        - target_duration (int): The total duration to aim for in seconds.
+        - tolerance (int, optional): How far from the target the total may be in seconds. Defaults to 60.
+        - genre (str, optional): Only use songs of this genre.
+        - min_year (int, optional): Only use songs released in or after this year.
+        - max_year (int, optional): Only use songs released in or before this year.
+        - min_play_count (int, optional): Only use songs played at least this many times.
+        - target (str, optional): The name of a new playlist to store the result in.
+
+    Returns:
+        JSON response with the chosen songs and their total duration.
+    Raises:
+        400 error if input validation fails, or target_duration + tolerance is above a day.
+        409 error if the target playlist already has songs, or another request filled it first.
+        422 error if no combination of songs fits within the tolerance.
+        500 error if there is an issue generating the playlist.
+    """
+    try:
+        data = request.get_json() or {}
+        target_duration = data.get('target_duration')
+        tolerance = data.get('tolerance', 60)
+        target = data.get('target')
+        filters = {key: data.get(key) for key in ('genre', 'min_year', 'max_year', 'min_play_count')}
+
+        if not isinstance(target_duration, int) or target_duration <= 0:
+            return make_response(jsonify({'error': 'Invalid input. target_duration must be a positive integer.'}), 400)
+        if not isinstance(tolerance, int) or tolerance < 0:
+            return make_response(jsonify({'error': 'Invalid input. tolerance must be a non-negative integer.'}), 400)
+        if target_duration + tolerance > MAX_TARGET_DURATION:
+            return make_response(jsonify({'error': f'Invalid input. target_duration + tolerance must be at most {MAX_TARGET_DURATION} seconds.'}), 400)
+        for key in ('min_year', 'max_year', 'min_play_count'):
+            if filters[key] is not None and not isinstance(filters[key], int):
+                return make_response(jsonify({'error': f'Invalid input. {key} must be an integer.'}), 400)
+
+        if target and get_playlist_model(target).get_playlist_length() > 0:
+            return make_response(jsonify({'error': f'Playlist {target} already has songs'}), 409)
+
+        app.logger.info(f"Generating a playlist of {target_duration} +/- {tolerance} seconds")
+        try:
+            generated = generate_playlist(target_duration, tolerance, **filters)
+        except ValueError as e:
+            return make_response(jsonify({'error': str(e)}), 422)
+
+        songs = generated.get_all_songs()
+        if target:
+            # Checked again under the playlist's lock against the stored version, and the write
+            # itself only succeeds from that version, so concurrent requests cannot both fill it
+            try:
+                get_playlist_model(target).add_songs_to_playlist(songs, only_if_empty=True)
+            except (ValueError, RuntimeError) as e:
+                app.logger.error(f"Error storing playlist {target}: {e}")
+                return make_response(jsonify({'error': str(e)}), 409)
+        return make_response(jsonify({
+            'status': 'success',
+            'playlist': target,
+            'songs': songs,
+            'playlist_length': len(songs),
+            'playlist_duration': generated.get_playlist_duration()
+        }), 201 if target else 200)
+
+    except Exception as e:
+        app.logger.error(f"Error generating playlist: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
+EXPORT_MIMETYPES = {'ndjson': 'application/x-ndjson', 'm3u': 'audio/x-mpegurl'}
+
+@app.route('/api/playlists/<string:name>/export', methods=['GET'])
+def export_playlist(name: str) -> Response:
+    """
+    Route to stream a stored playlist as M3U or NDJSON.
+
+    Path Parameter:
+        - name (str): The name of the playlist.
+
+    Query Parameters:
+        - format (str, optional): 'ndjson' or 'm3u'. Defaults to 'ndjson'.
+
+    Returns:
+        A streamed playlist file or an error message.
+    Raises:
+        400 error if the format is unknown.
+        404 error if the playlist does not exist.
+        500 error if there is an issue exporting the playlist.
+    """
+    try:
+        file_format = request.args.get('format', 'ndjson')
+        if file_format not in EXPORTERS:
+            return make_response(jsonify({'error': f"Invalid format: {file_format}. Expected one of {', '.join(EXPORTERS)}."}), 400)
+
+        if not playlist_exists(name):
+            return make_response(jsonify({'error': f'Playlist {name} not found'}), 404)
+
+        app.logger.info(f"Exporting playlist {name} as {file_format}")
+        # Other playlists are paged from the store rather than loaded whole into a model
+        playlist = playlist_model if name == playlist_model.name else name
+        lines = EXPORTERS[file_format](iter_playlist_songs(playlist))
+        return Response(
+            stream_with_context(lines),
+            mimetype=EXPORT_MIMETYPES[file_format],
+            headers={'Content-Disposition': f'attachment; filename="{name}.{file_format}"'}
+        )
+
+    except Exception as e:
+        app.logger.error(f"Error exporting playlist: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/playlists/<string:name>/import', methods=['POST'])
+def import_playlist(name: str) -> Response:
+    """
+    Route to append songs to a stored playlist from an uploaded M3U or NDJSON body.
+    The body is read line by line and songs are matched by artist, title and year.
+
+    Path Parameter:
+        - name (str): The name of the playlist.
+
+    Query Parameters:
+        - format (str, optional): 'ndjson' or 'm3u'. Defaults to 'ndjson'.
+
+    Returns:
+        JSON response with the number of imported songs and a per-line error report.
+    Raises:
+        400 error if the format is unknown.
+        500 error if there is an issue importing the playlist.
+    """
+    try:
+        file_format = request.args.get('format', 'ndjson')
+        if file_format not in PARSERS:
+            return make_response(jsonify({'error': f"Invalid format: {file_format}. Expected one of {', '.join(PARSERS)}."}), 400)
+
+        app.logger.info(f"Importing {file_format} into playlist {name}")
+        model = get_playlist_model(name)
+        lines = io.TextIOWrapper(request.stream, encoding='utf-8', errors='replace')
+        report = import_songs(model, PARSERS[file_format](lines))
+
+        return make_response(jsonify({
+            'status': 'success',
+            'playlist': name,
+            'playlist_length': model.get_playlist_length(),
+            **report
+        }), 200)
+
+    except Exception as e:
+        app.logger.error(f"Error importing playlist: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
+############################################################
+#
+# Playback Jobs
+#
+############################################################
+
+@app.route('/api/jobs/<string:job_id>', methods=['GET'])
+def get_job(job_id: str) -> Response:
+    """
+    Route to get the status and latest progress of a background job.
+
+    Path Parameter:
+        - job_id (str): The ID of the job.
+
+    Returns:
+        JSON response with the job status or an error message.
+    """
+    try:
+        app.logger.info(f"Retrieving job: {job_id}")
+        job = job_manager.get_job(job_id)
+        return make_response(jsonify({'status': 'success', 'job': job.to_dict()}), 200)
+    except ValueError as e:
+        app.logger.error(f"Error retrieving job: {e}")
+        return make_response(jsonify({'error': str(e)}), 404)
+    except Exception as e:
+        app.logger.error(f"Error retrieving job: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/jobs/<string:job_id>', methods=['DELETE'])
+def cancel_job(job_id: str) -> Response:
+    """
+    Route to cancel a background job. Playback stops after the batch in progress is committed.
+
+    Path Parameter:
+        - job_id (str): The ID of the job.
+
+    Returns:
+        JSON response with the job status or an error message.
+    """
+    try:
+        app.logger.info(f"Cancelling job: {job_id}")
+        job = job_manager.cancel_job(job_id)
+        return make_response(jsonify({'status': 'success', 'job': job.to_dict()}), 200)
+    except ValueError as e:
+        app.logger.error(f"Error cancelling job: {e}")
+        return make_response(jsonify({'error': str(e)}), 404)
+    except Exception as e:
+        app.logger.error(f"Error cancelling job: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/jobs/<string:job_id>/progress', methods=['GET'])
+def stream_job_progress(job_id: str) -> Response:
+    """
+    Route to stream the track-by-track progress of a background job as server-sent events.
+
+    Path Parameter:
+        - job_id (str): The ID of the job.
+
+    Returns:
+        A text/event-stream response with one 'progress' event per track and a final 'done'
+        event carrying the job status, or an error message.
+    """
+    try:
+        job = job_manager.get_job(job_id)
+    except ValueError as e:
+        app.logger.error(f"Error streaming job progress: {e}")
+        return make_response(jsonify({'error': str(e)}), 404)
+
+    def generate():
+        for event in job.stream_events():
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: progress\ndata: {json.dumps(event)}\n\n"
+        yield f"event: done\ndata: {json.dumps(job.to_dict())}\n\n"
+
+    app.logger.info(f"Streaming progress for job: {job_id}")
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
+
 ############################################################
 #
 # Leaderboard / Stats
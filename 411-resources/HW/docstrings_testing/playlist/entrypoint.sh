@@ -13,5 +13,9 @@ else
     echo "Skipping database creation."
 fi
 
-# Start the Python application
-exec python app.py
+# Start the application on gunicorn's gevent workers, so each open change stream is a
+# greenlet rather than an OS thread. WEB_CONCURRENCY sets the number of worker processes.
+exec gunicorn --worker-class gevent \
+    --worker-connections "${GUNICORN_WORKER_CONNECTIONS:-10000}" \
+    --bind 0.0.0.0:5000 \
+    app:app
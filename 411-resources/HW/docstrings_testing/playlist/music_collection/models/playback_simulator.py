@@ -0,0 +1,367 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import sqlite3
+import time
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from music_collection.models.playlist_model import PlaylistModel
+from music_collection.models.song_model import Song, update_play_counts
+from music_collection.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Plays collected before they are written to the database in one transaction
+SIMULATOR_FLUSH_SIZE = 5000
+
+# Longest time, in real seconds, that a play waits before it is written
+SIMULATOR_FLUSH_INTERVAL = 1.0
+
+# Tracks finished per scheduler step before the event loop gets a chance to run other tasks
+SIMULATOR_STEP_SIZE = 1000
+
+
+class _Session:
+    """
+    One simulated listener: a playlist and the simulator clock time at which its current song ends.
+    """
+    __slots__ = ("id", "model", "deadline", "plays", "active")
+
+    def __init__(self, session_id: int, model: PlaylistModel, deadline: float):
+        self.id = session_id
+        self.model = model
+        self.deadline = deadline
+        self.plays = 0
+        self.active = True
+
+
+class PlaybackSimulator:
+    """
+    Plays many playlists at once on a single asyncio event loop, as simulated listeners who
+    listen to every song for its full duration.
+
+    Sessions wait in a heap ordered by the time their current song ends, so the loop sleeps
+    until the earliest deadline and then finishes every song that is due: there is no task,
+    thread or timer per session. The simulator clock only runs while run() does, so sessions
+    added beforehand all start together. Finished songs are collected and their play counts are
+    written in batches on a worker thread, one transaction per batch, so the event loop never
+    waits for the database.
+
+    Attributes:
+        time_scale (float): How many simulated seconds pass per real second, e.g. 60 plays
+            a 3 minute song in 3 seconds.
+        flush_size (int): How many plays are collected before they are written.
+        flush_interval (float): The longest time, in real seconds, that a play waits to be written.
+    """
+
+    def __init__(
+        self,
+        time_scale: float = 1.0,
+        flush_size: int = SIMULATOR_FLUSH_SIZE,
+        flush_interval: float = SIMULATOR_FLUSH_INTERVAL
+    ):
+        """
+        Args:
+            time_scale (float, optional): Simulated seconds per real second. Defaults to 1 (real time).
+            flush_size (int, optional): Plays per database write. Defaults to SIMULATOR_FLUSH_SIZE.
+            flush_interval (float, optional): Real seconds between writes. Defaults to SIMULATOR_FLUSH_INTERVAL.
+
+        Raises:
+            ValueError: If the time scale, flush size or flush interval is not positive.
+        """
+        if time_scale <= 0 or flush_size <= 0 or flush_interval <= 0:
+            logger.error("Invalid simulator settings: time_scale=%s, flush_size=%s, flush_interval=%s",
+                         time_scale, flush_size, flush_interval)
+            raise ValueError("Time scale, flush size and flush interval must be positive")
+
+        self.time_scale = time_scale
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._sessions: Dict[int, _Session] = {}
+        self._deadlines: List[Tuple[float, int, _Session]] = []
+        self._session_ids = itertools.count(1)
+        self._pending_ids: List[int] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._plays = 0
+        self._flushed = 0
+        self._skipped_ids: Set[int] = set()
+        self._max_lag = 0.0
+        self._elapsed = 0.0
+        self._run_started_at: Optional[float] = None
+
+    ##################################################
+    # Session Management Functions
+    ##################################################
+
+    def add_session(self, model: PlaylistModel) -> int:
+        """
+        Starts a listener playing the current song of a playlist from its beginning.
+        Sessions can be added before or while the simulator is running.
+
+        Args:
+            model (PlaylistModel): The playlist to play. Its current track advances as songs end.
+
+        Returns:
+            int: The ID of the session.
+
+        Raises:
+            ValueError: If the playlist is empty.
+        """
+        model.check_if_empty()
+        current_song = model.playlist[model.current_track_number - 1]
+        session = _Session(next(self._session_ids), model, self._clock() + self._real_seconds(current_song))
+        self._sessions[session.id] = session
+        heapq.heappush(self._deadlines, (session.deadline, session.id, session))
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return session.id
+
+    def remove_session(self, session_id: int) -> None:
+        """
+        Stops a listener. The song it is playing is not counted.
+
+        Args:
+            session_id (int): The ID of the session to stop.
+
+        Raises:
+            ValueError: If no session with that ID is running.
+        """
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            logger.error("Playback session %d not found", session_id)
+            raise ValueError(f"Playback session {session_id} not found")
+        # The heap entry is skipped when it comes up, rather than searched for now
+        session.active = False
+
+    @property
+    def session_count(self) -> int:
+        return len(self._sessions)
+
+    def stop(self) -> None:
+        """
+        Asks a running simulator to write its remaining plays and return.
+        """
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def stats(self) -> dict:
+        """
+        Returns counters describing the run so far.
+
+        Returns:
+            dict: The number of sessions, plays, plays written and still pending, the IDs of songs
+                that could not be counted because they were deleted from the catalog, and the
+                largest delay, in real seconds, between a song's end and the simulator noticing it.
+        """
+        return {
+            'sessions': len(self._sessions),
+            'plays': self._plays,
+            'flushed_plays': self._flushed,
+            'pending_plays': len(self._pending_ids),
+            'skipped_ids': sorted(self._skipped_ids),
+            'max_lag_seconds': self._max_lag
+        }
+
+    ##################################################
+    # Scheduling Functions
+    ##################################################
+
+    async def run(self, simulated_seconds: Optional[float] = None) -> dict:
+        """
+        Plays the sessions until the simulated time has passed or stop() is called, then writes
+        any plays that are still pending.
+
+        Args:
+            simulated_seconds (float, optional): How long to simulate. Defaults to None, which
+                runs until stop() is called or the last session is removed.
+
+        Returns:
+            dict: The final stats, see stats().
+
+        Raises:
+            sqlite3.Error: If writing play counts fails. The plays of the failed batch stay pending.
+        """
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._run_started_at = time.monotonic()
+        started_at = self._clock()
+        stop_at = None if simulated_seconds is None else started_at + simulated_seconds / self.time_scale
+        next_flush_at = started_at + self.flush_interval
+        logger.info("Starting playback simulation of %d sessions at %sx speed", len(self._sessions), self.time_scale)
+
+        try:
+            while not self._stopping:
+                now = self._clock()
+                if stop_at is not None and now >= stop_at:
+                    break
+                if stop_at is None and not self._sessions:
+                    break
+
+                finished = self._finish_due_songs(now if stop_at is None else min(now, stop_at))
+                if len(self._pending_ids) >= self.flush_size or (self._pending_ids and now >= next_flush_at):
+                    self._start_flush()
+                    next_flush_at = now + self.flush_interval
+                if finished >= SIMULATOR_STEP_SIZE:
+                    # More songs may be due: let other tasks run, then carry on without sleeping
+                    await asyncio.sleep(0)
+                    continue
+
+                wake_at = next_flush_at if self._pending_ids else None
+                if self._deadlines:
+                    wake_at = self._deadlines[0][0] if wake_at is None else min(wake_at, self._deadlines[0][0])
+                if stop_at is not None:
+                    wake_at = stop_at if wake_at is None else min(wake_at, stop_at)
+                await self._sleep_until(wake_at)
+        finally:
+            self._elapsed = self._clock()
+            self._run_started_at = None
+            await self.flush()
+            self._wakeup = None
+
+        stats = self.stats()
+        logger.info("Playback simulation finished after %d plays in %.2f seconds",
+                    stats['plays'], self._elapsed - started_at)
+        return stats
+
+    def _finish_due_songs(self, now: float) -> int:
+        """
+        Finishes up to SIMULATOR_STEP_SIZE songs whose deadlines have passed and schedules the next
+        song of each session from the previous deadline, so lag does not accumulate.
+
+        Returns:
+            int: The number of songs finished.
+        """
+        finished = 0
+        while self._deadlines and self._deadlines[0][0] <= now and finished < SIMULATOR_STEP_SIZE:
+            deadline, _, session = heapq.heappop(self._deadlines)
+            if not session.active:
+                continue
+            try:
+                finished_song, next_song = session.model.advance_track()
+            except ValueError:
+                logger.warning("Playlist of session %d is empty, ending the session", session.id)
+                self._sessions.pop(session.id, None)
+                session.active = False
+                continue
+
+            self._pending_ids.append(finished_song.id)
+            self._plays += 1
+            session.plays += 1
+            self._max_lag = max(self._max_lag, now - deadline)
+            session.deadline = deadline + self._real_seconds(next_song)
+            heapq.heappush(self._deadlines, (session.deadline, session.id, session))
+            finished += 1
+        return finished
+
+    async def _sleep_until(self, wake_at: Optional[float]) -> None:
+        """
+        Sleeps until the given time, or until a session is added or the simulator is stopped.
+        """
+        timeout = None if wake_at is None else max(0.0, wake_at - self._clock())
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    def _clock(self) -> float:
+        """
+        Returns the real seconds the simulator has spent running, which stand still between runs.
+        """
+        if self._run_started_at is None:
+            return self._elapsed
+        return self._elapsed + time.monotonic() - self._run_started_at
+
+    def _real_seconds(self, song: Song) -> float:
+        return song.duration / self.time_scale
+
+    ##################################################
+    # Play Count Functions
+    ##################################################
+
+    def _start_flush(self) -> None:
+        """
+        Writes the pending plays in the background unless a write is already in progress,
+        in which case they are picked up by the next one. Only one write runs at a time,
+        since SQLite allows a single writer anyway.
+        """
+        if self._flush_task is not None:
+            if not self._flush_task.done():
+                return
+            # Raises here if the previous write failed
+            self._flush_task.result()
+        self._flush_task = asyncio.ensure_future(self._write_pending())
+
+    async def flush(self) -> None:
+        """
+        Waits for any write in progress, then writes every pending play.
+
+        Raises:
+            sqlite3.Error: If writing play counts fails. The plays of the failed batch stay pending.
+        """
+        if self._flush_task is not None:
+            task, self._flush_task = self._flush_task, None
+            await task
+        while self._pending_ids:
+            await self._write_pending()
+
+    async def _write_pending(self) -> None:
+        batch, self._pending_ids = self._pending_ids[:self.flush_size], self._pending_ids[self.flush_size:]
+        try:
+            skipped_ids = await asyncio.get_running_loop().run_in_executor(None, update_play_counts, batch)
+        except sqlite3.Error as e:
+            logger.error("Database error while writing %d simulated plays: %s", len(batch), str(e))
+            self._pending_ids[:0] = batch
+            raise e
+        self._flushed += len(batch)
+        self._skipped_ids.update(skipped_ids)
+        logger.info("Wrote %d simulated plays", len(batch))
+
+
+def run_simulation(
+    songs: Sequence[Song],
+    num_sessions: int,
+    simulated_seconds: float,
+    time_scale: float = 1.0,
+    tracks_per_session: Optional[int] = None
+) -> dict:
+    """
+    Runs a load test: each session plays a window of the given songs, starting at a different
+    song so the sessions do not all finish their tracks at once.
+
+    Args:
+        songs (Sequence[Song]): The catalog songs to play.
+        num_sessions (int): The number of simulated listeners.
+        simulated_seconds (float): How long to simulate.
+        time_scale (float, optional): Simulated seconds per real second. Defaults to 1.
+        tracks_per_session (int, optional): The length of each session's playlist. Defaults to all songs.
+
+    Returns:
+        dict: The final stats, see PlaybackSimulator.stats.
+
+    Raises:
+        ValueError: If there are no songs or the settings are invalid.
+        sqlite3.Error: If writing play counts fails.
+    """
+    if not songs:
+        logger.error("Cannot simulate playback without songs")
+        raise ValueError("Cannot simulate playback without songs")
+
+    length = min(tracks_per_session or len(songs), len(songs))
+    simulator = PlaybackSimulator(time_scale=time_scale)
+    logger.info("Creating %d simulated sessions of %d tracks", num_sessions, length)
+    for index in range(num_sessions):
+        start = index % len(songs)
+        window = [songs[(start + offset) % len(songs)] for offset in range(length)]
+        # Sessions keep no change history: nobody follows their feeds
+        model = PlaylistModel(max_change_events=0)
+        model.add_songs_to_playlist(window)
+        simulator.add_session(model)
+    return asyncio.run(simulator.run(simulated_seconds))
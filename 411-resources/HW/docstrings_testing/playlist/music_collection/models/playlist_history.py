@@ -0,0 +1,417 @@
+from collections import deque
+from collections.abc import MutableSequence
+import logging
+import sys
+from typing import Any, Callable, Deque, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from music_collection.models.song_model import Song
+from music_collection.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+##################################################
+# Persistent Sequence
+##################################################
+
+class _Node:
+    """
+    An immutable node of a persistent AVL tree, indexed by position rather than by key.
+    Nodes are never changed after creation, so any number of tree versions can share them.
+    """
+    __slots__ = ("left", "value", "right", "size", "height")
+
+    def __init__(self, left: Optional["_Node"], value: Any, right: Optional["_Node"]):
+        self.left = left
+        self.value = value
+        self.right = right
+        self.size = (left.size if left else 0) + 1 + (right.size if right else 0)
+        self.height = max(left.height if left else 0, right.height if right else 0) + 1
+
+
+# Approximate memory held by one node, used to keep the history within its byte budget
+NODE_BYTES = sys.getsizeof(_Node(None, None, None))
+
+
+def _size(node: Optional[_Node]) -> int:
+    return node.size if node else 0
+
+def _height(node: Optional[_Node]) -> int:
+    return node.height if node else 0
+
+
+class _PathCopier:
+    """
+    Builds new tree versions by copying only the nodes on the changed path, and counts
+    how many nodes it allocated.
+    """
+
+    def __init__(self):
+        self.allocated = 0
+
+    def node(self, left: Optional[_Node], value: Any, right: Optional[_Node]) -> _Node:
+        self.allocated += 1
+        return _Node(left, value, right)
+
+    def balance(self, left: Optional[_Node], value: Any, right: Optional[_Node]) -> _Node:
+        """
+        Joins two subtrees whose heights differ by at most two into a balanced node.
+        """
+        left_height, right_height = _height(left), _height(right)
+        if left_height > right_height + 1:
+            if _height(left.left) >= _height(left.right):
+                return self.node(left.left, left.value, self.node(left.right, value, right))
+            pivot = left.right
+            return self.node(
+                self.node(left.left, left.value, pivot.left), pivot.value, self.node(pivot.right, value, right)
+            )
+        if right_height > left_height + 1:
+            if _height(right.right) >= _height(right.left):
+                return self.node(self.node(left, value, right.left), right.value, right.right)
+            pivot = right.left
+            return self.node(
+                self.node(left, value, pivot.left), pivot.value, self.node(pivot.right, right.value, right.right)
+            )
+        return self.node(left, value, right)
+
+    def insert(self, node: Optional[_Node], index: int, value: Any) -> _Node:
+        if node is None:
+            return self.node(None, value, None)
+        left_size = _size(node.left)
+        if index <= left_size:
+            return self.balance(self.insert(node.left, index, value), node.value, node.right)
+        return self.balance(node.left, node.value, self.insert(node.right, index - left_size - 1, value))
+
+    def delete(self, node: _Node, index: int) -> Optional[_Node]:
+        left_size = _size(node.left)
+        if index < left_size:
+            return self.balance(self.delete(node.left, index), node.value, node.right)
+        if index > left_size:
+            return self.balance(node.left, node.value, self.delete(node.right, index - left_size - 1))
+        if node.left is None:
+            return node.right
+        if node.right is None:
+            return node.left
+        right, first_value = self.pop_first(node.right)
+        return self.balance(node.left, first_value, right)
+
+    def pop_first(self, node: _Node) -> Tuple[Optional[_Node], Any]:
+        if node.left is None:
+            return node.right, node.value
+        left, first_value = self.pop_first(node.left)
+        return self.balance(left, node.value, node.right), first_value
+
+    def set(self, node: _Node, index: int, value: Any) -> _Node:
+        left_size = _size(node.left)
+        if index < left_size:
+            return self.node(self.set(node.left, index, value), node.value, node.right)
+        if index > left_size:
+            return self.node(node.left, node.value, self.set(node.right, index - left_size - 1, value))
+        return self.node(node.left, value, node.right)
+
+    def build(self, values: List[Any], start: int, stop: int) -> Optional[_Node]:
+        if start >= stop:
+            return None
+        middle = (start + stop) // 2
+        return self.node(self.build(values, start, middle), values[middle], self.build(values, middle + 1, stop))
+
+
+class HistorySongList(MutableSequence):
+    """
+    A list of songs backed by a persistent AVL tree. Every change allocates O(log n) new nodes
+    and shares the rest with the previous version, so old versions can be kept for undo cheaply
+    and brought back by swapping the root.
+
+    Attributes:
+        root (Optional[_Node]): The root of the current version.
+        allocated (int): The total number of nodes allocated by changes, for memory accounting.
+    """
+
+    def __init__(self, songs: Iterable[Song] = ()):
+        self.root: Optional[_Node] = None
+        self.allocated = 0
+        self._flat_root: Optional[_Node] = None
+        self._flat: List[Song] = []
+        self.replace(songs)
+
+    def to_list(self) -> List[Song]:
+        """
+        Returns the songs as a plain list. The list is cached until the next change,
+        so repeated scans of an unchanged playlist walk the tree only once.
+        """
+        if self._flat_root is not self.root:
+            self._flat = list(self)
+            self._flat_root = self.root
+        return self._flat
+
+    def replace(self, songs: Iterable[Song]) -> None:
+        """
+        Replaces every song with one balanced O(n) build.
+
+        Args:
+            songs (Iterable[Song]): The new songs, in order.
+        """
+        songs = list(songs)
+        copier = _PathCopier()
+        self.root = copier.build(songs, 0, len(songs))
+        self.allocated += copier.allocated
+
+    def _check_index(self, index: int) -> int:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("playlist index out of range")
+        return index
+
+    def __len__(self) -> int:
+        return _size(self.root)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Song, List[Song]]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[position] for position in range(start, stop, step)]
+            return self._slice(start, stop)
+        index = self._check_index(index)
+        node = self.root
+        while True:
+            left_size = _size(node.left)
+            if index < left_size:
+                node = node.left
+            elif index > left_size:
+                index -= left_size + 1
+                node = node.right
+            else:
+                return node.value
+
+    def _slice(self, start: int, stop: int) -> List[Song]:
+        # In-order walk that skips whole subtrees before start, O(log n + k)
+        songs: List[Song] = []
+        stack: List[Tuple[_Node, int]] = []
+        node, offset = self.root, 0
+        while (stack or node) and len(songs) < stop - start:
+            if node is not None:
+                left_size = _size(node.left)
+                if offset + left_size < start:
+                    offset += left_size + 1
+                    node = node.right
+                else:
+                    stack.append((node, offset))
+                    node = node.left
+            else:
+                node, offset = stack.pop()
+                position = offset + _size(node.left)
+                if position >= start:
+                    songs.append(node.value)
+                node, offset = node.right, position + 1
+        return songs
+
+    def __setitem__(self, index: int, song: Song) -> None:
+        if isinstance(index, slice):
+            raise TypeError("HistorySongList does not support slice assignment")
+        copier = _PathCopier()
+        self.root = copier.set(self.root, self._check_index(index), song)
+        self.allocated += copier.allocated
+
+    def __delitem__(self, index: Union[int, slice]) -> None:
+        if isinstance(index, slice):
+            for position in sorted(range(*index.indices(len(self))), reverse=True):
+                del self[position]
+            return
+        copier = _PathCopier()
+        self.root = copier.delete(self.root, self._check_index(index))
+        self.allocated += copier.allocated
+
+    def __iter__(self) -> Iterator[Song]:
+        stack: List[_Node] = []
+        node = self.root
+        while stack or node:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.value
+            node = node.right
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (HistorySongList, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def index(self, song: Song, *args: int) -> int:
+        return self.to_list().index(song, *args)
+
+    def find(self, key: Any, key_of: Callable[[Song], Any]) -> int:
+        """
+        Returns the position of the song with the given key by descending the tree, in O(log n),
+        where index and membership tests have to scan every song. The songs must be in increasing
+        key order, as a playlist's songs are in the order of their sort keys.
+
+        Args:
+            key (Any): The key of the song to find.
+            key_of (Callable[[Song], Any]): Returns the key of a song.
+
+        Returns:
+            int: The 0-based position of the song.
+
+        Raises:
+            ValueError: If no song has the key.
+        """
+        node, offset = self.root, 0
+        while node is not None:
+            node_key = key_of(node.value)
+            if key < node_key:
+                node = node.left
+            elif key > node_key:
+                offset += _size(node.left) + 1
+                node = node.right
+            else:
+                return offset + _size(node.left)
+        raise ValueError(f"No song with key {key} in the playlist")
+
+    def extend(self, songs: Iterable[Song]) -> None:
+        songs = list(songs)
+        if len(songs) > len(self) // 8:
+            # Appending many songs one by one costs O(k log n) nodes, a rebuild costs O(n + k)
+            self.replace(self.to_list() + songs)
+        else:
+            for song in songs:
+                self.append(song)
+
+    def insert(self, index: int, song: Song) -> None:
+        index = max(0, min(index + len(self) if index < 0 else index, len(self)))
+        copier = _PathCopier()
+        self.root = copier.insert(self.root, index, song)
+        self.allocated += copier.allocated
+
+    def __contains__(self, song: object) -> bool:
+        return song in self.to_list()
+
+    def clear(self) -> None:
+        self.root = None
+
+    def copy(self) -> "HistorySongList":
+        """
+        Returns a copy sharing every node with this list, in O(1).
+        """
+        copied = HistorySongList()
+        copied.root = self.root
+        copied.allocated = self.allocated
+        return copied
+
+
+##################################################
+# Undo History
+##################################################
+
+class PlaylistState(NamedTuple):
+    """
+    Everything undo brings back: the tree root is shared, so capturing it is O(1).
+    The shuffle order is copied only while shuffle mode is on.
+    """
+    root: Optional[_Node]
+    current_track_number: int
+    shuffle_order: Optional[Any]
+    shuffle_cursor: int
+
+
+# Bookkeeping per history entry on top of its nodes
+ENTRY_BYTES = 200
+
+
+class PlaylistHistory:
+    """
+    Undo and redo stacks of playlist states, bounded by a byte budget.
+
+    Each entry carries the memory it keeps alive: the nodes the change that followed it
+    replaced, plus its shuffle order. When the budget is exceeded the oldest undo entries
+    are dropped first.
+
+    Attributes:
+        max_bytes (int): The memory the history may hold on to.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._undo: Deque[Tuple[PlaylistState, int]] = deque()
+        self._redo: List[Tuple[PlaylistState, int]] = []
+        self._bytes = 0
+
+    @property
+    def bytes_used(self) -> int:
+        """
+        Returns the estimated memory held by the undo and redo entries.
+        """
+        return self._bytes
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def record(self, state: PlaylistState, allocated_nodes: int) -> None:
+        """
+        Records the state before a change. Any redo entries are dropped.
+
+        Args:
+            state (PlaylistState): The state before the change.
+            allocated_nodes (int): The number of tree nodes the change allocated.
+        """
+        self._bytes -= sum(cost for _, cost in self._redo)
+        self._redo.clear()
+
+        cost = allocated_nodes * NODE_BYTES + ENTRY_BYTES
+        if state.shuffle_order is not None:
+            cost += len(state.shuffle_order) * state.shuffle_order.itemsize
+        self._undo.append((state, cost))
+        self._bytes += cost
+
+        while self._bytes > self.max_bytes and self._undo:
+            _, dropped_cost = self._undo.popleft()
+            self._bytes -= dropped_cost
+            logger.info("Dropped oldest undo entry to stay within %d bytes", self.max_bytes)
+
+    def undo(self, current: PlaylistState) -> PlaylistState:
+        """
+        Steps back one change.
+
+        Args:
+            current (PlaylistState): The current state, kept for redo.
+
+        Returns:
+            PlaylistState: The state to go back to.
+
+        Raises:
+            ValueError: If there is nothing to undo.
+        """
+        if not self._undo:
+            logger.error("Nothing to undo")
+            raise ValueError("Nothing to undo")
+        state, cost = self._undo.pop()
+        self._redo.append((current, cost))
+        return state
+
+    def redo(self, current: PlaylistState) -> PlaylistState:
+        """
+        Steps forward one undone change.
+
+        Args:
+            current (PlaylistState): The current state, kept for undo.
+
+        Returns:
+            PlaylistState: The state to go forward to.
+
+        Raises:
+            ValueError: If there is nothing to redo.
+        """
+        if not self._redo:
+            logger.error("Nothing to redo")
+            raise ValueError("Nothing to redo")
+        state, cost = self._redo.pop()
+        self._undo.append((current, cost))
+        return state
@@ -0,0 +1,216 @@
+import dataclasses
+import json
+import logging
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Union
+from urllib.parse import quote, unquote
+
+from music_collection.models.playlist_model import PlaylistModel
+from music_collection.models.playlist_store import load_playlist_page
+from music_collection.models.song_model import Song, get_songs_by_compound_keys
+from music_collection.utils.logger import configure_logger
+from music_collection.utils.sql_utils import chunked
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Number of tracks read from the playlist per page while exporting
+EXPORT_PAGE_SIZE = 500
+
+# Number of parsed lines resolved against the catalog per lookup while importing
+IMPORT_CHUNK_SIZE = 300
+
+# Only the first errors are listed in an import report, the rest are just counted
+MAX_REPORTED_ERRORS = 100
+
+CompoundKey = Tuple[str, str, int]
+
+
+##################################################
+# Export Functions
+##################################################
+
+def iter_playlist_songs(playlist: Union[PlaylistModel, str], page_size: int = EXPORT_PAGE_SIZE) -> Iterator[Song]:
+    """
+    Yields the songs of a playlist one page at a time.
+
+    A playlist given by name is paged straight from the store with a keyset cursor on its sort
+    keys, so only one page is in memory at a time and nothing is loaded up front.
+
+    Args:
+        playlist (Union[PlaylistModel, str]): The playlist to read, or the name of a stored playlist.
+        page_size (int, optional): The number of songs read per page. Defaults to EXPORT_PAGE_SIZE.
+
+    Yields:
+        Song: The songs in track order.
+    """
+    if isinstance(playlist, str):
+        after = None
+        while True:
+            page = load_playlist_page(playlist, after, page_size)
+            yield from (song for song, _ in page)
+            if len(page) < page_size:
+                return
+            last_song, last_sort_key = page[-1]
+            after = (last_sort_key, last_song.id)
+
+    playlist_model = playlist
+    offset = 0
+    while offset < playlist_model.get_playlist_length():
+        page = playlist_model.get_all_songs(offset=offset, limit=page_size)
+        if not page:
+            return
+        yield from page
+        offset += len(page)
+
+def export_ndjson(songs: Iterable[Song]) -> Iterator[str]:
+    """
+    Yields one JSON object per song, each on its own line.
+
+    Args:
+        songs (Iterable[Song]): The songs to export.
+
+    Yields:
+        str: The next line.
+    """
+    for song in songs:
+        yield json.dumps(dataclasses.asdict(song)) + "\n"
+
+def export_m3u(songs: Iterable[Song]) -> Iterator[str]:
+    """
+    Yields an extended M3U playlist. Each song's location is 'artist/year/title', with the
+    artist and title URL-encoded, so the compound key can be read back on import.
+
+    Args:
+        songs (Iterable[Song]): The songs to export.
+
+    Yields:
+        str: The next line.
+    """
+    yield "#EXTM3U\n"
+    for song in songs:
+        yield f"#EXTINF:{song.duration},{song.artist} - {song.title}\n"
+        yield f"{quote(song.artist, safe='')}/{song.year}/{quote(song.title, safe='')}\n"
+
+
+##################################################
+# Import Functions
+##################################################
+
+def parse_ndjson(lines: Iterable[str]) -> Iterator[Tuple[int, Union[CompoundKey, str]]]:
+    """
+    Parses NDJSON lines into compound keys. Blank lines are skipped.
+
+    Args:
+        lines (Iterable[str]): The lines to parse.
+
+    Yields:
+        Tuple[int, Union[CompoundKey, str]]: The 1-based line number with either the
+            (artist, title, year) key or an error message.
+    """
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            yield line_number, "Invalid JSON"
+            continue
+        if not isinstance(entry, dict):
+            yield line_number, "Expected a JSON object"
+            continue
+        artist, title, year = entry.get('artist'), entry.get('title'), entry.get('year')
+        if not isinstance(artist, str) or not isinstance(title, str) or not isinstance(year, int):
+            yield line_number, "Missing or invalid artist, title or year"
+            continue
+        yield line_number, (artist, title, year)
+
+def parse_m3u(lines: Iterable[str]) -> Iterator[Tuple[int, Union[CompoundKey, str]]]:
+    """
+    Parses M3U location lines written by export_m3u into compound keys.
+    Blank lines and directives starting with '#' are skipped.
+
+    Args:
+        lines (Iterable[str]): The lines to parse.
+
+    Yields:
+        Tuple[int, Union[CompoundKey, str]]: The 1-based line number with either the
+            (artist, title, year) key or an error message.
+    """
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = line.split("/")
+        if len(parts) != 3 or not parts[1].isdigit():
+            yield line_number, "Expected a location of the form artist/year/title"
+            continue
+        yield line_number, (unquote(parts[0]), unquote(parts[2]), int(parts[1]))
+
+PARSERS: Dict[str, Callable[[Iterable[str]], Iterator[Tuple[int, Union[CompoundKey, str]]]]] = {
+    'ndjson': parse_ndjson,
+    'm3u': parse_m3u
+}
+
+EXPORTERS: Dict[str, Callable[[Iterable[Song]], Iterator[str]]] = {
+    'ndjson': export_ndjson,
+    'm3u': export_m3u
+}
+
+def import_songs(
+    playlist_model: PlaylistModel,
+    entries: Iterable[Tuple[int, Union[CompoundKey, str]]],
+    chunk_size: int = IMPORT_CHUNK_SIZE
+) -> dict:
+    """
+    Appends parsed entries to a playlist a chunk at a time. Each chunk is resolved with one
+    compound-key lookup and appended in bulk, so memory does not grow with the input size.
+
+    Args:
+        playlist_model (PlaylistModel): The playlist to append to.
+        entries (Iterable[Tuple[int, Union[CompoundKey, str]]]): Parsed lines, see parse_ndjson.
+        chunk_size (int, optional): The number of lines per chunk. Defaults to IMPORT_CHUNK_SIZE.
+
+    Returns:
+        dict: The number of imported songs, the number of failed lines and the first
+              MAX_REPORTED_ERRORS errors as {'line', 'error'} dictionaries.
+    """
+    imported = 0
+    error_count = 0
+    errors: List[dict] = []
+
+    def report_error(line_number: int, error: str) -> None:
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({'line': line_number, 'error': error})
+
+    for chunk in chunked(entries, chunk_size):
+        keys = [entry for _, entry in chunk if isinstance(entry, tuple)]
+        songs_by_key = get_songs_by_compound_keys(keys)
+
+        resolved = []
+        chunk_errors = []
+        for line_number, entry in chunk:
+            if isinstance(entry, str):
+                chunk_errors.append((line_number, entry))
+            elif entry not in songs_by_key:
+                chunk_errors.append((line_number, "Song not found in catalog"))
+            elif songs_by_key[entry] is None:
+                chunk_errors.append((line_number, "Song has been deleted"))
+            else:
+                resolved.append((line_number, songs_by_key[entry]))
+
+        if resolved:
+            added = playlist_model.add_songs_to_playlist([song for _, song in resolved])
+            for (line_number, _), was_added in zip(resolved, added):
+                if not was_added:
+                    chunk_errors.append((line_number, "Song is already in the playlist"))
+            imported += sum(added)
+
+        for line_number, error in sorted(chunk_errors):
+            report_error(line_number, error)
+
+    logger.info("Imported %d songs into playlist with %d failed lines", imported, error_count)
+    return {'imported': imported, 'error_count': error_count, 'errors': errors}
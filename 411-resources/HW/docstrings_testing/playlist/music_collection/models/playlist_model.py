@@ -1,33 +1,132 @@
+from array import array
+from bisect import bisect_left
+import dataclasses
+from functools import wraps
 import logging
-from typing import List
-from music_collection.models.song_model import Song, update_play_count
+import random
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from music_collection.models.playlist_history import HistorySongList, PlaylistHistory, PlaylistState
+from music_collection.models.playlist_store import SORT_KEY_GAP, get_playlist_version, load_playlist, save_playlist_changes
+from music_collection.models.song_cache import SongIdList
+from music_collection.models.song_model import Song, get_play_counts, update_play_count, update_play_counts
+from music_collection.utils.change_feed import ChangeFeed
 from music_collection.utils.logger import configure_logger
+from music_collection.utils.random_utils import get_random_batch
 
 logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 
+# Upper bound of the random.org draws used for shuffling; the modulo bias this leaves is negligible
+SHUFFLE_DRAW_MAX = 1000000000
+
+# Number of tracks whose play counts are written per transaction when playback reports progress
+PLAYBACK_BATCH_SIZE = 500
+
+# The song fields a playlist can be sorted by, plus 'play_count' which is read from the catalog
+SORT_FIELDS = ("artist", "title", "year", "genre", "duration")
+
+
+def synchronized(method):
+    """
+    Runs a PlaylistModel method while holding the playlist's lock, after reloading a stored
+    playlist that another process has changed.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            self._reload_if_stale()
+            return method(self, *args, **kwargs)
+    return wrapper
+
+def recorded(method):
+    """
+    Records the playlist state before a PlaylistModel method so it can be undone.
+    Changes made inside apply_batch are recorded once, as the whole batch.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.history is None or self._pending_changes is not None:
+            return method(self, *args, **kwargs)
+        state = self._capture_state()
+        version, allocated = self.version, self.playlist.allocated
+        result = method(self, *args, **kwargs)
+        if self.version != version:
+            self.history.record(state, self.playlist.allocated - allocated)
+        return result
+    return wrapper
+
+
 class PlaylistModel:
     """
     A class to manage a playlist of songs.
 
     Attributes:
         current_track_number (int): The current track number being played.
-        playlist (List[Song]): The list of songs in the playlist.
+        playlist (Union[List[Song], SongIdList, HistorySongList]): The songs in the playlist. In id-only
+            mode only their IDs are stored and songs are hydrated from the shared catalog cache on access.
+            With undo history the songs live in a persistent tree whose versions share nodes, and are
+            found by their sort keys in O(log n).
+        name (Optional[str]): The name the playlist is stored under, or None if it only lives in memory.
+        version (int): Incremented on every change to the playlist or the current track number.
+        shuffle_order (Optional[array]): In shuffle mode, the 0-based track positions in play order.
+        changes (ChangeFeed): The changes made at each version, for clients following the playlist.
+        history (Optional[PlaylistHistory]): The undo and redo entries, or None if undo is disabled.
 
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        name: Optional[str] = None,
+        id_only: bool = False,
+        history_bytes: int = 0,
+        max_change_events: int = 1000
+    ):
         """
         Initializes the PlaylistModel with an empty playlist and the current track set to 1.
+
+        Args:
+            name (str, optional): If given, the playlist is stored in the database under this name
+                                  and restored from it on creation. Defaults to None (in memory only).
+            id_only (bool, optional): If True, the playlist stores only song IDs (8 bytes per track)
+                                      instead of copies of the songs. Defaults to False.
+            history_bytes (int, optional): If positive, changes can be undone and redone, keeping up to
+                                           this many bytes of history. Defaults to 0 (no undo).
+            max_change_events (int, optional): How many versions the change feed keeps for resuming clients.
+                                               Simulated sessions use 0 so they hold no change history.
+                                               Defaults to 1000.
+
+        Raises:
+            ValueError: If both id-only mode and undo history are requested.
         """
+        if id_only and history_bytes > 0:
+            logger.error("Undo history is not available for id-only playlists")
+            raise ValueError("Undo history is not available for id-only playlists")
+
         self.current_track_number = 1
-        self.playlist: List[Song] = []
+        self.id_only = id_only
+        self.history = PlaylistHistory(history_bytes) if history_bytes > 0 else None
+        self.playlist: Union[List[Song], SongIdList, HistorySongList] = self._new_song_list([])
+        self.name = name
+        self.version = 0
+        self._sort_keys: Dict[int, float] = {}
+        self._lock = threading.RLock()
+        self._pending_changes: Optional[Dict[str, Any]] = None
+        self.shuffle_order: Optional[array] = None
+        self._shuffle_slots: Optional[array] = None
+        self._shuffle_cursor = 0
+        self.changes = ChangeFeed(max_events=max_change_events)
+        self._published_track_number = self.current_track_number
+        if self.name is not None:
+            self.restore_playlist()
 
     ##################################################
     # Song Management Functions
     ##################################################
 
+    @synchronized
+    @recorded
     def add_song_to_playlist(self, song: Song) -> None:
         """
         Adds a song to the playlist.
@@ -45,12 +144,83 @@ class PlaylistModel:
             raise TypeError("Song is not a valid song")
 
         song_id = self.validate_song_id(song.id, check_in_playlist=False)
-        if song_id in [song_in_playlist.id for song_in_playlist in self.playlist]:
+        if self._has_song(song_id):
             logger.error("Song with ID %d already exists in the playlist", song.id)
             raise ValueError(f"Song with ID {song.id} already exists in the playlist")
 
         self.playlist.append(song)
+        self._shuffle_insert(len(self.playlist) - 1)
+        self._save_changes(
+            upserts=self._place_song(len(self.playlist) - 1),
+            changes=[{'op': 'add', 'track_number': len(self.playlist), 'song': dataclasses.asdict(song)}]
+        )
+
+    @synchronized
+    @recorded
+    def add_songs_to_playlist(self, songs: List[Song], only_if_empty: bool = False) -> List[bool]:
+        """
+        Appends many songs to the playlist in one step, skipping songs that are already in it.
+
+        Args:
+            songs (List[Song]): The songs to add, in order.
+            only_if_empty (bool, optional): If True, the songs are only added to an empty playlist.
+                                            The check is made under the lock against the latest
+                                            stored version, so two requests cannot both fill the
+                                            same new playlist. Defaults to False.
 
+        Returns:
+            List[bool]: For each song, True if it was added and False if it was a duplicate,
+                        either of a song already in the playlist or of an earlier song in the list.
+
+        Raises:
+            TypeError: If any song is not a valid Song instance. No songs are added in that case.
+            ValueError: If only_if_empty is set and the playlist already has songs.
+        """
+        logger.info("Adding %d songs to playlist", len(songs))
+        if not all(isinstance(song, Song) for song in songs):
+            logger.error("Song is not a valid song")
+            raise TypeError("Song is not a valid song")
+        if only_if_empty and self.playlist:
+            logger.error("Playlist %s already has songs", self.name)
+            raise ValueError(f"Playlist {self.name} already has songs")
+
+        # A keyed playlist already keeps the IDs of its songs as the keys of _sort_keys, so callers
+        # adding in chunks, like imports, do not pay for a new set of the whole playlist each time
+        playlist_ids = self._sort_keys if self._keyed else set(self._song_ids())
+        new_ids = set()
+        added = []
+        new_songs = []
+        for song in songs:
+            is_new = song.id not in playlist_ids and song.id not in new_ids
+            if is_new:
+                new_ids.add(song.id)
+                new_songs.append(song)
+            added.append(is_new)
+
+        if not new_songs:
+            logger.info("No new songs to add, skipped %d duplicates", len(added))
+            return added
+
+        self.playlist.extend(new_songs)
+        for index in range(len(self.playlist) - len(new_songs), len(self.playlist)):
+            self._shuffle_insert(index)
+        if self._keyed:
+            last_sort_key = self._sort_keys[self._song_id_at(-len(new_songs) - 1)] if len(self.playlist) > len(new_songs) else 0.0
+            for offset, song in enumerate(new_songs, start=1):
+                self._sort_keys[song.id] = last_sort_key + offset * SORT_KEY_GAP
+        first_track_number = len(self.playlist) - len(new_songs) + 1
+        self._save_changes(
+            upserts=[song.id for song in new_songs],
+            changes=[
+                {'op': 'add', 'track_number': track_number, 'song': dataclasses.asdict(song)}
+                for track_number, song in enumerate(new_songs, start=first_track_number)
+            ]
+        )
+        logger.info("Added %d songs to playlist, skipped %d duplicates", sum(added), len(added) - sum(added))
+        return added
+
+    @synchronized
+    @recorded
     def remove_song_by_song_id(self, song_id: int) -> None:
         """
         Removes a song from the playlist by its song ID.
@@ -64,9 +234,14 @@ class PlaylistModel:
         logger.info("Removing song with id %d from playlist", song_id)
         self.check_if_empty()
         song_id = self.validate_song_id(song_id)
-        self.playlist = [song_in_playlist for song_in_playlist in self.playlist if song_in_playlist.id != song_id]
+        playlist_index = self._index_of(song_id)
+        del self.playlist[playlist_index]
+        self._shuffle_delete(playlist_index)
+        self._save_changes(deletes=[song_id], changes=[{'op': 'remove', 'song_id': song_id}])
         logger.info("Song with id %d has been removed", song_id)
 
+    @synchronized
+    @recorded
     def remove_song_by_track_number(self, track_number: int) -> None:
         """
         Removes a song from the playlist by its track number (1-indexed).
@@ -81,9 +256,14 @@ class PlaylistModel:
         self.check_if_empty()
         track_number = self.validate_track_number(track_number)
         playlist_index = track_number - 1
-        logger.info("Removing song: %s", self.playlist[playlist_index].title)
+        song_id = self._song_id_at(playlist_index)
+        logger.info("Removing song with id %d", song_id)
         del self.playlist[playlist_index]
+        self._shuffle_delete(playlist_index)
+        self._save_changes(deletes=[song_id], changes=[{'op': 'remove', 'song_id': song_id}])
 
+    @synchronized
+    @recorded
     def clear_playlist(self) -> None:
         """
         Clears all songs from the playlist. If the playlist is already empty, logs a warning.
@@ -92,18 +272,35 @@ class PlaylistModel:
         if self.get_playlist_length() == 0:
             logger.warning("Clearing an empty playlist")
         self.playlist.clear()
+        self._sort_keys.clear()
+        if self.shuffle_order is not None:
+            self._set_shuffle_order(array('I'))
+        self._save_changes(clear=True, changes=[{'op': 'clear'}])
 
     ##################################################
     # Playlist Retrieval Functions
     ##################################################
 
-    def get_all_songs(self) -> List[Song]:
+    def get_all_songs(self, offset: int = 0, limit: Optional[int] = None) -> List[Song]:
         """
-        Returns a list of all songs in the playlist.
+        Returns a list of the songs in the playlist, optionally one page at a time.
+        In id-only mode the page is hydrated with a single catalog lookup.
+
+        Args:
+            offset (int, optional): The number of tracks to skip. Defaults to 0.
+            limit (int, optional): The maximum number of songs to return. Defaults to all.
+
+        Raises:
+            ValueError: If the playlist is empty or the offset or limit is negative.
         """
         self.check_if_empty()
-        logger.info("Getting all songs in the playlist")
-        return self.playlist
+        if offset < 0 or (limit is not None and limit < 0):
+            logger.error("Invalid page offset %s or limit %s", offset, limit)
+            raise ValueError(f"Invalid page: offset {offset}, limit {limit}")
+        logger.info("Getting songs in the playlist from offset %d", offset)
+        if offset == 0 and limit is None and isinstance(self.playlist, list):
+            return self.playlist
+        return self.playlist[offset:None if limit is None else offset + limit]
 
     def get_song_by_song_id(self, song_id: int) -> Song:
         """
@@ -118,7 +315,7 @@ class PlaylistModel:
         self.check_if_empty()
         song_id = self.validate_song_id(song_id)
         logger.info("Getting song with id %d from playlist", song_id)
-        return next((song for song in self.playlist if song.id == song_id), None)
+        return self.playlist[self._index_of(song_id)]
 
     def get_song_by_track_number(self, track_number: int) -> Song:
         """
@@ -149,6 +346,16 @@ class PlaylistModel:
         """
         return len(self.playlist)
 
+    @synchronized
+    def get_remaining_track_count(self) -> int:
+        """
+        Returns the number of tracks play_rest_of_playlist would play: those from the current
+        track to the end of the playlist, or to the end of the shuffle order in shuffle mode.
+        """
+        if self.shuffle_order is not None:
+            return self.get_playlist_length() - self._shuffle_cursor
+        return self.get_playlist_length() - self.current_track_number + 1
+
     def get_playlist_duration(self) -> int:
         """
         Returns the total duration of the playlist in seconds.
@@ -159,6 +366,7 @@ class PlaylistModel:
     # Playlist Movement Functions
     ##################################################
 
+    @synchronized
     def go_to_track_number(self, track_number: int) -> None:
         """
         Sets the current track number to the specified track number.
@@ -170,7 +378,12 @@ class PlaylistModel:
         track_number = self.validate_track_number(track_number)
         logger.info("Setting current track number to %d", track_number)
         self.current_track_number = track_number
+        if self.shuffle_order is not None:
+            self._shuffle_cursor = self._shuffle_slots[track_number - 1]
+        self._save_changes()
 
+    @synchronized
+    @recorded
     def move_song_to_beginning(self, song_id: int) -> None:
         """
         Moves a song to the beginning of the playlist.
@@ -181,11 +394,16 @@ class PlaylistModel:
         logger.info("Moving song with ID %d to the beginning of the playlist", song_id)
         self.check_if_empty()
         song_id = self.validate_song_id(song_id)
-        song = self.get_song_by_song_id(song_id)
-        self.playlist.remove(song)
+        index = self._index_of(song_id)
+        song = self.playlist[index]
+        self._shuffle_move(index, 0)
+        del self.playlist[index]
         self.playlist.insert(0, song)
+        self._save_changes(upserts=self._place_song(0), changes=[{'op': 'move', 'song_id': song_id, 'track_number': 1}])
         logger.info("Song with ID %d has been moved to the beginning", song_id)
 
+    @synchronized
+    @recorded
     def move_song_to_end(self, song_id: int) -> None:
         """
         Moves a song to the end of the playlist.
@@ -196,11 +414,19 @@ class PlaylistModel:
         logger.info("Moving song with ID %d to the end of the playlist", song_id)
         self.check_if_empty()
         song_id = self.validate_song_id(song_id)
-        song = self.get_song_by_song_id(song_id)
-        self.playlist.remove(song)
+        index = self._index_of(song_id)
+        song = self.playlist[index]
+        self._shuffle_move(index, len(self.playlist) - 1)
+        del self.playlist[index]
         self.playlist.append(song)
+        self._save_changes(
+            upserts=self._place_song(len(self.playlist) - 1),
+            changes=[{'op': 'move', 'song_id': song_id, 'track_number': len(self.playlist)}]
+        )
         logger.info("Song with ID %d has been moved to the end", song_id)
 
+    @synchronized
+    @recorded
     def move_song_to_track_number(self, song_id: int, track_number: int) -> None:
         """
         Moves a song to a specific track number in the playlist.
@@ -214,11 +440,19 @@ class PlaylistModel:
         song_id = self.validate_song_id(song_id)
         track_number = self.validate_track_number(track_number)
         playlist_index = track_number - 1
-        song = self.get_song_by_song_id(song_id)
-        self.playlist.remove(song)
+        index = self._index_of(song_id)
+        song = self.playlist[index]
+        self._shuffle_move(index, playlist_index)
+        del self.playlist[index]
         self.playlist.insert(playlist_index, song)
+        self._save_changes(
+            upserts=self._place_song(playlist_index),
+            changes=[{'op': 'move', 'song_id': song_id, 'track_number': track_number}]
+        )
         logger.info("Song with ID %d has been moved to track number %d", song_id, track_number)
 
+    @synchronized
+    @recorded
     def swap_songs_in_playlist(self, song1_id: int, song2_id: int) -> None:
         """
         Swaps the positions of two songs in the playlist.
@@ -239,17 +473,77 @@ class PlaylistModel:
             logger.error("Cannot swap a song with itself, both song IDs are the same: %d", song1_id)
             raise ValueError(f"Cannot swap a song with itself, both song IDs are the same: {song1_id}")
 
-        song1 = self.get_song_by_song_id(song1_id)
-        song2 = self.get_song_by_song_id(song2_id)
-        index1 = self.playlist.index(song1)
-        index2 = self.playlist.index(song2)
+        index1 = self._index_of(song1_id)
+        index2 = self._index_of(song2_id)
         self.playlist[index1], self.playlist[index2] = self.playlist[index2], self.playlist[index1]
+        self._shuffle_swap(index1, index2)
+        if self._keyed:
+            self._sort_keys[song1_id], self._sort_keys[song2_id] = self._sort_keys[song2_id], self._sort_keys[song1_id]
+        # Applied in order, these two moves swap the songs wherever they are
+        self._save_changes(upserts=[song1_id, song2_id], changes=[
+            {'op': 'move', 'song_id': song1_id, 'track_number': index2 + 1},
+            {'op': 'move', 'song_id': song2_id, 'track_number': index1 + 1}
+        ])
         logger.info("Swapped songs with IDs %d and %d", song1_id, song2_id)
 
+    @synchronized
+    @recorded
+    def sort_by(self, key: str, reverse: bool = False) -> None:
+        """
+        Sorts the playlist in place with one stable sort. The current track stays on the same song.
+
+        Text fields are compared case-insensitively. Play counts are read from the catalog in one
+        batched query, and songs no longer in the catalog count as never played.
+
+        Args:
+            key (str): One of 'artist', 'title', 'year', 'genre', 'duration' or 'play_count'.
+            reverse (bool, optional): If True, sorts in descending order. Songs with equal keys
+                                      keep their relative order either way. Defaults to False.
+
+        Raises:
+            ValueError: If the playlist is empty or the key is unknown.
+        """
+        logger.info("Sorting playlist by %s%s", key, " (descending)" if reverse else "")
+        self.check_if_empty()
+        if key != "play_count" and key not in SORT_FIELDS:
+            logger.error("Invalid sort key: %s", key)
+            raise ValueError(f"Invalid sort key: {key}. Expected one of {', '.join(SORT_FIELDS + ('play_count',))}.")
+
+        song_ids = list(self._song_ids())
+        if key == "play_count":
+            play_counts = get_play_counts(song_ids)
+            sort_values = [play_counts.get(song_id, 0) for song_id in song_ids]
+        else:
+            sort_values = [getattr(song, key) for song in self.playlist]
+            if isinstance(sort_values[0], str):
+                sort_values = [value.casefold() for value in sort_values]
+
+        # Sort positions rather than songs, so the old position of every song is known afterwards
+        order = sorted(range(len(song_ids)), key=sort_values.__getitem__, reverse=reverse)
+        new_positions = [0] * len(order)
+        for new_index, old_index in enumerate(order):
+            new_positions[old_index] = new_index
+
+        songs = self._songs_at(order)
+        if self.history is not None:
+            self.playlist.replace(songs)
+        else:
+            self.playlist = self._new_song_list(songs)
+        self.current_track_number = new_positions[self.current_track_number - 1] + 1
+        if self.shuffle_order is not None:
+            self._set_shuffle_order(array('I', map(new_positions.__getitem__, self.shuffle_order)), self._shuffle_cursor)
+
+        sorted_ids = [song_ids[index] for index in order]
+        if self._keyed:
+            self._sort_keys = {song_id: (index + 1) * SORT_KEY_GAP for index, song_id in enumerate(sorted_ids)}
+        self._save_changes(upserts=sorted_ids, changes=[{'op': 'reorder', 'song_ids': sorted_ids}])
+        logger.info("Sorted playlist of %d songs by %s", len(sorted_ids), key)
+
     ##################################################
     # Playlist Playback Functions
     ##################################################
 
+    @synchronized
     def play_current_song(self) -> None:
         """
         Plays the current song.
@@ -264,48 +558,674 @@ class PlaylistModel:
         update_play_count(current_song.id)
         logger.info("Updated play count for song: %s (ID: %d)", current_song.title, current_song.id)
         previous_track_number = self.current_track_number
-        self.current_track_number = (self.current_track_number % self.get_playlist_length()) + 1
+        self._advance_tracks(1)
+        self._save_changes()
         logger.info("Track number updated from %d to %d", previous_track_number, self.current_track_number)
 
-    def play_entire_playlist(self) -> None:
+    @synchronized
+    def advance_track(self) -> Tuple[Song, Song]:
+        """
+        Finishes the current song and moves on to the next track, without updating its play count.
+        Used by callers that write play counts in batches of their own, such as the playback simulator.
+
+        Returns:
+            Tuple[Song, Song]: The song that was finished and the song that is now current.
+
+        Raises:
+            ValueError: If the playlist is empty.
+        """
+        self.check_if_empty()
+        finished_song = self.playlist[self.current_track_number - 1]
+        self._advance_tracks(1)
+        self._save_changes()
+        logger.debug("Finished song ID %d, now at track number %d", finished_song.id, self.current_track_number)
+        return finished_song, self.playlist[self.current_track_number - 1]
+
+    def play_entire_playlist(
+        self,
+        on_track: Optional[Callable[[int, Song, bool], None]] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None
+    ) -> List[int]:
         """
         Plays the entire playlist.
 
+        Args:
+            on_track (Callable[[int, Song, bool], None], optional): Called with the track number, the song
+                and whether it was played, once each batch of tracks has been committed.
+            is_cancelled (Callable[[], bool], optional): Checked between batches; playback stops at the
+                next unplayed track once it returns True.
+
+        Returns:
+            List[int]: The IDs of songs that were deleted from the catalog and could not be played.
+
         Side-effects:
             Resets the current track number to 1.
-            Updates the play count for each song.
+            Updates the play count for each song in a single transaction.
         """
         self.check_if_empty()
         logger.info("Starting to play the entire playlist.")
-        self.current_track_number = 1
-        logger.info("Reset current track number to 1.")
-        for _ in range(self.get_playlist_length()):
-            logger.info("Playing track number: %d", self.current_track_number)
-            self.play_current_song()
+        with self._lock:
+            self._reload_if_stale()
+            self._rewind()
+            logger.info("Reset current track number to %d.", self.current_track_number)
+            num_tracks = self.get_playlist_length()
+        skipped_ids = self._play_tracks(num_tracks, on_track, is_cancelled)
         logger.info("Finished playing the entire playlist. Current track number reset to 1.")
+        return skipped_ids
 
-    def play_rest_of_playlist(self) -> None:
+    def play_rest_of_playlist(
+        self,
+        on_track: Optional[Callable[[int, Song, bool], None]] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None
+    ) -> List[int]:
         """
         Plays the rest of the playlist from the current track.
 
+        Args:
+            on_track (Callable[[int, Song, bool], None], optional): Called with the track number, the song
+                and whether it was played, once each batch of tracks has been committed.
+            is_cancelled (Callable[[], bool], optional): Checked between batches; playback stops at the
+                next unplayed track once it returns True.
+
+        Returns:
+            List[int]: The IDs of songs that were deleted from the catalog and could not be played.
+
         Side-effects:
             Updates the current track number back to 1.
-            Updates the play count for each song in the rest of the playlist.
+            Updates the play count for each song in the rest of the playlist in a single transaction.
         """
         self.check_if_empty()
         logger.info("Starting to play the rest of the playlist from track number: %d", self.current_track_number)
-        for _ in range(self.get_playlist_length() - self.current_track_number + 1):
-            logger.info("Playing track number: %d", self.current_track_number)
-            self.play_current_song()
+        skipped_ids = self._play_tracks(self.get_remaining_track_count(), on_track, is_cancelled)
         logger.info("Finished playing the rest of the playlist. Current track number reset to 1.")
+        return skipped_ids
+
+    def _play_tracks(
+        self,
+        num_tracks: int,
+        on_track: Optional[Callable[[int, Song, bool], None]] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None
+    ) -> List[int]:
+        """
+        Plays a run of tracks starting at the current track, with batched play count updates.
+
+        Without progress reporting all tracks are written in one transaction. With it, tracks are
+        written PLAYBACK_BATCH_SIZE at a time and the lock is released between batches, so other
+        requests are not blocked for the whole run.
 
+        Args:
+            num_tracks (int): The number of tracks to play.
+            on_track (Callable[[int, Song, bool], None], optional): Progress callback, see play_entire_playlist.
+            is_cancelled (Callable[[], bool], optional): Cancellation check, see play_entire_playlist.
+
+        Returns:
+            List[int]: The IDs of songs that were skipped because they were deleted from the catalog.
+        """
+        batch_size = PLAYBACK_BATCH_SIZE if on_track or is_cancelled else num_tracks
+        skipped_ids: List[int] = []
+        played = 0
+        while played < num_tracks:
+            if is_cancelled is not None and is_cancelled():
+                logger.info("Playback cancelled after %d of %d tracks", played, num_tracks)
+                break
+
+            with self._lock:
+                self._reload_if_stale()
+                batch_indices = self._upcoming_track_indices(min(batch_size, num_tracks - played))
+                if not batch_indices:
+                    break
+                batch = self._songs_at(batch_indices)
+                logger.info("Playing %d tracks starting at track number: %d", len(batch), self.current_track_number)
+                batch_skipped_ids = update_play_counts([song.id for song in batch])
+                self._advance_tracks(len(batch))
+                self._save_changes()
+
+            if batch_skipped_ids:
+                logger.warning("Skipped deleted songs while playing: %s", batch_skipped_ids)
+                skipped_ids.extend(batch_skipped_ids)
+            if on_track is not None:
+                batch_skipped = set(batch_skipped_ids)
+                for index, song in zip(batch_indices, batch):
+                    on_track(index + 1, song, song.id not in batch_skipped)
+            played += len(batch)
+
+        return skipped_ids
+
+    @synchronized
     def rewind_playlist(self) -> None:
         """
         Rewinds the playlist to the beginning.
         """
         self.check_if_empty()
         logger.info("Rewinding playlist to the beginning.")
-        self.current_track_number = 1
+        self._rewind()
+        self._save_changes()
+
+    def _rewind(self) -> None:
+        """
+        Moves to the first track, or to the first track of the shuffle order in shuffle mode.
+        """
+        if self.shuffle_order is not None:
+            self._shuffle_cursor = 0
+            self.current_track_number = self.shuffle_order[0] + 1 if self.shuffle_order else 1
+        else:
+            self.current_track_number = 1
+
+    def _upcoming_track_indices(self, count: int) -> List[int]:
+        """
+        Returns the 0-based indices of up to `count` tracks, starting at the current track, in play order.
+        """
+        if self.shuffle_order is not None:
+            return list(self.shuffle_order[self._shuffle_cursor:self._shuffle_cursor + count])
+        start_index = self.current_track_number - 1
+        return list(range(start_index, min(start_index + count, self.get_playlist_length())))
+
+    def _advance_tracks(self, count: int) -> None:
+        """
+        Moves the current track forward by `count` tracks in play order, wrapping around at the end.
+        """
+        if self.shuffle_order is not None:
+            self._shuffle_cursor = (self._shuffle_cursor + count) % len(self.shuffle_order)
+            self.current_track_number = self.shuffle_order[self._shuffle_cursor] + 1
+        else:
+            self.current_track_number = ((self.current_track_number - 1 + count) % self.get_playlist_length()) + 1
+
+    ##################################################
+    # Shuffle Functions
+    ##################################################
+
+    @synchronized
+    def enable_shuffle(self) -> None:
+        """
+        Turns on shuffle mode with a new Fisher-Yates order over the track positions.
+        The current track stays current and the rest of the playlist follows in random order.
+
+        All random numbers come from one batched random.org draw rather than one request per song.
+
+        Raises:
+            ValueError: If the playlist is empty.
+        """
+        self.check_if_empty()
+        logger.info("Shuffling playlist of %d songs", self.get_playlist_length())
+        current_index = self.current_track_number - 1
+        order = array('I', range(self.get_playlist_length()))
+        order[0], order[current_index] = order[current_index], order[0]
+
+        # Fisher-Yates over everything after the current track: one draw per swap
+        draws = get_random_batch(len(order) - 2, SHUFFLE_DRAW_MAX) if len(order) > 2 else []
+        for i, draw in zip(range(len(order) - 1, 1, -1), draws):
+            j = 1 + draw % i
+            order[i], order[j] = order[j], order[i]
+
+        self._set_shuffle_order(order)
+        self._save_changes(changes=[{'op': 'shuffle', 'enabled': True}])
+
+    @synchronized
+    def disable_shuffle(self) -> None:
+        """
+        Turns off shuffle mode. Playback continues in track order from the current track.
+        """
+        logger.info("Turning off shuffle")
+        self._set_shuffle_order(None)
+        self._save_changes(changes=[{'op': 'shuffle', 'enabled': False}])
+
+    def _set_shuffle_order(self, order: Optional[array], cursor: int = 0) -> None:
+        """
+        Sets the shuffle order and cursor, and indexes the shuffle slot of every track position so
+        later changes can find a track in the order without searching it.
+        """
+        self.shuffle_order = order
+        self._shuffle_cursor = cursor
+        if order is None:
+            self._shuffle_slots = None
+            return
+        self._shuffle_slots = array('I', bytes(len(order) * order.itemsize))
+        for slot, position in enumerate(order):
+            self._shuffle_slots[position] = slot
+
+    def _shuffle_insert(self, index: int) -> None:
+        """
+        Adds a newly inserted track position to the shuffle order at a random unplayed slot,
+        with one inside-out Fisher-Yates step: the track that had the slot moves to the end.
+        Appending a track is O(1); inserting one earlier renumbers the tracks after it.
+        """
+        if self.shuffle_order is None:
+            return
+        order, slots = self.shuffle_order, self._shuffle_slots
+        count = len(order)
+        self._shuffle_shift(index, count, 1)
+        slots.insert(index, count)
+        order.append(index)
+        slot = random.randint(self._shuffle_cursor + 1, count) if count else 0
+        if slot < count:
+            displaced = order[slot]
+            order[slot], order[count] = index, displaced
+            slots[index], slots[displaced] = slot, count
+        if count == 0:
+            self._shuffle_cursor = 0
+        self.current_track_number = order[self._shuffle_cursor] + 1
+
+    def _shuffle_delete(self, index: int) -> None:
+        """
+        Removes a deleted track position from the shuffle order, keeping the rest of the order.
+        Only the slots after it and the tracks after it are renumbered.
+        """
+        if self.shuffle_order is None:
+            return
+        order, slots = self.shuffle_order, self._shuffle_slots
+        slot = slots[index]
+        del order[slot]
+        for later_slot in range(slot, len(order)):
+            slots[order[later_slot]] -= 1
+        self._shuffle_shift(index + 1, len(slots), -1)
+        del slots[index]
+        if slot < self._shuffle_cursor:
+            self._shuffle_cursor -= 1
+        if self._shuffle_cursor >= len(order):
+            self._shuffle_cursor = 0
+        if order:
+            self.current_track_number = order[self._shuffle_cursor] + 1
+
+    def _shuffle_move(self, from_index: int, to_index: int) -> None:
+        """
+        Updates the shuffle order for a track moving from one position to another. The moved track
+        keeps its slot; only the tracks between the two positions are renumbered.
+        """
+        if self.shuffle_order is None or from_index == to_index:
+            return
+        slots = self._shuffle_slots
+        moved_slot = slots[from_index]
+        if from_index < to_index:
+            self._shuffle_shift(from_index + 1, to_index + 1, -1)
+        else:
+            self._shuffle_shift(to_index, from_index, 1)
+        del slots[from_index]
+        slots.insert(to_index, moved_slot)
+        self.shuffle_order[moved_slot] = to_index
+        self.current_track_number = self.shuffle_order[self._shuffle_cursor] + 1
+
+    def _shuffle_swap(self, index1: int, index2: int) -> None:
+        """
+        Updates the shuffle order for two tracks swapping positions, in O(1).
+        """
+        if self.shuffle_order is None:
+            return
+        slots = self._shuffle_slots
+        slot1, slot2 = slots[index1], slots[index2]
+        self.shuffle_order[slot1], self.shuffle_order[slot2] = index2, index1
+        slots[index1], slots[index2] = slot2, slot1
+        self.current_track_number = self.shuffle_order[self._shuffle_cursor] + 1
+
+    def _shuffle_shift(self, start: int, stop: int, delta: int) -> None:
+        """
+        Adds delta to the track positions start to stop - 1 in the shuffle order, found through their slots.
+        """
+        order = self.shuffle_order
+        for slot in self._shuffle_slots[start:stop]:
+            order[slot] += delta
+
+    ##################################################
+    # Batch Functions
+    ##################################################
+
+    @synchronized
+    @recorded
+    def apply_batch(self, operations: List[Dict[str, Any]]) -> int:
+        """
+        Applies an ordered list of operations atomically: either all of them take effect and are
+        stored in one transaction, or none of them do.
+
+        Each operation is a dict with an 'op' key:
+            - 'add': adds 'song' (Song).
+            - 'remove': removes 'song' (Song) or the song at 'track_number'.
+            - 'move': moves 'song' (Song) to 'track_number'.
+            - 'swap': swaps the songs at 'track_number_1' and 'track_number_2'.
+            - 'go_to_track': sets the current track to 'track_number'.
+
+        Args:
+            operations (List[Dict[str, Any]]): The operations to apply, in order.
+
+        Returns:
+            int: The playlist version after the batch.
+
+        Raises:
+            ValueError: If any operation is invalid. The playlist is left unchanged.
+            RuntimeError: If another process changed the playlist meanwhile. The playlist is reloaded.
+        """
+        logger.info("Applying batch of %d playlist operations", len(operations))
+        snapshot = (
+            self.playlist.copy(), self.current_track_number, dict(self._sort_keys), self.version,
+            None if self.shuffle_order is None else array('I', self.shuffle_order),
+            None if self._shuffle_slots is None else array('I', self._shuffle_slots), self._shuffle_cursor
+        )
+        self._pending_changes = {'upserts': set(), 'deletes': set(), 'clear': False, 'changes': []}
+        try:
+            for index, operation in enumerate(operations, start=1):
+                try:
+                    self._apply_operation(operation)
+                except (KeyError, TypeError, ValueError) as e:
+                    raise ValueError(f"Operation {index} ({operation.get('op')}) failed: {e}") from e
+
+            pending_changes, self._pending_changes = self._pending_changes, None
+            self._save_changes(
+                upserts=pending_changes['upserts'],
+                deletes=pending_changes['deletes'],
+                clear=pending_changes['clear'],
+                changes=pending_changes['changes']
+            )
+        except RuntimeError:
+            # The playlist was reloaded from the store, which supersedes the snapshot
+            self._pending_changes = None
+            raise
+        except Exception:
+            logger.error("Playlist batch failed, rolling back")
+            self._pending_changes = None
+            (self.playlist, self.current_track_number, self._sort_keys, self.version,
+             self.shuffle_order, self._shuffle_slots, self._shuffle_cursor) = snapshot
+            raise
+
+        logger.info("Applied batch of %d playlist operations, now at version %d", len(operations), self.version)
+        return self.version
+
+    def _apply_operation(self, operation: Dict[str, Any]) -> None:
+        """
+        Applies a single batch operation, see apply_batch.
+
+        Raises:
+            ValueError: If the operation is unknown or invalid.
+        """
+        op = operation.get('op')
+        if op == 'add':
+            self.add_song_to_playlist(operation['song'])
+        elif op == 'remove' and 'song' in operation:
+            self.remove_song_by_song_id(operation['song'].id)
+        elif op == 'remove':
+            self.remove_song_by_track_number(operation['track_number'])
+        elif op == 'move':
+            self.move_song_to_track_number(operation['song'].id, operation['track_number'])
+        elif op == 'swap':
+            song1 = self.get_song_by_track_number(operation['track_number_1'])
+            song2 = self.get_song_by_track_number(operation['track_number_2'])
+            self.swap_songs_in_playlist(song1.id, song2.id)
+        elif op == 'go_to_track':
+            self.go_to_track_number(operation['track_number'])
+        else:
+            logger.error("Unknown playlist operation: %s", op)
+            raise ValueError(f"Unknown playlist operation: {op}")
+
+    ##################################################
+    # Undo Functions
+    ##################################################
+
+    @synchronized
+    def undo(self) -> int:
+        """
+        Undoes the last change to the songs in the playlist, restoring the track order, the
+        current track and the shuffle order as they were. The tree root is swapped back in O(1);
+        a stored playlist is then rewritten in one transaction.
+
+        Returns:
+            int: The playlist version after the undo.
+
+        Raises:
+            ValueError: If undo history is disabled or there is nothing to undo.
+        """
+        logger.info("Undoing the last playlist change")
+        self._check_history()
+        self._restore_state(self.history.undo(self._capture_state()))
+        return self.version
+
+    @synchronized
+    def redo(self) -> int:
+        """
+        Redoes the last undone change.
+
+        Returns:
+            int: The playlist version after the redo.
+
+        Raises:
+            ValueError: If undo history is disabled or there is nothing to redo.
+        """
+        logger.info("Redoing the last undone playlist change")
+        self._check_history()
+        self._restore_state(self.history.redo(self._capture_state()))
+        return self.version
+
+    def _check_history(self) -> None:
+        """
+        Raises:
+            ValueError: If undo history is disabled.
+        """
+        if self.history is None:
+            logger.error("Undo history is not enabled for this playlist")
+            raise ValueError("Undo history is not enabled for this playlist")
+
+    def _capture_state(self) -> PlaylistState:
+        return PlaylistState(
+            root=self.playlist.root,
+            current_track_number=self.current_track_number,
+            shuffle_order=None if self.shuffle_order is None else array('I', self.shuffle_order),
+            shuffle_cursor=self._shuffle_cursor
+        )
+
+    def _restore_state(self, state: PlaylistState) -> None:
+        self.playlist.root = state.root
+        self.current_track_number = state.current_track_number
+        self._set_shuffle_order(state.shuffle_order, state.shuffle_cursor)
+        upserts, deletes = self._rekey_tracks(self._song_ids())
+        self._save_changes(upserts=upserts, deletes=deletes, changes=[{'op': 'reload'}])
+
+    def _rekey_tracks(self, song_ids: Sequence[int]) -> Tuple[List[int], List[int]]:
+        """
+        Gives a new track order sort keys while rewriting as few stored rows as possible.
+
+        The longest run of songs whose current keys are already in increasing order keeps its
+        keys, and only the other songs get new keys between their kept neighbours. Undoing a
+        single move therefore rewrites a single row.
+
+        Args:
+            song_ids (Sequence[int]): The song IDs in their new track order.
+
+        Returns:
+            Tuple[List[int], List[int]]: The IDs whose keys changed or were added, and the IDs
+                that are no longer in the playlist.
+        """
+        old_keys = self._sort_keys
+        keys = [old_keys.get(song_id) for song_id in song_ids]
+
+        # Longest strictly increasing subsequence of the existing keys, O(n log n)
+        tail_keys: List[float] = []
+        tail_positions: List[int] = []
+        previous = [-1] * len(keys)
+        for position, key in enumerate(keys):
+            if key is None:
+                continue
+            slot = bisect_left(tail_keys, key)
+            previous[position] = tail_positions[slot - 1] if slot > 0 else -1
+            if slot == len(tail_keys):
+                tail_keys.append(key)
+                tail_positions.append(position)
+            else:
+                tail_keys[slot] = key
+                tail_positions[slot] = position
+        kept = set()
+        position = tail_positions[-1] if tail_positions else -1
+        while position >= 0:
+            kept.add(position)
+            position = previous[position]
+
+        new_keys = list(keys)
+        start = 0
+        while start < len(keys):
+            if start in kept:
+                start += 1
+                continue
+            stop = start
+            while stop < len(keys) and stop not in kept:
+                stop += 1
+            low = new_keys[start - 1] if start > 0 else None
+            high = keys[stop] if stop < len(keys) else None
+            count = stop - start
+            for offset in range(count):
+                if low is None and high is None:
+                    new_keys[start + offset] = (offset + 1) * SORT_KEY_GAP
+                elif high is None:
+                    new_keys[start + offset] = low + (offset + 1) * SORT_KEY_GAP
+                elif low is None:
+                    new_keys[start + offset] = high - (count - offset) * SORT_KEY_GAP
+                else:
+                    new_keys[start + offset] = low + (high - low) * (offset + 1) / (count + 1)
+            start = stop
+
+        if any(later <= earlier for earlier, later in zip(new_keys, new_keys[1:])):
+            logger.info("Sort keys exhausted, respacing playlist '%s'", self.name)
+            new_keys = [(index + 1) * SORT_KEY_GAP for index in range(len(song_ids))]
+
+        self._sort_keys = dict(zip(song_ids, new_keys))
+        upserts = [song_id for song_id, key in zip(song_ids, new_keys) if old_keys.get(song_id) != key]
+        deletes = [song_id for song_id in old_keys if song_id not in self._sort_keys]
+        return upserts, deletes
+
+    ##################################################
+    # Persistence Functions
+    ##################################################
+
+    def restore_playlist(self) -> None:
+        """
+        Replaces the in-memory playlist with the one stored under this playlist's name.
+
+        Raises:
+            ValueError: If the playlist has no name.
+        """
+        if self.name is None:
+            logger.error("Cannot restore a playlist without a name")
+            raise ValueError("Cannot restore a playlist without a name")
+
+        with self._lock:
+            self._restore_playlist()
+
+    def _restore_playlist(self) -> None:
+        tracks, current_track_number, version = load_playlist(self.name)
+        self.playlist = self._new_song_list([song for song, _ in tracks])
+        if self.history is not None:
+            self.history = PlaylistHistory(self.history.max_bytes)
+        self._sort_keys = {song.id: sort_key for song, sort_key in tracks}
+        # Songs removed from the catalog drop out of the join, so the stored track may be out of range
+        self.current_track_number = current_track_number if 1 <= current_track_number <= len(self.playlist) else 1
+        self.version = version
+        self._set_shuffle_order(None)
+        self._published_track_number = self.current_track_number
+        self.changes.reset(self.version)
+        logger.info("Restored playlist '%s' with %d songs at version %d", self.name, len(self.playlist), self.version)
+
+    def _reload_if_stale(self) -> None:
+        """
+        Reloads a stored playlist if another process has stored a newer version of it, so every
+        change starts from the stored state. Does nothing inside apply_batch, which checked on entry.
+        """
+        if self.name is None or self._pending_changes is not None:
+            return
+        stored_version = get_playlist_version(self.name)
+        if stored_version != self.version:
+            logger.info("Playlist '%s' is at version %d in the store, reloading from version %d",
+                        self.name, stored_version, self.version)
+            self._restore_playlist()
+
+    def _place_song(self, index: int) -> List[int]:
+        """
+        Gives the song at the given index a sort key between those of its neighbours.
+
+        Args:
+            index (int): The 0-based index of the song that was added or moved.
+
+        Returns:
+            List[int]: The IDs of the songs whose sort keys changed. This is only the placed song,
+                       unless the gap between its neighbours ran out and the playlist was respaced.
+        """
+        if not self._keyed:
+            return []
+
+        before = self._sort_keys[self._song_id_at(index - 1)] if index > 0 else None
+        after = self._sort_keys[self._song_id_at(index + 1)] if index + 1 < len(self.playlist) else None
+        if before is None and after is None:
+            sort_key = SORT_KEY_GAP
+        elif after is None:
+            sort_key = before + SORT_KEY_GAP
+        elif before is None:
+            sort_key = after - SORT_KEY_GAP
+        else:
+            sort_key = (before + after) / 2
+
+        if (before is not None and sort_key <= before) or (after is not None and sort_key >= after):
+            logger.info("Sort keys exhausted around track %d, respacing playlist '%s'", index + 1, self.name)
+            self._sort_keys = {song_id: (i + 1) * SORT_KEY_GAP for i, song_id in enumerate(self._song_ids())}
+            return list(self._sort_keys)
+
+        song_id = self._song_id_at(index)
+        self._sort_keys[song_id] = sort_key
+        return [song_id]
+
+    def _save_changes(
+        self,
+        upserts: Iterable[int] = (),
+        deletes: Iterable[int] = (),
+        clear: bool = False,
+        changes: Iterable[Dict[str, Any]] = ()
+    ) -> None:
+        """
+        Bumps the playlist version, for a named playlist writes only the changed rows along with
+        the changes, and publishes the changes to the change feed. During apply_batch the changes are collected
+        instead and saved once at the end, as a single version.
+
+        Args:
+            upserts (Iterable[int]): The IDs of songs that were added or moved.
+            deletes (Iterable[int]): The IDs of songs that were removed.
+            clear (bool, optional): If True, every stored track is removed first.
+            changes (Iterable[Dict[str, Any]]): Compact descriptions of the changes for clients, each
+                with an 'op' of 'add', 'remove', 'move', 'reorder', 'clear', 'shuffle' or 'reload'. A 'current_track'
+                change is added automatically when the current track number changed.
+
+        Raises:
+            RuntimeError: If another process stored a change to the playlist first. The playlist
+                is reloaded from the store and this change is dropped.
+        """
+        deletes = list(deletes)
+        for song_id in deletes:
+            self._sort_keys.pop(song_id, None)
+
+        pending = self._pending_changes
+        if pending is not None:
+            if clear:
+                pending.update(upserts=set(), deletes=set(), clear=True)
+            pending['upserts'].difference_update(deletes)
+            pending['deletes'].update(deletes)
+            pending['upserts'].update(upserts)
+            pending['deletes'].difference_update(upserts)
+            pending['changes'].extend(changes)
+            return
+
+        changes = list(changes)
+        if self.current_track_number != self._published_track_number:
+            changes.append({'op': 'current_track', 'track_number': self.current_track_number})
+
+        if self.name is not None:
+            stored = save_playlist_changes(
+                self.name,
+                [(song_id, self._sort_keys[song_id]) for song_id in upserts],
+                deletes,
+                self.current_track_number,
+                self.version + 1,
+                clear=clear,
+                changes=changes
+            )
+            if not stored:
+                # Another process stored a change first: drop this one and start over from the store
+                logger.error("Playlist '%s' was changed by another process, reloading it", self.name)
+                self._restore_playlist()
+                raise RuntimeError(f"Playlist '{self.name}' was changed by another process, please retry")
+        self.version += 1
+        self._published_track_number = self.current_track_number
+        self.changes.publish(self.version, changes)
 
     ##################################################
     # Utility Functions
@@ -333,7 +1253,7 @@ class PlaylistModel:
             raise ValueError(f"Invalid song id: {song_id}")
 
         if check_in_playlist:
-            if song_id not in [song_in_playlist.id for song_in_playlist in self.playlist]:
+            if not self._has_song(song_id):
                 logger.error("Song with id %d not found in playlist", song_id)
                 raise ValueError(f"Song with id {song_id} not found in playlist")
 
@@ -360,6 +1280,68 @@ class PlaylistModel:
 
         return track_number
 
+    def _new_song_list(self, songs: List[Song]) -> Union[List[Song], SongIdList, HistorySongList]:
+        """
+        Returns a song list of the kind this playlist uses, holding the given songs.
+        """
+        if self.id_only:
+            return SongIdList(songs)
+        if self.history is not None:
+            return HistorySongList(songs)
+        return songs
+
+    def _song_ids(self) -> Sequence[int]:
+        """
+        Returns the IDs of the songs in track order, without hydrating any songs.
+        """
+        if isinstance(self.playlist, SongIdList):
+            return self.playlist.ids
+        if isinstance(self.playlist, HistorySongList):
+            return [song.id for song in self.playlist.to_list()]
+        return [song.id for song in self.playlist]
+
+    @property
+    def _keyed(self) -> bool:
+        """
+        Whether the songs carry sort keys in _sort_keys. A stored playlist stores its track order
+        with them; a playlist with undo history finds its songs in the tree by them.
+        """
+        return self.name is not None or self.history is not None
+
+    def _has_song(self, song_id: int) -> bool:
+        """
+        Returns True if a song with the given ID is in the playlist.
+        """
+        if self._keyed:
+            return song_id in self._sort_keys
+        return song_id in self._song_ids()
+
+    def _index_of(self, song_id: int) -> int:
+        """
+        Returns the 0-based index of the song with the given ID, which must be in the playlist.
+        In a history tree the song is found by its sort key in O(log n) rather than by a scan.
+        """
+        if isinstance(self.playlist, HistorySongList):
+            sort_keys = self._sort_keys
+            return self.playlist.find(sort_keys[song_id], lambda song: sort_keys[song.id])
+        return self._song_ids().index(song_id)
+
+    def _song_id_at(self, index: int) -> int:
+        """
+        Returns the ID of the song at the given 0-based index, without hydrating it.
+        """
+        if isinstance(self.playlist, SongIdList):
+            return self.playlist.ids[index]
+        return self.playlist[index].id
+
+    def _songs_at(self, indices: List[int]) -> List[Song]:
+        """
+        Returns the songs at the given 0-based indices, hydrated in one batch in id-only mode.
+        """
+        if isinstance(self.playlist, SongIdList):
+            return self.playlist.get_songs(indices)
+        return [self.playlist[index] for index in indices]
+
     def check_if_empty(self) -> None:
         """
         Checks if the playlist is empty, logs an error, and raises a ValueError if it is.
@@ -0,0 +1,96 @@
+from itertools import chain
+import logging
+from typing import Callable, Dict, List, Optional
+
+from music_collection.models.song_model import Song
+from music_collection.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+def union_songs(left: List[Song], right: List[Song]) -> List[Song]:
+    """
+    Returns the songs in either playlist: the left playlist in order, then the right playlist's
+    songs that are not in the left one, in their order.
+
+    Args:
+        left (List[Song]): The songs of the left playlist.
+        right (List[Song]): The songs of the right playlist.
+
+    Returns:
+        List[Song]: The union, without duplicate song IDs.
+    """
+    seen_ids = set()
+    result = []
+    # chain rather than +, so playlists stored as HistorySongList or SongIdList work too
+    for song in chain(left, right):
+        if song.id not in seen_ids:
+            seen_ids.add(song.id)
+            result.append(song)
+    logger.info("Union of %d and %d songs has %d songs", len(left), len(right), len(result))
+    return result
+
+def intersect_songs(left: List[Song], right: List[Song]) -> List[Song]:
+    """
+    Returns the songs of the left playlist that are also in the right one, in the left playlist's order.
+
+    Args:
+        left (List[Song]): The songs of the left playlist.
+        right (List[Song]): The songs of the right playlist.
+
+    Returns:
+        List[Song]: The intersection.
+    """
+    right_ids = {song.id for song in right}
+    result = [song for song in left if song.id in right_ids]
+    logger.info("Intersection of %d and %d songs has %d songs", len(left), len(right), len(result))
+    return result
+
+def difference_songs(left: List[Song], right: List[Song]) -> List[Song]:
+    """
+    Returns the songs of the left playlist that are not in the right one, in the left playlist's order.
+
+    Args:
+        left (List[Song]): The songs of the left playlist.
+        right (List[Song]): The songs of the right playlist.
+
+    Returns:
+        List[Song]: The difference.
+    """
+    right_ids = {song.id for song in right}
+    result = [song for song in left if song.id not in right_ids]
+    logger.info("Difference of %d and %d songs has %d songs", len(left), len(right), len(result))
+    return result
+
+def dedupe_songs(left: List[Song], right: Optional[List[Song]] = None) -> List[Song]:
+    """
+    Drops songs that repeat an earlier song's artist and title (e.g. re-releases from a
+    different year), keeping the first occurrence in the left playlist's order.
+
+    Args:
+        left (List[Song]): The songs of the playlist to dedupe.
+        right (List[Song], optional): Unused, so all operations share one signature.
+
+    Returns:
+        List[Song]: The deduplicated songs.
+    """
+    seen_keys = set()
+    result = []
+    for song in left:
+        key = (song.artist.casefold(), song.title.casefold())
+        if key not in seen_keys:
+            seen_keys.add(key)
+            result.append(song)
+    logger.info("Dedupe of %d songs kept %d songs", len(left), len(result))
+    return result
+
+
+# Maps the operation names accepted by the API to their implementations
+SET_OPERATIONS: Dict[str, Callable[..., List[Song]]] = {
+    'union': union_songs,
+    'intersect': intersect_songs,
+    'difference': difference_songs,
+    'dedupe': dedupe_songs
+}
@@ -0,0 +1,279 @@
+import json
+import logging
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from music_collection.models.song_model import Song
+from music_collection.utils.logger import configure_logger
+from music_collection.utils.sql_utils import get_db_connection
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Spacing between the sort keys of neighbouring tracks. Moving a track gives it the
+# midpoint of its new neighbours, so only that one row has to be rewritten.
+SORT_KEY_GAP = 1024.0
+
+# Number of recent versions whose changes are stored, so clients of any worker process can resume
+STORED_CHANGE_VERSIONS = 1000
+
+
+def load_playlist(name: str) -> Tuple[List[Tuple[Song, float]], int, int]:
+    """
+    Loads a stored playlist in track order.
+
+    Args:
+        name (str): The name of the playlist to load.
+
+    Returns:
+        Tuple[List[Tuple[Song, float]], int, int]: The (song, sort key) pairs in track order,
+            the current track number and the stored version. An unknown playlist loads as empty.
+
+    Raises:
+        sqlite3.Error: If any database error occurs.
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            logger.info("Loading playlist '%s'", name)
+            cursor.execute("SELECT current_track_number, version FROM playlists WHERE name = ?", (name,))
+            state = cursor.fetchone()
+            if not state:
+                logger.info("Playlist '%s' has not been stored yet", name)
+                return [], 1, 0
+
+            # Walks the (playlist_name, sort_key) index, so no sort step is needed
+            cursor.execute("""
+                SELECT s.id, s.artist, s.title, s.year, s.genre, s.duration, t.sort_key
+                FROM playlist_tracks t
+                JOIN songs s ON s.id = t.song_id
+                WHERE t.playlist_name = ?
+                ORDER BY t.sort_key
+            """, (name,))
+            tracks = [
+                (Song(id=row[0], artist=row[1], title=row[2], year=row[3], genre=row[4], duration=row[5]), row[6])
+                for row in cursor.fetchall()
+            ]
+
+            logger.info("Loaded %d tracks for playlist '%s'", len(tracks), name)
+            return tracks, state[0], state[1]
+
+    except sqlite3.Error as e:
+        logger.error("Database error while loading playlist '%s': %s", name, str(e))
+        raise e
+
+def load_playlist_page(
+    name: str,
+    after: Optional[Tuple[float, int]] = None,
+    limit: int = 500
+) -> List[Tuple[Song, float]]:
+    """
+    Loads one page of a stored playlist in track order, starting after a keyset cursor, so a
+    playlist can be read without holding all of it in memory or a read lock between pages.
+
+    Args:
+        name (str): The name of the playlist.
+        after (Optional[Tuple[float, int]], optional): The (sort key, song ID) of the last track of
+            the previous page, or None for the first page.
+        limit (int, optional): The maximum number of tracks to load. Defaults to 500.
+
+    Returns:
+        List[Tuple[Song, float]]: The (song, sort key) pairs of the page, in track order.
+
+    Raises:
+        sqlite3.Error: If any database error occurs.
+    """
+    sort_key, song_id = after if after is not None else (float("-inf"), -1)
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            # Seeks the (playlist_name, sort_key) index to the cursor instead of skipping rows
+            cursor.execute("""
+                SELECT s.id, s.artist, s.title, s.year, s.genre, s.duration, t.sort_key
+                FROM playlist_tracks t
+                JOIN songs s ON s.id = t.song_id
+                WHERE t.playlist_name = ? AND (t.sort_key, t.song_id) > (?, ?)
+                ORDER BY t.sort_key, t.song_id
+                LIMIT ?
+            """, (name, sort_key, song_id, limit))
+            return [
+                (Song(id=row[0], artist=row[1], title=row[2], year=row[3], genre=row[4], duration=row[5]), row[6])
+                for row in cursor.fetchall()
+            ]
+
+    except sqlite3.Error as e:
+        logger.error("Database error while loading a page of playlist '%s': %s", name, str(e))
+        raise e
+
+def get_playlist_version(name: str) -> int:
+    """
+    Returns the stored version of a playlist, so a process can tell whether its copy is stale.
+
+    Args:
+        name (str): The name of the playlist.
+
+    Returns:
+        int: The stored version, or 0 if the playlist has not been stored yet.
+
+    Raises:
+        sqlite3.Error: If any database error occurs.
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT version FROM playlists WHERE name = ?", (name,))
+            row = cursor.fetchone()
+            return row[0] if row else 0
+
+    except sqlite3.Error as e:
+        logger.error("Database error while reading the version of playlist '%s': %s", name, str(e))
+        raise e
+
+def load_playlist_changes(name: str, since: int) -> Tuple[int, Optional[List[Dict[str, Any]]]]:
+    """
+    Loads the changes stored for the versions of a playlist after the given one.
+
+    Args:
+        name (str): The name of the playlist.
+        since (int): The last version the client has seen.
+
+    Returns:
+        Tuple[int, Optional[List[Dict[str, Any]]]]: The stored version, and the later versions in
+            order, each with its changes, or None if some of them are no longer stored and the
+            client has to reload the playlist.
+
+    Raises:
+        sqlite3.Error: If any database error occurs.
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT version FROM playlists WHERE name = ?", (name,))
+            row = cursor.fetchone()
+            version = row[0] if row else 0
+            if since == version:
+                return version, []
+            if since > version:
+                return version, None
+
+            cursor.execute("""
+                SELECT version, changes FROM playlist_changes
+                WHERE playlist_name = ? AND version > ?
+                ORDER BY version
+            """, (name, since))
+            rows = cursor.fetchall()
+            if not rows or rows[0][0] != since + 1:
+                logger.info("Changes of playlist '%s' after version %d are no longer stored", name, since)
+                return version, None
+            return version, [{'version': row[0], 'changes': json.loads(row[1])} for row in rows]
+
+    except sqlite3.Error as e:
+        logger.error("Database error while loading the changes of playlist '%s': %s", name, str(e))
+        raise e
+
+def list_playlists() -> List[dict]:
+    """
+    Lists the stored playlists with their number of tracks.
+
+    Returns:
+        List[dict]: One dictionary per playlist with its name, length and version.
+
+    Raises:
+        sqlite3.Error: If any database error occurs.
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT p.name, COUNT(t.song_id), p.version
+                FROM playlists p
+                LEFT JOIN playlist_tracks t ON t.playlist_name = p.name
+                GROUP BY p.name
+                ORDER BY p.name
+            """)
+            playlists = [{'name': row[0], 'length': row[1], 'version': row[2]} for row in cursor.fetchall()]
+
+            logger.info("Retrieved %d stored playlists", len(playlists))
+            return playlists
+
+    except sqlite3.Error as e:
+        logger.error("Database error while listing playlists: %s", str(e))
+        raise e
+
+def save_playlist_changes(
+    name: str,
+    upserts: Iterable[Tuple[int, float]],
+    deletes: Iterable[int],
+    current_track_number: int,
+    version: int,
+    clear: bool = False,
+    changes: Optional[List[Dict[str, Any]]] = None
+) -> bool:
+    """
+    Writes the rows changed by one playlist mutation in a single transaction.
+
+    The write is optimistic: it only goes through if the stored version is still the one the
+    mutation started from (version - 1). Otherwise another process has changed the playlist in
+    the meantime, and nothing is written.
+
+    Args:
+        name (str): The name of the playlist.
+        upserts (Iterable[Tuple[int, float]]): (song_id, sort_key) pairs that were added or moved.
+        deletes (Iterable[int]): The IDs of the songs that were removed.
+        current_track_number (int): The current track number to store.
+        version (int): The playlist version after the mutation.
+        clear (bool, optional): If True, removes every track before applying the upserts.
+        changes (Optional[List[Dict[str, Any]]], optional): The compact changes made at this version,
+            stored for clients following the playlist. The last STORED_CHANGE_VERSIONS are kept.
+
+    Returns:
+        bool: True if the changes were stored, False if the stored version no longer matched.
+
+    Raises:
+        sqlite3.Error: If any database error occurs.
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO playlists (name, current_track_number, version)
+                VALUES (?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    current_track_number = excluded.current_track_number,
+                    version = excluded.version
+                WHERE playlists.version = excluded.version - 1
+            """, (name, current_track_number, version))
+            if cursor.rowcount == 0:
+                conn.rollback()
+                logger.warning("Playlist '%s' was changed by another process, not storing version %d", name, version)
+                return False
+            if clear:
+                cursor.execute("DELETE FROM playlist_tracks WHERE playlist_name = ?", (name,))
+            cursor.executemany(
+                "DELETE FROM playlist_tracks WHERE playlist_name = ? AND song_id = ?",
+                [(name, song_id) for song_id in deletes]
+            )
+            cursor.executemany("""
+                INSERT INTO playlist_tracks (playlist_name, song_id, sort_key)
+                VALUES (?, ?, ?)
+                ON CONFLICT(playlist_name, song_id) DO UPDATE SET sort_key = excluded.sort_key
+            """, [(name, song_id, sort_key) for song_id, sort_key in upserts])
+            if changes is not None:
+                cursor.execute(
+                    "INSERT OR REPLACE INTO playlist_changes (playlist_name, version, changes) VALUES (?, ?, ?)",
+                    (name, version, json.dumps(changes))
+                )
+                cursor.execute(
+                    "DELETE FROM playlist_changes WHERE playlist_name = ? AND version <= ?",
+                    (name, version - STORED_CHANGE_VERSIONS)
+                )
+            conn.commit()
+
+            logger.info("Stored playlist '%s' at version %d", name, version)
+            return True
+
+    except sqlite3.Error as e:
+        logger.error("Database error while storing playlist '%s': %s", name, str(e))
+        raise e
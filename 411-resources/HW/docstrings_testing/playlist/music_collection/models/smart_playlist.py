@@ -0,0 +1,141 @@
+from collections import Counter, defaultdict
+import logging
+from typing import Dict, List, Optional
+
+from music_collection.models.playlist_model import PlaylistModel
+from music_collection.models.song_model import Song, get_songs_by_filters
+from music_collection.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# The longest target duration plus tolerance in seconds. The subset-sum keeps a bitset this wide for
+# every bundle of songs, so the limit bounds its memory: a day is about 11 KB per bundle.
+MAX_TARGET_DURATION = 24 * 60 * 60
+
+
+def fit_duration(durations: List[int], target_duration: int, tolerance: int) -> List[int]:
+    """
+    Picks songs whose durations add up as close as possible to the target, within the tolerance.
+
+    This is a bounded subset-sum: the reachable totals are kept as bits of a Python int, so adding
+    a song is one shift-and-or over target + tolerance bits. Songs are grouped by duration and each
+    group is split into power-of-two bundles, so the work grows with the number of distinct durations
+    rather than the number of candidate songs. No total above the sum of the candidate durations is
+    reachable, so the bitsets are never wider than that sum either.
+
+    Args:
+        durations (List[int]): The candidate song durations in seconds, in order of preference.
+        target_duration (int): The total duration to aim for in seconds.
+        tolerance (int): How far from the target the total may be in seconds.
+
+    Returns:
+        List[int]: The indices of the chosen durations, in ascending order. Within a duration,
+                   earlier candidates are preferred.
+
+    Raises:
+        ValueError: If target + tolerance is above MAX_TARGET_DURATION, or no combination of songs
+            lands within the tolerance.
+    """
+    if target_duration + tolerance > MAX_TARGET_DURATION:
+        logger.error("Target of %d +/- %d seconds is too long", target_duration, tolerance)
+        raise ValueError(f"Invalid target duration: target_duration + tolerance must be at most {MAX_TARGET_DURATION} seconds.")
+    limit = min(target_duration + tolerance, sum(duration for duration in durations if duration > 0))
+    mask = (1 << (limit + 1)) - 1
+
+    indices_by_duration: Dict[int, List[int]] = defaultdict(list)
+    for index, duration in enumerate(durations):
+        if 0 < duration <= limit:
+            indices_by_duration[duration].append(index)
+
+    bundles = []
+    for duration, indices in indices_by_duration.items():
+        remaining = min(len(indices), limit // duration)
+        bundle_size = 1
+        while remaining > 0:
+            bundles.append((duration, min(bundle_size, remaining)))
+            remaining -= bundle_size
+            bundle_size *= 2
+
+    # reachable[i] holds the totals reachable with the first i bundles
+    reachable = [1]
+    for duration, count in bundles:
+        previous = reachable[-1]
+        reachable.append((previous | (previous << (duration * count))) & mask)
+
+    best_total = None
+    for offset in range(tolerance + 1):
+        for total in (target_duration - offset, target_duration + offset):
+            if 0 < total <= limit and reachable[-1] >> total & 1:
+                best_total = total
+                break
+        if best_total is not None:
+            break
+    if best_total is None:
+        logger.error("No combination of %d songs within %d seconds of %d seconds", len(durations), tolerance, target_duration)
+        raise ValueError(f"No combination of songs is within {tolerance} seconds of {target_duration} seconds")
+
+    # Walk the bundles backwards: a bundle was used if the total was not reachable without it
+    counts: Counter = Counter()
+    total = best_total
+    for index in range(len(bundles) - 1, -1, -1):
+        if not reachable[index] >> total & 1:
+            duration, count = bundles[index]
+            counts[duration] += count
+            total -= duration * count
+
+    logger.info("Fit %d seconds against a target of %d seconds", best_total, target_duration)
+    return sorted(index for duration, count in counts.items() for index in indices_by_duration[duration][:count])
+
+def generate_playlist(
+    target_duration: int,
+    tolerance: int = 60,
+    genre: Optional[str] = None,
+    min_year: Optional[int] = None,
+    max_year: Optional[int] = None,
+    min_play_count: Optional[int] = None,
+    playlist_model: Optional[PlaylistModel] = None
+) -> PlaylistModel:
+    """
+    Fills a new playlist from the catalog with songs that add up to the target duration.
+    Among songs of the same duration, the most played ones are chosen.
+
+    Args:
+        target_duration (int): The total duration to aim for in seconds.
+        tolerance (int, optional): How far from the target the total may be in seconds. Defaults to 60.
+        genre (str, optional): Only use songs of this genre.
+        min_year (int, optional): Only use songs released in or after this year.
+        max_year (int, optional): Only use songs released in or before this year.
+        min_play_count (int, optional): Only use songs played at least this many times.
+        playlist_model (PlaylistModel, optional): An empty playlist to fill, e.g. a named one that is
+            stored as it is filled. Defaults to a new unnamed playlist.
+
+    Returns:
+        PlaylistModel: The generated playlist, in catalog order of preference.
+
+    Raises:
+        ValueError: If the target or tolerance is invalid, target + tolerance is above MAX_TARGET_DURATION,
+            the playlist is not empty, or no combination fits.
+    """
+    if not isinstance(target_duration, int) or target_duration <= 0:
+        raise ValueError(f"Invalid target duration: {target_duration} (must be a positive integer).")
+    if not isinstance(tolerance, int) or tolerance < 0:
+        raise ValueError(f"Invalid tolerance: {tolerance} (must be a non-negative integer).")
+    if target_duration + tolerance > MAX_TARGET_DURATION:
+        raise ValueError(f"Invalid target duration: target_duration + tolerance must be at most {MAX_TARGET_DURATION} seconds.")
+
+    if playlist_model is None:
+        playlist_model = PlaylistModel()
+    if playlist_model.get_playlist_length() > 0:
+        logger.error("Playlist %s already has songs", playlist_model.name)
+        raise ValueError(f"Playlist {playlist_model.name} already has songs")
+
+    candidates: List[Song] = get_songs_by_filters(genre, min_year, max_year, min_play_count)
+    logger.info("Fitting %d candidate songs to %d +/- %d seconds", len(candidates), target_duration, tolerance)
+    chosen = fit_duration([song.duration for song in candidates], target_duration, tolerance)
+
+    # Checked again under the playlist's lock, so songs added meanwhile are not appended to
+    playlist_model.add_songs_to_playlist([candidates[index] for index in chosen], only_if_empty=True)
+    return playlist_model
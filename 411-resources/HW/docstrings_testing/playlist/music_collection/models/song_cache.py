@@ -0,0 +1,252 @@
+from array import array
+from collections import OrderedDict
+from collections.abc import MutableSequence
+import dataclasses
+import logging
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+from music_collection.models.song_model import Song, get_songs_by_ids
+from music_collection.utils.json_utils import dumps
+from music_collection.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Number of songs hydrated per lookup when iterating over a whole SongIdList
+HYDRATE_PAGE_SIZE = 500
+
+
+class SongCache:
+    """
+    A bounded, thread-safe cache of catalog songs shared by all id-only playlists.
+
+    Songs removed from the catalog are still returned with their last known metadata,
+    so a playlist can keep showing tracks that were deleted after they were added.
+
+    Attributes:
+        max_size (int): The number of songs kept before the least recently used are evicted.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._songs: "OrderedDict[int, Song]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, song: Song) -> None:
+        """
+        Adds or refreshes a song in the cache.
+
+        Args:
+            song (Song): The song to cache.
+        """
+        with self._lock:
+            self._songs[song.id] = song
+            self._songs.move_to_end(song.id)
+            self._evict()
+
+    def get_song(self, song_id: int) -> Song:
+        """
+        Retrieves one song, looking it up in the catalog on a miss.
+
+        Args:
+            song_id (int): The ID of the song.
+
+        Returns:
+            Song: The song.
+
+        Raises:
+            ValueError: If the song is not in the catalog.
+        """
+        return self.get_songs([song_id])[0]
+
+    def get_songs(self, song_ids: Iterable[int]) -> List[Song]:
+        """
+        Retrieves many songs, looking up every miss in one batch query.
+
+        Args:
+            song_ids (Iterable[int]): The IDs of the songs, duplicates allowed.
+
+        Returns:
+            List[Song]: The songs in the same order as the IDs.
+
+        Raises:
+            ValueError: If any of the songs is not in the catalog.
+        """
+        song_ids = list(song_ids)
+        with self._lock:
+            found: Dict[int, Song] = {}
+            for song_id in song_ids:
+                song = self._songs.get(song_id)
+                if song is not None:
+                    self._songs.move_to_end(song_id)
+                    found[song_id] = song
+        missing = [song_id for song_id in dict.fromkeys(song_ids) if song_id not in found]
+
+        if missing:
+            logger.info("Song cache miss for %d songs", len(missing))
+            fetched = get_songs_by_ids(missing, include_deleted=True)
+            not_found = [song_id for song_id in missing if song_id not in fetched]
+            if not_found:
+                logger.error("Songs not found in catalog: %s", not_found)
+                raise ValueError(f"Songs with IDs {not_found} not found in catalog")
+            with self._lock:
+                for song_id, song in fetched.items():
+                    self._songs[song_id] = song
+                    found[song_id] = song
+                self._evict()
+
+        return [found[song_id] for song_id in song_ids]
+
+    def clear(self) -> None:
+        """
+        Empties the cache, e.g. after the catalog is cleared and song IDs may be reused.
+        """
+        with self._lock:
+            self._songs.clear()
+        logger.info("Song cache cleared")
+
+    def __len__(self) -> int:
+        return len(self._songs)
+
+    def _evict(self) -> None:
+        while len(self._songs) > self.max_size:
+            self._songs.popitem(last=False)
+
+
+song_cache = SongCache()
+
+
+class SongFragmentCache:
+    """
+    A bounded, thread-safe cache of each song's encoded JSON, so large playlist responses
+    are built by joining bytes instead of encoding every song on every request.
+
+    A fragment is only reused while the song it was encoded from is unchanged.
+
+    Attributes:
+        max_size (int): The number of fragments kept before the least recently used are evicted.
+    """
+
+    def __init__(self, max_size: int = 50000):
+        self.max_size = max_size
+        self._fragments: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def encode(self, songs: Iterable[Song]) -> List[bytes]:
+        """
+        Returns the encoded JSON of each song, encoding only songs that are new or changed.
+
+        Args:
+            songs (Iterable[Song]): The songs to encode.
+
+        Returns:
+            List[bytes]: The JSON fragments in the same order as the songs.
+        """
+        fragments = []
+        with self._lock:
+            for song in songs:
+                entry = self._fragments.get(song.id)
+                if entry is not None and entry[0] == song:
+                    self._fragments.move_to_end(song.id)
+                else:
+                    # Keep a copy so a later change to the song is noticed
+                    entry = (dataclasses.replace(song), dumps(song))
+                    self._fragments[song.id] = entry
+                fragments.append(entry[1])
+            while len(self._fragments) > self.max_size:
+                self._fragments.popitem(last=False)
+        return fragments
+
+    def clear(self) -> None:
+        """
+        Empties the cache.
+        """
+        with self._lock:
+            self._fragments.clear()
+
+    def __len__(self) -> int:
+        return len(self._fragments)
+
+
+song_fragment_cache = SongFragmentCache()
+
+
+class SongIdList(MutableSequence):
+    """
+    A list of songs that only stores their IDs, 8 bytes per track, and hydrates Song objects
+    through the shared SongCache when they are read. Slices are hydrated in one batch.
+
+    Songs compare by ID, so index, remove and membership checks never touch the catalog.
+
+    Attributes:
+        ids (array): The song IDs in track order.
+    """
+
+    def __init__(self, songs: Iterable[Song] = (), cache: Optional[SongCache] = None):
+        self._cache = cache if cache is not None else song_cache
+        self.ids = array('q')
+        for song in songs:
+            self._cache.put(song)
+            self.ids.append(song.id)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Song, List[Song]]:
+        if isinstance(index, slice):
+            return self._cache.get_songs(self.ids[index])
+        return self._cache.get_song(self.ids[index])
+
+    def __setitem__(self, index: int, song: Song) -> None:
+        if isinstance(index, slice):
+            raise TypeError("SongIdList does not support slice assignment")
+        self._cache.put(song)
+        self.ids[index] = song.id
+
+    def __delitem__(self, index: Union[int, slice]) -> None:
+        del self.ids[index]
+
+    def __iter__(self) -> Iterator[Song]:
+        for start in range(0, len(self.ids), HYDRATE_PAGE_SIZE):
+            yield from self._cache.get_songs(self.ids[start:start + HYDRATE_PAGE_SIZE])
+
+    def __contains__(self, song: object) -> bool:
+        return isinstance(song, Song) and song.id in self.ids
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, SongIdList):
+            return self.ids == other.ids
+        return NotImplemented
+
+    def get_songs(self, indices: Iterable[int]) -> List[Song]:
+        """
+        Returns the songs at the given 0-based indices, hydrated in one batch.
+
+        Args:
+            indices (Iterable[int]): The positions of the songs.
+
+        Returns:
+            List[Song]: The songs in the same order as the indices.
+        """
+        return self._cache.get_songs(self.ids[index] for index in indices)
+
+    def insert(self, index: int, song: Song) -> None:
+        self._cache.put(song)
+        self.ids.insert(index, song.id)
+
+    def index(self, song: Song, *args: int) -> int:
+        return self.ids.index(song.id, *args)
+
+    def clear(self) -> None:
+        del self.ids[:]
+
+    def copy(self) -> "SongIdList":
+        """
+        Returns a copy sharing the same cache, without hydrating any songs.
+        """
+        copied = SongIdList(cache=self._cache)
+        copied.ids = array('q', self.ids)
+        return copied
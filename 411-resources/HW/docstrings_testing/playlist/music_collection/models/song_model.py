@@ -1,11 +1,13 @@
+from collections import Counter
 from dataclasses import dataclass
 import logging
 import os
 import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from music_collection.utils.logger import configure_logger
 from music_collection.utils.random_utils import get_random
-from music_collection.utils.sql_utils import get_db_connection
+from music_collection.utils.sql_utils import SQL_MAX_VARIABLES, chunked, get_db_connection
 
 
 logger = logging.getLogger(__name__)
@@ -204,6 +206,183 @@ def get_song_by_compound_key(artist: str, title: str, year: int) -> Song:
         logger.error("Database error while retrieving song by compound key (artist '%s', title '%s', year %d): %s", artist, title, year, str(e))
         raise e
 
+def get_songs_by_ids(song_ids: Iterable[int], include_deleted: bool = False) -> Dict[int, Optional[Song]]:
+    """
+    Retrieves many songs from the catalog by their song IDs in one chunked query.
+
+    Args:
+        song_ids (Iterable[int]): The IDs of the songs to look up.
+        include_deleted (bool, optional): If True, songs marked as deleted are returned like any other.
+
+    Returns:
+        Dict[int, Optional[Song]]: The found songs by ID. Songs that are marked as deleted map
+            to None unless include_deleted is set, and IDs that are not in the catalog are left out.
+
+    Raises:
+        sqlite3.Error: If any database error occurs.
+    """
+    unique_ids = list(dict.fromkeys(song_ids))
+    songs: Dict[int, Optional[Song]] = {}
+    if not unique_ids:
+        return songs
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            logger.info("Attempting to retrieve %d songs by ID", len(unique_ids))
+            for chunk in chunked(unique_ids):
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(f"""
+                    SELECT id, artist, title, year, genre, duration, deleted
+                    FROM songs
+                    WHERE id IN ({placeholders})
+                """, chunk)
+                for row in cursor.fetchall():
+                    songs[row[0]] = None if row[6] and not include_deleted else Song(
+                        id=row[0], artist=row[1], title=row[2], year=row[3], genre=row[4], duration=row[5]
+                    )
+
+            logger.info("Found %d of %d songs by ID", len(songs), len(unique_ids))
+            return songs
+
+    except sqlite3.Error as e:
+        logger.error("Database error while retrieving songs by ID: %s", str(e))
+        raise e
+
+def get_play_counts(song_ids: Iterable[int]) -> Dict[int, int]:
+    """
+    Retrieves the play counts of many songs in one chunked query.
+
+    Args:
+        song_ids (Iterable[int]): The IDs of the songs to look up.
+
+    Returns:
+        Dict[int, int]: The play count by song ID, including songs marked as deleted.
+            IDs that are not in the catalog are left out.
+
+    Raises:
+        sqlite3.Error: If any database error occurs.
+    """
+    unique_ids = list(dict.fromkeys(song_ids))
+    play_counts: Dict[int, int] = {}
+    if not unique_ids:
+        return play_counts
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            logger.info("Attempting to retrieve play counts of %d songs", len(unique_ids))
+            for chunk in chunked(unique_ids):
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(f"SELECT id, play_count FROM songs WHERE id IN ({placeholders})", chunk)
+                play_counts.update(cursor.fetchall())
+
+            logger.info("Found play counts of %d of %d songs", len(play_counts), len(unique_ids))
+            return play_counts
+
+    except sqlite3.Error as e:
+        logger.error("Database error while retrieving play counts: %s", str(e))
+        raise e
+
+def get_songs_by_compound_keys(keys: Iterable[Tuple[str, str, int]]) -> Dict[Tuple[str, str, int], Optional[Song]]:
+    """
+    Retrieves many songs from the catalog by their compound keys (artist, title, year) in one chunked query.
+
+    Args:
+        keys (Iterable[Tuple[str, str, int]]): The (artist, title, year) keys to look up.
+
+    Returns:
+        Dict[Tuple[str, str, int], Optional[Song]]: The found songs by key. Songs that are marked as
+            deleted map to None, and keys that are not in the catalog are left out.
+
+    Raises:
+        sqlite3.Error: If any database error occurs.
+    """
+    unique_keys = list(dict.fromkeys(keys))
+    songs: Dict[Tuple[str, str, int], Optional[Song]] = {}
+    if not unique_keys:
+        return songs
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            logger.info("Attempting to retrieve %d songs by compound key", len(unique_keys))
+            for chunk in chunked(unique_keys, SQL_MAX_VARIABLES // 3):
+                values = ", ".join(["(?, ?, ?)"] * len(chunk))
+                cursor.execute(f"""
+                    SELECT id, artist, title, year, genre, duration, deleted
+                    FROM songs
+                    WHERE (artist, title, year) IN (VALUES {values})
+                """, [field for key in chunk for field in key])
+                for row in cursor.fetchall():
+                    songs[(row[1], row[2], row[3])] = None if row[6] else Song(
+                        id=row[0], artist=row[1], title=row[2], year=row[3], genre=row[4], duration=row[5]
+                    )
+
+            logger.info("Found %d of %d songs by compound key", len(songs), len(unique_keys))
+            return songs
+
+    except sqlite3.Error as e:
+        logger.error("Database error while retrieving songs by compound key: %s", str(e))
+        raise e
+
+def get_songs_by_filters(
+    genre: Optional[str] = None,
+    min_year: Optional[int] = None,
+    max_year: Optional[int] = None,
+    min_play_count: Optional[int] = None
+) -> List[Song]:
+    """
+    Retrieves the non-deleted songs matching all given filters, most played first.
+
+    Args:
+        genre (str, optional): Only return songs of this genre.
+        min_year (int, optional): Only return songs released in or after this year.
+        max_year (int, optional): Only return songs released in or before this year.
+        min_play_count (int, optional): Only return songs played at least this many times.
+
+    Returns:
+        List[Song]: The matching songs.
+
+    Raises:
+        sqlite3.Error: If any database error occurs.
+    """
+    query = """
+        SELECT id, artist, title, year, genre, duration
+        FROM songs
+        WHERE deleted = FALSE
+    """
+    params: list = []
+    if genre is not None:
+        query += " AND genre = ?"
+        params.append(genre)
+    if min_year is not None:
+        query += " AND year >= ?"
+        params.append(min_year)
+    if max_year is not None:
+        query += " AND year <= ?"
+        params.append(max_year)
+    if min_play_count is not None:
+        query += " AND play_count >= ?"
+        params.append(min_play_count)
+    query += " ORDER BY play_count DESC"
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            logger.info("Attempting to retrieve songs by filters")
+            cursor.execute(query, params)
+            songs = [
+                Song(id=row[0], artist=row[1], title=row[2], year=row[3], genre=row[4], duration=row[5])
+                for row in cursor.fetchall()
+            ]
+            logger.info("Retrieved %d songs matching filters", len(songs))
+            return songs
+
+    except sqlite3.Error as e:
+        logger.error("Database error while retrieving songs by filters: %s", str(e))
+        raise e
+
 def get_all_songs(sort_by_play_count: bool = False) -> list[dict]:
     """
     Retrieves all songs that are not marked as deleted from the catalog.
@@ -329,3 +508,51 @@ def update_play_count(song_id: int) -> None:
     except sqlite3.Error as e:
         logger.error("Database error while updating play count for song with ID %d: %s", song_id, str(e))
         raise e
+
+
+def update_play_counts(song_ids: Iterable[int]) -> List[int]:
+    """
+    Increments the play counts of many songs in a single transaction.
+
+    A song ID that appears more than once is incremented once per occurrence. Songs that
+    are missing or marked as deleted are skipped instead of aborting the whole update.
+
+    Args:
+        song_ids (Iterable[int]): The IDs of the songs that were played.
+
+    Returns:
+        List[int]: The IDs of the songs that were skipped because they are missing or deleted.
+
+    Raises:
+        sqlite3.Error: If there is a database error. No play counts are updated in that case.
+    """
+    play_counts = Counter(song_ids)
+    if not play_counts:
+        return []
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            logger.info("Attempting to update play counts for %d songs", len(play_counts))
+
+            live_ids = set()
+            for chunk in chunked(list(play_counts)):
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(f"SELECT id FROM songs WHERE deleted = FALSE AND id IN ({placeholders})", chunk)
+                live_ids.update(row[0] for row in cursor.fetchall())
+
+            cursor.executemany(
+                "UPDATE songs SET play_count = play_count + ? WHERE id = ? AND deleted = FALSE",
+                [(count, song_id) for song_id, count in play_counts.items() if song_id in live_ids]
+            )
+            conn.commit()
+
+            skipped_ids = [song_id for song_id in play_counts if song_id not in live_ids]
+            if skipped_ids:
+                logger.warning("Skipped play count update for missing or deleted songs: %s", skipped_ids)
+            logger.info("Play counts incremented for %d songs", len(live_ids))
+            return skipped_ids
+
+    except sqlite3.Error as e:
+        logger.error("Database error while updating play counts: %s", str(e))
+        raise e
@@ -0,0 +1,318 @@
+from collections import deque
+import logging
+import queue
+import threading
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from music_collection.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# An event for a subscriber: its type ('ready', 'change' or 'reset') and its data, which
+# always carries the version it leaves the subscriber at
+FeedEvent = Tuple[str, Dict[str, Any]]
+
+
+class Subscription:
+    """
+    One client's place in a change feed: the events published since it subscribed, queued
+    until the client takes them.
+
+    A client that falls max_queued events behind is sent a single 'reset' event instead of
+    the changes it missed, so a stalled client cannot hold an unbounded backlog.
+    """
+
+    def __init__(self, feed: "ChangeFeed", max_queued: int):
+        self._feed = feed
+        self._max_queued = max_queued
+        self._queue: "queue.Queue[FeedEvent]" = queue.Queue()
+
+    def get(self, timeout: float) -> Optional[FeedEvent]:
+        """
+        Takes the next event, waiting up to timeout seconds for one.
+
+        Args:
+            timeout (float): How long to wait in seconds.
+
+        Returns:
+            Optional[FeedEvent]: The event type and data, or None if the wait timed out.
+        """
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self) -> None:
+        """
+        Stops delivering events to this subscription.
+        """
+        self._feed.unsubscribe(self)
+
+    def _put(self, event_type: str, data: Dict[str, Any]) -> None:
+        # Called with the feed's lock held, so events are queued in version order
+        if self._queue.qsize() >= self._max_queued:
+            logger.info("Change feed subscriber fell %d events behind, sending a reset", self._max_queued)
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            event_type, data = 'reset', {'version': data['version']}
+        self._queue.put((event_type, data))
+
+
+class ChangeFeed:
+    """
+    Keeps the most recent changes to a playlist, one entry per version, so clients can
+    follow the playlist and resume from the last version they saw.
+
+    Clients either wait on the feed's condition with wait_for_changes, or subscribe and get
+    every later version pushed onto their own queue, so the work per version is one queue put
+    per subscriber however the subscribers are served.
+
+    Attributes:
+        max_events (int): How many versions are kept for resuming.
+    """
+
+    def __init__(self, version: int = 0, max_events: int = 1000):
+        self.max_events = max_events
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=max_events)
+        self._version = version
+        self._changed = threading.Condition()
+        self._subscribers: Set[Subscription] = set()
+
+    @property
+    def version(self) -> int:
+        """
+        Returns the latest published version.
+        """
+        return self._version
+
+    @property
+    def subscriber_count(self) -> int:
+        """
+        Returns the number of open subscriptions.
+        """
+        return len(self._subscribers)
+
+    def publish(self, version: int, changes: List[Dict[str, Any]]) -> None:
+        """
+        Records the changes that produced a version and passes them on to waiting clients and
+        subscribers.
+
+        Args:
+            version (int): The version after the changes.
+            changes (List[Dict[str, Any]]): The changes, in the order they were applied.
+        """
+        with self._changed:
+            event = {'version': version, 'changes': changes}
+            self._events.append(event)
+            self._version = version
+            for subscription in self._subscribers:
+                subscription._put('change', event)
+            self._changed.notify_all()
+
+    def reset(self, version: int) -> None:
+        """
+        Forgets all recorded changes and starts again from the given version, e.g. after the
+        playlist was reloaded. Waiting clients are woken up and subscribers are told to reload.
+
+        Args:
+            version (int): The current version.
+        """
+        with self._changed:
+            self._events.clear()
+            self._version = version
+            for subscription in self._subscribers:
+                subscription._put('reset', {'version': version})
+            self._changed.notify_all()
+
+    def subscribe(self, since: Optional[int] = None, max_queued: int = 1000) -> Subscription:
+        """
+        Opens a subscription to the versions after the given one. The kept versions the client
+        has not seen are queued at once, or a 'reset' event if it is too far behind to resume.
+
+        Args:
+            since (Optional[int]): The last version the client has seen. If None, the subscription
+                starts with a 'ready' event carrying the current version.
+            max_queued (int, optional): How many events may wait for the client before they are
+                replaced by a 'reset' event. Defaults to 1000.
+
+        Returns:
+            Subscription: The subscription. Close it when the client goes away.
+        """
+        with self._changed:
+            subscription = Subscription(self, max_queued)
+            if since is None:
+                subscription._put('ready', {'version': self._version})
+            else:
+                events = self._changes_since(since)
+                if events is None:
+                    subscription._put('reset', {'version': self._version})
+                for event in events or []:
+                    subscription._put('change', event)
+            self._subscribers.add(subscription)
+            return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Stops delivering events to a subscription. Does nothing if it is already closed.
+
+        Args:
+            subscription (Subscription): The subscription to close.
+        """
+        with self._changed:
+            self._subscribers.discard(subscription)
+
+    def changes_since(self, version: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Returns the recorded versions after the given one.
+
+        Args:
+            version (int): The last version the client has seen.
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: The versions in order, each with its changes, or None
+                if some of them are no longer kept and the client has to reload the playlist.
+        """
+        with self._changed:
+            return self._changes_since(version)
+
+    def wait_for_changes(self, version: int, timeout: float) -> Optional[List[Dict[str, Any]]]:
+        """
+        Like changes_since, but waits up to timeout seconds if there are no new versions yet.
+
+        Args:
+            version (int): The last version the client has seen.
+            timeout (float): How long to wait in seconds.
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: See changes_since. Empty if the wait timed out.
+        """
+        with self._changed:
+            if version == self._version:
+                self._changed.wait(timeout)
+            return self._changes_since(version)
+
+    def _changes_since(self, version: int) -> Optional[List[Dict[str, Any]]]:
+        if version == self._version:
+            return []
+        if version > self._version or not self._events or self._events[0]['version'] > version + 1:
+            logger.info("Change feed cannot resume from version %d (latest %d)", version, self._version)
+            return None
+        return [event for event in self._events if event['version'] > version]
+
+
+class StoredChangePoller:
+    """
+    Follows the changes stored by every worker process and republishes them on a change feed
+    of its own, for all the clients of this process to subscribe to.
+
+    A single background thread per process reads the store, once per poll_interval, or at once
+    when the wake feed (the playlist's own feed) publishes a change made here. However many
+    clients are subscribed, each poll is one read of the store, and subscribers only wait on
+    their queues. The thread starts with the first subscription.
+
+    Attributes:
+        feed (ChangeFeed): The feed of stored versions that clients subscribe to.
+        poll_interval (float): How often the store is read, in seconds.
+    """
+
+    def __init__(
+        self,
+        load_changes: Callable[[int], Tuple[int, Optional[List[Dict[str, Any]]]]],
+        wake: Optional[ChangeFeed] = None,
+        poll_interval: float = 1.0,
+        max_events: int = 1000
+    ):
+        """
+        Args:
+            load_changes (Callable[[int], Tuple[int, Optional[List[Dict[str, Any]]]]]): Loads the
+                stored versions after the given one, like playlist_store.load_playlist_changes.
+            wake (Optional[ChangeFeed]): A feed whose changes trigger an immediate poll.
+            poll_interval (float, optional): How often the store is read, in seconds. Defaults to 1.
+            max_events (int, optional): How many versions are kept for resuming. Defaults to 1000.
+        """
+        self.feed = ChangeFeed(max_events=max_events)
+        self.poll_interval = poll_interval
+        self._load_changes = load_changes
+        self._wake = wake
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def subscribe(self, since: Optional[int] = None, max_queued: int = 1000) -> Subscription:
+        """
+        Opens a subscription to the stored versions after the given one, starting the poller
+        if it is not running yet. See ChangeFeed.subscribe.
+
+        Raises:
+            sqlite3.Error: If the poller is not running yet and the first read of the store fails.
+        """
+        self.start()
+        return self.feed.subscribe(since, max_queued)
+
+    def start(self) -> None:
+        """
+        Reads the store once and starts the background thread, unless it is already running.
+
+        Raises:
+            sqlite3.Error: If the first read of the store fails.
+        """
+        with self._lock:
+            if self._thread is not None:
+                return
+            local_version = self._wake.version if self._wake is not None else 0
+            # The first read is made here, so the first subscriber already sees the stored version
+            self.poll()
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, args=(local_version,), name="change-feed-poller",
+                                            daemon=True)
+            self._thread.start()
+            logger.info("Started polling for stored changes every %s seconds", self.poll_interval)
+
+    def stop(self) -> None:
+        """
+        Stops the background thread, after the poll in progress if any.
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+            self._stopped.set()
+        if self._wake is not None:
+            # Ends the thread's wait for a local change
+            with self._wake._changed:
+                self._wake._changed.notify_all()
+        if thread is not None:
+            thread.join()
+
+    def poll(self) -> None:
+        """
+        Publishes the versions stored since the last poll, or resets the feed if some of them
+        are no longer stored.
+
+        Raises:
+            sqlite3.Error: If any database error occurs.
+        """
+        stored_version, events = self._load_changes(self.feed.version)
+        if events is None:
+            self.feed.reset(stored_version)
+            return
+        for event in events:
+            self.feed.publish(event['version'], event['changes'])
+
+    def _run(self, local_version: int) -> None:
+        # The wake feed's version is read before each poll, so a change made here after the poll
+        # read the store ends the next wait at once
+        while not self._stopped.is_set():
+            if self._wake is not None:
+                self._wake.wait_for_changes(local_version, self.poll_interval)
+                local_version = self._wake.version
+            else:
+                self._stopped.wait(self.poll_interval)
+            if self._stopped.is_set():
+                return
+            try:
+                self.poll()
+            except Exception as e:
+                # The store is read again at the next interval; subscribers just see no change yet
+                logger.error("Failed to poll for stored changes: %s", str(e))
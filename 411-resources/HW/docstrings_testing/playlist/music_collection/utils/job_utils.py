@@ -0,0 +1,217 @@
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import uuid
+
+from music_collection.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+TERMINAL_STATUSES = ("succeeded", "failed", "cancelled")
+
+
+class Job:
+    """
+    A background job whose progress can be polled or streamed.
+
+    Attributes:
+        id (str): The unique ID of the job.
+        kind (str): What the job does, e.g. 'play-entire-playlist'.
+        status (str): One of 'queued', 'running', 'succeeded', 'failed' or 'cancelled'.
+        result (Any): The return value of the job once it has succeeded.
+        error (Optional[str]): The error message if the job failed.
+    """
+
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = "queued"
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._events: List[dict] = []
+        self._cancel_requested = threading.Event()
+        self._changed = threading.Condition()
+
+    def report(self, **event: Any) -> None:
+        """
+        Records a progress event and wakes up anyone streaming the job.
+
+        Args:
+            **event: The fields of the progress event.
+        """
+        with self._changed:
+            self._events.append(event)
+            self._changed.notify_all()
+
+    def is_cancelled(self) -> bool:
+        """
+        Returns True once cancellation has been requested.
+        """
+        return self._cancel_requested.is_set()
+
+    def cancel(self) -> None:
+        """
+        Requests cancellation. A running job stops at its next checkpoint.
+        """
+        self._cancel_requested.set()
+
+    def _set_status(self, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        with self._changed:
+            self.status = status
+            self.result = result
+            self.error = error
+            if status in TERMINAL_STATUSES:
+                self.finished_at = time.time()
+            self._changed.notify_all()
+
+    def stream_events(self, heartbeat_seconds: float = 15.0) -> Iterator[Optional[dict]]:
+        """
+        Yields progress events as they are reported, ending after the job finishes.
+
+        Args:
+            heartbeat_seconds (float, optional): How long to wait for a new event before
+                yielding None, so callers can keep idle connections alive. Defaults to 15.
+
+        Yields:
+            Optional[dict]: The next progress event, or None as a heartbeat.
+        """
+        next_index = 0
+        while True:
+            with self._changed:
+                if next_index == len(self._events) and self.status not in TERMINAL_STATUSES:
+                    self._changed.wait(heartbeat_seconds)
+                events = self._events[next_index:]
+                finished = self.status in TERMINAL_STATUSES
+            next_index += len(events)
+
+            if not events and not finished:
+                yield None
+            yield from events
+            if finished and next_index == len(self._events):
+                return
+
+    def to_dict(self) -> dict:
+        """
+        Returns a JSON-serializable summary of the job.
+        """
+        with self._changed:
+            return {
+                'id': self.id,
+                'kind': self.kind,
+                'status': self.status,
+                'progress': self._events[-1] if self._events else None,
+                'result': self.result,
+                'error': self.error
+            }
+
+
+class JobManager:
+    """
+    Runs jobs on a bounded worker pool and caps how many can be queued or running at once.
+
+    Attributes:
+        max_workers (int): The number of jobs that run concurrently.
+        max_jobs (int): The number of jobs that may be queued or running at once.
+        max_finished_jobs (int): How many finished jobs are kept around for status lookups.
+    """
+
+    def __init__(self, max_workers: int = 2, max_jobs: int = 4, max_finished_jobs: int = 100):
+        self.max_workers = max_workers
+        self.max_jobs = max_jobs
+        self.max_finished_jobs = max_finished_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._slots = threading.BoundedSemaphore(max_jobs)
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, func: Callable[[Job], Any]) -> Job:
+        """
+        Queues a job on the worker pool.
+
+        Args:
+            kind (str): What the job does.
+            func (Callable[[Job], Any]): Runs the job. It receives the Job so it can report
+                progress and check for cancellation; its return value becomes the result.
+
+        Returns:
+            Job: The queued job.
+
+        Raises:
+            RuntimeError: If the maximum number of jobs is already queued or running.
+        """
+        if not self._slots.acquire(blocking=False):
+            logger.error("Rejected %s job: %d jobs already queued or running", kind, self.max_jobs)
+            raise RuntimeError(f"Too many jobs in progress (limit {self.max_jobs}), try again later")
+
+        job = Job(kind)
+        with self._lock:
+            self._prune_finished_jobs()
+            self._jobs[job.id] = job
+        logger.info("Queued %s job %s", kind, job.id)
+        self._executor.submit(self._run, job, func)
+        return job
+
+    def get_job(self, job_id: str) -> Job:
+        """
+        Retrieves a job by its ID.
+
+        Args:
+            job_id (str): The ID of the job.
+
+        Returns:
+            Job: The job.
+
+        Raises:
+            ValueError: If no job with that ID is known.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            logger.error("Job %s not found", job_id)
+            raise ValueError(f"Job {job_id} not found")
+        return job
+
+    def cancel_job(self, job_id: str) -> Job:
+        """
+        Requests cancellation of a job.
+
+        Args:
+            job_id (str): The ID of the job to cancel.
+
+        Returns:
+            Job: The job.
+
+        Raises:
+            ValueError: If no job with that ID is known.
+        """
+        job = self.get_job(job_id)
+        logger.info("Cancelling job %s", job_id)
+        job.cancel()
+        return job
+
+    def _run(self, job: Job, func: Callable[[Job], Any]) -> None:
+        try:
+            if job.is_cancelled():
+                job._set_status("cancelled")
+                return
+            job._set_status("running")
+            result = func(job)
+            job._set_status("cancelled" if job.is_cancelled() else "succeeded", result=result)
+            logger.info("Job %s finished with status %s", job.id, job.status)
+        except Exception as e:
+            logger.error("Job %s failed: %s", job.id, str(e))
+            job._set_status("failed", error=str(e))
+        finally:
+            self._slots.release()
+
+    def _prune_finished_jobs(self) -> None:
+        finished = [job for job in self._jobs.values() if job.status in TERMINAL_STATUSES]
+        for job in sorted(finished, key=lambda job: job.finished_at)[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job.id]
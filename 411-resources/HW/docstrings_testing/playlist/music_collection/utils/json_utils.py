@@ -0,0 +1,85 @@
+import dataclasses
+import gzip
+import json
+import logging
+from typing import Any, Container, Dict, List, Optional, Tuple
+
+from music_collection.utils.logger import configure_logger
+
+# orjson and brotli are optional: without them encoding falls back to the standard
+# library and responses are only gzip-compressed
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Smaller bodies are sent uncompressed, compressing them costs more than it saves
+MIN_COMPRESS_SIZE = 1024
+
+
+def _default(obj: Any) -> Any:
+    if dataclasses.is_dataclass(obj):
+        return dataclasses.asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps(obj: Any) -> bytes:
+    """
+    Encodes an object as compact JSON with sorted keys, like Flask's jsonify.
+    Uses orjson when it is installed.
+
+    Args:
+        obj (Any): The object to encode. Dataclasses are encoded as objects.
+
+    Returns:
+        bytes: The UTF-8 encoded JSON.
+    """
+    if orjson is not None:
+        # orjson writes dataclass fields in declaration order, so pass them through as dicts to sort them
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS)
+    return json.dumps(obj, default=_default, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+def join_fragments(fields: Dict[str, Any], key: str, fragments: List[bytes]) -> bytes:
+    """
+    Builds a JSON object from plain fields plus one array made of already encoded items.
+
+    Args:
+        fields (Dict[str, Any]): The other fields of the object.
+        key (str): The name of the array field.
+        fragments (List[bytes]): The encoded array items.
+
+    Returns:
+        bytes: The encoded object.
+    """
+    array = b"[" + b",".join(fragments) + b"]"
+    rest = dumps(fields)
+    separator = b"," if fields else b""
+    return b"{" + dumps(key) + b":" + array + separator + rest[1:]
+
+def compress(body: bytes, accept_encodings: Container[str]) -> Tuple[bytes, Optional[str]]:
+    """
+    Compresses a response body with the best encoding the client accepts.
+
+    Args:
+        body (bytes): The response body.
+        accept_encodings (Container[str]): The encodings the client accepts, e.g. request.accept_encodings.
+
+    Returns:
+        Tuple[bytes, Optional[str]]: The body and its Content-Encoding, or None if it was left as is.
+    """
+    if len(body) < MIN_COMPRESS_SIZE:
+        return body, None
+    if brotli is not None and "br" in accept_encodings:
+        return brotli.compress(body, quality=4), "br"
+    if "gzip" in accept_encodings:
+        return gzip.compress(body, compresslevel=5), "gzip"
+    return body, None
@@ -1,4 +1,6 @@
 import logging
+from typing import List
+
 import requests
 
 from music_collection.utils.logger import configure_logger
@@ -46,3 +48,54 @@ def get_random(num_songs: int) -> int:
     except requests.exceptions.RequestException as e:
         logger.error("Request to random.org failed: %s", e)
         raise RuntimeError("Request to random.org failed: %s" % e)
+
+# random.org returns at most this many integers per request
+RANDOM_ORG_MAX_NUM = 10000
+
+
+def get_random_batch(count: int, max_value: int) -> List[int]:
+    """
+    Fetches many random ints between 1 and max_value from random.org, in as few requests as possible.
+
+    Args:
+        count (int): How many random numbers to fetch.
+        max_value (int): The largest number to return (at most 1,000,000,000).
+
+    Returns:
+        List[int]: The random numbers fetched from random.org.
+
+    Raises:
+        RuntimeError: If a request to random.org fails or times out.
+        ValueError: If the response from random.org is not a list of valid ints.
+    """
+    random_numbers: List[int] = []
+    while len(random_numbers) < count:
+        num = min(count - len(random_numbers), RANDOM_ORG_MAX_NUM)
+        url = f"https://www.random.org/integers/?num={num}&min=1&max={max_value}&col=1&base=10&format=plain&rnd=new"
+
+        try:
+            logger.info("Fetching %d random numbers from %s", num, url)
+
+            response = requests.get(url, timeout=5)
+            response.raise_for_status()
+
+            lines = response.text.split()
+            try:
+                batch = [int(line) for line in lines]
+            except ValueError:
+                raise ValueError("Invalid response from random.org: %s" % response.text.strip()[:100])
+            if len(batch) != num:
+                raise ValueError("Invalid response from random.org: expected %d numbers, got %d" % (num, len(batch)))
+
+            random_numbers.extend(batch)
+
+        except requests.exceptions.Timeout:
+            logger.error("Request to random.org timed out.")
+            raise RuntimeError("Request to random.org timed out.")
+
+        except requests.exceptions.RequestException as e:
+            logger.error("Request to random.org failed: %s", e)
+            raise RuntimeError("Request to random.org failed: %s" % e)
+
+    logger.info("Received %d random numbers", len(random_numbers))
+    return random_numbers
@@ -1,7 +1,9 @@
 from contextlib import contextmanager
+from itertools import islice
 import logging
 import os
 import sqlite3
+from typing import Iterable, Iterator, List, TypeVar
 
 from music_collection.utils.logger import configure_logger
 
@@ -13,6 +15,11 @@ configure_logger(logger)
 # load the db path from the environment with a default value
 DB_PATH = os.getenv("DB_PATH", "/app/sql/song_catalog.db")
 
+# Stay below SQLite's default limit of 999 bound parameters per statement
+SQL_MAX_VARIABLES = 999
+
+T = TypeVar("T")
+
 
 def check_database_connection():
     """Check the database connection
@@ -69,3 +76,23 @@ def get_db_connection():
         if conn:
             conn.close()
             logger.info("Database connection closed.")
+
+
+def chunked(items: Iterable[T], size: int = SQL_MAX_VARIABLES) -> Iterator[List[T]]:
+    """
+    Splits items into lists of at most `size` items, for building IN (...) clauses.
+    Iterators are consumed lazily, so only one chunk is held in memory at a time.
+
+    Args:
+        items (Iterable[T]): The items to split.
+        size (int, optional): The maximum chunk size. Defaults to SQL_MAX_VARIABLES.
+
+    Yields:
+        List[T]: The next chunk of items.
+    """
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
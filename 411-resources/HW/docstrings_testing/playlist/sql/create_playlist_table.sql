@@ -0,0 +1,21 @@
+DROP TABLE IF EXISTS playlist_changes;
+DROP TABLE IF EXISTS playlist_tracks;
+DROP TABLE IF EXISTS playlists;
+CREATE TABLE playlists (
+    name TEXT PRIMARY KEY,
+    current_track_number INTEGER NOT NULL DEFAULT 1,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE playlist_tracks (
+    playlist_name TEXT NOT NULL,
+    song_id INTEGER NOT NULL,
+    sort_key REAL NOT NULL,
+    PRIMARY KEY (playlist_name, song_id)
+);
+CREATE INDEX idx_playlist_tracks_order ON playlist_tracks (playlist_name, sort_key);
+CREATE TABLE playlist_changes (
+    playlist_name TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    changes TEXT NOT NULL,
+    PRIMARY KEY (playlist_name, version)
+);
@@ -9,4 +9,7 @@ CREATE TABLE songs (
     play_count INTEGER DEFAULT 0,
     deleted BOOLEAN DEFAULT FALSE,
     UNIQUE(artist, title, year)
-);
\ No newline at end of file
+);
+
+CREATE INDEX idx_songs_genre_year ON songs (genre, year) WHERE deleted = FALSE;
+CREATE INDEX idx_songs_play_count ON songs (play_count) WHERE deleted = FALSE;
@@ -0,0 +1,186 @@
+import threading
+
+import pytest
+
+from music_collection.utils.change_feed import ChangeFeed, StoredChangePoller
+
+
+@pytest.fixture
+def change_feed():
+    """Fixture to provide a ChangeFeed that keeps the last three versions."""
+    return ChangeFeed(max_events=3)
+
+class FakeStore:
+    """Stored versions of one playlist, counting how often they are loaded."""
+
+    def __init__(self):
+        self.events = []
+        self.loads = 0
+        # The oldest version whose changes are still stored
+        self.kept_from = 1
+
+    @property
+    def version(self):
+        return self.events[-1]['version'] if self.events else 0
+
+    def store(self, changes):
+        self.events.append({'version': self.version + 1, 'changes': changes})
+
+    def load_changes(self, since):
+        self.loads += 1
+        if since + 1 < self.kept_from:
+            return self.version, None
+        return self.version, [event for event in self.events if event['version'] > since]
+
+@pytest.fixture
+def store():
+    return FakeStore()
+
+@pytest.fixture
+def poller(store):
+    """Fixture to provide a poller of the fake store, woken by a local feed, that never polls on its own."""
+    poller = StoredChangePoller(store.load_changes, wake=ChangeFeed(), poll_interval=60)
+    yield poller
+    poller.stop()
+
+
+def test_changes_since(change_feed):
+    """Test that clients get every version after the one they have seen."""
+    change_feed.publish(1, [{'op': 'clear'}])
+    change_feed.publish(2, [{'op': 'remove', 'song_id': 1}])
+
+    assert change_feed.changes_since(0) == [
+        {'version': 1, 'changes': [{'op': 'clear'}]},
+        {'version': 2, 'changes': [{'op': 'remove', 'song_id': 1}]}
+    ]
+    assert change_feed.changes_since(1) == [{'version': 2, 'changes': [{'op': 'remove', 'song_id': 1}]}]
+    assert change_feed.changes_since(2) == []
+
+def test_changes_since_too_old(change_feed):
+    """Test that a client too far behind, or ahead, is told to reload."""
+    for version in range(1, 6):
+        change_feed.publish(version, [])
+
+    assert change_feed.changes_since(1) is None
+    assert [event['version'] for event in change_feed.changes_since(2)] == [3, 4, 5]
+    assert change_feed.changes_since(7) is None
+
+def test_reset(change_feed):
+    """Test that a reset drops the kept versions."""
+    change_feed.publish(1, [])
+    change_feed.reset(10)
+
+    assert change_feed.version == 10
+    assert change_feed.changes_since(10) == []
+    assert change_feed.changes_since(1) is None
+
+def test_wait_for_changes_times_out(change_feed):
+    """Test that waiting without new versions returns nothing after the timeout."""
+    assert change_feed.wait_for_changes(0, timeout=0.01) == []
+
+def test_wait_for_changes_wakes_up(change_feed):
+    """Test that a waiting client is woken up by a publish."""
+    timer = threading.Timer(0.05, change_feed.publish, args=(1, [{'op': 'clear'}]))
+    timer.start()
+
+    assert change_feed.wait_for_changes(0, timeout=5) == [{'version': 1, 'changes': [{'op': 'clear'}]}]
+    timer.join()
+
+##################################################
+# Subscription Test Cases
+##################################################
+
+def test_subscribe_ready(change_feed):
+    """Test that a new client is told the current version first."""
+    change_feed.publish(1, [])
+    subscription = change_feed.subscribe()
+
+    assert subscription.get(timeout=0) == ('ready', {'version': 1})
+    assert subscription.get(timeout=0) is None
+
+def test_subscribe_resumes(change_feed):
+    """Test that a resuming client gets the kept versions it missed, then new ones."""
+    change_feed.publish(1, [{'op': 'clear'}])
+    change_feed.publish(2, [])
+    subscription = change_feed.subscribe(since=1)
+    change_feed.publish(3, [{'op': 'shuffle'}])
+
+    assert subscription.get(timeout=0) == ('change', {'version': 2, 'changes': []})
+    assert subscription.get(timeout=0) == ('change', {'version': 3, 'changes': [{'op': 'shuffle'}]})
+
+def test_subscribe_too_old_and_reset(change_feed):
+    """Test that a client too far behind, or subscribed across a reset, is told to reload."""
+    for version in range(1, 6):
+        change_feed.publish(version, [])
+    subscription = change_feed.subscribe(since=1)
+    change_feed.reset(10)
+
+    assert subscription.get(timeout=0) == ('reset', {'version': 5})
+    assert subscription.get(timeout=0) == ('reset', {'version': 10})
+
+def test_slow_subscriber_reset(change_feed):
+    """Test that a client too far behind on its queue gets one reset instead of the backlog."""
+    subscription = change_feed.subscribe(since=0, max_queued=2)
+    for version in range(1, 4):
+        change_feed.publish(version, [])
+
+    assert subscription.get(timeout=0) == ('reset', {'version': 3})
+    assert subscription.get(timeout=0) is None
+
+def test_close(change_feed):
+    """Test that a closed subscription gets no more events."""
+    subscription = change_feed.subscribe(since=0)
+    subscription.close()
+    change_feed.publish(1, [])
+
+    assert change_feed.subscriber_count == 0
+    assert subscription.get(timeout=0) is None
+
+##################################################
+# Stored Change Poller Test Cases
+##################################################
+
+def test_poller_reads_store_once_for_all_subscribers(store, poller):
+    """Test that one read of the store serves many more streams than a thread per stream could."""
+    store.store([{'op': 'clear'}])
+    subscriptions = [poller.subscribe(since=0) for _ in range(2000)]
+    store.store([{'op': 'shuffle'}])
+    poller.poll()
+
+    assert store.loads == 2
+    assert poller.feed.subscriber_count == 2000
+    for subscription in subscriptions:
+        assert subscription.get(timeout=0) == ('change', {'version': 1, 'changes': [{'op': 'clear'}]})
+        assert subscription.get(timeout=0) == ('change', {'version': 2, 'changes': [{'op': 'shuffle'}]})
+        subscription.close()
+    assert poller.feed.subscriber_count == 0
+
+def test_poller_wakes_waiting_streams(store, poller):
+    """Test that a local change wakes the poller, which delivers it to every blocked stream."""
+    subscriptions = [poller.subscribe(since=0) for _ in range(100)]
+    received = []
+
+    def follow(subscription):
+        received.append(subscription.get(timeout=5))
+
+    threads = [threading.Thread(target=follow, args=(subscription,)) for subscription in subscriptions]
+    for thread in threads:
+        thread.start()
+    store.store([{'op': 'clear'}])
+    poller._wake.publish(1, [{'op': 'clear'}])
+    for thread in threads:
+        thread.join()
+
+    assert received == [('change', {'version': 1, 'changes': [{'op': 'clear'}]})] * 100
+    assert store.loads == 2
+
+def test_poller_resets_when_changes_are_gone(store, poller):
+    """Test that subscribers are told to reload when the store no longer has the versions they missed."""
+    subscription = poller.subscribe(since=0)
+    for _ in range(3):
+        store.store([])
+    store.kept_from = 3
+    poller.poll()
+
+    assert subscription.get(timeout=0) == ('reset', {'version': 3})
+    assert poller.feed.version == 3
@@ -0,0 +1,15 @@
+import os
+
+from dotenv import dotenv_values
+
+
+ENV_PATH = os.path.join(os.path.dirname(__file__), "..", ".env")
+
+
+def test_env_file_playlist_settings():
+    """Test that the shipped .env file sets each playlist setting on its own line."""
+    values = dotenv_values(ENV_PATH)
+
+    assert values["PLAYLIST_NAME"] == "default"
+    assert values["PLAYLIST_ID_ONLY"] == "false"
+    assert values["PLAYLIST_HISTORY_BYTES"] == "0"
@@ -0,0 +1,77 @@
+import threading
+
+import pytest
+
+from music_collection.utils.job_utils import JobManager
+
+
+@pytest.fixture
+def job_manager():
+    """Fixture to provide a JobManager with one worker and room for two jobs."""
+    return JobManager(max_workers=1, max_jobs=2)
+
+
+def wait_for(job):
+    """Drains the job's progress stream, which ends once the job has finished."""
+    return [event for event in job.stream_events(heartbeat_seconds=0.1) if event is not None]
+
+
+def test_submit_job(job_manager):
+    """Test that a job runs in the background and reports its progress and result."""
+    def run(job):
+        for track_number in (1, 2):
+            job.report(track_number=track_number)
+        return "done"
+
+    job = job_manager.submit("test", run)
+    events = wait_for(job)
+
+    assert events == [{"track_number": 1}, {"track_number": 2}]
+    assert job.status == "succeeded"
+    assert job.to_dict()["result"] == "done"
+    assert job_manager.get_job(job.id) is job
+
+def test_failed_job(job_manager):
+    """Test that an exception marks the job as failed."""
+    def run(job):
+        raise ValueError("Playlist is empty")
+
+    job = job_manager.submit("test", run)
+    wait_for(job)
+
+    assert job.status == "failed"
+    assert job.error == "Playlist is empty"
+
+def test_cancel_job(job_manager):
+    """Test that a running job sees the cancellation request."""
+    started = threading.Event()
+
+    def run(job):
+        started.set()
+        while not job.is_cancelled():
+            job.report(tick=True)
+            started.wait(0.01)
+
+    job = job_manager.submit("test", run)
+    started.wait(1)
+    job_manager.cancel_job(job.id)
+    wait_for(job)
+
+    assert job.status == "cancelled"
+
+def test_job_limit(job_manager):
+    """Test that submitting past the job limit is rejected."""
+    release = threading.Event()
+    jobs = [job_manager.submit("test", lambda job: release.wait(1)) for _ in range(2)]
+
+    with pytest.raises(RuntimeError, match="Too many jobs in progress"):
+        job_manager.submit("test", lambda job: None)
+
+    release.set()
+    for job in jobs:
+        wait_for(job)
+
+def test_get_unknown_job(job_manager):
+    """Test that looking up an unknown job raises an error."""
+    with pytest.raises(ValueError, match="Job missing not found"):
+        job_manager.get_job("missing")
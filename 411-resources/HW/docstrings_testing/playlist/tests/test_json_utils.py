@@ -0,0 +1,54 @@
+import gzip
+import json
+
+import pytest
+
+from music_collection.models.song_model import Song
+from music_collection.utils import json_utils
+from music_collection.utils.json_utils import compress, dumps, join_fragments
+
+
+@pytest.fixture
+def sample_song():
+    return Song(1, 'Artist 1', 'Song 1', 2022, 'Pop', 180)
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps(mocker, sample_song, use_orjson):
+    """Test that both backends encode compact JSON with sorted keys, like jsonify."""
+    if not use_orjson:
+        mocker.patch.object(json_utils, "orjson", None)
+    elif json_utils.orjson is None:
+        pytest.skip("orjson is not installed")
+
+    assert dumps({'song': sample_song, 'a': 1}) == (
+        b'{"a":1,"song":{"artist":"Artist 1","duration":180,"genre":"Pop","id":1,"title":"Song 1","year":2022}}'
+    )
+
+def test_join_fragments():
+    """Test building an object around pre-encoded array items."""
+    body = join_fragments({'status': 'success'}, 'songs', [b'{"id":1}', b'{"id":2}'])
+    assert json.loads(body) == {'status': 'success', 'songs': [{'id': 1}, {'id': 2}]}
+
+def test_join_fragments_no_fields():
+    """Test building an object with only the array."""
+    assert json.loads(join_fragments({}, 'songs', [])) == {'songs': []}
+
+def test_compress_gzip(mocker):
+    """Test that large bodies are gzip-compressed when the client accepts it."""
+    mocker.patch.object(json_utils, "brotli", None)
+    body = b'{"songs":[' + b','.join([b'{"id":1}'] * 500) + b']}'
+
+    compressed, encoding = compress(body, {'gzip', 'br'})
+
+    assert encoding == 'gzip'
+    assert gzip.decompress(compressed) == body
+
+def test_compress_not_accepted():
+    """Test that bodies are left alone when no supported encoding is accepted."""
+    body = b'x' * 2048
+    assert compress(body, {'identity'}) == (body, None)
+
+def test_compress_small_body():
+    """Test that small bodies are not compressed."""
+    assert compress(b'{}', {'gzip'}) == (b'{}', None)
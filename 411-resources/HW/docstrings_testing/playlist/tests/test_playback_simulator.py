@@ -0,0 +1,136 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from music_collection.models.playback_simulator import PlaybackSimulator, run_simulation
+from music_collection.models.playlist_model import PlaylistModel
+from music_collection.models.song_model import Song
+
+
+# 1000 simulated seconds per real second: a 180 second song ends after 0.18 seconds
+TIME_SCALE = 1000
+
+
+@pytest.fixture
+def mock_update_play_counts(mocker):
+    """Mock the batched update_play_counts function used by the simulator."""
+    return mocker.patch("music_collection.models.playback_simulator.update_play_counts", return_value=[])
+
+@pytest.fixture
+def sample_songs():
+    return [
+        Song(1, 'Artist 1', 'Song 1', 2022, 'Pop', 180),
+        Song(2, 'Artist 2', 'Song 2', 2021, 'Rock', 155)
+    ]
+
+@pytest.fixture
+def session_model(sample_songs):
+    """Fixture to provide a playlist of two songs for one simulated listener."""
+    model = PlaylistModel(max_change_events=0)
+    model.add_songs_to_playlist(sample_songs)
+    return model
+
+
+def test_run_plays_due_songs(session_model, mock_update_play_counts):
+    """Test that songs finish after their duration and are written in one batch."""
+    simulator = PlaybackSimulator(time_scale=TIME_SCALE, flush_interval=60)
+    simulator.add_session(session_model)
+
+    # Song 1 ends at 180s, song 2 at 335s and song 1 again at 515s
+    stats = asyncio.run(simulator.run(simulated_seconds=500))
+
+    mock_update_play_counts.assert_called_once_with([1, 2])
+    assert stats["plays"] == 2
+    assert stats["flushed_plays"] == 2
+    assert stats["pending_plays"] == 0
+    assert session_model.current_track_number == 1
+
+def test_run_flushes_in_batches(session_model, mock_update_play_counts):
+    """Test that plays are written once a batch is full."""
+    simulator = PlaybackSimulator(time_scale=TIME_SCALE, flush_size=1, flush_interval=60)
+    simulator.add_session(session_model)
+
+    asyncio.run(simulator.run(simulated_seconds=500))
+
+    assert [call.args[0] for call in mock_update_play_counts.call_args_list] == [[1], [2]]
+
+def test_run_reports_skipped_songs(session_model, mock_update_play_counts):
+    """Test that songs deleted from the catalog are reported in the stats."""
+    mock_update_play_counts.return_value = [2]
+    simulator = PlaybackSimulator(time_scale=TIME_SCALE)
+    simulator.add_session(session_model)
+
+    stats = asyncio.run(simulator.run(simulated_seconds=500))
+
+    assert stats["skipped_ids"] == [2]
+
+def test_run_until_stopped(session_model, mock_update_play_counts):
+    """Test that a run without a time limit ends when stop is called."""
+    simulator = PlaybackSimulator(time_scale=TIME_SCALE)
+    simulator.add_session(session_model)
+
+    async def run():
+        asyncio.get_running_loop().call_later(0.25, simulator.stop)
+        return await simulator.run()
+
+    stats = asyncio.run(run())
+
+    assert stats["plays"] == 1
+    mock_update_play_counts.assert_called_once_with([1])
+
+def test_run_write_error(session_model, mocker):
+    """Test that a failed write is raised and its plays stay pending."""
+    mocker.patch(
+        "music_collection.models.playback_simulator.update_play_counts",
+        side_effect=sqlite3.Error("Database error")
+    )
+    simulator = PlaybackSimulator(time_scale=TIME_SCALE)
+    simulator.add_session(session_model)
+
+    with pytest.raises(sqlite3.Error, match="Database error"):
+        asyncio.run(simulator.run(simulated_seconds=500))
+
+    assert simulator.stats()["pending_plays"] == 2
+
+def test_add_session_empty_playlist():
+    """Test error when adding a session for an empty playlist."""
+    simulator = PlaybackSimulator()
+
+    with pytest.raises(ValueError, match="Playlist is empty"):
+        simulator.add_session(PlaylistModel())
+
+def test_remove_session(session_model, mock_update_play_counts):
+    """Test that a removed session plays nothing."""
+    simulator = PlaybackSimulator(time_scale=TIME_SCALE)
+    session_id = simulator.add_session(session_model)
+
+    simulator.remove_session(session_id)
+    stats = asyncio.run(simulator.run(simulated_seconds=500))
+
+    assert stats["plays"] == 0
+    assert simulator.session_count == 0
+    mock_update_play_counts.assert_not_called()
+
+def test_remove_unknown_session():
+    """Test error when removing a session that is not running."""
+    with pytest.raises(ValueError, match="Playback session 7 not found"):
+        PlaybackSimulator().remove_session(7)
+
+def test_invalid_time_scale():
+    """Test error when the time scale is not positive."""
+    with pytest.raises(ValueError, match="must be positive"):
+        PlaybackSimulator(time_scale=0)
+
+def test_run_simulation(sample_songs, mock_update_play_counts):
+    """Test that each simulated session starts at a different song."""
+    stats = run_simulation(sample_songs, num_sessions=2, simulated_seconds=200, time_scale=TIME_SCALE)
+
+    # Session 1 finishes song 1 at 180s, session 2 finishes song 2 at 155s
+    assert stats["sessions"] == 2
+    assert sorted(mock_update_play_counts.call_args.args[0]) == [1, 2]
+
+def test_run_simulation_without_songs():
+    """Test error when simulating without songs."""
+    with pytest.raises(ValueError, match="without songs"):
+        run_simulation([], num_sessions=1, simulated_seconds=60)
@@ -0,0 +1,131 @@
+import random
+
+import pytest
+
+from music_collection.models.playlist_history import (
+    ENTRY_BYTES,
+    NODE_BYTES,
+    HistorySongList,
+    PlaylistHistory,
+    PlaylistState
+)
+
+
+def height_ok(node):
+    """Checks the AVL invariant and the cached sizes of a subtree, returning its height."""
+    if node is None:
+        return 0
+    left, right = height_ok(node.left), height_ok(node.right)
+    assert abs(left - right) <= 1
+    assert node.size == (node.left.size if node.left else 0) + 1 + (node.right.size if node.right else 0)
+    return max(left, right) + 1
+
+
+##################################################
+# Persistent Sequence Test Cases
+##################################################
+
+def test_history_song_list_matches_list():
+    """Test that random inserts, deletes and sets behave exactly like a list and stay balanced."""
+    rng = random.Random(7)
+    expected = []
+    songs = HistorySongList()
+    for step in range(2000):
+        operation = rng.random()
+        if operation < 0.5 or not expected:
+            index = rng.randint(0, len(expected))
+            expected.insert(index, step)
+            songs.insert(index, step)
+        elif operation < 0.8:
+            index = rng.randrange(len(expected))
+            del expected[index]
+            del songs[index]
+        else:
+            index = rng.randrange(len(expected))
+            expected[index] = step
+            songs[index] = step
+
+    assert list(songs) == expected
+    assert songs[5:40] == expected[5:40]
+    assert songs[-3] == expected[-3]
+    height_ok(songs.root)
+
+def test_changes_share_nodes():
+    """Test that a change allocates O(log n) nodes and leaves the old version intact."""
+    songs = HistorySongList(range(1024))
+    old_root, allocated = songs.root, songs.allocated
+
+    songs.insert(500, 'new')
+
+    assert songs.allocated - allocated <= 4 * 11
+    songs.root, new_root = old_root, songs.root
+    assert list(songs) == list(range(1024))
+    songs.root = new_root
+    assert songs[500] == 'new' and len(songs) == 1025
+
+def test_copy_is_independent():
+    """Test that a copy shares nodes but not later changes."""
+    songs = HistorySongList([1, 2, 3])
+    copied = songs.copy()
+    songs.remove(2)
+
+    assert list(copied) == [1, 2, 3]
+    assert songs == [1, 3]
+
+def test_index_errors():
+    """Test that out of range positions raise IndexError."""
+    songs = HistorySongList([1])
+    with pytest.raises(IndexError):
+        songs[1]
+    with pytest.raises(IndexError):
+        del songs[-2]
+
+def test_find_by_key():
+    """Test that find descends to the position of a key, and raises for a missing one."""
+    songs = HistorySongList(range(0, 200, 2))
+
+    assert [songs.find(key, lambda value: value) for key in (0, 42, 198)] == [0, 21, 99]
+    with pytest.raises(ValueError, match="No song with key 7"):
+        songs.find(7, lambda value: value)
+
+##################################################
+# Undo History Test Cases
+##################################################
+
+def state(track_number):
+    return PlaylistState(root=None, current_track_number=track_number, shuffle_order=None, shuffle_cursor=0)
+
+def test_undo_redo():
+    """Test stepping back and forth through recorded states."""
+    history = PlaylistHistory(max_bytes=10 ** 6)
+    history.record(state(1), allocated_nodes=3)
+
+    assert history.undo(state(2)) == state(1)
+    assert history.redo(state(1)) == state(2)
+    assert history.can_undo and not history.can_redo
+
+def test_record_drops_redo():
+    """Test that a new change makes undone changes unreachable."""
+    history = PlaylistHistory(max_bytes=10 ** 6)
+    history.record(state(1), allocated_nodes=3)
+    history.undo(state(2))
+    history.record(state(1), allocated_nodes=3)
+
+    assert not history.can_redo
+    assert history.bytes_used == 3 * NODE_BYTES + ENTRY_BYTES
+
+def test_budget_drops_oldest_entries():
+    """Test that the oldest undo entries are dropped to stay within the byte budget."""
+    history = PlaylistHistory(max_bytes=2 * (10 * NODE_BYTES + ENTRY_BYTES))
+    for track_number in range(1, 4):
+        history.record(state(track_number), allocated_nodes=10)
+
+    assert history.undo(state(4)) == state(3)
+    assert history.undo(state(3)) == state(2)
+    with pytest.raises(ValueError, match="Nothing to undo"):
+        history.undo(state(2))
+
+def test_nothing_to_redo():
+    """Test error when there is nothing to redo."""
+    with pytest.raises(ValueError, match="Nothing to redo"):
+        PlaylistHistory(max_bytes=1000).redo(state(1))
@@ -0,0 +1,153 @@
+import pytest
+
+from music_collection.models.playlist_io import (
+    export_m3u,
+    export_ndjson,
+    import_songs,
+    iter_playlist_songs,
+    parse_m3u,
+    parse_ndjson
+)
+from music_collection.models.playlist_model import PlaylistModel
+from music_collection.models.song_model import Song
+
+
+@pytest.fixture()
+def playlist_model():
+    """Fixture to provide a new instance of PlaylistModel for each test."""
+    return PlaylistModel()
+
+"""Fixtures providing sample songs for the tests."""
+@pytest.fixture
+def sample_song1():
+    return Song(1, 'AC/DC', 'Back in Black', 1980, 'Rock', 255)
+
+@pytest.fixture
+def sample_song2():
+    return Song(2, 'Artist 2', 'Song 2', 2021, 'Pop', 155)
+
+@pytest.fixture
+def mock_get_songs_by_compound_keys(mocker, sample_song1, sample_song2):
+    """Mock the catalog lookup: song 1 exists, song 2 has been deleted."""
+    catalog = {
+        (sample_song1.artist, sample_song1.title, sample_song1.year): sample_song1,
+        (sample_song2.artist, sample_song2.title, sample_song2.year): None
+    }
+    return mocker.patch(
+        "music_collection.models.playlist_io.get_songs_by_compound_keys",
+        side_effect=lambda keys: {key: catalog[key] for key in keys if key in catalog}
+    )
+
+
+##################################################
+# Export Test Cases
+##################################################
+
+def test_iter_playlist_songs(playlist_model, sample_song1, sample_song2):
+    """Test reading a playlist one page at a time."""
+    playlist_model.add_songs_to_playlist([sample_song1, sample_song2])
+    assert list(iter_playlist_songs(playlist_model, page_size=1)) == [sample_song1, sample_song2]
+
+def test_iter_playlist_songs_empty(playlist_model):
+    """Test that an empty playlist yields no songs."""
+    assert list(iter_playlist_songs(playlist_model)) == []
+
+def test_iter_stored_playlist_songs(mocker, sample_song1, sample_song2):
+    """Test that a playlist given by name is paged from the store with a keyset cursor."""
+    mock_load_page = mocker.patch(
+        "music_collection.models.playlist_io.load_playlist_page",
+        side_effect=[[(sample_song1, 1024.0)], [(sample_song2, 2048.0)], []]
+    )
+
+    assert list(iter_playlist_songs("road trip", page_size=1)) == [sample_song1, sample_song2]
+    assert [call.args for call in mock_load_page.call_args_list] == [
+        ("road trip", None, 1),
+        ("road trip", (1024.0, 1), 1),
+        ("road trip", (2048.0, 2), 1)
+    ]
+
+def test_iter_stored_playlist_songs_last_page(mocker, sample_song1):
+    """Test that a short page ends the export without another query."""
+    mock_load_page = mocker.patch(
+        "music_collection.models.playlist_io.load_playlist_page",
+        return_value=[(sample_song1, 1024.0)]
+    )
+
+    assert list(iter_playlist_songs("road trip", page_size=2)) == [sample_song1]
+    mock_load_page.assert_called_once()
+
+def test_export_ndjson(sample_song1):
+    """Test exporting songs as one JSON object per line."""
+    assert list(export_ndjson([sample_song1])) == [
+        '{"id": 1, "artist": "AC/DC", "title": "Back in Black", "year": 1980, "genre": "Rock", "duration": 255}\n'
+    ]
+
+def test_export_m3u(sample_song1):
+    """Test exporting songs as extended M3U with encoded locations."""
+    assert list(export_m3u([sample_song1])) == [
+        "#EXTM3U\n",
+        "#EXTINF:255,AC/DC - Back in Black\n",
+        "AC%2FDC/1980/Back%20in%20Black\n"
+    ]
+
+##################################################
+# Import Test Cases
+##################################################
+
+def test_parse_m3u_round_trip(sample_song1):
+    """Test that exported M3U parses back into the compound key."""
+    assert list(parse_m3u(export_m3u([sample_song1]))) == [(3, ('AC/DC', 'Back in Black', 1980))]
+
+def test_parse_m3u_invalid_location():
+    """Test that a location without a year is reported as an error."""
+    assert list(parse_m3u(["#EXTM3U\n", "\n", "song.mp3\n"])) == [(3, "Expected a location of the form artist/year/title")]
+
+def test_parse_ndjson():
+    """Test parsing NDJSON lines, reporting invalid ones."""
+    lines = [
+        '{"artist": "Artist 1", "title": "Song 1", "year": 2020}\n',
+        '\n',
+        'not json\n',
+        '{"artist": "Artist 1", "title": "Song 1"}\n',
+        '[1, 2]\n'
+    ]
+    assert list(parse_ndjson(lines)) == [
+        (1, ('Artist 1', 'Song 1', 2020)),
+        (3, "Invalid JSON"),
+        (4, "Missing or invalid artist, title or year"),
+        (5, "Expected a JSON object")
+    ]
+
+def test_import_songs(playlist_model, mock_get_songs_by_compound_keys, sample_song1):
+    """Test importing songs with a per-line error report."""
+    entries = [
+        (1, ('AC/DC', 'Back in Black', 1980)),
+        (2, "Invalid JSON"),
+        (3, ('Artist 2', 'Song 2', 2021)),
+        (4, ('Unknown', 'Song', 1999)),
+        (5, ('AC/DC', 'Back in Black', 1980))
+    ]
+
+    report = import_songs(playlist_model, entries, chunk_size=2)
+
+    assert playlist_model.playlist == [sample_song1]
+    assert report == {
+        'imported': 1,
+        'error_count': 4,
+        'errors': [
+            {'line': 2, 'error': "Invalid JSON"},
+            {'line': 3, 'error': "Song has been deleted"},
+            {'line': 4, 'error': "Song not found in catalog"},
+            {'line': 5, 'error': "Song is already in the playlist"}
+        ]
+    }
+    assert mock_get_songs_by_compound_keys.call_count == 3
+
+def test_import_songs_caps_reported_errors(mocker, playlist_model, mock_get_songs_by_compound_keys):
+    """Test that only the first errors are listed but all are counted."""
+    mocker.patch("music_collection.models.playlist_io.MAX_REPORTED_ERRORS", 2)
+
+    report = import_songs(playlist_model, [(line_number, "Invalid JSON") for line_number in range(1, 6)])
+
+    assert report['error_count'] == 5
+    assert [error['line'] for error in report['errors']] == [1, 2]
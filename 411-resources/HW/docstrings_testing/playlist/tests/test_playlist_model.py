@@ -1,6 +1,10 @@
+import random
+from unittest.mock import ANY
+
 import pytest
 
 from music_collection.models.playlist_model import PlaylistModel
+from music_collection.models.song_cache import SongCache
 from music_collection.models.song_model import Song
 
 
@@ -14,6 +18,11 @@ def mock_update_play_count(mocker):
     """Mock the update_play_count function for testing purposes."""
     return mocker.patch("music_collection.models.playlist_model.update_play_count")
 
+@pytest.fixture
+def mock_update_play_counts(mocker):
+    """Mock the batched update_play_counts function for testing purposes."""
+    return mocker.patch("music_collection.models.playlist_model.update_play_counts", return_value=[])
+
 """Fixtures providing sample songs for the tests."""
 @pytest.fixture
 def sample_song1():
@@ -44,6 +53,22 @@ def test_add_duplicate_song_to_playlist(playlist_model, sample_song1):
     with pytest.raises(ValueError, match="Song with ID 1 already exists in the playlist"):
         playlist_model.add_song_to_playlist(sample_song1)
 
+def test_add_songs_to_playlist(playlist_model, sample_song1, sample_song2):
+    """Test adding many songs at once, skipping duplicates."""
+    playlist_model.add_song_to_playlist(sample_song1)
+
+    added = playlist_model.add_songs_to_playlist([sample_song2, sample_song1, sample_song2])
+
+    assert added == [True, False, False]
+    assert [song.id for song in playlist_model.playlist] == [1, 2]
+
+def test_add_songs_to_playlist_invalid_song(playlist_model, sample_song1):
+    """Test that an invalid song rejects the whole bulk add."""
+    with pytest.raises(TypeError, match="Song is not a valid song"):
+        playlist_model.add_songs_to_playlist([sample_song1, "not a song"])
+
+    assert len(playlist_model.playlist) == 0
+
 ##################################################
 # Remove Song Management Test Cases
 ##################################################
@@ -146,6 +171,18 @@ def test_get_all_songs(playlist_model, sample_playlist):
     assert all_songs[0].id == 1
     assert all_songs[1].id == 2
 
+def test_get_all_songs_page(playlist_model, sample_playlist):
+    """Test retrieving one page of songs from the playlist."""
+    playlist_model.playlist.extend(sample_playlist)
+    assert playlist_model.get_all_songs(offset=1, limit=5) == [sample_playlist[1]]
+    assert playlist_model.get_all_songs(limit=1) == [sample_playlist[0]]
+
+def test_get_all_songs_invalid_page(playlist_model, sample_playlist):
+    """Test error when the page offset is negative."""
+    playlist_model.playlist.extend(sample_playlist)
+    with pytest.raises(ValueError, match="Invalid page"):
+        playlist_model.get_all_songs(offset=-1)
+
 def test_get_song_by_song_id(playlist_model, sample_song1):
     """Test successfully retrieving a song from the playlist by song ID."""
     playlist_model.add_song_to_playlist(sample_song1)
@@ -268,6 +305,23 @@ def test_play_current_song(playlist_model, sample_playlist, mock_update_play_cou
     # Assert that update_play_count was called with the id of the second song
     mock_update_play_count.assert_called_with(2)
 
+def test_advance_track(playlist_model, sample_playlist, mock_update_play_count):
+    """Test that advancing finishes the current song without touching its play count."""
+    playlist_model.playlist.extend(sample_playlist)
+
+    finished_song, current_song = playlist_model.advance_track()
+
+    assert finished_song.id == 1
+    assert current_song.id == 2
+    assert playlist_model.current_track_number == 2
+    assert playlist_model.version == 1
+    mock_update_play_count.assert_not_called()
+
+def test_advance_track_empty_playlist(playlist_model):
+    """Test error when advancing an empty playlist."""
+    with pytest.raises(ValueError, match="Playlist is empty"):
+        playlist_model.advance_track()
+
 def test_rewind_playlist(playlist_model, sample_playlist):
     """Test rewinding the iterator to the beginning of the playlist."""
     playlist_model.playlist.extend(sample_playlist)
@@ -283,21 +337,20 @@ def test_go_to_track_number(playlist_model, sample_playlist):
     playlist_model.go_to_track_number(2)
     assert playlist_model.current_track_number == 2, "Expected to be at track 2 after moving song"
 
-def test_play_entire_playlist(playlist_model, sample_playlist, mock_update_play_count):
+def test_play_entire_playlist(playlist_model, sample_playlist, mock_update_play_counts):
     """Test playing the entire playlist."""
     playlist_model.playlist.extend(sample_playlist)
 
-    playlist_model.play_entire_playlist()
+    skipped_ids = playlist_model.play_entire_playlist()
 
-    # Check that all play counts were updated
-    mock_update_play_count.assert_any_call(1)
-    mock_update_play_count.assert_any_call(2)
-    assert mock_update_play_count.call_count == len(playlist_model.playlist)
+    # Check that all play counts were updated in one batch
+    mock_update_play_counts.assert_called_once_with([1, 2])
+    assert skipped_ids == []
 
     # Check that the current track number was updated back to the first song
     assert playlist_model.current_track_number == 1, "Expected to loop back to the beginning of the playlist"
 
-def test_play_rest_of_playlist(playlist_model, sample_playlist, mock_update_play_count):
+def test_play_rest_of_playlist(playlist_model, sample_playlist, mock_update_play_counts):
     """Test playing from the current position to the end of the playlist."""
     playlist_model.playlist.extend(sample_playlist)
     playlist_model.current_track_number = 2
@@ -305,7 +358,654 @@ def test_play_rest_of_playlist(playlist_model, sample_playlist, mock_update_play
     playlist_model.play_rest_of_playlist()
 
     # Check that play counts were updated for the remaining songs
-    mock_update_play_count.assert_any_call(2)
-    assert mock_update_play_count.call_count == 1
+    mock_update_play_counts.assert_called_once_with([2])
+
+    assert playlist_model.current_track_number == 1, "Expected to loop back to the beginning of the playlist"
+
+def test_play_entire_playlist_reports_deleted_songs(playlist_model, sample_playlist, mock_update_play_counts):
+    """Test that songs deleted mid-playlist are reported instead of aborting playback."""
+    playlist_model.playlist.extend(sample_playlist)
+    mock_update_play_counts.return_value = [1]
+
+    skipped_ids = playlist_model.play_entire_playlist()
+
+    assert skipped_ids == [1]
+    assert playlist_model.current_track_number == 1, "Expected to loop back to the beginning of the playlist"
+
+def test_play_entire_playlist_reports_progress(playlist_model, sample_playlist, mock_update_play_counts, mocker):
+    """Test that playback reports every track and commits in batches when progress is requested."""
+    mocker.patch("music_collection.models.playlist_model.PLAYBACK_BATCH_SIZE", 1)
+    playlist_model.playlist.extend(sample_playlist)
+    progress = []
+
+    playlist_model.play_entire_playlist(on_track=lambda track_number, song, played: progress.append((track_number, song.id, played)))
+
+    assert progress == [(1, 1, True), (2, 2, True)]
+    assert mock_update_play_counts.call_count == 2
+
+def test_play_entire_playlist_cancelled(playlist_model, sample_playlist, mock_update_play_counts, mocker):
+    """Test that cancelled playback stops between batches at the next unplayed track."""
+    mocker.patch("music_collection.models.playlist_model.PLAYBACK_BATCH_SIZE", 1)
+    playlist_model.playlist.extend(sample_playlist)
+    progress = []
+
+    playlist_model.play_entire_playlist(on_track=lambda *args: progress.append(args), is_cancelled=lambda: len(progress) == 1)
+
+    mock_update_play_counts.assert_called_once_with([1])
+    assert playlist_model.current_track_number == 2, "Expected playback to stop before track 2"
+
+##################################################
+# Shuffle Test Cases
+##################################################
+
+@pytest.fixture
+def shuffled_playlist_model(playlist_model, mocker):
+    """Fixture to provide a shuffled playlist of five songs with a fixed shuffle order."""
+    for song_id in range(1, 6):
+        playlist_model.add_song_to_playlist(Song(song_id, f'Artist {song_id}', f'Song {song_id}', 2020, 'Pop', 100))
+    # Fisher-Yates over positions 1-4 swaps position 4 with 1 and leaves 3 and 2 in place
+    mocker.patch("music_collection.models.playlist_model.get_random_batch", return_value=[4, 2, 1])
+    playlist_model.enable_shuffle()
+    return playlist_model
+
+def test_enable_shuffle(shuffled_playlist_model):
+    """Test that shuffling keeps the current track first and draws all randomness in one batch."""
+    assert list(shuffled_playlist_model.shuffle_order) == [0, 4, 2, 3, 1]
+    assert shuffled_playlist_model.current_track_number == 1
+
+def test_enable_shuffle_single_draw(playlist_model, sample_playlist, mocker):
+    """Test that one batched draw covers the whole shuffle."""
+    mock_random_batch = mocker.patch("music_collection.models.playlist_model.get_random_batch", return_value=[])
+    playlist_model.playlist.extend(sample_playlist)
+
+    playlist_model.enable_shuffle()
+
+    mock_random_batch.assert_not_called()
+    assert list(playlist_model.shuffle_order) == [0, 1]
+
+def test_play_current_song_shuffled(shuffled_playlist_model, mock_update_play_count):
+    """Test that playback follows the shuffle order."""
+    shuffled_playlist_model.play_current_song()
+    shuffled_playlist_model.play_current_song()
+
+    assert [call.args[0] for call in mock_update_play_count.call_args_list] == [1, 5]
+    assert shuffled_playlist_model.current_track_number == 3
+
+def test_play_rest_of_playlist_shuffled(shuffled_playlist_model, mock_update_play_counts):
+    """Test that the rest of the playlist is played in shuffle order."""
+    shuffled_playlist_model.go_to_track_number(3)
+
+    shuffled_playlist_model.play_rest_of_playlist()
+
+    mock_update_play_counts.assert_called_once_with([3, 4, 2])
+    assert shuffled_playlist_model.current_track_number == 1
+
+def test_get_remaining_track_count(playlist_model, sample_playlist):
+    """Test that the tracks left run from the current track to the end of the playlist."""
+    playlist_model.playlist.extend(sample_playlist)
+    playlist_model.current_track_number = 2
+
+    assert playlist_model.get_remaining_track_count() == 1
+
+def test_get_remaining_track_count_shuffled(shuffled_playlist_model):
+    """Test that in shuffle mode the tracks left run to the end of the shuffle order, not the playlist."""
+    # Track 2 is last in the shuffle order [0, 4, 2, 3, 1] but second in the playlist
+    shuffled_playlist_model.go_to_track_number(2)
+    assert shuffled_playlist_model.get_remaining_track_count() == 1
+
+    shuffled_playlist_model.go_to_track_number(5)
+    assert shuffled_playlist_model.get_remaining_track_count() == 4
+
+def test_shuffle_remove_song(shuffled_playlist_model):
+    """Test that removing a song drops it from the shuffle order without reshuffling."""
+    shuffled_playlist_model.remove_song_by_song_id(3)
+
+    assert list(shuffled_playlist_model.shuffle_order) == [0, 3, 2, 1]
+
+def test_shuffle_add_song(shuffled_playlist_model, mocker):
+    """Test that an added song takes a random unplayed slot, whose song moves to the end of the order."""
+    mocker.patch("music_collection.models.playlist_model.random.randint", return_value=2)
+
+    shuffled_playlist_model.add_song_to_playlist(Song(6, 'Artist 6', 'Song 6', 2020, 'Pop', 100))
+
+    assert list(shuffled_playlist_model.shuffle_order) == [0, 4, 5, 3, 1, 2]
+
+def test_shuffle_move_song(shuffled_playlist_model):
+    """Test that moving a song keeps the shuffle order pointing at the same songs."""
+    songs_in_order = [shuffled_playlist_model.playlist[index].id for index in shuffled_playlist_model.shuffle_order]
+
+    shuffled_playlist_model.move_song_to_beginning(5)
+    shuffled_playlist_model.swap_songs_in_playlist(1, 2)
+
+    assert [shuffled_playlist_model.playlist[index].id for index in shuffled_playlist_model.shuffle_order] == songs_in_order
+    assert shuffled_playlist_model.get_current_song().id == 1
+
+def test_shuffle_slots_follow_changes(shuffled_playlist_model):
+    """Test that the slot of every track stays the inverse of the shuffle order through changes."""
+    rng = random.Random(7)
+    for song_id in range(6, 40):
+        shuffled_playlist_model.add_song_to_playlist(Song(song_id, f'Artist {song_id}', f'Song {song_id}', 2020, 'Pop', 100))
+    songs_in_order = [shuffled_playlist_model.playlist[index].id for index in shuffled_playlist_model.shuffle_order]
+
+    for _ in range(50):
+        length = shuffled_playlist_model.get_playlist_length()
+        song_id = shuffled_playlist_model.playlist[rng.randrange(length)].id
+        track_number = rng.randint(1, length)
+        shuffled_playlist_model.move_song_to_track_number(song_id, track_number)
+        other_song_id = shuffled_playlist_model.playlist[length - track_number].id
+        if other_song_id != song_id:
+            shuffled_playlist_model.swap_songs_in_playlist(song_id, other_song_id)
+    for song_id in songs_in_order[::3]:
+        shuffled_playlist_model.remove_song_by_song_id(song_id)
+        songs_in_order.remove(song_id)
+    shuffled_playlist_model.go_to_track_number(4)
+
+    order = shuffled_playlist_model.shuffle_order
+    assert [shuffled_playlist_model.playlist[index].id for index in order] == songs_in_order
+    assert [order[slot] for slot in shuffled_playlist_model._shuffle_slots] == list(range(len(order)))
+    assert order[shuffled_playlist_model._shuffle_cursor] == 3
+
+def test_disable_shuffle(shuffled_playlist_model, mock_update_play_count):
+    """Test that turning shuffle off returns to track order."""
+    shuffled_playlist_model.disable_shuffle()
+    shuffled_playlist_model.play_current_song()
+
+    assert shuffled_playlist_model.shuffle_order is None
+    assert shuffled_playlist_model.current_track_number == 2
+
+##################################################
+# Batch Test Cases
+##################################################
+
+def test_apply_batch(playlist_model, sample_song1, sample_song2):
+    """Test applying several operations as one batch."""
+    sample_song3 = Song(3, 'Artist 3', 'Song 3', 2020, 'Jazz', 200)
+    playlist_model.add_song_to_playlist(sample_song1)
+
+    version = playlist_model.apply_batch([
+        {'op': 'add', 'song': sample_song2},
+        {'op': 'add', 'song': sample_song3},
+        {'op': 'move', 'song': sample_song3, 'track_number': 1},
+        {'op': 'swap', 'track_number_1': 2, 'track_number_2': 3},
+        {'op': 'remove', 'track_number': 3},
+        {'op': 'go_to_track', 'track_number': 2}
+    ])
+
+    assert [song.id for song in playlist_model.playlist] == [3, 2]
+    assert playlist_model.current_track_number == 2
+    assert version == 2, "Expected the batch to bump the version once"
+
+def test_apply_batch_rolls_back(playlist_model, sample_song1, sample_song2):
+    """Test that a failing operation leaves the playlist unchanged."""
+    playlist_model.add_song_to_playlist(sample_song1)
+
+    with pytest.raises(ValueError, match="Operation 2 \\(go_to_track\\) failed: Invalid track number: 5"):
+        playlist_model.apply_batch([
+            {'op': 'add', 'song': sample_song2},
+            {'op': 'go_to_track', 'track_number': 5}
+        ])
+
+    assert [song.id for song in playlist_model.playlist] == [1]
+    assert playlist_model.version == 1
+
+def test_apply_batch_unknown_operation(playlist_model):
+    """Test that an unknown operation is rejected."""
+    with pytest.raises(ValueError, match="Unknown playlist operation: shuffle"):
+        playlist_model.apply_batch([{'op': 'shuffle'}])
+
+def test_apply_batch_stores_once(stored_playlist_model, mock_save_playlist_changes, sample_song1, sample_song2):
+    """Test that a named playlist stores the whole batch in one write."""
+    stored_playlist_model.add_song_to_playlist(sample_song1)
+    mock_save_playlist_changes.reset_mock()
+
+    stored_playlist_model.apply_batch([
+        {'op': 'add', 'song': sample_song2},
+        {'op': 'remove', 'song': sample_song1}
+    ])
+
+    mock_save_playlist_changes.assert_called_once_with("default", [(2, 2048.0)], [1], 1, 2, clear=False, changes=ANY)
+
+##################################################
+# Persistence Test Cases
+##################################################
+
+@pytest.fixture
+def mock_save_playlist_changes(mocker):
+    """Mock the save_playlist_changes function, and the stored version it leaves behind."""
+    stored_versions = {}
+
+    def save_playlist_changes(name, upserts, deletes, current_track_number, version, clear=False, changes=None):
+        stored_versions[name] = version
+        return True
+
+    mocker.patch(
+        "music_collection.models.playlist_model.get_playlist_version",
+        side_effect=lambda name: stored_versions.get(name, 0)
+    )
+    return mocker.patch("music_collection.models.playlist_model.save_playlist_changes", side_effect=save_playlist_changes)
+
+@pytest.fixture
+def stored_playlist_model(mocker, mock_save_playlist_changes):
+    """Fixture to provide a named PlaylistModel restored from an empty store."""
+    mocker.patch("music_collection.models.playlist_model.load_playlist", return_value=([], 1, 0))
+    return PlaylistModel(name="default")
+
+def test_restore_playlist(mocker, sample_song1, sample_song2):
+    """Test that a named playlist is restored from the store on creation."""
+    mocker.patch(
+        "music_collection.models.playlist_model.load_playlist",
+        return_value=([(sample_song2, 512.0), (sample_song1, 1024.0)], 2, 9)
+    )
+
+    playlist_model = PlaylistModel(name="default")
+
+    assert [song.id for song in playlist_model.playlist] == [2, 1]
+    assert playlist_model.current_track_number == 2
+    assert playlist_model.version == 9
+
+def test_add_song_writes_one_row(stored_playlist_model, mock_save_playlist_changes, sample_song1, sample_song2):
+    """Test that appending a song stores only that song's sort key."""
+    stored_playlist_model.add_song_to_playlist(sample_song1)
+    stored_playlist_model.add_song_to_playlist(sample_song2)
+
+    mock_save_playlist_changes.assert_called_with("default", [(2, 2048.0)], [], 1, 2, clear=False, changes=ANY)
+
+def test_move_song_writes_one_row(stored_playlist_model, mock_save_playlist_changes, sample_song1, sample_song2):
+    """Test that moving a song gives it the midpoint key and stores only that row."""
+    sample_song3 = Song(3, 'Artist 3', 'Song 3', 2020, 'Jazz', 200)
+    for song in (sample_song1, sample_song2, sample_song3):
+        stored_playlist_model.add_song_to_playlist(song)
+
+    stored_playlist_model.move_song_to_track_number(3, 2)
+
+    assert [song.id for song in stored_playlist_model.playlist] == [1, 3, 2]
+    mock_save_playlist_changes.assert_called_with("default", [(3, 1536.0)], [], 1, 4, clear=False, changes=ANY)
+
+def test_move_song_respaces_when_gap_exhausted(stored_playlist_model, mock_save_playlist_changes, sample_song1, sample_song2):
+    """Test that the playlist is respaced once neighbouring sort keys run out of room."""
+    stored_playlist_model.add_song_to_playlist(sample_song1)
+    stored_playlist_model.add_song_to_playlist(sample_song2)
+    stored_playlist_model._sort_keys[2] = stored_playlist_model._sort_keys[1]
+
+    sample_song3 = Song(3, 'Artist 3', 'Song 3', 2020, 'Jazz', 200)
+    stored_playlist_model.add_song_to_playlist(sample_song3)
+    stored_playlist_model.move_song_to_track_number(3, 2)
+
+    upserts = mock_save_playlist_changes.call_args[0][1]
+    assert upserts == [(1, 1024.0), (3, 2048.0), (2, 3072.0)]
+
+def test_add_songs_stores_once(stored_playlist_model, mock_save_playlist_changes, sample_song1, sample_song2):
+    """Test that a bulk add stores all new songs in one write."""
+    stored_playlist_model.add_songs_to_playlist([sample_song1, sample_song2])
+
+    mock_save_playlist_changes.assert_called_once_with("default", [(1, 1024.0), (2, 2048.0)], [], 1, 1, clear=False, changes=ANY)
+
+def test_add_songs_stored_playlist_skips_duplicates(stored_playlist_model, mocker, sample_song1, sample_song2):
+    """Test that a stored playlist finds duplicates through its sort keys without listing its songs."""
+    stored_playlist_model.add_songs_to_playlist([sample_song1])
+    song_ids_spy = mocker.spy(stored_playlist_model, "_song_ids")
+
+    assert stored_playlist_model.add_songs_to_playlist([sample_song1, sample_song2, sample_song2]) == [False, True, False]
+    song_ids_spy.assert_not_called()
+
+def test_add_no_new_songs_is_not_stored(stored_playlist_model, mock_save_playlist_changes, sample_song1):
+    """Test that adding only duplicates, or nothing, changes neither the version nor the store."""
+    stored_playlist_model.add_songs_to_playlist([sample_song1])
+    mock_save_playlist_changes.reset_mock()
+
+    assert stored_playlist_model.add_songs_to_playlist([sample_song1]) == [False]
+    assert stored_playlist_model.add_songs_to_playlist([]) == []
+
+    mock_save_playlist_changes.assert_not_called()
+    assert stored_playlist_model.version == 1
+    assert stored_playlist_model.changes.version == 1
+
+def test_add_songs_only_if_empty(playlist_model, sample_song1, sample_song2):
+    """Test that only_if_empty refuses to add songs to a playlist that already has some."""
+    playlist_model.add_songs_to_playlist([sample_song1], only_if_empty=True)
+
+    with pytest.raises(ValueError, match="already has songs"):
+        playlist_model.add_songs_to_playlist([sample_song2], only_if_empty=True)
+    assert [song.id for song in playlist_model.playlist] == [1]
+
+def test_remove_song_deletes_one_row(stored_playlist_model, mock_save_playlist_changes, sample_song1, sample_song2):
+    """Test that removing a song deletes only that song's row."""
+    stored_playlist_model.add_song_to_playlist(sample_song1)
+    stored_playlist_model.add_song_to_playlist(sample_song2)
+
+    stored_playlist_model.remove_song_by_track_number(1)
+
+    mock_save_playlist_changes.assert_called_with("default", [], [1], 1, 3, clear=False, changes=ANY)
+
+def test_changes_are_stored_with_version(stored_playlist_model, mock_save_playlist_changes, sample_song1, sample_song2):
+    """Test that the changes of a version, including the current track, are stored with it."""
+    stored_playlist_model.add_songs_to_playlist([sample_song1, sample_song2])
+    stored_playlist_model.go_to_track_number(2)
+
+    assert mock_save_playlist_changes.call_args.kwargs['changes'] == [{'op': 'current_track', 'track_number': 2}]
+    assert stored_playlist_model.changes.changes_since(1) == [
+        {'version': 2, 'changes': [{'op': 'current_track', 'track_number': 2}]}
+    ]
+
+def test_stale_playlist_reloads_before_change(stored_playlist_model, mocker, sample_song1, sample_song2):
+    """Test that a change starts from the stored playlist when another process has changed it."""
+    mocker.patch("music_collection.models.playlist_model.get_playlist_version", return_value=4)
+    mock_load = mocker.patch(
+        "music_collection.models.playlist_model.load_playlist",
+        return_value=([(sample_song1, 1024.0)], 1, 4)
+    )
+
+    stored_playlist_model.add_song_to_playlist(sample_song2)
+
+    mock_load.assert_called_once_with("default")
+    assert [song.id for song in stored_playlist_model.playlist] == [1, 2]
+    assert stored_playlist_model.version == 5
+
+def test_conflicting_write_reloads(stored_playlist_model, mock_save_playlist_changes, mocker, sample_song1, sample_song2):
+    """Test that a change is dropped and the playlist reloaded when another process stored first."""
+    mock_save_playlist_changes.side_effect = None
+    mock_save_playlist_changes.return_value = False
+    mocker.patch(
+        "music_collection.models.playlist_model.load_playlist",
+        return_value=([(sample_song2, 1024.0)], 1, 1)
+    )
+
+    with pytest.raises(RuntimeError, match="changed by another process"):
+        stored_playlist_model.add_song_to_playlist(sample_song1)
+
+    assert [song.id for song in stored_playlist_model.playlist] == [2]
+    assert stored_playlist_model.version == 1
+
+def test_unnamed_playlist_is_not_stored(playlist_model, mock_save_playlist_changes, sample_song1):
+    """Test that an unnamed playlist never touches the store."""
+    playlist_model.add_song_to_playlist(sample_song1)
+
+    mock_save_playlist_changes.assert_not_called()
+    assert playlist_model.version == 1
+
+##################################################
+# Id-only Mode Test Cases
+##################################################
+
+@pytest.fixture
+def id_only_playlist_model(mocker):
+    """Fixture to provide an id-only PlaylistModel backed by its own song cache."""
+    mocker.patch("music_collection.models.song_cache.song_cache", SongCache())
+    return PlaylistModel(id_only=True)
+
+def test_id_only_stores_ids(id_only_playlist_model, sample_song1, sample_song2):
+    """Test that an id-only playlist keeps only song IDs and hydrates songs on access."""
+    id_only_playlist_model.add_songs_to_playlist([sample_song1, sample_song2])
+
+    assert id_only_playlist_model.playlist.ids.tolist() == [1, 2]
+    assert id_only_playlist_model.playlist.ids.itemsize == 8
+    assert id_only_playlist_model.get_song_by_track_number(2) == sample_song2
+    assert id_only_playlist_model.get_all_songs() == [sample_song1, sample_song2]
+
+def test_id_only_mutations(id_only_playlist_model, sample_song1, sample_song2):
+    """Test that moves, swaps and removals work on song IDs."""
+    sample_song3 = Song(3, 'Artist 3', 'Song 3', 2020, 'Jazz', 200)
+    id_only_playlist_model.add_songs_to_playlist([sample_song1, sample_song2, sample_song3])
+
+    id_only_playlist_model.move_song_to_beginning(3)
+    id_only_playlist_model.swap_songs_in_playlist(1, 2)
+    id_only_playlist_model.remove_song_by_track_number(1)
+
+    assert id_only_playlist_model.playlist.ids.tolist() == [2, 1]
+    assert id_only_playlist_model.get_playlist_duration() == 335
+
+def test_id_only_page_hydrates_in_one_lookup(mocker, id_only_playlist_model, sample_song1, sample_song2):
+    """Test that a page of songs missing from the cache is hydrated with one catalog lookup."""
+    id_only_playlist_model.add_songs_to_playlist([sample_song1, sample_song2])
+    id_only_playlist_model.playlist._cache.clear()
+    mock_get_songs_by_ids = mocker.patch(
+        "music_collection.models.song_cache.get_songs_by_ids",
+        return_value={1: sample_song1, 2: sample_song2}
+    )
+
+    assert id_only_playlist_model.get_all_songs(offset=0, limit=2) == [sample_song1, sample_song2]
+    mock_get_songs_by_ids.assert_called_once_with([1, 2], include_deleted=True)
+
+def test_id_only_batch_rollback(id_only_playlist_model, sample_song1, sample_song2):
+    """Test that a failed batch restores the id-only playlist."""
+    id_only_playlist_model.add_song_to_playlist(sample_song1)
+
+    with pytest.raises(ValueError):
+        id_only_playlist_model.apply_batch([{'op': 'add', 'song': sample_song2}, {'op': 'add', 'song': sample_song1}])
+
+    assert id_only_playlist_model.playlist.ids.tolist() == [1]
+
+##################################################
+# Change Feed Test Cases
+##################################################
+
+def test_changes_published_per_version(playlist_model, sample_song1, sample_song2):
+    """Test that each mutation publishes its compact changes under the new version."""
+    playlist_model.add_songs_to_playlist([sample_song1, sample_song2])
+    playlist_model.swap_songs_in_playlist(1, 2)
+    playlist_model.go_to_track_number(2)
+    playlist_model.remove_song_by_song_id(1)
+
+    assert playlist_model.changes.changes_since(0) == [
+        {'version': 1, 'changes': [
+            {'op': 'add', 'track_number': 1, 'song': {'id': 1, 'artist': 'Artist 1', 'title': 'Song 1', 'year': 2022, 'genre': 'Pop', 'duration': 180}},
+            {'op': 'add', 'track_number': 2, 'song': {'id': 2, 'artist': 'Artist 2', 'title': 'Song 2', 'year': 2021, 'genre': 'Rock', 'duration': 155}}
+        ]},
+        {'version': 2, 'changes': [
+            {'op': 'move', 'song_id': 1, 'track_number': 2},
+            {'op': 'move', 'song_id': 2, 'track_number': 1}
+        ]},
+        {'version': 3, 'changes': [{'op': 'current_track', 'track_number': 2}]},
+        {'version': 4, 'changes': [{'op': 'remove', 'song_id': 1}]}
+    ]
+
+def test_batch_changes_published_once(playlist_model, sample_song1, sample_song2):
+    """Test that a batch is published as one version, and a failed batch not at all."""
+    playlist_model.apply_batch([
+        {'op': 'add', 'song': sample_song1},
+        {'op': 'add', 'song': sample_song2},
+        {'op': 'move', 'song': sample_song2, 'track_number': 1}
+    ])
+    with pytest.raises(ValueError):
+        playlist_model.apply_batch([{'op': 'clear'}])
+
+    assert playlist_model.changes.changes_since(0) == [
+        {'version': 1, 'changes': [
+            {'op': 'add', 'track_number': 1, 'song': {'id': 1, 'artist': 'Artist 1', 'title': 'Song 1', 'year': 2022, 'genre': 'Pop', 'duration': 180}},
+            {'op': 'add', 'track_number': 2, 'song': {'id': 2, 'artist': 'Artist 2', 'title': 'Song 2', 'year': 2021, 'genre': 'Rock', 'duration': 155}},
+            {'op': 'move', 'song_id': 2, 'track_number': 1}
+        ]}
+    ]
+
+##################################################
+# Sort Test Cases
+##################################################
+
+@pytest.fixture
+def unsorted_playlist_model(playlist_model):
+    """Fixture to provide a playlist of four songs, two of them from the same year."""
+    playlist_model.add_songs_to_playlist([
+        Song(1, 'beta', 'Song 1', 2022, 'Pop', 180),
+        Song(2, 'Alpha', 'Song 2', 2020, 'Rock', 155),
+        Song(3, 'gamma', 'Song 3', 2022, 'Jazz', 200),
+        Song(4, 'Delta', 'Song 4', 2019, 'Pop', 120)
+    ])
+    return playlist_model
+
+def song_ids(playlist_model):
+    return [song.id for song in playlist_model.playlist]
+
+def test_sort_by_year(unsorted_playlist_model):
+    """Test that sorting is stable and keeps the current track on the same song."""
+    unsorted_playlist_model.go_to_track_number(3)
+
+    unsorted_playlist_model.sort_by('year')
+
+    assert song_ids(unsorted_playlist_model) == [4, 2, 1, 3]
+    assert unsorted_playlist_model.current_track_number == 4
+
+def test_sort_by_year_reverse_is_stable(unsorted_playlist_model):
+    """Test that songs with equal keys keep their order when sorting in reverse."""
+    unsorted_playlist_model.sort_by('year', reverse=True)
+    assert song_ids(unsorted_playlist_model) == [1, 3, 2, 4]
+
+def test_sort_by_artist_ignores_case(unsorted_playlist_model):
+    """Test that text keys are compared case-insensitively."""
+    unsorted_playlist_model.sort_by('artist')
+    assert song_ids(unsorted_playlist_model) == [2, 1, 4, 3]
+
+def test_sort_by_play_count(mocker, unsorted_playlist_model):
+    """Test that play counts come from one batched catalog lookup."""
+    mock_get_play_counts = mocker.patch(
+        "music_collection.models.playlist_model.get_play_counts",
+        return_value={1: 5, 2: 20, 3: 5}
+    )
+
+    unsorted_playlist_model.sort_by('play_count', reverse=True)
+
+    assert song_ids(unsorted_playlist_model) == [2, 1, 3, 4]
+    mock_get_play_counts.assert_called_once_with([1, 2, 3, 4])
+
+def test_sort_by_invalid_key(unsorted_playlist_model):
+    """Test error when sorting by an unknown key."""
+    with pytest.raises(ValueError, match="Invalid sort key: id"):
+        unsorted_playlist_model.sort_by('id')
+
+def test_sort_empty_playlist(playlist_model):
+    """Test error when sorting an empty playlist."""
+    with pytest.raises(ValueError, match="Playlist is empty"):
+        playlist_model.sort_by('year')
+
+def test_sort_keeps_shuffle_order(shuffled_playlist_model):
+    """Test that the shuffle order keeps following the same songs after a sort."""
+    shuffled_playlist_model.sort_by('artist', reverse=True)
+
+    assert song_ids(shuffled_playlist_model) == [5, 4, 3, 2, 1]
+    assert list(shuffled_playlist_model.shuffle_order) == [4, 0, 2, 1, 3]
+    assert shuffled_playlist_model.current_track_number == 5
+
+def test_sort_stored_playlist(stored_playlist_model, mock_save_playlist_changes, sample_song1, sample_song2):
+    """Test that a sort respaces and stores every sort key in one write."""
+    stored_playlist_model.add_songs_to_playlist([sample_song1, sample_song2])
+
+    stored_playlist_model.sort_by('duration')
+
+    mock_save_playlist_changes.assert_called_with(
+        "default", [(2, 1024.0), (1, 2048.0)], [], 2, 2, clear=False, changes=ANY
+    )
+    assert stored_playlist_model.changes.changes_since(1) == [
+        {'version': 2, 'changes': [{'op': 'reorder', 'song_ids': [2, 1]}, {'op': 'current_track', 'track_number': 2}]}
+    ]
+
+##################################################
+# Undo Test Cases
+##################################################
+
+@pytest.fixture
+def history_playlist_model(sample_song1, sample_song2):
+    """Fixture to provide a playlist with undo history and two songs."""
+    playlist_model = PlaylistModel(history_bytes=10 ** 6)
+    playlist_model.add_songs_to_playlist([sample_song1, sample_song2])
+    return playlist_model
+
+def test_undo_remove(history_playlist_model, sample_song1, sample_song2):
+    """Test that an accidental remove can be undone and redone."""
+    history_playlist_model.go_to_track_number(2)
+    history_playlist_model.remove_song_by_track_number(1)
+
+    history_playlist_model.undo()
+    assert history_playlist_model.playlist == [sample_song1, sample_song2]
+    assert history_playlist_model.current_track_number == 2
+
+    history_playlist_model.redo()
+    assert history_playlist_model.playlist == [sample_song2]
+
+def test_undo_batch_as_one_step(history_playlist_model, sample_song1, sample_song2):
+    """Test that a batch is undone as a whole."""
+    history_playlist_model.apply_batch([
+        {'op': 'move', 'song': sample_song2, 'track_number': 1},
+        {'op': 'remove', 'song': sample_song1}
+    ])
+
+    history_playlist_model.undo()
+    assert history_playlist_model.playlist == [sample_song1, sample_song2]
+
+def test_undo_skips_playback(mock_update_play_counts, history_playlist_model, sample_song1, sample_song2):
+    """Test that playback is not recorded as an undoable change."""
+    history_playlist_model.play_rest_of_playlist()
+    history_playlist_model.undo()
+    assert history_playlist_model.playlist == []
+
+def test_undo_publishes_reload(history_playlist_model):
+    """Test that an undo tells change feed clients to reload."""
+    history_playlist_model.undo()
+    assert history_playlist_model.changes.changes_since(1) == [{'version': 2, 'changes': [{'op': 'reload'}]}]
+
+def test_history_playlist_matches_list_playlist():
+    """Test that songs found by sort key in the history tree match a plain list through random changes and undo."""
+    rng = random.Random(3)
+    songs = [Song(id=song_id, artist="Artist", title=f"Song {song_id}", year=2000, genre="Pop", duration=100)
+             for song_id in range(1, 41)]
+    history_model = PlaylistModel(history_bytes=10 ** 6)
+    list_model = PlaylistModel()
+    for model in (history_model, list_model):
+        model.add_songs_to_playlist(songs[:30])
+
+    for step in range(200):
+        song_id, other_id = rng.sample([song.id for song in list_model.playlist], 2)
+        track_number = rng.randint(1, len(list_model.playlist))
+        replacement = rng.choice([song for song in songs if song not in list_model.playlist or song.id == song_id])
+        for model in (history_model, list_model):
+            if step % 4 == 0:
+                model.move_song_to_track_number(song_id, track_number)
+            elif step % 4 == 1:
+                model.swap_songs_in_playlist(song_id, other_id)
+            elif step % 4 == 2:
+                model.remove_song_by_song_id(song_id)
+                model.add_song_to_playlist(replacement)
+            else:
+                assert model.get_song_by_song_id(song_id).id == song_id
+        assert list(history_model.playlist) == list_model.playlist
+
+    history_model.undo()
+    assert all(history_model.get_song_by_song_id(song.id) == song for song in history_model.playlist)
+
+def test_undo_nothing(history_playlist_model):
+    """Test error when there is nothing left to undo."""
+    history_playlist_model.undo()
+    with pytest.raises(ValueError, match="Nothing to undo"):
+        history_playlist_model.undo()
+
+def test_undo_disabled(playlist_model):
+    """Test error when undo history is disabled."""
+    with pytest.raises(ValueError, match="Undo history is not enabled"):
+        playlist_model.undo()
+
+def test_undo_not_with_id_only():
+    """Test that undo history cannot be combined with id-only mode."""
+    with pytest.raises(ValueError, match="not available for id-only playlists"):
+        PlaylistModel(id_only=True, history_bytes=1000)
+
+def test_undo_stored_playlist(mocker, mock_save_playlist_changes, sample_song1, sample_song2):
+    """Test that undoing a stored playlist rewrites only the rows whose order changed."""
+    mocker.patch("music_collection.models.playlist_model.load_playlist", return_value=([], 1, 0))
+    playlist_model = PlaylistModel(name="default", history_bytes=10 ** 6)
+    playlist_model.add_songs_to_playlist([sample_song1, sample_song2])
+    playlist_model.move_song_to_beginning(2)
+
+    playlist_model.undo()
+
+    mock_save_playlist_changes.assert_called_with("default", [(1, -1024.0)], [], 1, 3, clear=False, changes=ANY)
+
+def test_undo_clear_stored_playlist(mocker, mock_save_playlist_changes, sample_song1, sample_song2):
+    """Test that undoing a clear stores every song again, and redoing it deletes them."""
+    mocker.patch("music_collection.models.playlist_model.load_playlist", return_value=([], 1, 0))
+    playlist_model = PlaylistModel(name="default", history_bytes=10 ** 6)
+    playlist_model.add_songs_to_playlist([sample_song1, sample_song2])
+    playlist_model.clear_playlist()
+
+    playlist_model.undo()
+    mock_save_playlist_changes.assert_called_with("default", [(1, 1024.0), (2, 2048.0)], [], 1, 3, clear=False, changes=ANY)
 
-    assert playlist_model.current_track_number == 1, "Expected to loop back to the beginning of the playlist"
\ No newline at end of file
+    playlist_model.redo()
+    mock_save_playlist_changes.assert_called_with("default", [], [1, 2], 1, 4, clear=False, changes=ANY)
@@ -0,0 +1,53 @@
+import pytest
+
+from music_collection.models.playlist_history import HistorySongList
+from music_collection.models.playlist_operations import (
+    dedupe_songs,
+    difference_songs,
+    intersect_songs,
+    union_songs
+)
+from music_collection.models.song_model import Song
+
+
+"""Fixtures providing sample playlists for the tests."""
+@pytest.fixture
+def left_playlist():
+    return [
+        Song(3, 'Artist 3', 'Song 3', 2020, 'Jazz', 200),
+        Song(1, 'Artist 1', 'Song 1', 2022, 'Pop', 180),
+        Song(2, 'Artist 2', 'Song 2', 2021, 'Rock', 155)
+    ]
+
+@pytest.fixture
+def right_playlist():
+    return [
+        Song(4, 'Artist 4', 'Song 4', 2019, 'Pop', 210),
+        Song(2, 'Artist 2', 'Song 2', 2021, 'Rock', 155),
+        Song(3, 'Artist 3', 'Song 3', 2020, 'Jazz', 200)
+    ]
+
+
+def song_ids(songs):
+    return [song.id for song in songs]
+
+def test_union_songs(left_playlist, right_playlist):
+    """Test that the union keeps the left order and appends new songs from the right."""
+    assert song_ids(union_songs(left_playlist, right_playlist)) == [3, 1, 2, 4]
+
+def test_union_songs_history_list(left_playlist, right_playlist):
+    """Test that the union accepts playlists stored as persistent song lists."""
+    assert song_ids(union_songs(HistorySongList(left_playlist), right_playlist)) == [3, 1, 2, 4]
+
+def test_intersect_songs(left_playlist, right_playlist):
+    """Test that the intersection keeps the left order."""
+    assert song_ids(intersect_songs(left_playlist, right_playlist)) == [3, 2]
+
+def test_difference_songs(left_playlist, right_playlist):
+    """Test that the difference keeps the left order."""
+    assert song_ids(difference_songs(left_playlist, right_playlist)) == [1]
+
+def test_dedupe_songs(left_playlist):
+    """Test that re-releases of the same artist and title are dropped."""
+    left_playlist.append(Song(5, 'ARTIST 1', 'song 1', 2023, 'Pop', 181))
+    assert song_ids(dedupe_songs(left_playlist)) == [3, 1, 2]
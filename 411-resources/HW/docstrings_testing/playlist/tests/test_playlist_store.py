@@ -0,0 +1,207 @@
+from contextlib import contextmanager
+import json
+import re
+
+import pytest
+
+from music_collection.models.playlist_store import (
+    get_playlist_version, list_playlists, load_playlist, load_playlist_changes, load_playlist_page,
+    save_playlist_changes
+)
+from music_collection.models.song_model import Song
+
+######################################################
+#
+#    Fixtures
+#
+######################################################
+
+def normalize_whitespace(sql_query: str) -> str:
+    return re.sub(r'\s+', ' ', sql_query).strip()
+
+# Mocking the database connection for tests
+@pytest.fixture
+def mock_cursor(mocker):
+    mock_conn = mocker.Mock()
+    mock_cursor = mocker.Mock()
+
+    # Mock the connection's cursor
+    mock_conn.cursor.return_value = mock_cursor
+    mock_cursor.fetchone.return_value = None  # Default return for queries
+    mock_cursor.fetchall.return_value = []
+    mock_conn.commit.return_value = None
+
+    # Mock the get_db_connection context manager from sql_utils
+    @contextmanager
+    def mock_get_db_connection():
+        yield mock_conn  # Yield the mocked connection object
+
+    mocker.patch("music_collection.models.playlist_store.get_db_connection", mock_get_db_connection)
+
+    return mock_cursor  # Return the mock cursor so we can set expectations per test
+
+######################################################
+#
+#    Load
+#
+######################################################
+
+def test_load_playlist(mock_cursor):
+    """Test restoring a stored playlist in sort key order."""
+    mock_cursor.fetchone.return_value = (2, 7)
+    mock_cursor.fetchall.return_value = [
+        (2, "Artist B", "Song B", 2021, "Pop", 180, 512.0),
+        (1, "Artist A", "Song A", 2020, "Rock", 210, 1024.0)
+    ]
+
+    tracks, current_track_number, version = load_playlist("default")
+
+    assert tracks == [
+        (Song(2, "Artist B", "Song B", 2021, "Pop", 180), 512.0),
+        (Song(1, "Artist A", "Song A", 2020, "Rock", 210), 1024.0)
+    ]
+    assert current_track_number == 2
+    assert version == 7
+
+    expected_query = normalize_whitespace("""
+        SELECT s.id, s.artist, s.title, s.year, s.genre, s.duration, t.sort_key
+        FROM playlist_tracks t
+        JOIN songs s ON s.id = t.song_id
+        WHERE t.playlist_name = ?
+        ORDER BY t.sort_key
+    """)
+    assert normalize_whitespace(mock_cursor.execute.call_args[0][0]) == expected_query
+    assert mock_cursor.execute.call_args[0][1] == ("default",)
+
+def test_load_playlist_not_stored(mock_cursor):
+    """Test that a playlist that was never stored loads as empty."""
+    mock_cursor.fetchone.return_value = None
+
+    assert load_playlist("default") == ([], 1, 0)
+    mock_cursor.execute.assert_called_once()
+
+def test_load_playlist_page(mock_cursor):
+    """Test that a page starts after the keyset cursor and is limited in size."""
+    mock_cursor.fetchall.return_value = [(2, "Artist B", "Song B", 2021, "Pop", 180, 2048.0)]
+
+    page = load_playlist_page("default", (1024.0, 1), 1)
+
+    assert page == [(Song(2, "Artist B", "Song B", 2021, "Pop", 180), 2048.0)]
+    sql, args = mock_cursor.execute.call_args[0]
+    assert "WHERE t.playlist_name = ? AND (t.sort_key, t.song_id) > (?, ?)" in normalize_whitespace(sql)
+    assert normalize_whitespace(sql).endswith("ORDER BY t.sort_key, t.song_id LIMIT ?")
+    assert args == ("default", 1024.0, 1, 1)
+
+def test_load_playlist_page_first(mock_cursor):
+    """Test that the first page starts before every sort key."""
+    load_playlist_page("default", limit=2)
+
+    assert mock_cursor.execute.call_args[0][1] == ("default", float("-inf"), -1, 2)
+
+def test_get_playlist_version(mock_cursor):
+    """Test reading the stored version of a playlist."""
+    mock_cursor.fetchone.return_value = (7,)
+
+    assert get_playlist_version("default") == 7
+    assert mock_cursor.execute.call_args[0][1] == ("default",)
+
+def test_get_playlist_version_not_stored(mock_cursor):
+    """Test that a playlist that was never stored is at version 0."""
+    assert get_playlist_version("default") == 0
+
+def test_load_playlist_changes(mock_cursor):
+    """Test replaying the stored changes after a version."""
+    mock_cursor.fetchone.return_value = (5,)
+    mock_cursor.fetchall.return_value = [(4, '[{"op": "clear"}]'), (5, '[]')]
+
+    assert load_playlist_changes("default", 3) == (5, [
+        {'version': 4, 'changes': [{'op': 'clear'}]},
+        {'version': 5, 'changes': []}
+    ])
+    assert mock_cursor.execute.call_args[0][1] == ("default", 3)
+
+def test_load_playlist_changes_up_to_date(mock_cursor):
+    """Test that a client at the stored version gets no changes and no second query."""
+    mock_cursor.fetchone.return_value = (5,)
+
+    assert load_playlist_changes("default", 5) == (5, [])
+    mock_cursor.execute.assert_called_once()
+
+def test_load_playlist_changes_trimmed(mock_cursor):
+    """Test that a client has to reload when the versions it missed are no longer stored."""
+    mock_cursor.fetchone.return_value = (5,)
+    mock_cursor.fetchall.return_value = [(5, '[]')]
+
+    assert load_playlist_changes("default", 3) == (5, None)
+
+def test_load_playlist_changes_ahead(mock_cursor):
+    """Test that a client ahead of the store, e.g. after the database was recreated, has to reload."""
+    mock_cursor.fetchone.return_value = (2,)
+
+    assert load_playlist_changes("default", 7) == (2, None)
+
+def test_list_playlists(mock_cursor):
+    """Test listing the stored playlists."""
+    mock_cursor.fetchall.return_value = [("default", 2, 7), ("road trip", 0, 1)]
+
+    assert list_playlists() == [
+        {'name': "default", 'length': 2, 'version': 7},
+        {'name': "road trip", 'length': 0, 'version': 1}
+    ]
+
+######################################################
+#
+#    Save
+#
+######################################################
+
+def test_save_playlist_changes(mock_cursor):
+    """Test that only the changed rows are written."""
+    mock_cursor.rowcount = 1
+
+    assert save_playlist_changes("default", [(3, 1536.0)], [4], 2, 5) is True
+
+    state_args = mock_cursor.execute.call_args[0][1]
+    assert state_args == ("default", 2, 5)
+
+    delete_sql, delete_args = mock_cursor.executemany.call_args_list[0][0]
+    assert normalize_whitespace(delete_sql) == "DELETE FROM playlist_tracks WHERE playlist_name = ? AND song_id = ?"
+    assert delete_args == [("default", 4)]
+
+    upsert_args = mock_cursor.executemany.call_args_list[1][0][1]
+    assert upsert_args == [("default", 3, 1536.0)]
+
+def test_save_playlist_changes_clear(mock_cursor):
+    """Test that clearing removes every stored track for the playlist."""
+    save_playlist_changes("default", [], [], 1, 3, clear=True)
+
+    actual_query = normalize_whitespace(mock_cursor.execute.call_args_list[1][0][0])
+    assert actual_query == "DELETE FROM playlist_tracks WHERE playlist_name = ?"
+    assert mock_cursor.execute.call_args_list[1][0][1] == ("default",)
+
+def test_save_playlist_changes_checks_version(mock_cursor):
+    """Test that the playlist row is only updated from the version before the change."""
+    mock_cursor.rowcount = 1
+
+    save_playlist_changes("default", [], [], 1, 3)
+
+    actual_query = normalize_whitespace(mock_cursor.execute.call_args_list[0][0][0])
+    assert actual_query.endswith("WHERE playlists.version = excluded.version - 1")
+
+def test_save_playlist_changes_conflict(mock_cursor):
+    """Test that nothing is written when another process stored a newer version first."""
+    mock_cursor.rowcount = 0
+
+    assert save_playlist_changes("default", [(3, 1536.0)], [4], 2, 5) is False
+    mock_cursor.executemany.assert_not_called()
+
+def test_save_playlist_changes_stores_changes(mock_cursor):
+    """Test that the changes of a version are stored and older versions trimmed."""
+    mock_cursor.rowcount = 1
+
+    save_playlist_changes("default", [], [], 1, 1500, changes=[{'op': 'clear'}])
+
+    insert_sql, insert_args = mock_cursor.execute.call_args_list[-2][0]
+    assert "INSERT OR REPLACE INTO playlist_changes" in insert_sql
+    assert insert_args == ("default", 1500, json.dumps([{'op': 'clear'}]))
+    assert mock_cursor.execute.call_args_list[-1][0][1] == ("default", 500)
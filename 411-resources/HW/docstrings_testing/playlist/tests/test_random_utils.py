@@ -1,7 +1,7 @@
 import pytest
 import requests
 
-from music_collection.utils.random_utils import get_random
+from music_collection.utils.random_utils import get_random, get_random_batch
 
 
 RANDOM_NUMBER = 42
@@ -47,4 +47,20 @@ def test_get_random_invalid_response(mock_random_org):
     mock_random_org.text = "invalid_response"
 
     with pytest.raises(ValueError, match="Invalid response from random.org: invalid_response"):
-        get_random(NUM_SONGS)
\ No newline at end of file
+        get_random(NUM_SONGS)
+
+def test_get_random_batch(mock_random_org):
+    """Test retrieving many random numbers in one request."""
+    mock_random_org.text = "5\n17\n3\n"
+
+    result = get_random_batch(3, NUM_SONGS)
+
+    assert result == [5, 17, 3]
+    requests.get.assert_called_once_with("https://www.random.org/integers/?num=3&min=1&max=100&col=1&base=10&format=plain&rnd=new", timeout=5)
+
+def test_get_random_batch_short_response(mock_random_org):
+    """Simulate a response with fewer numbers than requested."""
+    mock_random_org.text = "5\n"
+
+    with pytest.raises(ValueError, match="expected 3 numbers, got 1"):
+        get_random_batch(3, NUM_SONGS)
@@ -0,0 +1,102 @@
+import pytest
+
+from music_collection.models.playlist_model import PlaylistModel
+from music_collection.models.smart_playlist import MAX_TARGET_DURATION, fit_duration, generate_playlist
+from music_collection.models.song_model import Song
+
+
+"""Fixtures providing sample candidates for the tests."""
+@pytest.fixture
+def candidates():
+    return [
+        Song(1, 'Artist 1', 'Song 1', 2020, 'Rock', 300),
+        Song(2, 'Artist 2', 'Song 2', 2021, 'Rock', 240),
+        Song(3, 'Artist 3', 'Song 3', 2022, 'Rock', 240),
+        Song(4, 'Artist 4', 'Song 4', 2019, 'Rock', 180),
+        Song(5, 'Artist 5', 'Song 5', 2018, 'Rock', 200)
+    ]
+
+@pytest.fixture
+def mock_get_songs_by_filters(mocker, candidates):
+    return mocker.patch("music_collection.models.smart_playlist.get_songs_by_filters", return_value=candidates)
+
+
+def test_fit_duration_exact():
+    """Test that an exact fit is found when one exists."""
+    durations = [300, 240, 240, 180, 200]
+    chosen = fit_duration(durations, 720, 0)
+    assert sum(durations[index] for index in chosen) == 720
+
+def test_fit_duration_prefers_closest_total():
+    """Test that the total closest to the target is chosen within the tolerance."""
+    durations = [100, 250, 400]
+    chosen = fit_duration(durations, 510, 100)
+    assert sum(durations[index] for index in chosen) == 500
+
+def test_fit_duration_prefers_earlier_candidates():
+    """Test that earlier candidates win among songs of the same duration."""
+    assert fit_duration([200, 200, 200], 400, 0) == [0, 1]
+
+def test_fit_duration_uses_each_song_once():
+    """Test that many songs of one duration are never reused."""
+    durations = [60] * 1000
+    chosen = fit_duration(durations, 3600, 0)
+    assert chosen == list(range(60))
+
+def test_fit_duration_no_fit():
+    """Test error when no combination lands within the tolerance."""
+    with pytest.raises(ValueError, match="No combination of songs is within 10 seconds of 100 seconds"):
+        fit_duration([300, 400], 100, 10)
+
+def test_fit_duration_too_long():
+    """Test error when target + tolerance is above the limit, before any bitset is built."""
+    with pytest.raises(ValueError, match=f"must be at most {MAX_TARGET_DURATION} seconds"):
+        fit_duration([300], MAX_TARGET_DURATION, 1)
+
+def test_fit_duration_bounded_by_candidates():
+    """Test that a target above the candidates' total still finds the whole set within the tolerance."""
+    durations = [300, 240, 180]
+    chosen = fit_duration(durations, 1000, 300)
+    assert chosen == [0, 1, 2]
+
+def test_generate_playlist(mock_get_songs_by_filters):
+    """Test filling a new playlist with songs that fit the target duration."""
+    playlist_model = generate_playlist(420, tolerance=0, genre='Rock', min_year=2018)
+
+    assert playlist_model.get_playlist_duration() == 420
+    assert [song.id for song in playlist_model.playlist] == [2, 4]
+    mock_get_songs_by_filters.assert_called_once_with('Rock', 2018, None, None)
+
+def test_generate_playlist_fills_given_playlist(mock_get_songs_by_filters):
+    """Test that a given empty playlist is filled in place."""
+    playlist_model = PlaylistModel()
+    assert generate_playlist(480, tolerance=0, playlist_model=playlist_model) is playlist_model
+    assert playlist_model.get_playlist_duration() == 480
+
+def test_generate_playlist_non_empty(mock_get_songs_by_filters, candidates):
+    """Test error when the playlist to fill already has songs."""
+    playlist_model = PlaylistModel()
+    playlist_model.add_song_to_playlist(candidates[0])
+    with pytest.raises(ValueError, match="already has songs"):
+        generate_playlist(600, playlist_model=playlist_model)
+
+def test_generate_playlist_filled_meanwhile(mocker, candidates):
+    """Test that songs added while the fit is computed make generating fail rather than append to them."""
+    playlist_model = PlaylistModel()
+
+    def fill_meanwhile(*args):
+        playlist_model.add_song_to_playlist(candidates[0])
+        return candidates
+    mocker.patch("music_collection.models.smart_playlist.get_songs_by_filters", side_effect=fill_meanwhile)
+
+    with pytest.raises(ValueError, match="already has songs"):
+        generate_playlist(480, tolerance=0, playlist_model=playlist_model)
+    assert [song.id for song in playlist_model.playlist] == [1]
+
+@pytest.mark.parametrize("target_duration, tolerance", [
+    (0, 60), (-5, 60), (600, -1), ("600", 60), (10**9, 60), (MAX_TARGET_DURATION, 1)
+])
+def test_generate_playlist_invalid_input(target_duration, tolerance):
+    """Test error when the target duration or tolerance is invalid."""
+    with pytest.raises(ValueError, match="Invalid"):
+        generate_playlist(target_duration, tolerance)
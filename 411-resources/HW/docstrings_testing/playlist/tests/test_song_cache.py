@@ -0,0 +1,87 @@
+import pytest
+
+from music_collection.models.song_cache import SongCache, SongFragmentCache, SongIdList
+from music_collection.models.song_model import Song
+
+
+@pytest.fixture
+def song_cache():
+    """Fixture to provide an empty cache for each test."""
+    return SongCache(max_size=2)
+
+@pytest.fixture
+def mock_get_songs_by_ids(mocker):
+    """Mock the catalog lookup with three songs."""
+    catalog = {song_id: Song(song_id, f'Artist {song_id}', f'Song {song_id}', 2020, 'Pop', 100 + song_id) for song_id in (1, 2, 3)}
+    return mocker.patch(
+        "music_collection.models.song_cache.get_songs_by_ids",
+        side_effect=lambda song_ids, include_deleted: {song_id: catalog[song_id] for song_id in song_ids if song_id in catalog}
+    )
+
+
+def test_get_songs_batches_misses(song_cache, mock_get_songs_by_ids):
+    """Test that cache misses are looked up together and hits are not looked up again."""
+    songs = song_cache.get_songs([2, 1, 2])
+
+    assert [song.id for song in songs] == [2, 1, 2]
+    mock_get_songs_by_ids.assert_called_once_with([2, 1], include_deleted=True)
+
+    song_cache.get_song(1)
+    assert mock_get_songs_by_ids.call_count == 1
+
+def test_get_songs_not_found(song_cache, mock_get_songs_by_ids):
+    """Test error when a song is not in the catalog."""
+    with pytest.raises(ValueError, match=r"Songs with IDs \[9\] not found in catalog"):
+        song_cache.get_songs([1, 9])
+
+def test_cache_evicts_least_recently_used(song_cache, mock_get_songs_by_ids):
+    """Test that the cache stays within its size by evicting the least recently used song."""
+    song_cache.get_songs([1, 2])
+    song_cache.get_song(1)
+    song_cache.get_song(3)
+
+    assert len(song_cache) == 2
+    song_cache.get_song(1)
+    assert mock_get_songs_by_ids.call_count == 2
+
+def test_song_id_list(song_cache, mock_get_songs_by_ids):
+    """Test that a SongIdList behaves like a list of songs while storing IDs."""
+    songs = song_cache.get_songs([1, 2, 3])
+    song_ids = SongIdList(songs[:2], cache=song_cache)
+    song_ids.insert(0, songs[2])
+    song_ids.remove(songs[0])
+
+    assert song_ids.ids.tolist() == [3, 2]
+    assert list(song_ids) == [songs[2], songs[1]]
+    assert song_ids[1:] == [songs[1]]
+    assert songs[1] in song_ids
+    assert song_ids.index(songs[1]) == 1
+
+def test_song_id_list_copy(song_cache):
+    """Test that a copy is independent of the original."""
+    song = Song(1, 'Artist 1', 'Song 1', 2020, 'Pop', 101)
+    song_ids = SongIdList([song], cache=song_cache)
+    copied = song_ids.copy()
+    song_ids.clear()
+
+    assert copied.ids.tolist() == [1]
+    assert len(song_ids) == 0
+
+def test_fragment_cache_reuses_fragments(mocker):
+    """Test that a song is encoded once and its fragment reused until it changes."""
+    mock_dumps = mocker.patch("music_collection.models.song_cache.dumps", side_effect=lambda song: str(song.duration).encode())
+    fragment_cache = SongFragmentCache()
+    song = Song(1, 'Artist 1', 'Song 1', 2020, 'Pop', 101)
+
+    assert fragment_cache.encode([song, song]) == [b'101', b'101']
+    assert mock_dumps.call_count == 1
+
+    song.duration = 202
+    assert fragment_cache.encode([song]) == [b'202']
+    assert mock_dumps.call_count == 2
+
+def test_fragment_cache_evicts():
+    """Test that the fragment cache stays within its size."""
+    fragment_cache = SongFragmentCache(max_size=1)
+    fragment_cache.encode([Song(1, 'Artist 1', 'Song 1', 2020, 'Pop', 101), Song(2, 'Artist 2', 'Song 2', 2020, 'Pop', 102)])
+    assert len(fragment_cache) == 1
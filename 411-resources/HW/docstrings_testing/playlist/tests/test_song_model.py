@@ -11,9 +11,14 @@ from music_collection.models.song_model import (
     delete_song,
     get_song_by_id,
     get_song_by_compound_key,
+    get_songs_by_compound_keys,
+    get_songs_by_filters,
+    get_play_counts,
+    get_songs_by_ids,
     get_all_songs,
     get_random_song,
-    update_play_count
+    update_play_count,
+    update_play_counts
 )
 
 ######################################################
@@ -423,3 +428,119 @@ def test_update_play_count_deleted_song(mock_cursor):
 
     # Ensure that no SQL query for updating play count was executed
     mock_cursor.execute.assert_called_once_with("SELECT deleted FROM songs WHERE id = ?", (1,))
+
+
+def test_update_play_counts(mock_cursor):
+    """Test incrementing the play counts of many songs in one transaction."""
+
+    # Simulate that song 3 has been deleted
+    mock_cursor.fetchall.return_value = [(1,), (2,)]
+
+    skipped_ids = update_play_counts([1, 2, 1, 3])
+
+    # Ensure all songs were validated with a single query
+    expected_select = normalize_whitespace("SELECT id FROM songs WHERE deleted = FALSE AND id IN (?, ?, ?)")
+    assert normalize_whitespace(mock_cursor.execute.call_args[0][0]) == expected_select
+    assert mock_cursor.execute.call_args[0][1] == [1, 2, 3]
+
+    # Ensure repeated songs were grouped and the deleted song was skipped
+    expected_update = normalize_whitespace("UPDATE songs SET play_count = play_count + ? WHERE id = ? AND deleted = FALSE")
+    assert normalize_whitespace(mock_cursor.executemany.call_args[0][0]) == expected_update
+    assert mock_cursor.executemany.call_args[0][1] == [(2, 1), (1, 2)]
+    assert skipped_ids == [3]
+
+def test_update_play_counts_empty(mock_cursor):
+    """Test that an empty batch does not touch the database."""
+    assert update_play_counts([]) == []
+    mock_cursor.execute.assert_not_called()
+
+def test_get_songs_by_compound_keys(mock_cursor):
+    """Test retrieving many songs by compound key with one query."""
+
+    # Simulate that the second song has been deleted and the third is missing
+    mock_cursor.fetchall.return_value = [
+        (1, "Artist A", "Song A", 2020, "Rock", 210, False),
+        (2, "Artist B", "Song B", 2021, "Pop", 180, True)
+    ]
+
+    songs = get_songs_by_compound_keys([
+        ("Artist A", "Song A", 2020),
+        ("Artist B", "Song B", 2021),
+        ("Artist C", "Song C", 2022),
+        ("Artist A", "Song A", 2020)
+    ])
+
+    assert songs == {
+        ("Artist A", "Song A", 2020): Song(1, "Artist A", "Song A", 2020, "Rock", 210),
+        ("Artist B", "Song B", 2021): None
+    }
+
+    # Ensure duplicate keys were only looked up once, in a single query
+    mock_cursor.execute.assert_called_once()
+    expected_query = normalize_whitespace("""
+        SELECT id, artist, title, year, genre, duration, deleted
+        FROM songs
+        WHERE (artist, title, year) IN (VALUES (?, ?, ?), (?, ?, ?), (?, ?, ?))
+    """)
+    assert normalize_whitespace(mock_cursor.execute.call_args[0][0]) == expected_query
+    assert mock_cursor.execute.call_args[0][1] == ["Artist A", "Song A", 2020, "Artist B", "Song B", 2021, "Artist C", "Song C", 2022]
+
+def test_get_songs_by_ids(mock_cursor):
+    """Test retrieving many songs by ID with one query."""
+
+    # Simulate that the second song has been deleted and the third is missing
+    mock_cursor.fetchall.return_value = [
+        (1, "Artist A", "Song A", 2020, "Rock", 210, False),
+        (2, "Artist B", "Song B", 2021, "Pop", 180, True)
+    ]
+
+    songs = get_songs_by_ids([1, 2, 3, 1])
+
+    assert songs == {1: Song(1, "Artist A", "Song A", 2020, "Rock", 210), 2: None}
+
+    mock_cursor.execute.assert_called_once()
+    expected_query = normalize_whitespace("SELECT id, artist, title, year, genre, duration, deleted FROM songs WHERE id IN (?, ?, ?)")
+    assert normalize_whitespace(mock_cursor.execute.call_args[0][0]) == expected_query
+    assert mock_cursor.execute.call_args[0][1] == [1, 2, 3]
+
+def test_get_songs_by_filters(mock_cursor):
+    """Test retrieving the candidate songs for a smart playlist."""
+
+    mock_cursor.fetchall.return_value = [
+        (2, "Artist B", "Song B", 2021, "Rock", 180),
+        (1, "Artist A", "Song A", 2020, "Rock", 210)
+    ]
+
+    songs = get_songs_by_filters(genre="Rock", min_year=2020, max_year=2022, min_play_count=5)
+
+    assert songs == [Song(2, "Artist B", "Song B", 2021, "Rock", 180), Song(1, "Artist A", "Song A", 2020, "Rock", 210)]
+
+    expected_query = normalize_whitespace("""
+        SELECT id, artist, title, year, genre, duration FROM songs WHERE deleted = FALSE
+        AND genre = ? AND year >= ? AND year <= ? AND play_count >= ? ORDER BY play_count DESC
+    """)
+    assert normalize_whitespace(mock_cursor.execute.call_args[0][0]) == expected_query
+    assert mock_cursor.execute.call_args[0][1] == ["Rock", 2020, 2022, 5]
+
+def test_get_songs_by_filters_no_filters(mock_cursor):
+    """Test that without filters every non-deleted song is a candidate."""
+
+    mock_cursor.fetchall.return_value = []
+
+    assert get_songs_by_filters() == []
+
+    expected_query = normalize_whitespace("SELECT id, artist, title, year, genre, duration FROM songs WHERE deleted = FALSE ORDER BY play_count DESC")
+    assert normalize_whitespace(mock_cursor.execute.call_args[0][0]) == expected_query
+    assert mock_cursor.execute.call_args[0][1] == []
+
+def test_get_play_counts(mock_cursor):
+    """Test retrieving the play counts of many songs with one query."""
+
+    mock_cursor.fetchall.return_value = [(1, 5), (3, 0)]
+
+    assert get_play_counts([1, 2, 3, 1]) == {1: 5, 3: 0}
+
+    mock_cursor.execute.assert_called_once()
+    expected_query = normalize_whitespace("SELECT id, play_count FROM songs WHERE id IN (?, ?, ?)")
+    assert normalize_whitespace(mock_cursor.execute.call_args[0][0]) == expected_query
+    assert mock_cursor.execute.call_args[0][1] == [1, 2, 3]